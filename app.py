@@ -418,49 +418,22 @@ def auto_import_recipes():
                     # Import recipes directly to ChromaDB collections
                     recipes_to_import = recipes[:1000]  # Limit to 1000 for startup speed
                     
-                    # Prepare data for ChromaDB
-                    ids = []
-                    documents = []
-                    metadatas = []
-                    
+                    # Recipes without an id get a placeholder one
+                    prepared = []
                     for recipe in recipes_to_import:
-                        try:
-                            recipe_id = str(recipe.get('id', f"backup_{total_added}"))
-                            ids.append(recipe_id)
-                            
-                            # Store the full recipe as a JSON string
-                            documents.append(json.dumps(recipe))
-                            
-                            # Create metadata
-                            metadata = {
-                                'id': recipe_id,
-                                'title': recipe.get('title', 'Unknown Recipe'),
-                                'source': recipe.get('source', 'backup'),
-                                'cached_at': str(int(time.time()))
-                            }
-                            
-                            # Add additional metadata if available
-                            if recipe.get('cuisines'):
-                                metadata['cuisines'] = ','.join(recipe['cuisines'][:3])
-                            if recipe.get('diets'):
-                                metadata['diets'] = ','.join(recipe['diets'][:3])
-                            
-                            metadatas.append(metadata)
-                            total_added += 1
-                        except Exception as e:
-                            print(f"❌ Failed to process recipe {recipe.get('title', 'Unknown')}: {e}")
+                        if not isinstance(recipe, dict):
+                            continue
+                        recipe_id = str(recipe.get('id', f"backup_{len(prepared)}"))
+                        prepared.append(dict(recipe, id=recipe_id, source=recipe.get('source', 'backup')))
                     
-                    # Batch insert to ChromaDB
-                    if ids:
-                        try:
-                            recipe_cache.recipe_collection.upsert(
-                                ids=ids,
-                                documents=documents,
-                                metadatas=metadatas
-                            )
-                            print(f"✅ Successfully imported {len(ids)} recipes to ChromaDB")
-                        except Exception as e:
-                            print(f"❌ Failed to upsert recipes to ChromaDB: {e}")
+                    # Written as schema v2 documents with the filterable metadata,
+                    # and published to the in-process corpus
+                    if prepared:
+                        if recipe_cache.cache_recipes(prepared):
+                            total_added += len(prepared)
+                            print(f"✅ Successfully imported {len(prepared)} recipes to ChromaDB")
+                        else:
+                            print("❌ Failed to upsert recipes to ChromaDB")
                     
                     recipes_loaded = True
                     print(f"✅ Successfully loaded {total_added} recipes from {backup_file}!")
@@ -508,25 +481,8 @@ def auto_import_recipes():
             # Add curated recipes to ChromaDB
             if curated_recipes:
                 try:
-                    curated_ids = []
-                    curated_docs = []
-                    curated_metas = []
-                    
-                    for recipe in curated_recipes:
-                        curated_ids.append(recipe['id'])
-                        curated_docs.append(json.dumps(recipe))
-                        curated_metas.append({
-                            'id': recipe['id'],
-                            'title': recipe['title'],
-                            'source': recipe['source'],
-                            'cached_at': str(int(time.time()))
-                        })
-                    
-                    recipe_cache.recipe_collection.upsert(
-                        ids=curated_ids,
-                        documents=curated_docs,
-                        metadatas=curated_metas
-                    )
+                    if not recipe_cache.cache_recipes(curated_recipes):
+                        raise RuntimeError("recipe cache rejected the curated recipes")
                     total_added += len(curated_recipes)
                     print(f"✅ Added {len(curated_recipes)} curated recipes")
                     
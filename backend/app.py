@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from config.logging_config import configure_logging
 from services.recipe_cache_service import RecipeCacheService
 from services.email_service import EmailService
+from services.prefork import PREFORK_PRELOAD, preload_recipe_corpus
 from routes.recipe_routes import register_recipe_routes
 from routes.auth_routes import auth_bp
 from routes.preferences import preferences_bp
@@ -25,37 +26,7 @@ load_dotenv()
 debug_mode = os.environ.get("DEBUG", "false").lower() == "true"
 configure_logging(debug_mode)
 
-# Initialize Flask app
-app = Flask(__name__)
-
-# Configure session for authentication
-app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-
-# Configure CORS for development and production
-allowed_origins = [
-    "http://localhost:8081", "http://127.0.0.1:8081", 
-    "http://localhost:8083", "http://127.0.0.1:8083",
-    # Add your production frontend URLs here
-    "https://betterbulk.netlify.app",  # Your actual Netlify frontend URL
-]
-
-# Configure CORS properly to handle preflight requests
-cors = CORS(app, 
-    origins=allowed_origins,
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With", "x-requested-with"],
-    expose_headers=["Content-Type", "Authorization", "X-Requested-With", "x-requested-with"],
-    supports_credentials=True,
-    max_age=3600
-)
-
-# Initialize services
-recipe_cache = RecipeCacheService()
-
-def ensure_recipes_loaded():
+def ensure_recipes_loaded(recipe_cache):
     """Auto-restore recipes if count is too low on startup"""
     try:
         count_result = recipe_cache.get_recipe_count()
@@ -136,26 +107,73 @@ def ensure_recipes_loaded():
     except Exception as e:
         print(f"❌ Error checking/restoring recipes: {e}")
 
-# Auto-restore recipes on startup
-ensure_recipes_loaded()
 
-# Initialize email service with the Flask app
-email_service = EmailService(app)
-print("✓ Email service initialized")
+def create_app(preload_corpus: bool = PREFORK_PRELOAD) -> Flask:
+    """
+    Build the Flask app and its services.
+    
+    Args:
+        preload_corpus: Load the recipe corpus and indexes now so forked gunicorn
+            workers share them (see gunicorn.conf.py)
+    """
+    # Initialize Flask app
+    app = Flask(__name__)
+
+    # Configure session for authentication
+    app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+
+    # Configure CORS for development and production
+    allowed_origins = [
+        "http://localhost:8081", "http://127.0.0.1:8081", 
+        "http://localhost:8083", "http://127.0.0.1:8083",
+        # Add your production frontend URLs here
+        "https://betterbulk.netlify.app",  # Your actual Netlify frontend URL
+    ]
+
+    # Configure CORS properly to handle preflight requests
+    cors = CORS(app, 
+        origins=allowed_origins,
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+        allow_headers=["Content-Type", "Authorization", "X-Requested-With", "x-requested-with"],
+        expose_headers=["Content-Type", "Authorization", "X-Requested-With", "x-requested-with"],
+        supports_credentials=True,
+        max_age=3600
+    )
+
+    # Initialize services
+    recipe_cache = RecipeCacheService()
+
+    # Auto-restore recipes on startup
+    ensure_recipes_loaded(recipe_cache)
+
+    # Initialize email service with the Flask app
+    email_service = EmailService(app)
+    print("✓ Email service initialized")
+
+    # Register routes
+    app = register_recipe_routes(app, recipe_cache)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(preferences_bp, url_prefix='/api')
+    app.register_blueprint(meal_planner_bp, url_prefix='/api')
+    # app.register_blueprint(ai_meal_planner_bp, url_prefix='/api')  # Commented out to avoid route conflict
+    app.register_blueprint(health_bp)  # Health check routes
+    app.register_blueprint(review_bp, url_prefix='/api')  # Review routes
+    app.register_blueprint(folder_bp, url_prefix='/api')  # Folder routes
+    app.register_blueprint(smart_features_bp, url_prefix='/api')  # Smart features routes
+    app.register_blueprint(image_proxy_bp, url_prefix='/api')  # Image proxy routes
+    app.register_blueprint(test_bp, url_prefix='/api')  # Test routes
+    app.register_blueprint(test_meal_bp, url_prefix='/api')  # Test meal planner routes
+    
+    if preload_corpus:
+        preload_recipe_corpus(recipe_cache)
+    
+    return app
+
 
-# Register routes
-app = register_recipe_routes(app, recipe_cache)
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(preferences_bp, url_prefix='/api')
-app.register_blueprint(meal_planner_bp, url_prefix='/api')
-# app.register_blueprint(ai_meal_planner_bp, url_prefix='/api')  # Commented out to avoid route conflict
-app.register_blueprint(health_bp)  # Health check routes
-app.register_blueprint(review_bp, url_prefix='/api')  # Review routes
-app.register_blueprint(folder_bp, url_prefix='/api')  # Folder routes
-app.register_blueprint(smart_features_bp, url_prefix='/api')  # Smart features routes
-app.register_blueprint(image_proxy_bp, url_prefix='/api')  # Image proxy routes
-app.register_blueprint(test_bp, url_prefix='/api')  # Test routes
-app.register_blueprint(test_meal_bp, url_prefix='/api')  # Test meal planner routes
+app = create_app()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5003))
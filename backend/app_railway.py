@@ -5,6 +5,7 @@ import json
 from dotenv import load_dotenv
 from config.logging_config import configure_logging
 from services.recipe_cache_service import RecipeCacheService
+from services.recipe_document import decode_legacy_document
 from services.email_service import EmailService
 from routes.recipe_routes import register_recipe_routes
 from routes.auth_routes import auth_bp
@@ -188,38 +189,32 @@ def populate_from_file():
         
         print(f"Processing {len(recipes)} recipes from sync data...")
         
-        # Add recipes to cache
-        for i, recipe_info in enumerate(recipes):
+        # Build the recipes, then write them through the cache so they get
+        # schema v2 documents and the filterable metadata
+        prepared = []
+        for recipe_info in recipes:
+            recipe_id = recipe_info.get('id')
             try:
-                recipe_id = recipe_info['id']
-                metadata = recipe_info['metadata']
-                recipe_data = recipe_info['data']
+                metadata = recipe_info.get('metadata') or {}
                 
                 # Use document field if available (merged data), otherwise merge data and metadata
                 if 'document' in recipe_info:
-                    document_data = recipe_info['document']
+                    recipe = decode_legacy_document(recipe_info['document'], metadata, recipe_id)
+                    if recipe is None:
+                        raise ValueError("document holds no recipe")
                 else:
                     # Merge metadata into recipe data for frontend compatibility
-                    merged_recipe = recipe_data.copy()
+                    recipe = dict(recipe_info['data'])
                     for key, value in metadata.items():
-                        if key not in merged_recipe or merged_recipe[key] is None or merged_recipe[key] == '':
-                            merged_recipe[key] = value
-                    document_data = json.dumps(merged_recipe)
-                
-                # Store in recipe collection
-                recipe_cache.recipe_collection.upsert(
-                    ids=[recipe_id],
-                    documents=[document_data],
-                    metadatas=[metadata]
-                )
-                
-                if (i + 1) % 100 == 0:
-                    print(f"Processed {i + 1}/{len(recipes)} recipes...")
-                    
+                        if key not in recipe or recipe[key] is None or recipe[key] == '':
+                            recipe[key] = value
+                prepared.append(dict(recipe, id=str(recipe_id)))
             except Exception as e:
                 print(f"Error processing recipe {recipe_id}: {e}")
                 continue
         
+        if not recipe_cache.cache_recipes(prepared):
+            return {'status': 'error', 'message': 'Failed to store recipes'}, 500
         print(f"Successfully processed {len(recipes)} recipes")
         return {'status': 'success', 'message': f'Successfully populated {len(recipes)} recipes'}
         
@@ -48,26 +48,22 @@ def restore_from_backup():
         from services.recipe_cache_service import RecipeCacheService
         recipe_cache = RecipeCacheService()
         
-        restored_count = 0
+        from services.recipe_document import decode_legacy_document
+        
+        # Backup rows may predate schema v2; decode them and write them back
+        # through the cache so they get v2 documents and the filterable metadata
+        recipes = []
         for recipe_data in sync_data['recipes']:
-            try:
-                recipe_id = recipe_data['id']
-                metadata = recipe_data.get('metadata', {})
-                document = recipe_data.get('document', '')
-                
-                if document:
-                    # Store in ChromaDB
-                    recipe_cache.recipe_collection.upsert(
-                        ids=[recipe_id],
-                        documents=[document],
-                        metadatas=[metadata]
-                    )
-                    restored_count += 1
-                    
-            except Exception as e:
-                print(f"   ⚠️ Error restoring recipe {recipe_data.get('id', 'unknown')}: {e}")
+            document = recipe_data.get('document', '')
+            if not document:
+                continue
+            recipe = decode_legacy_document(document, recipe_data.get('metadata', {}), recipe_data.get('id'))
+            if recipe is None:
+                print(f"   ⚠️ Error restoring recipe {recipe_data.get('id', 'unknown')}: document holds no recipe")
                 continue
+            recipes.append(dict(recipe, id=str(recipe_data.get('id') or recipe['id'])))
         
+        restored_count = len(recipes) if recipes and recipe_cache.cache_recipes(recipes) else 0
         print(f"✅ Restored {restored_count} recipes to ChromaDB")
         return restored_count > 0
         
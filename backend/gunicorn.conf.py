@@ -0,0 +1,38 @@
+"""
+Gunicorn settings for serving app:app with a pre-forked recipe corpus.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The master imports the app once (preload_app), loading the recipe corpus and
+its indexes before forking, so workers share those pages copy-on-write
+instead of each parsing the store. Each worker opens its own ChromaDB
+client in post_fork. Set GUNICORN_PRELOAD=false to go back to every worker
+loading on its own.
+
+Each worker keeps its own corpus, indexes and query cache. A write made
+through one worker (or by a script) bumps the store generation counter next
+to the ChromaDB store (services/store_generation.py). The other workers check
+it at most every RECIPE_STORE_GENERATION_CHECK_SECONDS (default 1s) and then
+reload, serving their previous snapshot until the reload finishes. Chained
+search handles are shared through an SQLite table (services/result_set_store.py).
+Set WEB_CONCURRENCY=1 if even that window of staleness is not acceptable.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+keepalive = 2
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = 100
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+if preload_app:
+    # Read by services.prefork when app.py is imported in the master
+    os.environ.setdefault('RECIPE_PREFORK_PRELOAD', 'true')
+
+
+def post_fork(server, worker):
+    from services.prefork import run_post_fork_hooks
+    run_post_fork_hooks()
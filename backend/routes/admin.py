@@ -203,58 +203,22 @@ def seed_recipes():
                 'diets': diets
             }, rid
 
-        # Prepare documents and metadata
-        ids, docs, metas = [], [], []
+        # Prepare recipes
+        normalized_recipes = []
         for item in recipes[:max(0, limit)]:
-            normalized, rid = normalize_item(item)
-            ids.append(rid)
-            docs.append(json.dumps(normalized))
-            
-            # Create safe metadata (only primitive types for ChromaDB)
-            metadata = {
-                'id': rid,
-                'title': normalized.get('title', ''),
-                'source': 'admin_seed',
-                'uploaded_at': datetime.now().isoformat()
-            }
-            
-            # Add safe metadata fields
-            if normalized.get('cuisines'):
-                metadata['cuisines'] = ','.join(normalized['cuisines']) if isinstance(normalized['cuisines'], list) else str(normalized.get('cuisines', ''))
-            
-            if normalized.get('diets'):
-                metadata['diets'] = ','.join(normalized['diets']) if isinstance(normalized['diets'], list) else str(normalized.get('diets', ''))
-                
-            # Skip all nutrition metadata to avoid ChromaDB issues
-            # The nutrition data will be stored in the document JSON instead
-            pass  # Nutrition data is preserved in the JSON document
-            
-            metas.append(metadata)
+            normalized, _ = normalize_item(item)
+            normalized['source'] = 'admin_seed'
+            normalized_recipes.append(normalized)
 
-        if not ids:
+        if not normalized_recipes:
             return jsonify({'error': 'No recipes to import'}), 400
 
-        # Add to primary recipe store
-        cache.recipe_collection.add(ids=ids, documents=docs, metadatas=metas)
-
-        # Also populate search cache so /api/get_recipes works immediately
-        try:
-            search_docs = []
-            for d in docs:
-                try:
-                    obj = json.loads(d)
-                except Exception:
-                    obj = {'title': d}
-                title = obj.get('title', '')
-                ing_text = ' '.join([(i.get('name') if isinstance(i, dict) else str(i)) for i in obj.get('ingredients', [])])
-                cuisine_text = ' '.join(obj.get('cuisines', []) or [])
-                search_docs.append(f"{title} {ing_text} {cuisine_text}")
-            if hasattr(cache, 'search_collection') and cache.search_collection is not None:
-                cache.search_collection.add(ids=ids, documents=search_docs, metadatas=metas)
-        except Exception:
-            pass
+        # Written as schema v2 documents with the filterable metadata, to the
+        # primary store and the search collection so /api/get_recipes works immediately
+        if not cache.cache_recipes(normalized_recipes, skip_existing=True, mirror_to_search=True):
+            return jsonify({'error': 'Failed to store recipes'}), 500
 
-        return jsonify({'status': 'ok', 'imported': len(ids), 'path': seed_path}), 200
+        return jsonify({'status': 'ok', 'imported': len(normalized_recipes), 'path': seed_path}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
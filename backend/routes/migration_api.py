@@ -128,45 +128,24 @@ def upload_complete_recipes(data: Dict[str, Any]) -> tuple:
             logger.error("Recipe collection not available")
             return jsonify({"error": "Recipe storage not available"}), 500
         
-        uploaded_count = 0
         errors = []
+        valid_recipes = []
         
         for i, recipe in enumerate(recipes):
-            try:
-                # Validate recipe has essential data
-                if not _validate_complete_recipe(recipe):
-                    errors.append(f"Recipe {i}: Missing essential data")
-                    continue
-                
-                # Store recipe with proper format
-                recipe_id = str(recipe.get('id', f'imported_{i}'))
-                
-                # Create the document (for search) - combine key fields
-                document_text = _create_search_document(recipe)
-                
-                # Create comprehensive metadata
-                metadata = _create_recipe_metadata(recipe)
-                
-                # Store the complete recipe as JSON document
-                recipe_json = json.dumps(recipe, ensure_ascii=False)
-                
-                # Upsert to ChromaDB
-                recipe_cache.recipe_collection.upsert(
-                    ids=[recipe_id],
-                    documents=[recipe_json],
-                    metadatas=[metadata]
-                )
-                
-                uploaded_count += 1
-                
-                if uploaded_count % 5 == 0:
-                    logger.info(f"Uploaded {uploaded_count}/{len(recipes)} recipes...")
-                    
-            except Exception as e:
-                error_msg = f"Recipe {i} ({recipe.get('title', 'Unknown')}): {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+            # Validate recipe has essential data
+            if not isinstance(recipe, dict) or not _validate_complete_recipe(recipe):
+                errors.append(f"Recipe {i}: Missing essential data")
                 continue
+            valid_recipes.append(dict(recipe, id=str(recipe.get('id', f'imported_{i}'))))
+        
+        # Stored as schema v2 documents with the filterable metadata, and
+        # published to the in-process corpus
+        uploaded_count = 0
+        if valid_recipes:
+            if recipe_cache.cache_recipes(valid_recipes):
+                uploaded_count = len(valid_recipes)
+            else:
+                errors.append(f"Failed to store {len(valid_recipes)} recipes")
         
         logger.info(f"Upload complete: {uploaded_count} success, {len(errors)} errors")
         
@@ -212,95 +191,6 @@ def _validate_complete_recipe(recipe: Dict[str, Any]) -> bool:
     
     return True
 
-def _create_search_document(recipe: Dict[str, Any]) -> str:
-    """Create searchable document text from recipe"""
-    parts = [
-        recipe.get('title', ''),
-        ' '.join(recipe.get('cuisines', [])),
-        ' '.join(recipe.get('tags', [])),
-        ' '.join(recipe.get('dish_types', [])),
-        ' '.join(recipe.get('diets', []))
-    ]
-    
-    # Add ingredient names
-    ingredients = recipe.get('ingredients', [])
-    if isinstance(ingredients, list):
-        ingredient_names = [
-            ing.get('name', '') for ing in ingredients 
-            if isinstance(ing, dict) and ing.get('name')
-        ]
-        parts.extend(ingredient_names)
-    
-    return ' '.join(filter(None, parts))
-
-def _create_recipe_metadata(recipe: Dict[str, Any]) -> Dict[str, Any]:
-    """Create comprehensive metadata for ChromaDB"""
-    metadata = {
-        'id': str(recipe.get('id', '')),
-        'title': recipe.get('title', ''),
-        'type': recipe.get('type', 'imported'),
-        'source': recipe.get('source', 'migration'),
-        'uploaded_at': datetime.utcnow().isoformat()
-    }
-    
-    # Add cuisines
-    cuisines = recipe.get('cuisines', [])
-    if isinstance(cuisines, list) and cuisines:
-        metadata['cuisines'] = ','.join(cuisines)
-        metadata['cuisine'] = cuisines[0]  # Primary cuisine
-    
-    # Add diets
-    diets = recipe.get('diets', [])
-    if isinstance(diets, list) and diets:
-        metadata['diets'] = ','.join(diets)
-    
-    # Add tags
-    tags = recipe.get('tags', [])
-    if isinstance(tags, list) and tags:
-        metadata['tags'] = ','.join(tags)
-    
-    # Add dish types
-    dish_types = recipe.get('dish_types', [])
-    if isinstance(dish_types, list) and dish_types:
-        metadata['dish_types'] = ','.join(dish_types)
-    
-    # Add nutrition info (convert to primitive types for ChromaDB)
-    nutrition = recipe.get('nutrition', {})
-    if isinstance(nutrition, dict):
-        metadata['calories'] = float(nutrition.get('calories', 0)) if nutrition.get('calories') else 0.0
-        metadata['protein'] = float(nutrition.get('protein', 0)) if nutrition.get('protein') else 0.0
-        metadata['carbs'] = float(nutrition.get('carbs', 0)) if nutrition.get('carbs') else 0.0
-        metadata['fat'] = float(nutrition.get('fat', 0)) if nutrition.get('fat') else 0.0
-    else:
-        # Also check direct fields on recipe
-        metadata['calories'] = float(recipe.get('calories', 0)) if recipe.get('calories') else 0.0
-        metadata['protein'] = float(recipe.get('protein', 0)) if recipe.get('protein') else 0.0
-        metadata['carbs'] = float(recipe.get('carbs', 0)) if recipe.get('carbs') else 0.0
-        metadata['fat'] = float(recipe.get('fat', 0)) if recipe.get('fat') else 0.0
-    
-    # Add ingredient count
-    ingredients = recipe.get('ingredients', [])
-    if isinstance(ingredients, list):
-        metadata['ingredient_count'] = len(ingredients)
-    
-    # Add cooking time
-    metadata['ready_in_minutes'] = recipe.get('ready_in_minutes', 30)
-    
-    # Add image availability
-    metadata['has_image'] = bool(recipe.get('image', '').strip())
-    
-    # Sanitize metadata to ensure all values are primitive types
-    sanitized_metadata = {}
-    for key, value in metadata.items():
-        if isinstance(value, (str, int, float, bool)) or value is None:
-            sanitized_metadata[key] = value
-        elif isinstance(value, (list, dict)):
-            sanitized_metadata[key] = json.dumps(value) if value else ""
-        else:
-            sanitized_metadata[key] = str(value)
-    
-    return sanitized_metadata
-
 def batch_upload_legacy(data: Dict[str, Any]) -> tuple:
     """Legacy batch upload support"""
     recipes = data.get('recipes', [])
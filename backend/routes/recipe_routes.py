@@ -2,7 +2,7 @@
 import requests
 import json
 import os
-from flask import request, jsonify, make_response
+from flask import request, jsonify, make_response, Response
 import time
 # Try to import dotenv, fallback if not available
 try:
@@ -14,6 +14,13 @@ except ImportError:
     def load_dotenv():
         pass  # No-op fallback
 from services.recipe_service import RecipeService
+from services.seeded_pagination import decode_cursor
+from services.recipe_summaries import parse_projection, shape_recipes
+from services.recipe_json import get_recipe_json_index
+from services.search_trace import start_trace
+from services.recipe_nutrition import parse_range_filters
+from services.recipe_document import LEGACY_DOCUMENTS_ENABLED
+from services.recipe_facets import CUISINE_MATCH_PARTIAL, CUISINE_MATCH_EXACT
 from services.user_preferences_service import UserPreferencesService
 from flask_cors import cross_origin
 import asyncio
@@ -84,6 +91,42 @@ def async_route(f):
             raise
     return decorated_function
 
+# Streaming formats for large listings: one recipe per line, or a chunked JSON array
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+STREAM_HEADERS = ("X-Total-Count", "X-Result-Set", "X-Next-Cursor", "X-Shuffle-Seed")
+
+def stream_recipe_results(result, stream_format):
+    """Yield a search result one recipe at a time so the body is never built in memory"""
+    recipes = result.get("results") or []
+    json_index = get_recipe_json_index()
+    if stream_format == "ndjson":
+        for recipe in recipes:
+            yield json_index.recipe_json(recipe) + "\n"
+        return
+    
+    yield '{"results":['
+    for i, recipe in enumerate(recipes):
+        yield ("," if i else "") + json_index.recipe_json(recipe)
+    # Everything but the recipes (total, cursors) goes last, as a trailer
+    trailer = {k: v for k, v in result.items() if k != "results"}
+    yield "]," + json.dumps(trailer, default=str)[1:]
+
+def streaming_response(result, stream_format):
+    """Wrap a search result in a streamed response with the counts in headers"""
+    response = Response(stream_recipe_results(result, stream_format), mimetype=STREAM_FORMATS[stream_format])
+    response.headers["X-Total-Count"] = str(result.get("total", 0))
+    if result.get("result_set"):
+        response.headers["X-Result-Set"] = result["result_set"]
+    if result.get("next_cursor"):
+        response.headers["X-Next-Cursor"] = result["next_cursor"]
+    if result.get("seed") is not None:
+        response.headers["X-Shuffle-Seed"] = str(result["seed"])
+    response.headers["Access-Control-Expose-Headers"] = ", ".join(STREAM_HEADERS)
+    return response
+
 def register_recipe_routes(app, recipe_cache):
     # Initialize services
     recipe_service = RecipeService(recipe_cache)
@@ -123,12 +166,17 @@ def register_recipe_routes(app, recipe_cache):
             return jsonify({"error": "Recipe ID is required"}), 400
         
         try:
+            # Fast path: stored JSON from the corpus, no document parse or re-serialize
+            recipe_json = recipe_cache.get_recipe_json_by_id(recipe_id)
+            if recipe_json is not None:
+                return Response(recipe_json, mimetype="application/json"), 200
+            
             # Use the proper recipe service instead of searching through all recipes
             recipe = await recipe_service.get_recipe_by_id(recipe_id)
                                 
             if recipe:
-                # Fix data structure - if recipe has nested data, extract the actual recipe data
-                if 'data' in recipe and isinstance(recipe['data'], dict):
+                # Cached documents are flat (schema v2); only pre-migration stores need unwrapping
+                if LEGACY_DOCUMENTS_ENABLED and 'data' in recipe and isinstance(recipe['data'], dict):
                     # Extract the actual recipe data from the nested structure
                     recipe_data = recipe['data']
                     
@@ -139,7 +187,7 @@ def register_recipe_routes(app, recipe_cache):
                         recipe_data['source'] = recipe['source']
                     
                     return jsonify(recipe_data), 200
-                elif 'document' in recipe and isinstance(recipe['document'], str):
+                elif LEGACY_DOCUMENTS_ENABLED and 'document' in recipe and isinstance(recipe['document'], str):
                     try:
                         import json
                         document_data = json.loads(recipe['document'])
@@ -181,18 +229,13 @@ def register_recipe_routes(app, recipe_cache):
             response.headers.add('Access-Control-Allow-Credentials', 'true')
             return response
             
-        start_time = time.time()
         query = request.args.get("query", "").strip()
         ingredient = request.args.get("ingredient", "").strip()
         
         offset = int(request.args.get("offset", "0"))
         limit = int(request.args.get("limit", "10000"))  # Default to 10000 results to show more recipes
-        
-        # Debug pagination parameters
-        print(f"🔍 BACKEND PAGINATION DEBUG:")
-        print(f"   - Received offset: {offset}")
-        print(f"   - Received limit: {limit}")
-        print(f"   - Request args: {dict(request.args)}")
+        # trace=1 returns the per-stage timings in a Server-Timing header
+        trace_header = request.args.get("trace", "").strip().lower() in ("1", "true")
         
         # Get cuisine and dietary restrictions filters
         cuisine_param = request.args.get("cuisine", "")
@@ -201,6 +244,42 @@ def register_recipe_routes(app, recipe_cache):
         # Parse comma-separated values
         cuisines = [c.strip() for c in cuisine_param.split(",") if c.strip()] if cuisine_param else []
         dietary_restrictions = [d.strip() for d in diet_param.split(",") if d.strip()] if diet_param else []
+        # 'partial' (default) lets "american" match "south american"; 'exact' does not
+        cuisine_match = request.args.get("cuisine_match", CUISINE_MATCH_PARTIAL).strip().lower()
+        if cuisine_match not in (CUISINE_MATCH_PARTIAL, CUISINE_MATCH_EXACT):
+            return jsonify({"error": "Invalid cuisine_match",
+                            "details": f"cuisine_match must be '{CUISINE_MATCH_PARTIAL}' or '{CUISINE_MATCH_EXACT}'"}), 400
+        # Result-set handle from a previous search to search within (chained search)
+        within = request.args.get("within", "").strip() or None
+        # result_set=true asks for a handle to the full result, to search within later
+        keep_result_set = request.args.get("result_set", "").strip().lower() == "true"
+        # Seeded shuffle: pass seed (or shuffle=seeded) on the first page, then the returned cursor
+        cursor = request.args.get("cursor", "").strip() or None
+        shuffle = request.args.get("shuffle", "").strip().lower() or None
+        seed_param = request.args.get("seed", "").strip()
+        try:
+            seed = int(seed_param) if seed_param else None
+        except ValueError:
+            return jsonify({"error": "Invalid seed", "details": "seed must be an integer"}), 400
+        # Opt-in streaming (stream=ndjson or stream=json) keeps large listings out of memory
+        stream_format = request.args.get("stream", "").strip().lower() or None
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({"error": "Invalid stream format", "details": f"stream must be one of {sorted(STREAM_FORMATS)}"}), 400
+        # List views can ask for view=summary or fields=id,title,... instead of full documents
+        try:
+            view, fields = parse_projection(request.args.get("fields"), request.args.get("view"))
+        except ValueError as e:
+            return jsonify({"error": "Invalid view", "details": str(e)}), 400
+        # Range filters: max_calories, min_protein, max_carbs, min_fat, max_time, ...
+        try:
+            nutrition_ranges = parse_range_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": "Invalid range filter", "details": str(e)}), 400
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({"error": "Invalid cursor", "details": str(e)}), 400
         
         # Get user's preferences
         foods_to_avoid = []
@@ -213,28 +292,20 @@ def register_recipe_routes(app, recipe_cache):
                     # Get foods to avoid
                     if 'foodsToAvoid' in preferences:
                         foods_to_avoid = [f.lower() for f in preferences['foodsToAvoid'] if f and isinstance(f, str)]
-                        print(f"Found {len(foods_to_avoid)} foods to avoid in user preferences")
                     
                     # Get favorite foods
                     if 'favoriteFoods' in preferences:
                         favorite_foods = [f.lower() for f in preferences['favoriteFoods'] if f and isinstance(f, str)]
-                        print(f"Found {len(favorite_foods)} favorite foods in user preferences")
         except Exception as e:
             print(f"Error getting user preferences: {e}")
         
-        print(f"\n=== Recipe Search Request ===")
-        print(f"Query: '{query}'")
-        print(f"Ingredient: '{ingredient}'")
-        print(f"Cuisines: {cuisines} (type: {type(cuisines)}, length: {len(cuisines)})")
-        print(f"Dietary Restrictions: {dietary_restrictions} (type: {type(dietary_restrictions)}, length: {len(dietary_restrictions)})")
-        print(f"Offset: {offset}, Limit: {limit}")
-        print(f"Foods to avoid: {foods_to_avoid} (type: {type(foods_to_avoid)}, length: {len(foods_to_avoid)})")
-        print(f"Favorite foods: {favorite_foods} (type: {type(favorite_foods)}, length: {len(favorite_foods)})")
-        print(f"Raw cuisine_param: '{cuisine_param}' (type: {type(cuisine_param)})")
-        print(f"Raw diet_param: '{diet_param}' (type: {type(diet_param)})")
-        print(f"Parsed dietary_restrictions: {dietary_restrictions}")
-        print(f"Request args keys: {list(request.args.keys())}")
-        print(f"Request args values: {dict(request.args)}")
+        trace = start_trace(
+            "get_recipes", query=query, ingredient=ingredient, cuisines=cuisines,
+            dietary_restrictions=dietary_restrictions, offset=offset, limit=limit,
+            within=within, cursor=bool(cursor), avoid=len(foods_to_avoid), favorites=len(favorite_foods),
+            ranges=nutrition_ranges or None
+        )
+        trace.mark("request")
         
         try:
             # Create service instance for this request
@@ -250,13 +321,38 @@ def register_recipe_routes(app, recipe_cache):
                 cuisines=cuisines,
                 dietary_restrictions=dietary_restrictions,
                 foods_to_avoid=foods_to_avoid,
-                favorite_foods=favorite_foods
+                favorite_foods=favorite_foods,
+                cuisine_match=cuisine_match,
+                within=within,
+                keep_result_set=keep_result_set,
+                seed=seed,
+                cursor=cursor,
+                shuffle=shuffle,
+                nutrition_ranges=nutrition_ranges
             )
             
-            print(f"Found {result['total']} recipes in {time.time() - start_time:.2f}s")
-            return jsonify(result), 200
+            if result.get("result_set_expired"):
+                return trace.finish(jsonify({
+                    "error": "Result set expired",
+                    "details": "Run the original search again to get a new result_set"
+                }), trace_header), 410
+            
+            result["results"] = shape_recipes(result.get("results", []), view, fields)
+            trace.mark("shape", len(result["results"]))
+            if stream_format:
+                # Streaming bodies are serialized after the response leaves the route
+                return trace.finish(streaming_response(result, stream_format), trace_header)
+            # Full documents are spliced from their stored JSON rather than re-serialized
+            if not view and not fields:
+                response = Response(get_recipe_json_index().dumps_result(result), mimetype="application/json")
+            else:
+                response = jsonify(result)
+            trace.mark("serialize", len(result["results"]))
+            return trace.finish(response, trace_header), 200
             
         except Exception as e:
+            trace.annotate(error=str(e))
+            trace.finish()
             print(f"Error searching recipes: {e}")
             return jsonify({
                 "error": "Failed to search recipes",
@@ -388,6 +484,8 @@ def register_recipe_routes(app, recipe_cache):
                     deleted += len(chunk)
                 except Exception as e:
                     print(f"Delete chunk failed: {e}")
+            if deleted:
+                recipe_cache.invalidate_corpus("admin_assist_cleanup")
             return jsonify({"status": "success", "deleted": deleted}), 200
         except Exception as e:
             return jsonify({"status": "error", "message": str(e)}), 500
@@ -425,6 +523,7 @@ def register_recipe_routes(app, recipe_cache):
             if str(payload.get("clear_first", "false")).lower() == "true":
                 try:
                     recipe_cache.recipe_collection.delete(where={})
+                    recipe_cache.invalidate_corpus("admin_import_clear")
                 except Exception as e:
                     print(f"Could not clear existing recipes: {e}")
 
@@ -433,9 +532,9 @@ def register_recipe_routes(app, recipe_cache):
             total = 0
             for i in range(0, len(recipes), batch_size):
                 batch = recipes[i:i+batch_size]
-                documents, metadatas, ids = [], [], []
+                docs = []
                 for r in batch:
-                    rid = str(r.get("id") or r.get("_id") or f"import_{i}_{len(ids)}")
+                    rid = str(r.get("id") or r.get("_id") or f"import_{i}_{len(docs)}")
                     title = r.get("title", "")
                     doc = {
                         "id": rid,
@@ -454,26 +553,12 @@ def register_recipe_routes(app, recipe_cache):
                         "fat": r.get("fat", 0),
                         "source": r.get("source", "import")
                     }
-                    documents.append(json.dumps(doc))
-                    # Ensure Chroma metadata uses only primitive types
-                    cuisines_meta = doc.get("cuisines", [])
-                    if isinstance(cuisines_meta, list):
-                        cuisines_meta = ",".join([str(c) for c in cuisines_meta if c])
-                    diets_meta = doc.get("diets", [])
-                    if isinstance(diets_meta, list):
-                        diets_meta = ",".join([str(d) for d in diets_meta if d])
-                    metadatas.append({
-                        "id": rid,
-                        "title": title,
-                        "cuisines": cuisines_meta or "",
-                        "diets": diets_meta or "",
-                        "cached_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-                    })
-                    ids.append(rid)
+                    docs.append(doc)
 
-                if ids:
-                    recipe_cache.recipe_collection.add(documents=documents, metadatas=metadatas, ids=ids)
-                    total += len(ids)
+                # Schema v2 documents with the filterable metadata; existing
+                # recipes are left untouched, as with collection.add
+                if docs and recipe_cache.cache_recipes(docs, skip_existing=True):
+                    total += len(docs)
 
             # Return new count
             try:
@@ -3,6 +3,8 @@ from services.recipe_search_service import RecipeSearchService
 from services.meal_history_service import MealHistoryService
 # SmartShoppingService will be imported lazily to avoid startup issues
 from services.user_preferences_service import UserPreferencesService
+from services.recipe_summaries import parse_projection, shape_recipes
+from services.recipe_nutrition import parse_range_filters
 import logging
 from middleware.auth_middleware import get_current_user_id, require_auth
 from flask_cors import cross_origin
@@ -156,6 +158,17 @@ def get_personalized_recommendations():
         limit = request.args.get('limit', 16, type=int)  # Increased from 8 to 16 for better cuisine distribution
         print(f"📊 Requested limit: {limit}")
         
+        # Optional projection: view=summary or fields=id,title,...
+        try:
+            view, fields = parse_projection(request.args.get('fields'), request.args.get('view'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        # Range filters: max_calories, min_protein, max_time, ...
+        try:
+            nutrition_ranges = parse_range_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Get user preferences from the database
         preferences = user_preferences_service.get_preferences(user_id)
         print(f"📋 Retrieved preferences: {preferences}")
@@ -171,8 +184,9 @@ def get_personalized_recommendations():
         # Log the preferences being used for debugging
         print(f"✅ Using preferences for user {user_id}: {preferences}")
         
-        results = recipe_search_service.get_recipe_recommendations(preferences, limit)
+        results = recipe_search_service.get_recipe_recommendations(preferences, limit, nutrition_ranges)
         print(f"🎯 Generated {len(results)} recommendations")
+        results = shape_recipes(results, view, fields)
         
         return jsonify({
             "success": True,
@@ -195,6 +209,12 @@ def get_simple_recommendations():
         limit = request.args.get('limit', 8, type=int)
         print(f"🚀 Simple recommendations - Requested limit: {limit}")
         
+        # Optional projection: view=summary or fields=id,title,...
+        try:
+            view, fields = parse_projection(request.args.get('fields'), request.args.get('view'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         # Get recipes directly from the recipe cache (much faster)
         from services.recipe_cache_service import RecipeCacheService
         recipe_cache = RecipeCacheService()
@@ -249,6 +269,11 @@ def get_simple_recommendations():
             for recipe in sampled_recipes:
                 if len(formatted_recipes) >= limit:
                     break
+                
+                if view or fields:
+                    # Summary records skip copying ingredients and instructions entirely
+                    formatted_recipes.extend(shape_recipes([recipe], view, fields))
+                    continue
                     
                 # Include ALL available recipe fields for complete data
                 formatted_recipe = {
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Backfill stored dietary flags (is_vegetarian, is_vegan, diet_classifier_version)
+on cached recipes and report where the classifier disagrees with stored data.
+
+Recipes written before the flags existed, or by an older classifier version,
+are classified on every read until this has been run. The report counts every
+stored verdict the current classifier changes, by direction, with samples of
+the old and new verdict and the keywords matched, so a DIET_CLASSIFIER_VERSION
+bump can be reviewed with --dry-run before it is written.
+
+Usage:
+    python scripts/backfill_dietary_flags.py --report
+    python scripts/backfill_dietary_flags.py --dry-run --output report.json
+"""
+
+import os
+import sys
+import json
+import logging
+from typing import Any, Dict, List
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.dietary_classifier import (
+    DIET_CLASSIFIER_VERSION, classify_recipe, diet_metadata, explain_classification, flags_from_metadata
+)
+from services.store_generation import mark_store_changed
+from utils.chromadb_singleton import get_chromadb_client
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SAMPLE_LIMIT = 20
+
+
+def _unwrap(document: Any) -> Any:
+    """Recipe dict from a stored document (some documents wrap it in 'data')"""
+    if isinstance(document, dict) and isinstance(document.get('data'), dict):
+        return document['data']
+    return document
+
+
+def _tagged_diets(recipe: Dict[str, Any]) -> List[str]:
+    """Diet tags the recipe itself claims"""
+    tags = set()
+    for field in ('diets', 'dietaryRestrictions', 'dietary_restrictions'):
+        values = recipe.get(field)
+        if isinstance(values, list):
+            tags.update(str(v).lower().strip() for v in values if v)
+    if recipe.get('vegetarian') is True:
+        tags.add('vegetarian')
+    if recipe.get('vegan') is True:
+        tags.add('vegan')
+    return sorted(tags)
+
+
+def _sample(report: Dict[str, Any], key: str, entry: Dict[str, Any]) -> None:
+    samples = report["samples"].setdefault(key, [])
+    if len(samples) < SAMPLE_LIMIT:
+        samples.append(entry)
+
+
+def backfill_dietary_flags(dry_run: bool = False, batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Classify every cached recipe and store the flags in its metadata.
+
+    Args:
+        dry_run: Only build the report, don't write anything
+        batch_size: Number of recipes read and updated per ChromaDB call
+
+    Returns:
+        Dict: Consistency report
+    """
+    client = get_chromadb_client()
+    collection = client.get_collection('recipe_details_cache')
+
+    report = {
+        "classifier_version": DIET_CLASSIFIER_VERSION,
+        "dry_run": dry_run,
+        "total": 0,
+        "missing_flags": 0,
+        "outdated_flags": 0,
+        "up_to_date": 0,
+        "unparseable": 0,
+        "updated": 0,
+        "vegetarian": 0,
+        "vegan": 0,
+        "stored_vegetarian_changed": 0,
+        "stored_vegan_changed": 0,
+        # Direction of the changed verdicts, e.g. vegetarian_to_not: stored as vegetarian, no longer is
+        "vegetarian_to_not": 0,
+        "not_to_vegetarian": 0,
+        "vegan_to_not": 0,
+        "not_to_vegan": 0,
+        "tag_conflicts": 0,
+        "samples": {}
+    }
+
+    total = collection.count()
+    offset = 0
+    while offset < total:
+        batch = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+        ids = batch.get('ids') or []
+        if not ids:
+            break
+        offset += len(ids)
+
+        update_ids, update_metas = [], []
+        for recipe_id, document, metadata in zip(ids, batch.get('documents') or [], batch.get('metadatas') or []):
+            report["total"] += 1
+            metadata = dict(metadata or {})
+            try:
+                recipe = _unwrap(json.loads(document))
+            except (TypeError, ValueError):
+                recipe = None
+            if not isinstance(recipe, dict):
+                report["unparseable"] += 1
+                continue
+
+            is_vegetarian, is_vegan = classify_recipe(recipe)
+            report["vegetarian"] += int(is_vegetarian)
+            report["vegan"] += int(is_vegan)
+            title = recipe.get('title') or recipe.get('name') or ''
+
+            # Flags stored under the previous classifier version, compared with the new verdict
+            if 'diet_classifier_version' not in metadata:
+                report["missing_flags"] += 1
+            elif flags_from_metadata(metadata) is None:
+                report["outdated_flags"] += 1
+                for diet, now in (('vegetarian', is_vegetarian), ('vegan', is_vegan)):
+                    was = metadata.get(f'is_{diet}')
+                    if was == now:
+                        continue
+                    report[f"stored_{diet}_changed"] += 1
+                    report[f"{diet}_to_not" if was else f"not_to_{diet}"] += 1
+                    _sample(report, f"stored_{diet}_changed", {
+                        "id": recipe_id,
+                        "title": title,
+                        "was": was,
+                        "now": now,
+                        "from_version": metadata.get('diet_classifier_version'),
+                        "matched": explain_classification(recipe)
+                    })
+            else:
+                report["up_to_date"] += 1
+
+            # Recipes tagged vegetarian/vegan that the classifier rejects
+            tags = _tagged_diets(recipe)
+            conflicts = [d for d, ok in (('vegetarian', is_vegetarian), ('vegan', is_vegan)) if d in tags and not ok]
+            if conflicts:
+                report["tag_conflicts"] += 1
+                _sample(report, "tag_conflicts", {
+                    "id": recipe_id,
+                    "title": title,
+                    "tags": conflicts,
+                    "matched": explain_classification(recipe)
+                })
+
+            flags = diet_metadata(recipe)
+            if any(metadata.get(k) != v for k, v in flags.items()):
+                metadata.update(flags)
+                update_ids.append(recipe_id)
+                update_metas.append(metadata)
+
+        if update_ids and not dry_run:
+            collection.update(ids=update_ids, metadatas=update_metas)
+            # Running servers reload the flags (and drop their snapshot files)
+            mark_store_changed()
+        report["updated"] += len(update_ids)
+        logger.info(f"Processed {offset}/{total} recipes ({report['updated']} {'to update' if dry_run else 'updated'})")
+
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\nDietary flag consistency report")
+    print("=" * 40)
+    for key in ("classifier_version", "total", "missing_flags", "outdated_flags", "up_to_date", "unparseable",
+                "updated", "vegetarian", "vegan", "stored_vegetarian_changed", "stored_vegan_changed",
+                "vegetarian_to_not", "not_to_vegetarian", "vegan_to_not", "not_to_vegan", "tag_conflicts"):
+        print(f"{key:28} {report[key]}")
+    for key, samples in report["samples"].items():
+        print(f"\n{key} (first {len(samples)}):")
+        for sample in samples:
+            print(f"  - {sample}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backfill stored dietary flags on cached recipes')
+    parser.add_argument('--dry-run', action='store_true', help="Report only, don't update metadata")
+    parser.add_argument('--report', action='store_true', help='Print the consistency report')
+    parser.add_argument('--batch-size', type=int, default=200, help='Recipes per ChromaDB call')
+    parser.add_argument('--output', help='Write the report as JSON to this path')
+    args = parser.parse_args()
+
+    result = backfill_dietary_flags(dry_run=args.dry_run, batch_size=args.batch_size)
+    if args.report or args.dry_run:
+        print_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Report written to {args.output}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Latency of exact brute-force k-NN (services/dense_retrieval.py) against
+ChromaDB's HNSW query on the collection RecipeSearchService serves, using the
+same query embeddings for both.
+
+For each run it reports p50/p95 per-query latency of
+- chroma: collection.query(query_embeddings=...), documents and metadata included;
+- dense: DenseRecipeIndex.search over the memory-mapped matrix;
+- dense batched: every query in one matrix product;
+and overlap@k, the share of Chroma's k rows the exact search also returns
+(below 1.0 where HNSW missed a true neighbour). A filtered run repeats this with
+a cuisine `where` clause from _build_where_clause.
+
+Usage:
+    python scripts/benchmark_dense_search.py
+    python scripts/benchmark_dense_search.py --queries 200 --k 30 --cuisine italian
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_search_service import RecipeSearchService
+from services.sparse_retrieval import SEARCH_BACKEND_DENSE
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def benchmark_dense_search(query_count: int = 100, k: int = 30, cuisine: str = 'italian', seed: int = 7):
+    service = RecipeSearchService()
+    collection = service.recipe_collection
+    _, build_ms = _timed(lambda: service._ensure_search_index(SEARCH_BACKEND_DENSE))
+    index = service.dense_index
+    print(f"collection: {collection.name} ({index.size} rows), dense index built in {build_ms:.0f} ms "
+          f"(mapped: {index.get_stats()['mapped']})")
+
+    rows = collection.get(include=['metadatas'])
+    names = [(m or {}).get('name') or (m or {}).get('title') or '' for m in rows.get('metadatas') or []]
+    rng = random.Random(seed)
+    queries = [service._expand_query(name) for name in rng.sample(names, min(query_count, len(names))) if name]
+    embeddings = service.embedding_function(queries)
+
+    report = {}
+    for label, where in (("unfiltered", None), (f"cuisine={cuisine}", service._build_where_clause({"cuisine": cuisine}))):
+        chroma_ms, dense_ms, overlaps = [], [], []
+        for embedding in embeddings:
+            chroma, elapsed = _timed(lambda: collection.query(
+                query_embeddings=[embedding], n_results=k, where=where,
+                include=['documents', 'metadatas', 'distances']
+            ))
+            chroma_ms.append(elapsed)
+            dense, elapsed = _timed(lambda: index.search([embedding], n_results=k, where=where))
+            dense_ms.append(elapsed)
+            expected = set(chroma['ids'][0])
+            if expected:
+                overlaps.append(len(expected & set(dense['ids'][0])) / len(expected))
+        _, batch_ms = _timed(lambda: index.search(embeddings, n_results=k, where=where))
+        report[label] = {
+            "chroma_p50_ms": round(_percentile(chroma_ms, 0.5), 3),
+            "chroma_p95_ms": round(_percentile(chroma_ms, 0.95), 3),
+            "dense_p50_ms": round(_percentile(dense_ms, 0.5), 3),
+            "dense_p95_ms": round(_percentile(dense_ms, 0.95), 3),
+            "dense_batched_ms_per_query": round(batch_ms / max(len(embeddings), 1), 3),
+            "overlap_at_k": round(sum(overlaps) / len(overlaps), 4) if overlaps else None,
+        }
+
+    print(f"\nqueries: {len(queries)}, k={k}")
+    print(f"{'run':>18} {'chroma p50':>11} {'chroma p95':>11} {'dense p50':>10} {'dense p95':>10} "
+          f"{'batched/query':>14} {'overlap@k':>10}")
+    for label, row in report.items():
+        print(f"{label:>18} {row['chroma_p50_ms']:>11.2f} {row['chroma_p95_ms']:>11.2f} {row['dense_p50_ms']:>10.3f} "
+              f"{row['dense_p95_ms']:>10.3f} {row['dense_batched_ms_per_query']:>14.3f} {str(row['overlap_at_k']):>10}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare exact matrix k-NN with ChromaDB HNSW queries')
+    parser.add_argument('--queries', type=int, default=100, help='Number of sampled queries')
+    parser.add_argument('--k', type=int, default=30, help='Rows retrieved per query')
+    parser.add_argument('--cuisine', default='italian', help='Cuisine for the filtered run')
+    args = parser.parse_args()
+
+    benchmark_dense_search(args.queries, args.k, args.cuisine)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Throughput (texts/sec) of the lightweight embedding functions on recipe
+documents and titles from the seed file.
+
+For each text set and batch size it reports:
+- per-text loop: the pure-Python embedding (what runs without NumPy);
+- compat batch: compat mode as the app runs it (one matrix per batch, the
+  per-text loop for batches under VECTORIZE_MIN_CHARS characters);
+- hashed batch: the hashing-trick embedder (LIGHTWEIGHT_EMBEDDING_MODE=hashed).
+It also checks that compat mode returns exactly the per-text loop's vectors.
+
+Usage:
+    python scripts/benchmark_embeddings.py
+    python scripts/benchmark_embeddings.py --seed-file ../complete_recipes_backup.json --batch-sizes 1 32 256
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.lightweight_embeddings as lightweight_embeddings
+from services.recipe_document import encode_document
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 'complete_recipes_backup.json')
+DEFAULT_BATCH_SIZES = (1, 32, 256)
+
+
+def load_texts(seed_path: str, limit: int):
+    """Stored documents and titles of up to `limit` seed recipes"""
+    with open(seed_path, 'r') as f:
+        recipes = json.load(f)
+    if isinstance(recipes, dict):
+        recipes = recipes.get('recipes', [])
+    recipes = [r for r in recipes if isinstance(r, dict)][:limit]
+    return {
+        "documents": [encode_document(r) for r in recipes],
+        "titles": [str(r.get('title') or r.get('name') or '') for r in recipes],
+    }
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _embed_all(embed, texts, batch_size):
+    for start in range(0, len(texts), batch_size):
+        embed(texts[start:start + batch_size])
+
+
+def _per_text_loop(embed, texts):
+    """Call the embedder with NumPy switched off, as it runs without NumPy"""
+    lightweight_embeddings.NUMPY_AVAILABLE = False
+    try:
+        return embed(texts)
+    finally:
+        lightweight_embeddings.NUMPY_AVAILABLE = True
+
+
+def benchmark_embeddings(seed_path: str = DEFAULT_SEED_PATH, limit: int = 1000,
+                         batch_sizes=DEFAULT_BATCH_SIZES, repeat: int = 3):
+    if not lightweight_embeddings.NUMPY_AVAILABLE:
+        logger.error("NumPy is not installed; only the per-text loop is available")
+        return []
+
+    compat = lightweight_embeddings.get_lightweight_embedding_function(use_token_based=True, mode='compat')
+    hashed = lightweight_embeddings.get_lightweight_embedding_function(use_token_based=True, mode='hashed')
+    text_sets = load_texts(seed_path, limit)
+
+    print(f"\n{'texts':>10} {'count':>6} {'batch':>6} {'loop texts/s':>13} {'compat texts/s':>15} "
+          f"{'hashed texts/s':>15} {'compat exact':>13}")
+    results = []
+    for name, texts in text_sets.items():
+        if not texts:
+            continue
+        exact = _per_text_loop(compat, texts) == compat._matrix(texts).tolist()
+        if not exact:
+            logger.error(f"{name}: compat vectors differ from the per-text loop")
+        for batch_size in batch_sizes:
+            loop_ms = _best_ms(lambda: _embed_all(lambda b: _per_text_loop(compat, b), texts, batch_size), repeat)
+            compat_ms = _best_ms(lambda: _embed_all(compat, texts, batch_size), repeat)
+            hashed_ms = _best_ms(lambda: _embed_all(hashed, texts, batch_size), repeat)
+            row = {
+                "texts": name,
+                "count": len(texts),
+                "batch_size": batch_size,
+                "loop_texts_per_sec": round(len(texts) / loop_ms * 1000),
+                "compat_texts_per_sec": round(len(texts) / compat_ms * 1000),
+                "hashed_texts_per_sec": round(len(texts) / hashed_ms * 1000),
+                "compat_exact": exact,
+            }
+            print(f"{name:>10} {len(texts):>6} {batch_size:>6} {row['loop_texts_per_sec']:>13} "
+                  f"{row['compat_texts_per_sec']:>15} {row['hashed_texts_per_sec']:>15} {str(exact):>13}")
+            results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark lightweight embedding throughput')
+    parser.add_argument('--seed-file', default=DEFAULT_SEED_PATH, help='Recipe JSON file to embed')
+    parser.add_argument('--limit', type=int, default=1000, help='Maximum recipes to load')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(DEFAULT_BATCH_SIZES), help='Texts per call')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    benchmark_embeddings(args.seed_file, args.limit, args.batch_sizes, args.repeat)
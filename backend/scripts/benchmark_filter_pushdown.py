@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Rows transferred per query for store reads, with the filters pushed down to
+ChromaDB as a where clause and without.
+
+Seeds a throwaway ChromaDB directory from the seed file, with the in-memory
+corpus disabled so every search reads the store, then runs the same searches
+with pushdown on and off. It reports the rows read, the time taken, and
+whether both runs returned the same recipes.
+
+Usage:
+    python scripts/benchmark_filter_pushdown.py
+    python scripts/benchmark_filter_pushdown.py --path ../complete_recipes_backup.json
+"""
+
+import os
+import sys
+import time
+import tempfile
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+# get_recipes-style searches: (query, ingredient, filters)
+SEARCHES = {
+    "italian": ("", "", {"cuisine": "italian"}),
+    "indian+mexican": ("", "", {"cuisine": ["indian", "mexican"]}),
+    "vegan": ("", "", {"dietary_restrictions": ["vegan"], "dietary_match": "all"}),
+    "vegetarian, gluten free": ("", "", {"dietary_restrictions": ["vegetarian", "gluten free"], "dietary_match": "all"}),
+    "calories<=500": ("", "", {"nutrition_ranges": {"calories": [None, 500.0]}}),
+    "chicken, american": ("chicken", "", {"cuisine": "american"}),
+    "indian vegetarian <=30min": ("", "", {"cuisine": "indian", "dietary_restrictions": ["vegetarian"],
+                                            "dietary_match": "all",
+                                            "nutrition_ranges": {"ready_in_minutes": [None, 30.0]}}),
+}
+
+
+def benchmark_filter_pushdown(path: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the services are imported
+        os.environ['CHROMA_DB_PATH'] = tmp
+        os.environ['RECIPE_CORPUS_ENABLED'] = 'false'
+        os.environ['SEED_RECIPES_FILE'] = path
+        logging.basicConfig(level=logging.WARNING)
+        import services.recipe_cache_service as recipe_cache_module
+        from services.recipe_filter_schema import get_pushdown_stats
+
+        service = recipe_cache_module.RecipeCacheService()
+        print(f"{service.recipe_collection.count()} recipes seeded from {path}")
+
+        print(f"\n{'search':28} {'results':>8} {'rows (all)':>11} {'rows (pushdown)':>16} {'ms (all)':>9} {'ms (pushdown)':>14} {'same':>5}")
+        results = []
+        for name, (query, ingredient, filters) in SEARCHES.items():
+            row = {"search": name}
+            outputs = {}
+            for pushdown in (False, True):
+                recipe_cache_module.FILTER_PUSHDOWN_ENABLED = pushdown
+                before = get_pushdown_stats()["rows_read"]
+                started = time.perf_counter()
+                outputs[pushdown] = service._search_cached_recipes(query, ingredient, dict(filters))
+                row[f"ms_{pushdown}"] = (time.perf_counter() - started) * 1000
+                row[f"rows_{pushdown}"] = get_pushdown_stats()["rows_read"] - before
+            row["results"] = len(outputs[True])
+            row["same"] = [r.get('id') for r in outputs[False]] == [r.get('id') for r in outputs[True]]
+            print(f"{name:28} {row['results']:>8} {row['rows_False']:>11} {row['rows_True']:>16} "
+                  f"{row['ms_False']:>9.1f} {row['ms_True']:>14.1f} {str(row['same']):>5}")
+            results.append(row)
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark rows transferred with and without filter pushdown')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    args = parser.parse_args()
+
+    benchmark_filter_pushdown(args.path)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request CPU cost of building recipe list responses:
+
+  parse + dumps   json.loads every stored document, then json.dumps the response
+                  (how the read paths worked before the corpus)
+  dumps           json.dumps the already-parsed results (corpus, no passthrough)
+  passthrough     splice the stored JSON from RecipeJsonIndex
+
+Usage:
+    python scripts/benchmark_json_passthrough.py
+    python scripts/benchmark_json_passthrough.py --path ../complete_recipes_backup.json --repeat 50
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_json import RecipeJsonIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+
+
+def _time_ms(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def benchmark_json_passthrough(path: str, repeat: int = 20):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    recipes = [r for r in recipes if isinstance(r, dict) and r.get('id')]
+    documents = [json.dumps(r) for r in recipes]
+
+    index = RecipeJsonIndex()
+    started = time.perf_counter()
+    index.build(0, recipes)
+    logger.info(f"Indexed {len(recipes)} recipes in {(time.perf_counter() - started) * 1000:.1f}ms (once per corpus build)")
+
+    print(f"\n{'page size':>10} {'parse+dumps ms':>15} {'dumps ms':>10} {'passthrough ms':>15} {'saved':>7}")
+    for page_size in (20, 100, len(recipes)):
+        docs = documents[:page_size]
+        # Search results are shallow copies of corpus recipes plus a score
+        results = [dict(r, search_score=10) for r in recipes[:page_size]]
+        response = {"results": results, "total": len(recipes)}
+
+        def parse_and_dump():
+            parsed = [dict(json.loads(d), search_score=10) for d in docs]
+            json.dumps({"results": parsed, "total": len(recipes)})
+
+        def dump():
+            json.dumps(response)
+
+        def passthrough():
+            index.dumps_result(response)
+
+        assert json.loads(index.dumps_result(response)) == json.loads(json.dumps(response))
+        baseline_ms = _time_ms(parse_and_dump, repeat)
+        dump_ms = _time_ms(dump, repeat)
+        passthrough_ms = _time_ms(passthrough, repeat)
+        print(f"{page_size:>10} {baseline_ms:>15.2f} {dump_ms:>10.2f} {passthrough_ms:>15.2f} {1 - passthrough_ms / baseline_ms:>6.0%}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark recipe JSON passthrough against parse/serialize')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--repeat', type=int, default=20, help='Iterations per measurement')
+    args = parser.parse_args()
+
+    benchmark_json_passthrough(args.path, args.repeat)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare calorie/macro/time range filters evaluated over the nutrition table
+with the same filters evaluated by scanning recipe dicts.
+
+For each filter it reports:
+- the dict scan (recipe_in_ranges over every recipe);
+- the table mask (range_mask, NumPy comparisons packed into a position bitmap);
+- the mask plus selecting the matching recipes (what a search does with it).
+It also checks that both produce the same recipes. Needs NumPy; without it
+only the dict scan runs.
+
+Usage:
+    python scripts/benchmark_nutrition_filters.py
+    python scripts/benchmark_nutrition_filters.py --path ../complete_recipes_backup.json --copies 100
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_nutrition import NutritionTable, NUMPY_AVAILABLE, parse_range_filters, recipe_in_ranges
+from services.recipe_facets import select_positions
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+FILTERS = {
+    "calories<=500": {"max_calories": "500"},
+    "protein>=30": {"min_protein": "30"},
+    "time<=30": {"max_time": "30"},
+    "cal 200-600, protein>=20, time<=45": {"min_calories": "200", "max_calories": "600",
+                                           "min_protein": "20", "max_time": "45"},
+}
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_nutrition_filters(path: str, copies: int = 1, repeat: int = 5):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    recipes = [r for r in recipes if isinstance(r, dict)] * max(copies, 1)
+    print(f"{len(recipes)} recipes from {path}")
+
+    table = None
+    if NUMPY_AVAILABLE:
+        tmp = tempfile.TemporaryDirectory()
+        table = NutritionTable(os.path.join(tmp.name, 'recipe_nutrition.npy'))
+        started = time.perf_counter()
+        table.build(0, recipes)
+        stats = table.get_stats()
+        print(f"table built in {(time.perf_counter() - started) * 1000:.1f}ms, "
+              f"{os.path.getsize(table.path):,} bytes, memory-mapped: {stats['memory_mapped']}")
+    else:
+        print("NumPy is not installed: only the dict scan is measured")
+
+    print(f"\n{'filter':38} {'matches':>8} {'dict scan ms':>13} {'mask ms':>9} {'mask+select ms':>15} {'speedup':>8}")
+    results = []
+    for name, args in FILTERS.items():
+        ranges = parse_range_filters(args)
+        scan_ms = _best_ms(lambda: [r for r in recipes if recipe_in_ranges(r, ranges)], repeat)
+        expected = [i for i, r in enumerate(recipes) if recipe_in_ranges(r, ranges)]
+        row = {"filter": name, "matches": len(expected), "dict_scan_ms": round(scan_ms, 3)}
+        if table is not None:
+            mask = table.range_mask(0, ranges)
+            matched = [i for i in range(len(recipes)) if mask >> i & 1]
+            if matched != expected:
+                logger.error(f"{name}: table matched {len(matched)} recipes, dict scan {len(expected)}")
+            mask_ms = _best_ms(lambda: table.range_mask(0, ranges), repeat)
+            select_ms = _best_ms(lambda: select_positions(table.range_mask(0, ranges), recipes), repeat)
+            row.update({"mask_ms": round(mask_ms, 3), "mask_select_ms": round(select_ms, 3),
+                        "identical": matched == expected})
+            print(f"{name:38} {len(expected):>8} {scan_ms:>13.2f} {mask_ms:>9.3f} {select_ms:>15.2f} "
+                  f"{scan_ms / select_ms if select_ms else 0:>7.1f}x")
+        else:
+            print(f"{name:38} {len(expected):>8} {scan_ms:>13.2f} {'-':>9} {'-':>15} {'-':>8}")
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark nutrition range filters: columnar table vs dict scan')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the seed file to simulate a larger corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    benchmark_nutrition_filters(args.path, args.copies, args.repeat)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Latency of personalized recommendations with their sub-queries batched
+(RecipeSearchService.semantic_search_batch) against the previous pattern of one
+semantic_search per favorite food and per cuisine.
+
+Preference profiles are sampled from the collection: a few cuisines that have
+recipes, plus favorite foods taken from recipe names. For each profile the
+report shows
+- sequential: every sub-query of get_recipe_recommendations run as its own
+  semantic_search, as before (food searches, then the cuisine pool);
+- batched: the same sub-queries in one semantic_search_batch call;
+- recommendations: get_recipe_recommendations end to end, with the number of
+  backend queries it issued;
+and the same comparison for the per-cuisine fallback, which used to run up to
+three searches per cuisine.
+
+Usage:
+    python scripts/benchmark_recommendations.py
+    python scripts/benchmark_recommendations.py --profiles 50 --limit 16
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+from collections import Counter
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_search_service import RecipeSearchService
+from services.sparse_retrieval import tokenize
+
+logging.basicConfig(level=logging.WARNING)
+# The search service logs every recommendation step at INFO
+logging.getLogger('services').setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+FALLBACK_TEMPLATES = ["{} recipes", "{} traditional dishes", "{} food"]
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def build_profiles(metadatas, count: int, seed: int = 7):
+    """User preference dicts with 2-3 cuisines present in the collection and 2-4 favorite foods"""
+    rng = random.Random(seed)
+    cuisines = [c for c, n in Counter((m or {}).get('cuisine') for m in metadatas).most_common(12) if c and n >= 5]
+    words = [t for t, n in Counter(t for m in metadatas for t in tokenize((m or {}).get('name'))
+                                   if len(t) > 3).most_common(60)]
+    profiles = []
+    for _ in range(count):
+        profiles.append({
+            "favoriteCuisines": rng.sample(cuisines, min(len(cuisines), rng.randint(2, 3))),
+            "favoriteFoods": rng.sample(words, min(len(words), rng.randint(2, 4))),
+            "dietaryRestrictions": [],
+        })
+    return profiles
+
+
+def benchmark_recommendations(profile_count: int = 30, limit: int = 16):
+    service = RecipeSearchService()
+    rows = service.recipe_collection.get(include=['metadatas'])
+    profiles = build_profiles(rows.get('metadatas') or [], profile_count)
+    print(f"collection: {service.recipe_collection.name} ({len(rows.get('ids') or [])} rows), "
+          f"backend: {service.search_backend}, profiles: {len(profiles)}, limit={limit}")
+
+    # Count backend round trips made by get_recipe_recommendations
+    query_collection = service._query_collection
+    calls = [0]
+
+    def counted(*args, **kwargs):
+        calls[0] += 1
+        return query_collection(*args, **kwargs)
+
+    service._query_collection = counted
+    service.semantic_search("warm up", limit=1)
+
+    timings = {name: [] for name in ("sequential", "batched", "recommendations",
+                                     "fallback_sequential", "fallback_batched")}
+    round_trips = []
+    for profile in profiles:
+        cuisines = [service._normalize_cuisine(c) for c in profile["favoriteCuisines"]]
+        searches = [(f"delicious {food} recipes", {}, 5) for food in profile["favoriteFoods"]]
+        searches.append(("delicious recipes", {"cuisine": cuisines}, limit * 3))
+        _, elapsed = _timed(lambda: [service.semantic_search(q, filters=f, limit=n) for q, f, n in searches])
+        timings["sequential"].append(elapsed)
+        _, elapsed = _timed(lambda: service.semantic_search_batch(searches))
+        timings["batched"].append(elapsed)
+
+        calls[0] = 0
+        _, elapsed = _timed(lambda: service.get_recipe_recommendations(profile, limit=limit))
+        timings["recommendations"].append(elapsed)
+        round_trips.append(calls[0])
+
+        needed = max(1, limit // len(cuisines))
+        _, elapsed = _timed(lambda: [service.semantic_search(template.format(c), filters={"cuisine": c}, limit=needed * 4)
+                                     for c in cuisines for template in FALLBACK_TEMPLATES])
+        timings["fallback_sequential"].append(elapsed)
+        _, elapsed = _timed(lambda: service._fill_with_individual_cuisine_searches(
+            [], set(), cuisines, limit, {}, profile, parsed={}))
+        timings["fallback_batched"].append(elapsed)
+
+    print(f"\n{'run':>20} {'p50 ms':>9} {'p95 ms':>9}")
+    report = {}
+    for name, values in timings.items():
+        report[name] = {"p50_ms": round(_percentile(values, 0.5), 3), "p95_ms": round(_percentile(values, 0.95), 3)}
+        print(f"{name:>20} {report[name]['p50_ms']:>9.2f} {report[name]['p95_ms']:>9.2f}")
+    report["backend_queries_per_recommendation"] = round(sum(round_trips) / max(len(round_trips), 1), 2)
+    print(f"\nbackend queries per get_recipe_recommendations: {report['backend_queries_per_recommendation']}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare batched and per-query recommendation searches')
+    parser.add_argument('--profiles', type=int, default=30, help='Number of sampled preference profiles')
+    parser.add_argument('--limit', type=int, default=16, help='Recommendations per profile')
+    args = parser.parse_args()
+
+    benchmark_recommendations(args.profiles, args.limit)
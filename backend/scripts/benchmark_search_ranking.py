@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cost of cutting one page of search results from 1k, 10k and 100k synthetic
+scored recipes.
+
+For each size it reports:
+- full sort: sorting every match by relevance, then slicing the page (the old ranking);
+- top-k heap: rank_results() ranking only the first offset+limit matches;
+- shuffle page: copying and shuffling every match, then slicing (the old unseeded page);
+- sampled page: drawing just the page with random.sample (the current unseeded page).
+It also checks that the heap returns the same page as the full sort.
+
+Usage:
+    python scripts/benchmark_search_ranking.py
+    python scripts/benchmark_search_ranking.py --sizes 1000 10000 100000 --offset 0 --limit 20
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.search_ranking import rank_results, ranking_key
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def synthetic_matches(count: int, seed: int = 7):
+    """Scored matches as the name-search scorer leaves them (scores repeat, so ties are common)"""
+    rng = random.Random(seed)
+    matches = []
+    for i in range(count):
+        title_matches = rng.randint(0, 1)
+        matches.append({
+            "id": str(i),
+            "title": f"Recipe {i}",
+            "search_score": 100 * title_matches + rng.choice((0, 0, 50)),
+            "matched_terms": title_matches,
+            "title_matches": title_matches,
+            "ingredient_matches": 0,
+        })
+    return matches
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _shuffled_page(matches, offset, limit):
+    shuffled = matches.copy()
+    random.shuffle(shuffled)
+    return shuffled[offset:offset + limit]
+
+
+def benchmark_search_ranking(sizes=DEFAULT_SIZES, offset: int = 0, limit: int = 20, repeat: int = 5):
+    key = ranking_key(query="recipe")
+    print(f"page: offset={offset} limit={limit}")
+    print(f"\n{'matches':>8} {'full sort ms':>13} {'top-k heap ms':>14} {'speedup':>8} "
+          f"{'shuffle page ms':>16} {'sampled page ms':>16} {'same page':>10}")
+    results = []
+    for size in sizes:
+        matches = synthetic_matches(size)
+        full_page = sorted(matches, key=key, reverse=True)[offset:offset + limit]
+        heap_page = rank_results(matches, key, offset + limit)[offset:offset + limit]
+        same = [r["id"] for r in full_page] == [r["id"] for r in heap_page]
+        if not same:
+            logger.error(f"{size}: top-k heap page differs from the full sort")
+
+        sort_ms = _best_ms(lambda: sorted(matches, key=key, reverse=True)[offset:offset + limit], repeat)
+        heap_ms = _best_ms(lambda: rank_results(matches, key, offset + limit)[offset:offset + limit], repeat)
+        shuffle_ms = _best_ms(lambda: _shuffled_page(matches, offset, limit), repeat)
+        sample_ms = _best_ms(lambda: random.sample(matches, max(0, min(limit, size - offset))), repeat)
+        row = {
+            "matches": size,
+            "full_sort_ms": round(sort_ms, 3),
+            "top_k_heap_ms": round(heap_ms, 3),
+            "shuffle_page_ms": round(shuffle_ms, 3),
+            "sampled_page_ms": round(sample_ms, 3),
+            "same_page": same,
+        }
+        print(f"{size:>8} {sort_ms:>13.2f} {heap_ms:>14.2f} {sort_ms / heap_ms if heap_ms else 0:>7.1f}x "
+              f"{shuffle_ms:>16.2f} {sample_ms:>16.3f} {str(same):>10}")
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark top-k ranking and page sampling against full sorts')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Numbers of matches')
+    parser.add_argument('--offset', type=int, default=0, help='Page offset')
+    parser.add_argument('--limit', type=int, default=20, help='Page size')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    benchmark_search_ranking(args.sizes, args.offset, args.limit, args.repeat)
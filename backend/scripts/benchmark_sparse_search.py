@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of RecipeSearchService's two search backends on the recipe
+collection it serves: ChromaDB nearest neighbours over the lightweight
+embeddings, and the in-process BM25 index (services/sparse_retrieval.py).
+
+Queries are built from the corpus: the first words of sampled recipe titles.
+The rows whose name contains every query word are the relevant set, and each
+backend's recall@k is the share of those it returns in its first k rows (the
+pool semantic_search re-ranks). Per-query latency is reported as p50/p95, with
+the batched BM25 run (every query scored in one call) alongside.
+
+Usage:
+    python scripts/benchmark_sparse_search.py
+    python scripts/benchmark_sparse_search.py --queries 200 --k 30
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_search_service import RecipeSearchService
+from services.sparse_retrieval import SEARCH_BACKEND_CHROMA, SEARCH_BACKEND_SPARSE, tokenize
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def build_queries(names, count: int, words: int = 2, seed: int = 7):
+    """(query, relevant row positions) pairs from sampled recipe names"""
+    rng = random.Random(seed)
+    name_tokens = [set(tokenize(name)) for name in names]
+    queries = []
+    for position in rng.sample(range(len(names)), min(count, len(names))):
+        terms = [t for t in tokenize(names[position]) if len(t) > 2][:words]
+        if not terms:
+            continue
+        relevant = {i for i, tokens in enumerate(name_tokens) if all(t in tokens for t in terms)}
+        queries.append((' '.join(terms), relevant))
+    return queries
+
+
+def benchmark_sparse_search(query_count: int = 100, k: int = 30):
+    service = RecipeSearchService()
+    service.search_backend = SEARCH_BACKEND_SPARSE
+    started = time.perf_counter()
+    service._ensure_search_index(SEARCH_BACKEND_SPARSE)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rows = service.recipe_collection.get(include=['metadatas'])
+    ids = rows.get('ids') or []
+    names = [(m or {}).get('name') or (m or {}).get('title') or '' for m in rows.get('metadatas') or []]
+    positions = {row_id: i for i, row_id in enumerate(ids)}
+    queries = build_queries(names, query_count)
+    print(f"collection: {service.recipe_collection.name} ({len(ids)} rows), sparse index built in {build_ms:.0f} ms")
+    print(f"queries: {len(queries)}, recall@{k} against rows whose name contains every query word\n")
+
+    report = {}
+    for backend in (SEARCH_BACKEND_CHROMA, SEARCH_BACKEND_SPARSE):
+        service.search_backend = backend
+        latencies, recalls = [], []
+        for query, relevant in queries:
+            started = time.perf_counter()
+            results = service._query_collection([query], n_results=k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = {positions.get(row_id) for row_id in results['ids'][0]}
+            recalls.append(len(found & relevant) / min(len(relevant), k))
+        report[backend] = {
+            "recall_at_k": round(sum(recalls) / len(recalls), 4) if recalls else 0.0,
+            "p50_ms": round(_percentile(latencies, 0.5), 3),
+            "p95_ms": round(_percentile(latencies, 0.95), 3),
+        }
+
+    service.search_backend = SEARCH_BACKEND_SPARSE
+    started = time.perf_counter()
+    service._query_collection([query for query, _ in queries], n_results=k)
+    batch_ms = (time.perf_counter() - started) * 1000
+    report[SEARCH_BACKEND_SPARSE]["batched_ms_per_query"] = round(batch_ms / max(len(queries), 1), 3)
+
+    print(f"{'backend':>8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'batched ms/query':>17}")
+    for backend, row in report.items():
+        batched = row.get("batched_ms_per_query")
+        print(f"{backend:>8} {row['recall_at_k']:>9.3f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+              f"{'' if batched is None else f'{batched:.3f}':>17}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare ChromaDB and BM25 search backends')
+    parser.add_argument('--queries', type=int, default=100, help='Number of sampled queries')
+    parser.add_argument('--k', type=int, default=30, help='Rows retrieved per query')
+    args = parser.parse_args()
+
+    benchmark_sparse_search(args.queries, args.k)
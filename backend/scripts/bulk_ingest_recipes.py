@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Bulk-load a recipe seed file into ChromaDB through the ingest pipeline.
+
+The file is streamed, recipes are prepared and embedded in a process pool,
+duplicate ids are collapsed and each batch is written with one upsert per
+collection. Progress is logged after every batch. If the run is interrupted,
+running the same command again resumes from the checkpoint.
+
+Usage:
+    python scripts/bulk_ingest_recipes.py --path ../complete_recipes_backup.json
+    python scripts/bulk_ingest_recipes.py --path recipes_data.json --workers 4 --batch-size 1000
+"""
+
+import os
+import sys
+import json
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# This script does the seeding itself
+os.environ['SEED_RECIPES_ON_STARTUP'] = 'false'
+
+from services.recipe_cache_service import RecipeCacheService
+from services.recipe_ingest import INGEST_BATCH_SIZE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def bulk_ingest_recipes(path: str, limit: int = 0, batch_size: int = INGEST_BATCH_SIZE,
+                        workers: int = 0, resume: bool = True):
+    cache = RecipeCacheService()
+    if cache.recipe_collection is None:
+        logger.error("ChromaDB is not available")
+        return None
+
+    checkpoint_path = getattr(cache, 'seed_checkpoint_path', None)
+    if not resume and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    logger.info(f"Ingesting {path} with {workers or 1} worker(s), batches of {batch_size}")
+    stats = cache._seed_chromadb_from_file(path, limit=limit, batch_size=batch_size, workers=workers)
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bulk-load recipes into ChromaDB')
+    parser.add_argument('--path', default=os.environ.get('SEED_RECIPES_FILE', 'recipes_data.json'), help='Seed JSON file of recipes')
+    parser.add_argument('--limit', type=int, default=0, help='Maximum number of records to ingest (0 = all)')
+    parser.add_argument('--batch-size', type=int, default=INGEST_BATCH_SIZE, help='Recipes per upsert')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes preparing and embedding recipes')
+    parser.add_argument('--no-resume', action='store_true', help='Start over even if a checkpoint exists')
+    args = parser.parse_args()
+
+    bulk_ingest_recipes(args.path, args.limit, args.batch_size, args.workers, not args.no_resume)
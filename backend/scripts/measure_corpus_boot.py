@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh process takes to serve its first search, with the
+corpus loaded from parsed documents (the old boot path) and from the binary
+corpus snapshot file.
+
+Each boot runs in a forked child so nothing is warm. The store is simulated
+by the seed file's documents; reading them from ChromaDB adds to the
+document boot, not to the snapshot boot.
+
+Usage:
+    python scripts/measure_corpus_boot.py
+    python scripts/measure_corpus_boot.py --path ../complete_recipes_backup.json --copies 10
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_corpus import get_recipe_corpus
+from services.recipe_text_index import get_recipe_text_index
+from services.recipe_facets import get_recipe_facet_index
+from services.recipe_summaries import get_recipe_summary_index
+from services.recipe_json import get_recipe_json_index
+from services.dietary_classifier import get_diet_flag_store
+from services.corpus_snapshot import CorpusSnapshotFile
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+
+
+def _boot(documents, snapshot_path: str, write: bool):
+    """Load the corpus in this process and serve one search; returns timings in ms"""
+    started = time.perf_counter()
+    corpus = get_recipe_corpus()
+    corpus.set_loader(lambda: [json.loads(doc) for doc in documents])
+    corpus.register_snapshot_state(get_diet_flag_store())
+    corpus.set_snapshot_file(CorpusSnapshotFile(snapshot_path), lambda: len(documents))
+    for index in (get_recipe_text_index(), get_recipe_facet_index(),
+                  get_recipe_summary_index(), get_recipe_json_index()):
+        corpus.register_index(index)
+
+    version, recipes = corpus.get_snapshot()
+    loaded_ms = (time.perf_counter() - started) * 1000
+    positions = get_recipe_text_index().candidates(version, 'chicken', ('title', 'ingredients')) or []
+    get_recipe_json_index().dumps_list([recipes[p] for p in positions[:20]])
+    first_ms = (time.perf_counter() - started) * 1000
+
+    timings = {
+        "from_file": corpus.get_stats()["snapshot_file_loads"] > 0,
+        "load_ms": round(loaded_ms, 1),
+        "first_search_ms": round(first_ms, 1),
+    }
+    if write:
+        write_started = time.perf_counter()
+        corpus.write_snapshot_file()
+        timings["write_ms"] = round((time.perf_counter() - write_started) * 1000, 1)
+        timings["bytes"] = os.path.getsize(snapshot_path)
+    return timings
+
+
+def _in_child(fn, *args):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            payload = json.dumps(fn(*args))
+        except Exception as e:
+            payload = json.dumps({"error": str(e)})
+        os.write(write_fd, payload.encode('utf-8'))
+        os.close(write_fd)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        result = json.loads(f.read() or b'{}')
+    os.waitpid(pid, 0)
+    return result
+
+
+def measure_corpus_boot(path: str, copies: int = 1):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    documents = [json.dumps(r) for r in recipes if isinstance(r, dict)] * max(copies, 1)
+    print(f"{len(documents)} recipes from {path}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, 'recipe_corpus.snapshot')
+        cold = _in_child(_boot, documents, snapshot_path, True)
+        warm = _in_child(_boot, documents, snapshot_path, False)
+
+    print(f"\n{'boot':16} {'load ms':>10} {'first search ms':>16}")
+    print(f"{'documents':16} {cold.get('load_ms', 0):>10.1f} {cold.get('first_search_ms', 0):>16.1f}")
+    print(f"{'snapshot file':16} {warm.get('load_ms', 0):>10.1f} {warm.get('first_search_ms', 0):>16.1f}")
+    print(f"\nsnapshot file: {cold.get('bytes', 0):,} bytes, written in {cold.get('write_ms', 0):.1f}ms, "
+          f"used at boot: {warm.get('from_file')}")
+    return {"documents": cold, "snapshot_file": warm}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure corpus boot time with and without the snapshot file')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the seed file to simulate a larger corpus')
+    args = parser.parse_args()
+
+    measure_corpus_boot(args.path, args.copies)
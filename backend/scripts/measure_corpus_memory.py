@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Report the memory held per recipe by the in-process corpus, before and after
+compaction (shared keys and vocabularies), using a seed file.
+
+Each recipe is serialized and parsed on its own, like documents read back
+from ChromaDB, so the "before" figure matches what the corpus used to hold.
+
+Usage:
+    python scripts/measure_corpus_memory.py
+    python scripts/measure_corpus_memory.py --path ../complete_recipes_backup.json --copies 10
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_compact import RecipeCompactor, bytes_per_recipe
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+
+
+def measure_corpus_memory(path: str, copies: int = 1):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    documents = [json.dumps(r) for r in recipes if isinstance(r, dict)] * max(copies, 1)
+    logger.info(f"Loaded {len(documents)} recipes from {path}")
+
+    parsed = [json.loads(doc) for doc in documents]
+    before = bytes_per_recipe(parsed)
+
+    compactor = RecipeCompactor()
+    started = time.perf_counter()
+    compacted = compactor.compact_all(parsed)
+    compact_ms = (time.perf_counter() - started) * 1000
+    after = bytes_per_recipe(compacted)
+
+    if compacted != parsed:
+        logger.error("Compacted recipes differ from the parsed documents")
+
+    print(f"\n{'recipes':24} {len(parsed):>12,}")
+    print(f"{'bytes/recipe before':24} {before:>12,.0f}")
+    print(f"{'bytes/recipe after':24} {after:>12,.0f}")
+    print(f"{'saved':24} {1 - after / before:>12.1%}")
+    print(f"{'total before (MB)':24} {before * len(parsed) / 1e6:>12.1f}")
+    print(f"{'total after (MB)':24} {after * len(parsed) / 1e6:>12.1f}")
+    print(f"{'compaction ms':24} {compact_ms:>12.1f}")
+    stats = compactor.get_stats()
+    for name, size in stats["vocabulary_sizes"].items():
+        print(f"{'vocabulary ' + name:24} {size:>12,}")
+    return {"before": before, "after": after, "stats": stats}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure corpus memory per recipe')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the seed file to simulate a larger corpus')
+    args = parser.parse_args()
+
+    measure_corpus_memory(args.path, args.copies)
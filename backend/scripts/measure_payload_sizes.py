@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure recipe list payload sizes for full documents vs. the summary view
+and a field projection, using a seed file (the same JSON the cache seeds from).
+
+Usage:
+    python scripts/measure_payload_sizes.py
+    python scripts/measure_payload_sizes.py --path ../complete_recipes_backup.json --page-size 20
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_summaries import build_summary, shape_recipes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+
+
+def _serialize(recipes, repeat: int = 5):
+    """Return (bytes, average ms) for jsonify-equivalent serialization"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = json.dumps({"results": recipes, "total": len(recipes)})
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+    return len(body.encode('utf-8')), elapsed_ms
+
+
+def measure_payload_sizes(path: str, page_size: int = 20):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    recipes = [r for r in recipes if isinstance(r, dict)]
+    logger.info(f"Loaded {len(recipes)} recipes from {path}")
+
+    variants = {
+        "full": lambda rs: rs,
+        "view=summary": lambda rs: [build_summary(r) for r in rs],
+        "fields=title,image,cuisines": lambda rs: shape_recipes(rs, None, ['title', 'image', 'cuisines']),
+    }
+
+    print(f"\n{'variant':32} {'page bytes':>12} {'all bytes':>12} {'all ms':>8} {'vs full':>8}")
+    full_all = None
+    for name, shape in variants.items():
+        page_bytes, _ = _serialize(shape(recipes[:page_size]))
+        all_bytes, all_ms = _serialize(shape(recipes))
+        if full_all is None:
+            full_all = all_bytes
+        print(f"{name:32} {page_bytes:>12,} {all_bytes:>12,} {all_ms:>8.1f} {all_bytes / full_all:>7.1%}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare full vs. summary recipe list payload sizes')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--page-size', type=int, default=20, help='Recipes per page for the page column')
+    args = parser.parse_args()
+
+    measure_payload_sizes(args.path, args.page_size)
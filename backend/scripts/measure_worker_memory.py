@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Report per-worker RSS and USS for 1, 2 and 4 forked workers, with the recipe
+corpus preloaded in the parent (gunicorn preload_app) and loaded by each
+worker on its own.
+
+Workers are forked the way gunicorn forks them. Each one runs a small search
+and serialization workload over the corpus and its indexes, then reports its
+memory. USS (pages only this process holds) is what each extra worker really
+costs; RSS also counts the pages shared with the parent. Linux only.
+
+Usage:
+    python scripts/measure_worker_memory.py
+    python scripts/measure_worker_memory.py --path ../complete_recipes_backup.json --copies 10
+"""
+
+import os
+import sys
+import json
+import logging
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_corpus import get_recipe_corpus
+from services.recipe_text_index import get_recipe_text_index
+from services.recipe_facets import get_recipe_facet_index
+from services.recipe_summaries import get_recipe_summary_index
+from services.recipe_json import get_recipe_json_index
+from services.prefork import freeze_heap, memory_usage
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'complete_recipes_backup.json'
+)
+WORKLOAD_TERMS = ['chicken', 'pasta', 'rice', 'beef', 'salad', 'soup', 'cake', 'curry']
+
+
+def _run_workload(corpus) -> None:
+    """Touch the corpus the way searches and list responses do"""
+    version, recipes = corpus.get_snapshot()
+    text_index = get_recipe_text_index()
+    json_index = get_recipe_json_index()
+    for term in WORKLOAD_TERMS:
+        positions = text_index.candidates(version, term, ('title', 'ingredients')) or []
+        json_index.dumps_list([dict(recipes[p]) for p in positions[:200]])
+    get_recipe_facet_index().filter_mask(version, cuisines=['italian'], any_diets=['vegetarian'])
+    json_index.dumps_list(recipes)
+
+
+def _fork_workers(count: int, corpus, preloaded: bool):
+    """Fork `count` workers and collect their memory usage after the workload"""
+    children = []
+    for _ in range(count):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                if not preloaded:
+                    corpus.get_snapshot()
+                _run_workload(corpus)
+                payload = json.dumps(memory_usage()).encode('utf-8')
+            except Exception as e:
+                payload = json.dumps({"error": str(e)}).encode('utf-8')
+            os.write(write_fd, payload)
+            os.close(write_fd)
+            os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    usages = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, 'rb') as f:
+            usages.append(json.loads(f.read() or b'{}'))
+        os.waitpid(pid, 0)
+    return usages
+
+
+def _load_documents(path: str, copies: int):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    recipes = data.get('recipes', data) if isinstance(data, dict) else data
+    return [json.dumps(r) for r in recipes if isinstance(r, dict)] * max(copies, 1)
+
+
+def measure_worker_memory(path: str, copies: int = 1, worker_counts=(1, 2, 4)):
+    documents = _load_documents(path, copies)
+    print(f"{len(documents)} recipes from {path}")
+    print(f"\n{'mode':10} {'workers':>7} {'RSS/worker MB':>14} {'USS/worker MB':>14} {'total USS MB':>13} {'total PSS MB':>13}")
+
+    results = []
+    for preloaded in (False, True):
+        for count in worker_counts:
+            # Each measurement runs in its own parent so loads don't leak between runs
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                corpus = get_recipe_corpus()
+                corpus.set_loader(lambda: [json.loads(doc) for doc in documents])
+                for index in (get_recipe_text_index(), get_recipe_facet_index(),
+                              get_recipe_summary_index(), get_recipe_json_index()):
+                    corpus.register_index(index)
+                if preloaded:
+                    corpus.get_snapshot()
+                    freeze_heap()
+                usages = _fork_workers(count, corpus, preloaded)
+                os.write(write_fd, json.dumps(usages).encode('utf-8'))
+                os.close(write_fd)
+                os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd, 'rb') as f:
+                usages = json.loads(f.read() or b'[]')
+            os.waitpid(pid, 0)
+
+            if not usages or any("error" in u for u in usages):
+                logger.error(f"Worker run failed: {usages}")
+                continue
+            mode = "preload" if preloaded else "per-worker"
+            rss = sum(u["rss"] for u in usages) / len(usages) / 1e6
+            uss = sum(u["uss"] for u in usages) / len(usages) / 1e6
+            total_uss = sum(u["uss"] for u in usages) / 1e6
+            total_pss = sum(u["pss"] for u in usages) / 1e6
+            print(f"{mode:10} {count:>7} {rss:>14.1f} {uss:>14.1f} {total_uss:>13.1f} {total_pss:>13.1f}")
+            results.append({"mode": mode, "workers": count, "usages": usages})
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure per-worker memory with and without a preloaded corpus')
+    parser.add_argument('--path', default=DEFAULT_SEED_PATH, help='Seed JSON file of recipes')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the seed file to simulate a larger corpus')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated worker counts')
+    args = parser.parse_args()
+
+    measure_worker_memory(args.path, args.copies, [int(n) for n in args.workers.split(',') if n.strip()])
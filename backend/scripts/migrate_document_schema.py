@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Rewrite every cached recipe document to schema v2 (see
+services/recipe_document.py): the flat recipe JSON with a string id, marked
+with document_schema_version = 2 in the row's metadata.
+
+Rows already at v2 are skipped, and progress is checkpointed after every batch
+(in the ChromaDB directory), so an interrupted run resumes where it stopped.
+Rows whose document holds no recipe are left untouched and reported. Once the
+report says complete, RECIPE_LEGACY_DOCUMENTS=false turns off the legacy
+decoding on reads.
+
+Usage:
+    python scripts/migrate_document_schema.py
+    python scripts/migrate_document_schema.py --dry-run
+    python scripts/migrate_document_schema.py --restart
+"""
+
+import os
+import sys
+import json
+import logging
+from typing import Any, Dict
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_document import (
+    DOCUMENT_SCHEMA_FIELD, DOCUMENT_SCHEMA_VERSION, decode_legacy_document, encode_document, is_current
+)
+from services.store_generation import mark_store_changed
+from utils.chromadb_singleton import get_chromadb_client, get_chromadb_path
+from utils.lightweight_embeddings import get_lightweight_embedding_function
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'document_schema_checkpoint.json'
+SAMPLE_LIMIT = 20
+
+
+def _load_offset(checkpoint_path: str) -> int:
+    try:
+        with open(checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if checkpoint.get("schema_version") != DOCUMENT_SCHEMA_VERSION:
+        return 0
+    return int(checkpoint.get("offset", 0))
+
+
+def _save_offset(checkpoint_path: str, offset: int) -> None:
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"schema_version": DOCUMENT_SCHEMA_VERSION, "offset": offset}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def migrate_document_schema(dry_run: bool = False, batch_size: int = 200, restart: bool = False) -> Dict[str, Any]:
+    """
+    Rewrite every row not at DOCUMENT_SCHEMA_VERSION.
+
+    Args:
+        dry_run: Count what would change without writing (ignores the checkpoint)
+        batch_size: Number of recipes read and updated per ChromaDB call
+        restart: Ignore the checkpoint and scan from the first row
+
+    Returns:
+        Dict: Migration counts
+    """
+    client = get_chromadb_client()
+    # Updated documents are re-embedded, so use the function the cache service writes with
+    collection = client.get_collection(
+        'recipe_details_cache',
+        embedding_function=get_lightweight_embedding_function(use_token_based=True)
+    )
+    checkpoint_path = os.path.join(get_chromadb_path(), CHECKPOINT_FILE)
+
+    report = {
+        "schema_version": DOCUMENT_SCHEMA_VERSION,
+        "dry_run": dry_run,
+        "resumed_at": 0,
+        "total": 0,
+        "up_to_date": 0,
+        "migrated": 0,
+        "unparseable": 0,
+        "unparseable_ids": [],
+        "complete": False,
+    }
+
+    total = collection.count()
+    offset = 0 if (dry_run or restart) else _load_offset(checkpoint_path)
+    report["resumed_at"] = offset
+    if offset:
+        logger.info(f"Resuming from row {offset}/{total}")
+
+    while offset < total:
+        batch = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+        ids = batch.get('ids') or []
+        if not ids:
+            break
+        offset += len(ids)
+
+        update_ids, update_docs, update_metas = [], [], []
+        for recipe_id, document, metadata in zip(ids, batch.get('documents') or [], batch.get('metadatas') or []):
+            report["total"] += 1
+            if is_current(metadata):
+                report["up_to_date"] += 1
+                continue
+            recipe = decode_legacy_document(document)
+            if recipe is None:
+                report["unparseable"] += 1
+                if len(report["unparseable_ids"]) < SAMPLE_LIMIT:
+                    report["unparseable_ids"].append(recipe_id)
+                continue
+            update_ids.append(recipe_id)
+            update_docs.append(encode_document(recipe))
+            update_metas.append(dict(metadata or {}, **{DOCUMENT_SCHEMA_FIELD: DOCUMENT_SCHEMA_VERSION}))
+
+        if not dry_run:
+            if update_ids:
+                collection.update(ids=update_ids, documents=update_docs, metadatas=update_metas)
+                # Running servers reload the rewritten rows (and drop their snapshot files)
+                mark_store_changed()
+            _save_offset(checkpoint_path, offset)
+        report["migrated"] += len(update_ids)
+        logger.info(f"Processed {offset}/{total} recipes ({report['migrated']} {'to migrate' if dry_run else 'migrated'})")
+
+    if not dry_run:
+        # A later run rescans from the start, picking up rows older app instances wrote since
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        current = collection.get(where={DOCUMENT_SCHEMA_FIELD: DOCUMENT_SCHEMA_VERSION}, include=[])
+        report["complete"] = len(current.get('ids') or []) >= collection.count()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rewrite cached recipe documents to the flat schema v2')
+    parser.add_argument('--dry-run', action='store_true', help="Count rows to migrate, don't write")
+    parser.add_argument('--batch-size', type=int, default=200, help='Recipes per ChromaDB call')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start from the first row')
+    args = parser.parse_args()
+
+    result = migrate_document_schema(dry_run=args.dry_run, batch_size=args.batch_size, restart=args.restart)
+    print(json.dumps(result, indent=2))
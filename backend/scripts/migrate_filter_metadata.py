@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Write the canonical filter metadata (see services/recipe_filter_schema.py) on
+every cached recipe, so store reads can push cuisine, diet and nutrition
+filters down to ChromaDB.
+
+Rows already at the current schema version are skipped, so an interrupted run
+can simply be started again. Rows whose document can't be parsed only get the
+version field: the store loader skips them anyway. Filter pushdown turns on
+(within RECIPE_FILTER_SCHEMA_RECHECK_SECONDS) once every row is migrated.
+
+Usage:
+    python scripts/migrate_filter_metadata.py
+    python scripts/migrate_filter_metadata.py --dry-run
+"""
+
+import os
+import sys
+import json
+import logging
+from typing import Any, Dict
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_cache_service import RecipeCacheService
+from services.recipe_filter_schema import (
+    FILTER_SCHEMA_VERSION, SCHEMA_VERSION_FIELD, collection_migrated, filterable_metadata, strip_filter_metadata
+)
+from services.store_generation import mark_store_changed
+from utils.chromadb_singleton import get_chromadb_client
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def migrate_filter_metadata(dry_run: bool = False, batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Rewrite the filter fields of every row not at FILTER_SCHEMA_VERSION.
+
+    Args:
+        dry_run: Count what would change without writing
+        batch_size: Number of recipes read and updated per ChromaDB call
+
+    Returns:
+        Dict: Migration counts
+    """
+    client = get_chromadb_client()
+    collection = client.get_collection('recipe_details_cache')
+
+    report = {
+        "schema_version": FILTER_SCHEMA_VERSION,
+        "dry_run": dry_run,
+        "total": 0,
+        "up_to_date": 0,
+        "migrated": 0,
+        "unparseable": 0,
+        "complete": False,
+    }
+
+    total = collection.count()
+    offset = 0
+    while offset < total:
+        batch = collection.get(include=['documents', 'metadatas'], limit=batch_size, offset=offset)
+        ids = batch.get('ids') or []
+        if not ids:
+            break
+        offset += len(ids)
+
+        update_ids, update_metas = [], []
+        for recipe_id, document, metadata in zip(ids, batch.get('documents') or [], batch.get('metadatas') or []):
+            report["total"] += 1
+            metadata = dict(metadata or {})
+            if metadata.get(SCHEMA_VERSION_FIELD) == FILTER_SCHEMA_VERSION:
+                report["up_to_date"] += 1
+                continue
+            try:
+                recipe = RecipeCacheService._unwrap_recipe_document(json.loads(document))
+            except (TypeError, ValueError):
+                recipe = None
+
+            metadata = strip_filter_metadata(metadata)
+            if recipe is None:
+                report["unparseable"] += 1
+                metadata[SCHEMA_VERSION_FIELD] = FILTER_SCHEMA_VERSION
+            else:
+                metadata.update(filterable_metadata(recipe))
+            update_ids.append(recipe_id)
+            update_metas.append(metadata)
+
+        if update_ids and not dry_run:
+            collection.update(ids=update_ids, metadatas=update_metas)
+            # Running servers reload the updated rows (and drop their snapshot files)
+            mark_store_changed()
+        report["migrated"] += len(update_ids)
+        logger.info(f"Processed {offset}/{total} recipes ({report['migrated']} {'to migrate' if dry_run else 'migrated'})")
+
+    if not dry_run:
+        report["complete"] = collection_migrated(collection)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write canonical filter metadata on cached recipes')
+    parser.add_argument('--dry-run', action='store_true', help="Count rows to migrate, don't update metadata")
+    parser.add_argument('--batch-size', type=int, default=200, help='Recipes per ChromaDB call')
+    args = parser.parse_args()
+
+    result = migrate_filter_metadata(dry_run=args.dry_run, batch_size=args.batch_size)
+    print(json.dumps(result, indent=2))
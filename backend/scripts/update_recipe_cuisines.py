@@ -1,5 +1,6 @@
 import chromadb
 from services.recipe_search_service import RecipeSearchService
+from services.store_generation import mark_store_changed
 import logging
 
 # Set up logging
@@ -62,6 +63,9 @@ def update_recipe_cuisines():
                 logger.error(f"Error processing recipe {recipe_id}: {e}")
                 continue
         
+        if updated_count:
+            # Running servers reload the updated rows
+            mark_store_changed("./chroma_db")
         logger.info(f"Successfully updated cuisines for {updated_count} recipes")
         
     except Exception as e:
@@ -0,0 +1,202 @@
+"""
+Recipe cache statistics without store scans.
+
+Row counts of the cache collections are kept in memory. Each count is read
+from its collection once, then adjusted by the cache service's own writes when
+it already knows which rows they add (skip_existing writes, deletes). Other
+upserts, and writes that bypass the service (followed by invalidate_corpus()),
+mark the counts stale so the next read re-counts once. A background sampler re-reads every count every CACHE_STATS_SAMPLE_SECONDS,
+which also corrects drift from writes made by other processes (gunicorn
+workers, scripts).
+
+The on-disk size of the ChromaDB directory is only measured by that sampler,
+so get_cache_stats and get_recipe_count never walk the directory or pull rows.
+"""
+
+import os
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the background sampler: counts are then only re-read when stale
+# and the disk size is not reported
+CACHE_STATS_SAMPLE_SECONDS = float(os.environ.get('CACHE_STATS_SAMPLE_SECONDS', '300'))
+
+Counter = Callable[[], Optional[int]]
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the files under `path`"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                # Removed while walking (e.g. a sqlite journal)
+                continue
+    return total
+
+
+class CacheStatistics:
+    """Row counts maintained on write, and a background sample of the store's disk usage"""
+
+    def __init__(self, interval: float = CACHE_STATS_SAMPLE_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._counters: Dict[str, Counter] = {}
+        self._counts: Dict[str, int] = {}
+        self._stale = set()
+        # Writes recorded per collection, to detect ones landing during a re-count
+        self._writes: Dict[str, int] = {}
+        self._disk_bytes: Optional[int] = None
+        self._disk_sampled_at: Optional[float] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._stats = {"count_reads": 0, "recounts": 0, "samples": 0, "sample_errors": 0}
+
+    def configure(self, path: str, counters: Dict[str, Counter]) -> None:
+        """
+        Set the store directory and the functions that count each collection.
+
+        Args:
+            path: ChromaDB directory whose size is sampled
+            counters: Collection name -> function returning its row count (None when unavailable)
+        """
+        with self._lock:
+            if path != self._path:
+                self._counts.clear()
+                self._disk_bytes = None
+                self._disk_sampled_at = None
+            self._path = path
+            self._counters = dict(counters)
+            # Services created later for the same store keep the counts already known
+            self._stale.update(name for name in self._counters if name not in self._counts)
+
+    def count(self, name: str) -> int:
+        """Row count of a collection, re-counted only when stale"""
+        self._ensure_sampler()
+        with self._lock:
+            self._stats["count_reads"] += 1
+            if name in self._counts and name not in self._stale:
+                return self._counts[name]
+        return self._recount(name)
+
+    def tracking(self, name: str) -> bool:
+        """True when writes to `name` should report their row changes (its count is current)"""
+        with self._lock:
+            return name in self._counts and name not in self._stale
+
+    def record_rows(self, name: str, delta: int) -> None:
+        """Apply rows added (positive) or removed (negative) by a write"""
+        if not delta:
+            return
+        with self._lock:
+            self._writes[name] = self._writes.get(name, 0) + 1
+            if name in self._counts and name not in self._stale:
+                self._counts[name] = max(0, self._counts[name] + delta)
+
+    def mark_stale(self, name: Optional[str] = None) -> None:
+        """Re-count one collection (or all) on the next read, after writes that weren't tracked"""
+        with self._lock:
+            for stale_name in ([name] if name else list(self._counters)):
+                self._writes[stale_name] = self._writes.get(stale_name, 0) + 1
+                self._stale.add(stale_name)
+
+    def disk_size_bytes(self) -> Optional[int]:
+        """Store size from the last background sample, or None before the first one"""
+        self._ensure_sampler()
+        with self._lock:
+            return self._disk_bytes
+
+    def _recount(self, name: str) -> int:
+        counter = self._counters.get(name)
+        with self._lock:
+            writes = self._writes.get(name, 0)
+        try:
+            count = counter() if counter else None
+        except Exception as e:
+            logger.warning(f"Could not count {name}: {e}")
+            count = None
+        with self._lock:
+            if count is None:
+                return self._counts.get(name, 0)
+            self._counts[name] = count
+            if self._writes.get(name, 0) == writes:
+                self._stale.discard(name)
+            else:
+                # A write landed while counting and may be missing: count again on the next read
+                self._stale.add(name)
+            self._stats["recounts"] += 1
+        return count
+
+    def sample(self) -> None:
+        """Re-count every collection and measure the store's disk usage"""
+        for name in list(self._counters):
+            self._recount(name)
+        path = self._path
+        if path and os.path.exists(path):
+            size = directory_size(path)
+            with self._lock:
+                self._disk_bytes = size
+                self._disk_sampled_at = time.time()
+        with self._lock:
+            self._stats["samples"] += 1
+
+    def _ensure_sampler(self) -> None:
+        """Start the sampler thread in this process (again after a fork) if it's enabled"""
+        if self.interval <= 0 or not self._path:
+            return
+        if self._sampler is not None and self._sampler.is_alive() and self._sampler_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive() and self._sampler_pid == os.getpid():
+                return
+            self._stop.clear()
+            self._sampler_pid = os.getpid()
+            self._sampler = threading.Thread(target=self._sampler_loop, name="cache-stats-sampler", daemon=True)
+            self._sampler.start()
+
+    def _sampler_loop(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                with self._lock:
+                    self._stats["sample_errors"] += 1
+                logger.warning(f"Cache statistics sample failed: {e}")
+            if self.interval <= 0 or self._stop.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        """Stop the background sampler"""
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the counters' state and access counts"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "counts": dict(self._counts),
+                "stale": sorted(self._stale),
+                "disk_bytes": self._disk_bytes,
+                "disk_sampled_at": self._disk_sampled_at,
+                "sample_interval_seconds": self.interval,
+                "sampler_running": self._sampler is not None and self._sampler.is_alive()
+                                   and self._sampler_pid == os.getpid(),
+            })
+        return stats
+
+
+# Global statistics shared by every RecipeCacheService in this process
+_cache_statistics = CacheStatistics()
+
+
+def get_cache_statistics() -> CacheStatistics:
+    """Get the process-wide cache statistics"""
+    return _cache_statistics
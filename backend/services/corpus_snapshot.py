@@ -0,0 +1,194 @@
+"""
+Binary snapshot file of the recipe corpus for fast boot.
+
+The corpus is normally loaded by reading every document from ChromaDB,
+parsing it, compacting it and building every index. That happens on the
+first request of every process. The snapshot file saves the compacted recipe
+list together with the exported state of the indexes (and the stored diet
+flags). At boot it is memory-mapped and unpickled in one pass, so the first
+request is served from warm indexes.
+
+The file is written after each corpus change (debounced, in the background).
+It is deleted as soon as the store changes and rewritten once the corpus has
+caught up. A file is only used when all of these match:
+- the format version and magic;
+- the fingerprint of the code that shapes recipes and indexes;
+- the store generation (see store_generation), which every write bumps,
+  including writes by other workers and maintenance scripts;
+- the number of recipes in the store.
+
+Pickle (protocol 5) is used because it keeps the compactor's shared strings
+shared and needs no extra dependency. The file is written and read only by
+this service from its own data directory; never point it at untrusted files.
+"""
+
+import os
+import mmap
+import pickle
+import struct
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .query_result_cache import code_fingerprint
+except ImportError:
+    from query_result_cache import code_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CORPUS_SNAPSHOT_ENABLED = os.environ.get('RECIPE_CORPUS_SNAPSHOT', 'true').lower() == 'true'
+# Debounce so a burst of writes produces one snapshot file
+SNAPSHOT_WRITE_DELAY_SECONDS = float(os.environ.get('RECIPE_CORPUS_SNAPSHOT_WRITE_DELAY', '2.0'))
+# Boot loads slower than this are logged as a warning
+SNAPSHOT_BOOT_BUDGET_MS = float(os.environ.get('RECIPE_CORPUS_SNAPSHOT_BUDGET_MS', '1000'))
+
+SNAPSHOT_MAGIC = b'RCSNAP'
+SNAPSHOT_FORMAT_VERSION = 1
+# magic, format version, header length
+_PREFIX = struct.Struct('<6sHI')
+
+_SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+# Source files whose logic decides what a loaded recipe or index looks like
+SNAPSHOT_CODE_FINGERPRINT = code_fingerprint(
+    os.path.join(_SERVICES_DIR, name)
+    for name in ('recipe_cache_service.py', 'recipe_compact.py', 'recipe_text_index.py', 'recipe_facets.py',
+                 'recipe_json.py', 'query_result_cache.py', 'dietary_classifier.py', 'corpus_snapshot.py')
+)
+
+
+class CorpusSnapshotFile:
+    """Reads and atomically writes one corpus snapshot file"""
+
+    def __init__(self, path: str, code_version: str = SNAPSHOT_CODE_FINGERPRINT):
+        self.path = path
+        self.code_version = code_version
+        self._lock = threading.Lock()
+        # Serializes writers; they share the temporary file name
+        self._write_lock = threading.Lock()
+        self._stats = {
+            "loads": 0,
+            "rejected": 0,
+            "last_rejected_reason": None,
+            "last_load_ms": 0.0,
+            "writes": 0,
+            "write_failures": 0,
+            "last_write_ms": 0.0,
+            "last_written_at": None,
+            "invalidations": 0,
+            "bytes": 0,
+        }
+
+    def load(self, store_count: Optional[int] = None,
+             store_generation: Optional[int] = None) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Memory-map and unpickle the snapshot.
+
+        Args:
+            store_count: Number of recipes currently in the store, or None to skip that check
+            store_generation: Current store generation, or None to skip that check
+
+        Returns:
+            (recipes, states) where states maps a component name to its exported
+            state, or None if there is no usable file
+        """
+        started = time.perf_counter()
+        try:
+            with open(self.path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    magic, format_version, header_length = _PREFIX.unpack_from(mapped, 0)
+                    if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION:
+                        return self._reject("format")
+                    header = pickle.loads(mapped[_PREFIX.size:_PREFIX.size + header_length])
+                    if header.get("code_version") != self.code_version:
+                        return self._reject("code changed")
+                    if store_generation is not None and header.get("store_generation") != store_generation:
+                        return self._reject(f"store generation is {store_generation}, "
+                                            f"snapshot {header.get('store_generation')}")
+                    if store_count is not None and header.get("store_count") != store_count:
+                        return self._reject(f"store has {store_count} recipes, snapshot {header.get('store_count')}")
+                    with memoryview(mapped) as view:
+                        payload = pickle.loads(view[_PREFIX.size + header_length:])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read corpus snapshot {self.path}: {e}")
+            return self._reject("unreadable")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["loads"] += 1
+            self._stats["last_load_ms"] = round(elapsed_ms, 2)
+        return payload["recipes"], payload["states"]
+
+    def save(self, recipes: List[Dict[str, Any]], states: Dict[str, Any], store_count: int,
+             store_generation: Optional[int] = None) -> bool:
+        """Write the snapshot to a temporary file and move it into place"""
+        started = time.perf_counter()
+        header = pickle.dumps({
+            "code_version": self.code_version,
+            "store_count": store_count,
+            "store_generation": store_generation,
+            "recipe_count": len(recipes),
+            "written_at": datetime.now().isoformat(),
+        }, protocol=5)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with self._write_lock:
+                with open(tmp_path, 'wb') as f:
+                    f.write(_PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(header)))
+                    f.write(header)
+                    pickle.dump({"recipes": recipes, "states": states}, f, protocol=5)
+                    size = f.tell()
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not write corpus snapshot {self.path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            with self._lock:
+                self._stats["write_failures"] += 1
+            return False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["writes"] += 1
+            self._stats["last_write_ms"] = round(elapsed_ms, 2)
+            self._stats["last_written_at"] = datetime.now().isoformat()
+            self._stats["bytes"] = size
+        logger.debug(f"Corpus snapshot written: {len(recipes)} recipes, {size} bytes in {elapsed_ms:.1f}ms")
+        return True
+
+    def invalidate(self) -> None:
+        """Delete the file because the store no longer matches it"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Could not remove stale corpus snapshot {self.path}: {e}")
+            return
+        with self._lock:
+            self._stats["invalidations"] += 1
+
+    def _reject(self, reason: str) -> None:
+        logger.info(f"Ignoring corpus snapshot {self.path}: {reason}")
+        with self._lock:
+            self._stats["rejected"] += 1
+            self._stats["last_rejected_reason"] = reason
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return load/write timings and counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "enabled": CORPUS_SNAPSHOT_ENABLED,
+            "path": self.path,
+            "boot_budget_ms": SNAPSHOT_BOOT_BUDGET_MS,
+        })
+        return stats
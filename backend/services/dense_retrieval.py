@@ -0,0 +1,235 @@
+"""
+Exact k-nearest-neighbour search over a memory-mapped embedding matrix.
+
+With RECIPE_SEARCH_BACKEND=dense, RecipeSearchService answers its vector
+queries from this index instead of ChromaDB's HNSW graph. At this corpus size,
+one matrix product over every stored embedding is cheaper than the graph walk
+and the per-query document fetch. The results are exact rather than
+approximate.
+
+All embeddings of the collection sit in one float32 matrix, row-aligned with
+the ids, documents and metadata. Like the nutrition table, the matrix is written
+to a .npy file next to the store and memory-mapped copy-on-write, so workers
+share its pages. Rows upserted through the search service are written in place
+(or appended), and those changes stay private to the process. The next build
+maps a file again.
+
+A batch of query embeddings is scored with a single matrix product.
+`where` filters (ChromaDB syntax, see sparse_retrieval.matches_where) are
+turned into row masks before ranking, and np.argpartition picks the k nearest
+rows. Distances follow the collection's "hnsw:space": squared L2 (the
+default), inner product or cosine, matching what collection.query() reports.
+"""
+
+import os
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from .sparse_retrieval import WhereMasks
+except ImportError:
+    from sparse_retrieval import WhereMasks
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SPACES = ('l2', 'ip', 'cosine')
+
+
+class DenseRecipeIndex:
+    """(rows x dimensions) float32 embeddings of one collection, searched exhaustively"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self.path = path
+        self.space = 'l2'
+        self._vectors = None
+        self._squared_norms = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._documents: List[Any] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._masks = WhereMasks([])
+        self._mapped = False
+        self.built = False
+        self.stale = False
+        self._stats = {"builds": 0, "incremental_updates": 0, "queries": 0, "batches": 0}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def invalidate(self) -> None:
+        """Rebuild before the next search; build() doesn't clear this"""
+        self.stale = True
+
+    def build(self, ids: List[str], embeddings: List[List[float]], documents: List[Any],
+              metadatas: List[Dict[str, Any]], space: str = 'l2') -> None:
+        """
+        Replace the index with the given rows.
+
+        Args:
+            ids: Row ids
+            embeddings: The rows' stored embeddings
+            documents: Stored documents, returned with the results
+            metadatas: Row metadata, returned with the results and matched by `where`
+            space: Distance the collection was created with ('l2', 'ip' or 'cosine')
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            vectors = vectors.reshape(len(ids), -1)
+        vectors, mapped = self._map_to_file(vectors)
+        metadatas = [metadata or {} for metadata in metadatas]
+
+        with self._lock:
+            self.space = space if space in SPACES else 'l2'
+            self._vectors = vectors
+            self._squared_norms = np.einsum('ij,ij->i', vectors, vectors)
+            self._size = len(ids)
+            self._ids = list(ids)
+            self._positions = {row_id: position for position, row_id in enumerate(self._ids)}
+            self._documents = list(documents)
+            self._metadatas = metadatas
+            self._masks = WhereMasks(metadatas)
+            self._mapped = mapped
+            self.built = True
+            self._stats["builds"] += 1
+        logger.info(f"Dense recipe index built over {len(ids)} rows (mapped: {mapped})")
+
+    def _map_to_file(self, vectors):
+        """Write the matrix to self.path and map it copy-on-write; returns (vectors, mapped)"""
+        if not self.path or not len(vectors):
+            return vectors, False
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npy"
+        try:
+            np.save(tmp_path, vectors)
+            os.replace(tmp_path, self.path)
+            return np.load(self.path, mmap_mode='c'), True
+        except Exception as e:
+            logger.warning(f"Could not memory-map recipe embeddings at {self.path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return vectors, False
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], documents: List[Any],
+               metadatas: List[Dict[str, Any]]) -> None:
+        """Overwrite the rows of known ids and append new ones"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if not self.built:
+                return
+            if len(vectors) and vectors.shape[1] != self._vectors.shape[1]:
+                raise ValueError(f"Embedding has {vectors.shape[1]} dimensions, index has {self._vectors.shape[1]}")
+            new_rows = sum(1 for row_id in dict.fromkeys(ids) if row_id not in self._positions)
+            needed = self._size + new_rows
+            if needed > len(self._vectors):
+                # Appended rows: grow in memory; the next build maps a file again
+                grown = np.zeros((max(needed, int(len(self._vectors) * 1.25) + 1), self._vectors.shape[1]),
+                                 dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                norms = np.zeros(len(grown), dtype=np.float32)
+                norms[:self._size] = self._squared_norms[:self._size]
+                self._vectors, self._squared_norms = grown, norms
+                self._mapped = False
+            for row_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                position = self._positions.get(row_id)
+                if position is None:
+                    position = self._size
+                    self._positions[row_id] = position
+                    self._ids.append(row_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata or {})
+                    self._size += 1
+                else:
+                    self._documents[position] = document
+                    self._metadatas[position] = metadata or {}
+                self._vectors[position] = vector
+                self._squared_norms[position] = float(np.dot(vector, vector))
+            self._masks = WhereMasks(self._metadatas)
+            self._stats["incremental_updates"] += 1
+
+    def search(self, query_embeddings: List[List[float]], n_results: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> Dict[str, List[List[Any]]]:
+        """
+        Nearest rows for each query embedding, in the shape collection.query() returns.
+
+        Args:
+            query_embeddings: Query vectors, scored together in one matrix product
+            n_results: Rows returned per query
+            where: ChromaDB-style metadata filter, applied before ranking
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas' and 'distances', one list per query
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            if not self.built or not self._size:
+                for key in results:
+                    results[key] = [[] for _ in range(len(queries))]
+                return results
+            if queries.ndim != 2 or queries.shape[1] != self._vectors.shape[1]:
+                raise ValueError(f"Query embeddings don't match the index's {self._vectors.shape[1]} dimensions")
+            mask = self._masks.get(where)
+            pool = np.flatnonzero(mask) if mask is not None else None
+            vectors = self._vectors[:self._size] if pool is None else self._vectors[pool]
+            norms = self._squared_norms[:self._size] if pool is None else self._squared_norms[pool]
+
+            products = queries @ vectors.T
+            if self.space == 'ip':
+                distances = 1.0 - products
+            elif self.space == 'cosine':
+                query_norms = np.linalg.norm(queries, axis=1)
+                denominator = np.outer(query_norms, np.sqrt(norms))
+                denominator[denominator == 0] = 1.0
+                distances = 1.0 - products / denominator
+            else:
+                distances = (np.einsum('ij,ij->i', queries, queries)[:, None] - 2.0 * products) + norms[None, :]
+
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            self._stats["queries"] += len(queries)
+            self._stats["batches"] += 1
+
+        k = min(n_results, distances.shape[1])
+        for row_distances in distances:
+            if k <= 0:
+                nearest = np.arange(0)
+            elif k < len(row_distances):
+                nearest = np.argpartition(row_distances, k - 1)[:k]
+            else:
+                nearest = np.arange(len(row_distances))
+            # Nearest first; equal distances in collection order
+            nearest = nearest[np.lexsort((nearest, row_distances[nearest]))]
+            positions = nearest if pool is None else pool[nearest]
+            results["ids"].append([ids[i] for i in positions])
+            results["documents"].append([documents[i] for i in positions])
+            results["metadatas"].append([metadatas[i] for i in positions])
+            results["distances"].append(row_distances[nearest].tolist())
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and query counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "built": self.built,
+                "stale": self.stale,
+                "rows": self._size,
+                "dimensions": None if self._vectors is None else int(self._vectors.shape[1]),
+                "space": self.space,
+                "mapped": self._mapped,
+                "path": self.path,
+                "mask_builds": self._masks.builds,
+                "mask_hits": self._masks.hits,
+            })
+        return stats
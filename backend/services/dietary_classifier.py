@@ -0,0 +1,227 @@
+"""
+Dietary classifier for recipes.
+
+One place that decides whether a recipe is vegetarian and/or vegan. The
+keyword lists are compiled once into a single regex each, matching any word
+that starts with a keyword, so a recipe is classified with two regex scans
+instead of one search per keyword.
+
+Verdicts are computed when recipes are written and stored as metadata flags
+(is_vegetarian, is_vegan, diet_classifier_version). Read paths look them up
+through the process-wide DietFlagStore and only classify on the fly for rows
+that predate the flags; scripts/backfill_dietary_flags.py fills those in.
+"""
+
+import re
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the keyword lists or matching rules change so stored flags are
+# treated as stale and recomputed by the backfill job
+DIET_CLASSIFIER_VERSION = 3
+
+MEAT_INDICATORS = [
+    'chicken', 'beef', 'pork', 'lamb', 'fish', 'salmon', 'tuna', 'shrimp', 'prawn',
+    'meat', 'bacon', 'ham', 'sausage', 'turkey', 'duck', 'goose', 'venison',
+    'rabbit', 'quail', 'pheasant', 'veal', 'mackerel', 'haddock', 'clam', 'oyster',
+    'mussel', 'scallop', 'crab', 'lobster', 'anchovy', 'sardine', 'trout', 'cod',
+    'halibut', 'sea bass', 'tilapia', 'catfish', 'swordfish', 'mahi mahi',
+    'steak', 'burger', 'cheeseburger', 'hot dog', 'hotdog', 'pepperoni', 'salami', 'prosciutto',
+    'chorizo', 'pastrami', 'corned beef', 'roast beef', 'ground beef', 'mince',
+    'liver', 'kidney', 'heart', 'tongue', 'tripe', 'oxtail', 'short ribs',
+    'ribeye', 'sirloin', 'tenderloin', 'brisket', 'flank', 'skirt steak',
+    'lamb chops', 'lamb shank', 'pork chops', 'pork belly', 'pork shoulder',
+    'chicken breast', 'chicken thigh', 'chicken wing', 'chicken leg', 'chicken drumstick',
+    'fish fillet', 'fish steak', 'fish cake', 'fish ball', 'fish sauce',
+    'anchovy paste', 'fish stock', 'chicken stock', 'beef stock', 'meat stock',
+    'bone broth', 'chicken broth', 'beef broth', 'meat broth'
+]
+
+# Plurals the regular -s/-es suffix doesn't produce
+MEAT_IRREGULAR_PLURALS = ['anchovies', 'geese']
+
+# Plant foods named after meat, and words that merely start with a meat
+# keyword; removed before the scans so "artichoke hearts" doesn't read as
+# "heart", "falafel burgers" as "burger" or "minced garlic" as "mince"
+NOT_MEAT_PHRASES = ['artichoke heart', 'heart of palm', 'hearts of palm', 'palm heart',
+                    'veggie burger', 'bean burger', 'falafel burger', 'kidney bean',
+                    'hearty', 'heartier', 'meatless', 'minced', 'gooseberry', 'gooseberries']
+
+ANIMAL_PRODUCT_INDICATORS = [
+    'milk', 'cheese', 'butter', 'cream', 'egg', 'yogurt', 'honey', 'gelatin',
+    'lard', 'tallow', 'whey', 'casein', 'parmesan', 'pecorino', 'mascarpone',
+    'creme fraiche', 'sour cream', 'condensed milk', 'evaporated milk', 'half and half',
+    'heavy cream', 'light cream', 'whipping cream', 'buttermilk', 'kefir', 'cottage cheese',
+    'ricotta', 'mozzarella', 'cheddar', 'gouda', 'brie', 'camembert', 'feta', 'blue cheese',
+    'cheesy', 'yoghurt',
+    'goat cheese', 'cream cheese', 'american cheese', 'provolone', 'swiss cheese',
+    # Dairy used in Indian recipes, previously reported as vegan
+    'paneer', 'ghee'
+]
+
+# Plant foods that start with an animal-product keyword, removed like NOT_MEAT_PHRASES
+NOT_ANIMAL_PRODUCT_PHRASES = ['eggplant', 'eggless', 'butternut', 'butterfly', 'butter bean', 'buttercup',
+                              'honeydew', 'cream of tartar', 'brief', 'briefly']
+
+
+def _compile_keywords(keywords: List[str], plurals: bool = False, prefix: bool = False) -> 're.Pattern':
+    """
+    Compile keywords into one alternation starting on a word boundary.
+
+    Args:
+        keywords: Words or phrases to match
+        plurals: Also match the -s/-es plural of a whole word
+        prefix: Match any word the keyword starts ("meatballs", "buttery")
+    """
+    # Longest first so multi-word phrases are reported over their prefixes
+    alternation = '|'.join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+    if prefix:
+        return re.compile(r'\b(?:' + alternation + r')\w*')
+    suffix = r'(?:e?s)?' if plurals else ''
+    return re.compile(r'\b(?:' + alternation + r')' + suffix + r'\b')
+
+
+# Keywords match the start of a word, so compounds and inflections count
+# ("meatloaf", "beefsteak", "eggwhites", "creamy") while "chickpea" is still
+# not "chicken"; the exception phrases are stripped from the text first.
+_MEAT_PATTERN = _compile_keywords(MEAT_INDICATORS + MEAT_IRREGULAR_PLURALS, prefix=True)
+_NOT_DIET_KEYWORD_PATTERN = _compile_keywords(NOT_MEAT_PHRASES + NOT_ANIMAL_PRODUCT_PHRASES, plurals=True)
+_ANIMAL_PRODUCT_PATTERN = _compile_keywords(ANIMAL_PRODUCT_INDICATORS, prefix=True)
+
+
+def classifier_text(recipe: Dict[str, Any]) -> str:
+    """Lowercased title, ingredient names and instructions used for classification,
+    without the NOT_MEAT_PHRASES and NOT_ANIMAL_PRODUCT_PHRASES"""
+    parts = []
+    if recipe.get('title'):
+        parts.append(str(recipe['title']))
+    elif recipe.get('name'):
+        parts.append(str(recipe['name']))
+
+    for field in ('ingredients', 'extendedIngredients'):
+        items = recipe.get(field)
+        if not isinstance(items, list):
+            continue
+        for ing in items:
+            if isinstance(ing, dict) and 'name' in ing:
+                parts.append(str(ing['name']))
+            elif isinstance(ing, str) and field == 'ingredients':
+                parts.append(ing)
+
+    instructions = recipe.get('instructions', '')
+    if isinstance(instructions, list):
+        instructions = ' '.join(str(step) for step in instructions)
+    if instructions:
+        parts.append(str(instructions))
+
+    return _NOT_DIET_KEYWORD_PATTERN.sub(' ', ' '.join(parts).lower())
+
+
+def classify_recipe(recipe: Dict[str, Any]) -> Tuple[bool, bool]:
+    """
+    Classify a recipe from its text.
+
+    Args:
+        recipe: Recipe dictionary
+
+    Returns:
+        Tuple of (is_vegetarian, is_vegan); vegan implies vegetarian
+    """
+    text = classifier_text(recipe)
+    if _MEAT_PATTERN.search(text):
+        return False, False
+    return True, not _ANIMAL_PRODUCT_PATTERN.search(text)
+
+
+def explain_classification(recipe: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Return the meat and animal-product keywords found in a recipe (for reports)"""
+    text = classifier_text(recipe)
+    return {
+        "meat": sorted(set(_MEAT_PATTERN.findall(text))),
+        "animal_products": sorted(set(_ANIMAL_PRODUCT_PATTERN.findall(text))),
+    }
+
+
+def diet_metadata(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata flags to store alongside a recipe when it is written"""
+    is_vegetarian, is_vegan = classify_recipe(recipe)
+    return {
+        "is_vegetarian": is_vegetarian,
+        "is_vegan": is_vegan,
+        "diet_classifier_version": DIET_CLASSIFIER_VERSION,
+    }
+
+
+def flags_from_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[Tuple[bool, bool]]:
+    """Read stored flags, or None if missing or written by an older classifier"""
+    if not metadata or metadata.get('diet_classifier_version') != DIET_CLASSIFIER_VERSION:
+        return None
+    is_vegetarian = metadata.get('is_vegetarian')
+    is_vegan = metadata.get('is_vegan')
+    if not isinstance(is_vegetarian, bool) or not isinstance(is_vegan, bool):
+        return None
+    return is_vegetarian, is_vegan
+
+
+class DietFlagStore:
+    """Process-wide map of recipe id -> stored (is_vegetarian, is_vegan) flags"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flags: Dict[str, Tuple[bool, bool]] = {}
+        self._stats = {"lookups": 0, "stored_hits": 0, "classified": 0}
+
+    def replace_all(self, flags: Dict[str, Tuple[bool, bool]]) -> None:
+        """Replace every entry, e.g. after a full corpus load"""
+        with self._lock:
+            self._flags = dict(flags)
+
+    def export_state(self, version: int) -> Dict[str, Tuple[bool, bool]]:
+        """Stored flags for the corpus snapshot file"""
+        with self._lock:
+            return dict(self._flags)
+
+    def restore_state(self, version: int, recipes: List[Dict[str, Any]], state: Dict[str, Tuple[bool, bool]]) -> bool:
+        """Take over flags saved with the corpus snapshot file"""
+        self.replace_all(state)
+        return True
+
+    def set(self, recipe_id: Any, flags: Tuple[bool, bool]) -> None:
+        with self._lock:
+            self._flags[str(recipe_id)] = flags
+
+    def get_flags(self, recipe: Dict[str, Any]) -> Tuple[bool, bool]:
+        """Stored flags for the recipe's id, classifying only when none are stored"""
+        recipe_id = recipe.get('id')
+        with self._lock:
+            self._stats["lookups"] += 1
+            flags = self._flags.get(str(recipe_id)) if recipe_id else None
+            if flags is not None:
+                self._stats["stored_hits"] += 1
+                return flags
+            self._stats["classified"] += 1
+        return classify_recipe(recipe)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["stored_flags"] = len(self._flags)
+            stats["classifier_version"] = DIET_CLASSIFIER_VERSION
+        return stats
+
+
+# Global flag store shared by the cache service and facet index
+_diet_flag_store = DietFlagStore()
+
+
+def get_diet_flag_store() -> DietFlagStore:
+    """Get the process-wide diet flag store"""
+    return _diet_flag_store
+
+
+def get_diet_flags(recipe: Dict[str, Any]) -> Tuple[bool, bool]:
+    """(is_vegetarian, is_vegan) for a recipe, preferring stored flags"""
+    return _diet_flag_store.get_flags(recipe)
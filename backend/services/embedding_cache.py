@@ -0,0 +1,207 @@
+"""
+Embedding cache keyed by (model id, text hash).
+
+Encoding the same text with the same model always gives the same vector, so
+RecipeSearchService looks document and query embeddings up here before
+encoding. Only the misses of a batch are encoded, in one call.
+
+Lookups go through an in-memory LRU first, then an SQLite table on disk next to
+the ChromaDB store. The disk table survives restarts and is shared by
+workers, so reindexing an unchanged recipe, or repeating a search, never runs
+the encoder again. Vectors are stored as packed float32. Each process opens its
+own connection, so forked workers never share one.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+import logging
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_ENABLED = os.environ.get('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+# 384-dimension vectors take about 1.6KB each, so the default is roughly 32MB
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MEMORY_ENTRIES', '20000'))
+EMBEDDING_CACHE_FILE = 'embedding_cache.sqlite3'
+# Keys per SELECT ... IN (...), below SQLite's bound-parameter limit
+_DISK_BATCH = 500
+
+CacheKey = Tuple[str, str]
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of the text's UTF-8 bytes"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """In-memory LRU over an on-disk table of (model id, text hash) -> float32 vector"""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = EMBEDDING_CACHE_MEMORY_ENTRIES):
+        self._lock = threading.Lock()
+        self.path = path
+        self.capacity = capacity
+        self._entries: "OrderedDict[CacheKey, array]" = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._disk_failed = False
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "encoded": 0, "disk_errors": 0}
+
+    def set_path(self, path: str) -> None:
+        """Keep the disk table at `path` (opened on first use)"""
+        with self._lock:
+            if path != self.path:
+                self.path = path
+                self._connection = None
+                self._disk_failed = False
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """This process's connection to the disk table; caller holds the lock"""
+        if not self.path or self._disk_failed:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            try:
+                connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS embeddings ('
+                    'model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, '
+                    'PRIMARY KEY (model, text_hash)) WITHOUT ROWID'
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache disk store unavailable at {self.path}: {e}")
+                self._disk_failed = True
+                return None
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _remember(self, key: CacheKey, vector: array) -> None:
+        """Add to the LRU; caller holds the lock"""
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get_many(self, model_id: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for `texts` (None where not cached)"""
+        keys = [(model_id, text_hash(text)) for text in texts]
+        found: Dict[CacheKey, array] = {}
+        with self._lock:
+            missing, seen = [], set()
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                    self._stats["memory_hits"] += 1
+                elif key not in seen:
+                    seen.add(key)
+                    missing.append(key)
+
+            db = self._db() if missing else None
+            if db is not None:
+                try:
+                    for start in range(0, len(missing), _DISK_BATCH):
+                        hashes = [digest for _, digest in missing[start:start + _DISK_BATCH]]
+                        rows = db.execute(
+                            f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                            f"AND text_hash IN ({','.join('?' * len(hashes))})",
+                            [model_id] + hashes
+                        ).fetchall()
+                        for digest, blob in rows:
+                            vector = array('f')
+                            vector.frombytes(blob)
+                            found[(model_id, digest)] = vector
+                            self._remember((model_id, digest), vector)
+                except sqlite3.Error as e:
+                    self._stats["disk_errors"] += 1
+                    logger.warning(f"Embedding cache disk lookup failed: {e}")
+
+            for key in missing:
+                if key in found:
+                    self._stats["disk_hits"] += 1
+                else:
+                    self._stats["misses"] += 1
+        return [found[key].tolist() if key in found else None for key in keys]
+
+    def put_many(self, model_id: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for `texts`, in memory and on disk"""
+        rows = []
+        with self._lock:
+            for text, values in zip(texts, vectors):
+                vector = array('f', [float(v) for v in values])
+                digest = text_hash(text)
+                self._remember((model_id, digest), vector)
+                rows.append((model_id, digest, vector.tobytes()))
+            db = self._db()
+            if db is not None and rows:
+                try:
+                    db.executemany('INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)', rows)
+                    db.commit()
+                except sqlite3.Error as e:
+                    self._stats["disk_errors"] += 1
+                    logger.warning(f"Embedding cache disk write failed: {e}")
+
+    def embed(self, model_id: str, texts: Sequence[str],
+              encode: Callable[[List[str]], Sequence[Sequence[float]]]) -> List[List[float]]:
+        """
+        Embeddings of `texts`, encoding only the ones not cached.
+
+        Args:
+            model_id: Identifies the model (and any setting that changes its output)
+            texts: Texts to embed
+            encode: Encodes a list of texts, one vector per text
+
+        Returns:
+            One vector (list of floats) per text
+        """
+        if not EMBEDDING_CACHE_ENABLED:
+            return [list(map(float, vector)) for vector in encode(list(texts))]
+        vectors = self.get_many(model_id, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            # Rounded to float32 as stored, so a vector is the same whether encoded now or cached
+            encoded = [array('f', map(float, vector)).tolist() for vector in encode(missing)]
+            self.put_many(model_id, missing, encoded)
+            with self._lock:
+                self._stats["encoded"] += len(missing)
+            by_text = dict(zip(missing, encoded))
+            vectors = [by_text[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory entries (the disk table is kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit counts and rates for the memory and disk tiers"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "enabled": EMBEDDING_CACHE_ENABLED,
+                "memory_entries": len(self._entries),
+                "capacity": self.capacity,
+                "path": self.path,
+                "disk_available": bool(self.path) and not self._disk_failed,
+            })
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["memory_hit_rate"] = round(stats["memory_hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Global cache shared by every RecipeSearchService in this process
+_embedding_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache"""
+    return _embedding_cache
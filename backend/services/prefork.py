@@ -0,0 +1,121 @@
+"""
+Pre-fork loading of the recipe corpus for gunicorn.
+
+With preload_app, gunicorn imports the app once in the master and forks the
+workers from it. If the parsed corpus and its indexes (text, facets,
+summaries, JSON passthrough, query-result fingerprints) are built before the
+fork, every worker starts with them on copy-on-write pages instead of reading
+and parsing the whole store itself.
+
+Two things keep those pages shared after the fork:
+- gc.freeze() moves everything loaded so far into the permanent generation,
+  so the cyclic collector in the workers never walks (and writes to) it.
+- The snapshot is built of long immutable strings (stored JSON, instructions)
+  and shared vocabulary values (see recipe_compact). Reading an object only
+  dirties the page holding its header, not the pages of a long string.
+
+ChromaDB clients hold SQLite connections and must not be shared across a fork.
+The master drops its client after loading, and each worker opens its own
+from the post_fork hook (see gunicorn.conf.py).
+"""
+
+import os
+import gc
+import time
+import logging
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+PREFORK_PRELOAD = os.environ.get('RECIPE_PREFORK_PRELOAD', 'false').lower() == 'true'
+# Seconds to wait for a background corpus rebuild (e.g. after seeding) before forking
+PREFORK_REBUILD_TIMEOUT = float(os.environ.get('RECIPE_PREFORK_REBUILD_TIMEOUT', '120'))
+
+_post_fork_hooks: List[Callable[[], Any]] = []
+
+
+def preload_recipe_corpus(recipe_cache: Any) -> Dict[str, Any]:
+    """
+    Load the corpus and its indexes in the current (master) process.
+
+    Args:
+        recipe_cache: RecipeCacheService whose store the corpus is loaded from
+
+    Returns:
+        Dict with the number of recipes loaded, the time taken and whether the
+        heap was frozen
+    """
+    corpus = getattr(recipe_cache, 'corpus', None)
+    if corpus is None or getattr(recipe_cache, 'recipe_collection', None) is None:
+        logger.warning("Recipe store unavailable, workers will load the corpus themselves")
+        return {"preloaded": False, "recipes": 0}
+
+    started = time.perf_counter()
+    corpus.wait_for_rebuild(PREFORK_REBUILD_TIMEOUT)
+    _, recipes = corpus.get_snapshot()
+    # Writes during startup (seeding, restores) may have scheduled another pass
+    corpus.wait_for_rebuild(PREFORK_REBUILD_TIMEOUT)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if corpus.get_stats()["snapshot_file_loads"] == 0:
+        # Loaded from the store: write the snapshot file now, while the master still has a client
+        corpus.write_snapshot_file()
+
+    # Drop the store client; each worker opens its own after the fork
+    register_post_fork(recipe_cache.reopen_collections)
+    recipe_cache.release_collections()
+
+    frozen = freeze_heap()
+    logger.info(f"Preloaded {len(recipes)} recipes for workers in {elapsed_ms:.1f}ms")
+    return {"preloaded": True, "recipes": len(recipes), "ms": round(elapsed_ms, 2), "frozen": frozen}
+
+
+def freeze_heap() -> bool:
+    """Collect garbage once, then exclude every surviving object from future collections"""
+    if not hasattr(gc, 'freeze'):
+        return False
+    gc.collect()
+    gc.freeze()
+    return True
+
+
+def register_post_fork(hook: Callable[[], Any]) -> None:
+    """Run `hook` in every worker right after it is forked"""
+    if hook not in _post_fork_hooks:
+        _post_fork_hooks.append(hook)
+
+
+def run_post_fork_hooks() -> None:
+    """Called from gunicorn's post_fork hook in each new worker"""
+    for hook in _post_fork_hooks:
+        try:
+            hook()
+        except Exception as e:
+            logger.error(f"Post-fork hook {getattr(hook, '__qualname__', hook)} failed: {e}")
+
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Resident memory of the current process, in bytes (Linux only).
+
+    rss counts shared pages in full; uss counts only pages private to this
+    process (what it would free on exit); pss splits shared pages evenly
+    between the processes sharing them.
+    """
+    usage = {"rss": 0, "pss": 0, "uss": 0}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                fields = value.split()
+                if not fields or not fields[0].isdigit():
+                    continue
+                size = int(fields[0]) * 1024
+                if key == 'Rss':
+                    usage["rss"] = size
+                elif key == 'Pss':
+                    usage["pss"] = size
+                elif key in ('Private_Clean', 'Private_Dirty'):
+                    usage["uss"] += size
+    except OSError as e:
+        logger.debug(f"Memory usage unavailable: {e}")
+    return usage
@@ -0,0 +1,301 @@
+"""
+Two-tier cache of search results for RecipeCacheService.get_cached_recipes.
+
+A result is stored as a list of (recipe id, per-request fields) pairs, where
+the per-request fields are whatever scoring added or changed on the shallow
+copy (search_score, matched_terms, ...). A hit rebuilds the result from the
+corpus recipes plus those fields, so it is identical to recomputing it.
+
+Tier 1 is an in-process LRU keyed by (corpus snapshot version, query key).
+It is emptied whenever the corpus publishes a new snapshot.
+
+Tier 2 (optional) persists results in the recipe_search_cache collection so
+other workers and restarts can reuse them. Snapshot versions are per process,
+so persisted entries are keyed by a content fingerprint of the corpus (XOR of
+per-recipe digests, updated incrementally like the other corpus indexes) and a
+fingerprint of the search code, and never outlive a data or code change.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_ENABLED = os.environ.get('QUERY_RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+QUERY_CACHE_PERSIST = os.environ.get('QUERY_RESULT_CACHE_PERSIST', 'true').lower() == 'true'
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('QUERY_RESULT_CACHE_MAX_ENTRIES', '512'))
+# Caps memory across all entries (ids plus their per-request fields)
+QUERY_CACHE_MAX_IDS = int(os.environ.get('QUERY_RESULT_CACHE_MAX_IDS', '200000'))
+
+PERSISTED_ENTRY_TYPE = 'query_result'
+PERSISTED_ID_PREFIX = 'query_result:'
+
+ResultEntries = Tuple[Tuple[str, Dict[str, Any]], ...]
+
+
+def code_fingerprint(paths: Iterable[str]) -> str:
+    """Digest of the source files whose logic decides search results"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(path.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _recipe_digest(recipe: Dict[str, Any]) -> int:
+    payload = json.dumps(recipe, sort_keys=True, default=str).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big')
+
+
+def pack_results(results: List[Dict[str, Any]],
+                 get_recipe: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[ResultEntries]:
+    """
+    Reduce a result list to (id, changed fields) pairs.
+
+    Returns:
+        The packed entries, or None if a result isn't a corpus recipe (then it can't be cached)
+    """
+    entries = []
+    for result in results:
+        recipe_id = str(result.get('id')) if isinstance(result, dict) and result.get('id') else None
+        stored = get_recipe(recipe_id) if recipe_id else None
+        if stored is None:
+            return None
+        if any(k not in result for k in stored):
+            return None
+        extras = {k: v for k, v in result.items() if k not in stored or stored[k] is not v}
+        entries.append((recipe_id, extras))
+    return tuple(entries)
+
+
+def unpack_results(entries: ResultEntries,
+                   get_recipe: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    """Rebuild fresh result dicts from packed entries, or None if a recipe is gone"""
+    results = []
+    for recipe_id, extras in entries:
+        stored = get_recipe(recipe_id)
+        if stored is None:
+            return None
+        result = dict(stored)
+        result.update(extras)
+        results.append(result)
+    return results
+
+
+class QueryResultCache:
+    """LRU of (snapshot version, query key) -> packed results, plus the corpus fingerprint"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, max_ids: int = QUERY_CACHE_MAX_IDS,
+                 persist: bool = QUERY_CACHE_PERSIST):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[int, str], ResultEntries]" = OrderedDict()
+        self._stored_ids = 0
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self.persist = persist
+        self.version = -1
+        self._digests: Dict[str, int] = {}
+        self._fingerprint = 0
+        self._pruned_fingerprint: Optional[str] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "rejected": 0,
+            "persisted_hits": 0,
+            "persisted_misses": 0,
+            "persisted_writes": 0,
+            "persisted_errors": 0,
+        }
+
+    # Corpus index interface
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Drop cached results and fingerprint a new snapshot"""
+        digests = {}
+        if self.persist:
+            for recipe in recipes:
+                if isinstance(recipe, dict) and recipe.get('id'):
+                    digests.setdefault(str(recipe['id']), _recipe_digest(recipe))
+        fingerprint = 0
+        for digest in digests.values():
+            fingerprint ^= digest
+        with self._lock:
+            self._digests = digests
+            self._fingerprint = fingerprint
+            self._invalidate(version)
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Drop cached results and update the fingerprint for written recipes"""
+        with self._lock:
+            if self.persist:
+                for _, recipe in changes:
+                    if isinstance(recipe, dict) and recipe.get('id'):
+                        recipe_id = str(recipe['id'])
+                        digest = _recipe_digest(recipe)
+                        self._fingerprint ^= self._digests.get(recipe_id, 0) ^ digest
+                        self._digests[recipe_id] = digest
+            self._invalidate(version)
+
+    def export_state(self, version: int) -> Optional[Dict[str, int]]:
+        """Per-recipe digests for the snapshot file, or None if not built for `version`"""
+        with self._lock:
+            if version != self.version or not self.persist:
+                return None
+            return dict(self._digests)
+
+    def restore_state(self, version: int, recipes: List[Dict[str, Any]], state: Dict[str, int]) -> bool:
+        """Take over digests saved in the snapshot file; cached results start empty"""
+        if not self.persist:
+            return False
+        fingerprint = 0
+        for digest in state.values():
+            fingerprint ^= digest
+        with self._lock:
+            self._digests = state
+            self._fingerprint = fingerprint
+            self._invalidate(version)
+        return True
+
+    def _invalidate(self, version: int) -> None:
+        """Forget every cached result; caller holds the lock"""
+        if self._entries:
+            self._stats["invalidations"] += 1
+        self._entries.clear()
+        self._stored_ids = 0
+        self.version = version
+
+    def fingerprint(self, version: int) -> Optional[str]:
+        """Content fingerprint of snapshot `version`, or None if it isn't the indexed one"""
+        with self._lock:
+            if not self.persist or version != self.version:
+                return None
+            return f"{self._fingerprint:016x}-{len(self._digests)}"
+
+    # Tier 1
+
+    def get(self, version: int, key: str) -> Optional[ResultEntries]:
+        """Packed results for a query on snapshot `version`, or None"""
+        with self._lock:
+            entries = self._entries.get((version, key))
+            if entries is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((version, key))
+            self._stats["hits"] += 1
+        return entries
+
+    def put(self, version: int, key: str, entries: ResultEntries) -> None:
+        """Remember packed results for a query on snapshot `version`"""
+        with self._lock:
+            if version != self.version:
+                # Computed from a snapshot the corpus has already replaced
+                return
+            if len(entries) > self.max_ids:
+                self._stats["rejected"] += 1
+                return
+            previous = self._entries.pop((version, key), None)
+            if previous is not None:
+                self._stored_ids -= len(previous)
+            self._entries[(version, key)] = entries
+            self._stored_ids += len(entries)
+            self._stats["stores"] += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._stored_ids > self.max_ids):
+                _, evicted = self._entries.popitem(last=False)
+                self._stored_ids -= len(evicted)
+                self._stats["evictions"] += 1
+
+    # Tier 2
+
+    @staticmethod
+    def _persisted_id(fingerprint: str, key: str) -> str:
+        return PERSISTED_ID_PREFIX + hashlib.md5(f"{fingerprint}:{key}".encode('utf-8')).hexdigest()
+
+    def load_persisted(self, collection: Any, fingerprint: str, key: str) -> Optional[ResultEntries]:
+        """Packed results stored by any process for the same corpus content, or None"""
+        try:
+            found = collection.get(ids=[self._persisted_id(fingerprint, key)], include=['documents'])
+            documents = (found or {}).get('documents') or []
+            if not documents or not documents[0]:
+                self._count("persisted_misses")
+                return None
+            payload = json.loads(documents[0])
+            entries = tuple((str(recipe_id), extras) for recipe_id, extras in payload["results"])
+            self._count("persisted_hits")
+            return entries
+        except Exception as e:
+            logger.debug(f"Could not read persisted query result: {e}")
+            self._count("persisted_errors")
+            return None
+
+    def store_persisted(self, collection: Any, fingerprint: str, key: str, entries: ResultEntries,
+                        embed: Optional[Callable[[List[str]], List[List[float]]]] = None) -> None:
+        """Persist packed results and drop entries left over from older corpus content"""
+        try:
+            document = json.dumps({"results": [list(entry) for entry in entries]})
+            write = {
+                "ids": [self._persisted_id(fingerprint, key)],
+                "documents": [document],
+                "metadatas": [{
+                    "type": PERSISTED_ENTRY_TYPE,
+                    "cache_key": key,
+                    "corpus_fingerprint": fingerprint,
+                    "result_count": len(entries),
+                    "cached_at": datetime.now().isoformat(),
+                }],
+            }
+            if embed is not None:
+                # Embed the short key rather than the id list
+                write["embeddings"] = [list(embed([key])[0])]
+            collection.upsert(**write)
+            self._count("persisted_writes")
+            if self._pruned_fingerprint != fingerprint:
+                self._pruned_fingerprint = fingerprint
+                collection.delete(where={"$and": [
+                    {"type": PERSISTED_ENTRY_TYPE},
+                    {"corpus_fingerprint": {"$ne": fingerprint}},
+                ]})
+        except Exception as e:
+            logger.debug(f"Could not persist query result: {e}")
+            self._count("persisted_errors")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return occupancy, hit rate and eviction counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update({
+                "enabled": QUERY_CACHE_ENABLED,
+                "persist": self.persist,
+                "version": self.version,
+                "entries": len(self._entries),
+                "stored_ids": self._stored_ids,
+                "max_entries": self.max_entries,
+                "max_ids": self.max_ids,
+                "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            })
+        return stats
+
+
+# Global cache registered with the process-wide recipe corpus
+_query_result_cache = QueryResultCache()
+
+
+def get_query_result_cache() -> QueryResultCache:
+    """Get the process-wide query-result cache"""
+    return _query_result_cache
@@ -1,14 +1,84 @@
 import json
 import hashlib
 import os
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterable, List, Optional
 import logging
 import time
 from datetime import datetime, timedelta
 
+try:
+    from .recipe_corpus import get_recipe_corpus, CORPUS_ENABLED
+    from .recipe_text_index import get_recipe_text_index, TEXT_INDEX_ENABLED
+    from .recipe_facets import (
+        get_recipe_facet_index, FACET_INDEX_ENABLED, CUISINE_MATCH_PARTIAL,
+        cuisine_filter_values, cuisine_value_matches, matches_required_diets, required_diet_values, select_positions
+    )
+    from .dietary_classifier import diet_metadata, flags_from_metadata, get_diet_flags, get_diet_flag_store
+    from .result_set_store import get_result_set_store, RESULT_SET_FILE
+    from .recipe_summaries import get_recipe_summary_index
+    from .recipe_json import get_recipe_json_index, splice_object
+    from .recipe_ingest import IngestRecord, RecipeIngestPipeline, ingest_file, load_checkpoint
+    from .corpus_snapshot import CorpusSnapshotFile, CORPUS_SNAPSHOT_ENABLED
+    from .store_generation import StoreGeneration, store_generation_path
+    from .query_result_cache import (
+        get_query_result_cache, QUERY_CACHE_ENABLED, code_fingerprint, pack_results, unpack_results
+    )
+    from .search_trace import current_trace
+    from .recipe_nutrition import get_nutrition_table, recipe_in_ranges
+    from .recipe_filter_schema import (
+        FILTER_PUSHDOWN_ENABLED, FILTER_SCHEMA_VERSION, FILTER_SCHEMA_RECHECK_SECONDS,
+        collection_migrated, compile_where, filterable_metadata, get_pushdown_stats, record_store_read,
+        strip_filter_metadata
+    )
+    from .recipe_document import (
+        LEGACY_DOCUMENTS_ENABLED, decode_documents, decode_legacy_document, encode_document,
+        get_document_stats, is_current, schema_metadata
+    )
+    from .search_ranking import rank_results, ranking_key
+    from .cache_stats import get_cache_statistics
+    from .embedding_cache import get_embedding_cache
+except ImportError:
+    from recipe_corpus import get_recipe_corpus, CORPUS_ENABLED
+    from recipe_text_index import get_recipe_text_index, TEXT_INDEX_ENABLED
+    from recipe_facets import (
+        get_recipe_facet_index, FACET_INDEX_ENABLED, CUISINE_MATCH_PARTIAL,
+        cuisine_filter_values, cuisine_value_matches, matches_required_diets, required_diet_values, select_positions
+    )
+    from dietary_classifier import diet_metadata, flags_from_metadata, get_diet_flags, get_diet_flag_store
+    from result_set_store import get_result_set_store, RESULT_SET_FILE
+    from recipe_summaries import get_recipe_summary_index
+    from recipe_json import get_recipe_json_index, splice_object
+    from recipe_ingest import IngestRecord, RecipeIngestPipeline, ingest_file, load_checkpoint
+    from corpus_snapshot import CorpusSnapshotFile, CORPUS_SNAPSHOT_ENABLED
+    from store_generation import StoreGeneration, store_generation_path
+    from query_result_cache import (
+        get_query_result_cache, QUERY_CACHE_ENABLED, code_fingerprint, pack_results, unpack_results
+    )
+    from search_trace import current_trace
+    from recipe_nutrition import get_nutrition_table, recipe_in_ranges
+    from recipe_filter_schema import (
+        FILTER_PUSHDOWN_ENABLED, FILTER_SCHEMA_VERSION, FILTER_SCHEMA_RECHECK_SECONDS,
+        collection_migrated, compile_where, filterable_metadata, get_pushdown_stats, record_store_read,
+        strip_filter_metadata
+    )
+    from recipe_document import (
+        LEGACY_DOCUMENTS_ENABLED, decode_documents, decode_legacy_document, encode_document,
+        get_document_stats, is_current, schema_metadata
+    )
+    from search_ranking import rank_results, ranking_key
+    from cache_stats import get_cache_statistics
+    from embedding_cache import get_embedding_cache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Persisted query results are only reused by processes running the same search code
+SEARCH_CODE_FINGERPRINT = code_fingerprint(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ('recipe_cache_service.py', 'recipe_facets.py', 'recipe_text_index.py', 'dietary_classifier.py',
+                 'recipe_nutrition.py', 'recipe_document.py', 'search_ranking.py')
+)
+
 # ChromaDB handled via singleton to prevent multiple instances
 
 class RecipeCacheService:
@@ -20,6 +90,19 @@ class RecipeCacheService:
             cache_ttl_days: Number of days before cache entries expire (default: None - TTL disabled)
         """
         self.cache_ttl_days = cache_ttl_days
+        # Parsed corpus shared by every cache service instance in this process
+        self.corpus = get_recipe_corpus()
+        self.cache_statistics = get_cache_statistics()
+        self.text_index = get_recipe_text_index()
+        self.facet_index = get_recipe_facet_index()
+        self.summary_index = get_recipe_summary_index()
+        self.json_index = get_recipe_json_index()
+        self.query_cache = get_query_result_cache()
+        self.nutrition_table = get_nutrition_table()
+        # Shared write counter of the persistent store (None for the in-memory fallback)
+        self.store_generation: Optional[StoreGeneration] = None
+        # (ready, checked_at, store generation checked) for filter pushdown
+        self._filter_schema_state = (False, None, None)
             
         try:
             # Import ChromaDB singleton to prevent multiple instances
@@ -56,9 +139,42 @@ class RecipeCacheService:
             
             # TTL is disabled - recipes will never expire
             self.cache_ttl = None
+            self.corpus.set_loader(self._load_all_recipes_from_store)
+            if TEXT_INDEX_ENABLED:
+                self.corpus.register_index(self.text_index)
+            if FACET_INDEX_ENABLED:
+                self.corpus.register_index(self.facet_index)
+            self.corpus.register_index(self.summary_index)
+            self.corpus.register_index(self.json_index)
+            if QUERY_CACHE_ENABLED:
+                self.corpus.register_index(self.query_cache)
             logger.info("ChromaDB recipe cache initialized with TTL disabled - recipes will never expire")
             chroma_path = get_chromadb_path()
+            if self.nutrition_table.available:
+                # Macro/time columns memory-mapped from the data directory, shared by workers
+                self.nutrition_table.set_path(os.path.join(chroma_path, 'recipe_nutrition.npy'))
+                self.corpus.register_index(self.nutrition_table)
             logger.info(f"Using persistent storage at {chroma_path}")
+            # Chained-search handles resolve in every worker, not just the one that made them
+            get_result_set_store().set_path(os.path.join(chroma_path, RESULT_SET_FILE))
+            # Row counts kept on write; disk usage sampled in the background
+            self.cache_statistics.configure(chroma_path, {
+                "recipes": self._count_stored_recipes,
+                "searches": self._count_stored_searches,
+            })
+            self.seed_checkpoint_path = os.path.join(chroma_path, 'seed_ingest_checkpoint.json')
+            # Writes by other workers and scripts reload this process's corpus; the
+            # incremental row counts are recounted along with it
+            self.store_generation = StoreGeneration(store_generation_path(chroma_path))
+            self.corpus.set_store_generation(self.store_generation)
+            self.corpus.register_change_listener(self.cache_statistics.mark_stale)
+            if CORPUS_SNAPSHOT_ENABLED:
+                # Boot the corpus from a binary snapshot instead of parsing every document
+                self.corpus.register_snapshot_state(get_diet_flag_store())
+                self.corpus.set_snapshot_file(
+                    CorpusSnapshotFile(os.path.join(chroma_path, 'recipe_corpus.snapshot')),
+                    self._count_stored_recipes
+                )
             
             # Seed ChromaDB from local JSON if available and collections are empty
             try:
@@ -67,9 +183,9 @@ class RecipeCacheService:
                 if seed_on_start and os.path.exists(seed_path):
                     # Check if collections are empty
                     recipe_count = self.recipe_collection.count()
-                    if recipe_count == 0:
+                    if recipe_count == 0 or load_checkpoint(self.seed_checkpoint_path, seed_path):
                         limit = int(os.environ.get('SEED_RECIPES_LIMIT', '10000'))
-                        logger.info(f"ChromaDB collections are empty, seeding from {seed_path} (limit: {limit})")
+                        logger.info(f"Seeding ChromaDB from {seed_path} (limit: {limit}, {recipe_count} recipes present)")
                         self._seed_chromadb_from_file(seed_path, limit=limit)
                     else:
                         logger.info(f"ChromaDB already has {recipe_count} recipes, skipping seeding")
@@ -95,62 +211,137 @@ class RecipeCacheService:
             self.recipe_collection = None
             self.cache_ttl = None  # TTL disabled even if initialization fails
 
-    def _seed_chromadb_from_file(self, path: str, limit: int = 500) -> None:
+    def _count_stored_recipes(self) -> Optional[int]:
+        """Number of documents in recipe_details_cache, or None without a store"""
+        if self.recipe_collection is None:
+            return None
+        return self.recipe_collection.count()
+
+    def _count_stored_searches(self) -> Optional[int]:
+        """Number of documents in recipe_search_cache, or None without a store"""
+        if self.search_collection is None:
+            return None
+        return self.search_collection.count()
+
+    def _track_new_rows(self, name: str, ids: List[str], existing: Optional[Iterable[str]] = None) -> None:
+        """
+        Account for an upsert of `ids` in the collection's row count.
+        
+        Args:
+            name: Collection name in cache_statistics
+            ids: Ids being upserted
+            existing: Those of them already stored, when the caller looked them up;
+                otherwise the count is marked stale and re-counted on the next read
+        """
+        if existing is None:
+            self.cache_statistics.mark_stale(name)
+        elif self.cache_statistics.tracking(name):
+            self.cache_statistics.record_rows(name, len(set(ids).difference(existing)))
+
+    def release_collections(self) -> None:
+        """
+        Drop the ChromaDB client and collections without touching the corpus.
+        Used by the gunicorn master after preloading, since a client must not
+        be shared across fork(); workers call reopen_collections().
+        """
+        from utils.chromadb_singleton import ChromaDBSingleton
+        # Workers start their own sampler on first use
+        self.cache_statistics.stop()
+        ChromaDBSingleton.reset()
+        self.client = None
+        self.search_collection = None
+        self.recipe_collection = None
+
+    def reopen_collections(self) -> bool:
+        """
+        Open a fresh ChromaDB client and collections in this process.
+        
+        Returns:
+            bool: True if both collections are available
+        """
+        try:
+            from utils.chromadb_singleton import get_chromadb_client
+            self.client = get_chromadb_client()
+            if self.client is None:
+                logger.warning("ChromaDB client is None - recipe cache will operate in fallback mode")
+                return False
+            self.search_collection = self.client.get_or_create_collection(
+                name="recipe_search_cache",
+                metadata={"description": "Cache for recipe search results"},
+                embedding_function=self.embedding_function
+            )
+            self.recipe_collection = self.client.get_or_create_collection(
+                name="recipe_details_cache",
+                metadata={"description": "Cache for individual recipe details"},
+                embedding_function=self.embedding_function
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to reopen ChromaDB collections: {e}")
+            self.client = None
+            self.search_collection = None
+            self.recipe_collection = None
+            return False
+
+    def _seed_chromadb_from_file(self, path: str, limit: int = 500, **pipeline_options) -> Dict[str, Any]:
         """Seed ChromaDB from a local JSON file.
         The file can be a list of recipe objects or an object with a top-level 'recipes' list.
+        It is streamed through the bulk ingest pipeline and written in large upsert
+        batches; an interrupted seed resumes from its checkpoint on the next start.
+        
+        Args:
+            path: Seed JSON file
+            limit: Maximum number of records to seed (0 = all)
+            **pipeline_options: Passed to RecipeIngestPipeline (batch_size, workers)
+        
+        Returns:
+            Dict of ingest statistics (empty if seeding failed)
         """
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-            if isinstance(data, dict) and 'recipes' in data:
-                recipes = data['recipes']
-            elif isinstance(data, list):
-                recipes = data
-            else:
-                logger.warning("Seed file format not recognized; expected list or {'recipes': [...]} ")
-                return
-            
-            # Normalize minimal fields expected by ChromaDB
-            count = 0
-            ids = []
-            docs = []
-            metas = []
-            
-            for item in recipes:
-                if limit > 0 and count >= limit:
-                    break
-                rid = str(item.get('id') or item.get('_id') or item.get('idMeal') or hash(item.get('title', '')))
-                title = item.get('title') or item.get('name') or item.get('strMeal') or 'Recipe'
-                
-                # Create ChromaDB-compatible metadata (flatten complex objects)
-                meta = {}
-                for key, value in item.items():
-                    if isinstance(value, (str, int, float, bool)) or value is None:
-                        meta[key] = value
-                    elif isinstance(value, (dict, list)):
-                        # Convert complex objects to JSON strings
-                        meta[key] = json.dumps(value)
-                    else:
-                        # Convert other types to strings
-                        meta[key] = str(value)
-                
-                # Store the full recipe as a JSON document for searching and retrieval
-                doc = json.dumps(item)
-                
-                ids.append(rid)
-                docs.append(doc)
-                metas.append(meta)
-                count += 1
-            
-            if ids:
-                # Add to both collections
-                self.recipe_collection.add(ids=ids, documents=docs, metadatas=metas)
-                self.search_collection.add(ids=ids, documents=docs, metadatas=metas)
-                logger.info(f"Seeded {len(ids)} recipes into ChromaDB from {path}")
+            stats = ingest_file(
+                path,
+                lambda records: self._upsert_recipe_records(records, mirror_to_search=True),
+                limit=limit,
+                checkpoint_path=getattr(self, 'seed_checkpoint_path', None),
+                # One embedding pass shared by both collections
+                embed=self.embedding_function,
+                **pipeline_options
+            )
+            if stats["written"]:
+                # The loader re-reads the store (and its stored dietary flags) once
+                self.invalidate_corpus("seed")
+                logger.info(f"Seeded {stats['written']} recipes into ChromaDB from {path} "
+                            f"in {stats['seconds']}s ({stats['recipes_per_second']} recipes/s)")
             else:
                 logger.warning(f"No recipes found to seed from {path}")
+            return stats
         except Exception as e:
             logger.warning(f"Failed to seed ChromaDB from file {path}: {e}")
+            return {}
+
+    def _upsert_recipe_records(self, records: List[IngestRecord], mirror_to_search: bool = False,
+                               existing: Optional[Iterable[str]] = None) -> None:
+        """
+        Write one batch of prepared recipes with a single upsert per collection.
+        
+        Args:
+            records: Prepared recipes with unique ids
+            mirror_to_search: Also store the documents in the search collection (seeding)
+            existing: Ids of the records already in recipe_collection, if known
+        """
+        ids = [r.id for r in records]
+        batch = {
+            "ids": ids,
+            "documents": [r.document for r in records],
+            "metadatas": [r.metadata for r in records],
+        }
+        if all(r.embedding is not None for r in records):
+            batch["embeddings"] = [r.embedding for r in records]
+        self._track_new_rows("recipes", ids, existing)
+        self.recipe_collection.upsert(**batch)
+        if mirror_to_search and self.search_collection is not None:
+            self._track_new_rows("searches", ids)
+            self.search_collection.upsert(**batch)
 
     def _seed_from_file(self, path: str, limit: int = 500) -> None:
         """Seed the fallback cache from a local JSON file if using in-memory storage.
@@ -175,9 +366,11 @@ class RecipeCacheService:
                 if limit > 0 and count >= limit:
                     break
                 rid = str(item.get('id') or item.get('_id') or item.get('idMeal') or hash(item.get('title', '')))
-                title = item.get('title') or item.get('name') or item.get('strMeal') or 'Recipe'
-                doc = title
-                meta = item
+                recipe = item if item.get('id') else dict(item, id=rid)
+                doc = encode_document(recipe)
+                # The fallback cache keeps the raw fields, plus the diet, filterable
+                # and schema fields that cache_recipes writes
+                meta = dict(item, **diet_metadata(recipe), **filterable_metadata(recipe), **schema_metadata())
                 ids.append(rid)
                 docs.append(doc)
                 metas.append(meta)
@@ -237,15 +430,17 @@ class RecipeCacheService:
                 return False
                 
             # Store the full recipe data as the document, not just text summary
-            recipe_document = json.dumps(recipe)
+            recipe_document = encode_document(recipe)
             
             # Add to recipe collection
+            self._track_new_rows("recipes", [metadata['id']])
             self.recipe_collection.upsert(
                 ids=[metadata['id']],
                 documents=[recipe_document],  # Store full recipe data
                 metadatas=[metadata]
             )
             
+            self._publish_to_corpus([recipe_document], "add_recipe", [metadata])
             logger.debug(f"Successfully cached recipe: {metadata.get('title')} (ID: {metadata['id']})")
             return True
             
@@ -253,7 +448,8 @@ class RecipeCacheService:
             logger.error(f"Error adding recipe to cache: {str(e)}")
             return False
 
-    def _extract_recipe_metadata(self, recipe: Dict[Any, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_recipe_metadata(recipe: Dict[Any, Any]) -> Dict[str, Any]:
         """Extract searchable metadata from a recipe"""
         if not recipe or not isinstance(recipe, dict):
             logger.warning("Invalid recipe format: recipe must be a non-empty dictionary")
@@ -325,6 +521,13 @@ class RecipeCacheService:
             # Add category if it exists
             if 'strCategory' in recipe:
                 metadata["category"] = recipe['strCategory']
+            
+            # Dietary verdicts are computed once at write time and looked up on reads
+            unwrapped = RecipeCacheService._unwrap_recipe_document(recipe) or recipe
+            metadata.update(diet_metadata(unwrapped))
+            # Canonical fields that store reads filter on (see recipe_filter_schema)
+            metadata.update(filterable_metadata(unwrapped))
+            metadata.update(schema_metadata())
                 
             return metadata
             
@@ -332,7 +535,8 @@ class RecipeCacheService:
             logger.error(f"Error extracting recipe metadata: {str(e)}")
             return {}
 
-    def _extract_search_terms(self, recipe: Dict[Any, Any]) -> str:
+    @staticmethod
+    def _extract_search_terms(recipe: Dict[Any, Any]) -> str:
         """Extract searchable terms from a recipe"""
         terms = []
         
@@ -370,55 +574,131 @@ class RecipeCacheService:
         # Join all terms and create searchable text
         return ' '.join(filter(None, terms)).lower()
 
-    def get_cached_recipes(self, query: str = "", ingredient: str = "", filters: Optional[Dict[str, Any]] = None) -> List[Dict[Any, Any]]:
-        """Retrieve cached recipes for the given search parameters with TTL support"""
+    def get_cached_recipes(self, query: str = "", ingredient: str = "", filters: Optional[Dict[str, Any]] = None,
+                           rank_limit: Optional[int] = None) -> List[Dict[Any, Any]]:
+        """Retrieve cached recipes for the given search parameters with TTL support.
+        Results are served from the query-result cache while the corpus is unchanged.
+        
+        Every match is returned (callers count them and keep their ids), but only the
+        first `rank_limit` are guaranteed to be in relevance order; the rest follow
+        unranked. Pass offset+limit when cutting one page, 0 when the caller reorders
+        the results itself, or None (default) to rank them all.
+        Unscored recipes may be shared with the corpus snapshot; copy one before
+        modifying it.
+        """
         if not self.recipe_collection:
             logger.warning("ChromaDB recipe collection not initialized")
             return []
         
+        cache_key = self._query_cache_key(query, ingredient, filters)
+        if cache_key is None:
+            return self._search_cached_recipes(query, ingredient, filters, rank_limit)
+        
+        trace = current_trace()
+        corpus_version = self.corpus.get_snapshot()[0]
+        trace.mark("corpus")
+        entries = self.query_cache.get(corpus_version, cache_key)
+        cache_outcome = "hit"
+        fingerprint = None
+        if entries is None and self.search_collection is not None:
+            fingerprint = self.query_cache.fingerprint(corpus_version)
+            if fingerprint:
+                entries = self.query_cache.load_persisted(self.search_collection, fingerprint, cache_key)
+                if entries is not None:
+                    cache_outcome = "persisted"
+                    self.query_cache.put(corpus_version, cache_key, entries)
+        if entries is not None:
+            results = unpack_results(entries, self.corpus.get_recipe)
+            if results is not None:
+                trace.annotate(query_cache=cache_outcome)
+                # Cached results may have been ranked to a shallower depth (see search_ranking)
+                results = rank_results(results, ranking_key(query, ingredient), rank_limit)
+                trace.mark("query_cache", len(results))
+                return results
+        trace.annotate(query_cache="miss")
+        trace.mark("query_cache")
+        
+        results = self._search_cached_recipes(query, ingredient, filters, rank_limit)
+        # Only cache results computed from the snapshot the key was looked up for
+        if results and self.corpus.snapshot_version == corpus_version:
+            entries = pack_results(results, self.corpus.get_recipe)
+            if entries is not None:
+                self.query_cache.put(corpus_version, cache_key, entries)
+                if fingerprint:
+                    self.query_cache.store_persisted(self.search_collection, fingerprint, cache_key, entries,
+                                                     embed=self.embedding_function)
+        return results
+
+    def _query_cache_key(self, query: str, ingredient: str, filters: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Query-result cache key, or None when the search shouldn't be cached"""
+        if not (QUERY_CACHE_ENABLED and CORPUS_ENABLED and self.client):
+            return None
+        if not (query or '').strip() and not (ingredient or '').strip() and not filters:
+            # Plain listing of every recipe: nothing to save
+            return None
+        if filters and filters.get('baseRecipes'):
+            # Client-supplied recipes aren't part of the corpus
+            return None
+        try:
+            return f"{SEARCH_CODE_FINGERPRINT}:{self._generate_cache_key(query or '', ingredient or '', filters)}"
+        except (TypeError, ValueError):
+            return None
+
+    def _search_cached_recipes(self, query: str = "", ingredient: str = "", filters: Optional[Dict[str, Any]] = None,
+                               rank_limit: Optional[int] = None) -> List[Dict[Any, Any]]:
+        """Scan and score the corpus for get_cached_recipes"""
+        trace = current_trace()
         try:
             # Get all recipes from cache first
-            all_recipes = self._get_all_recipes_from_cache()
-            logger.info(f"Retrieved {len(all_recipes)} recipes from cache")
-            
-            # Debug: Show exactly what parameters we received
-            logger.info("🔍 SEARCH PARAMETERS RECEIVED:")
-            logger.info(f"  - query parameter: '{query}' (type: {type(query)}, length: {len(query) if query else 0})")
-            logger.info(f"  - ingredient parameter: '{ingredient}' (type: {type(ingredient)}, length: {len(ingredient) if ingredient else 0})")
-            logger.info(f"  - query.strip(): '{query.strip() if query else ''}'")
-            logger.info(f"  - ingredient.strip(): '{ingredient.strip() if ingredient else ''}'")
+            corpus_version, all_recipes = self._get_corpus_snapshot(filters)
+            trace.mark("fetch", len(all_recipes))
             
             # Check for chained search: base recipes from previous search
             base_recipes = None
             if filters and 'baseRecipes' in filters and filters['baseRecipes']:
                 base_recipes = filters['baseRecipes']
-                logger.info(f"🔗 CHAINED SEARCH DETECTED: {len(base_recipes)} base recipes from previous search")
                 # Use base recipes instead of all recipes for filtering
                 all_recipes = base_recipes
-                logger.info(f"  - Will filter ingredient search within {len(all_recipes)} base recipes")
+            
+            # Chained search by result-set handle: the caller passes the ids of the
+            # previous result and we intersect with them as a bitmap over the snapshot
+            within_mask = None
+            if not base_recipes and filters and filters.get('within_ids') is not None:
+                within_mask = self._within_mask(corpus_version, all_recipes, filters['within_ids'])
+            
+            # Calorie/macro/time ranges as a bitmap from the nutrition table; it narrows
+            # the pool like within_ids. When the table can't be used the per-recipe check runs
+            nutrition_ranges = (filters or {}).get('nutrition_ranges') or None
+            nutrition_mask = None
+            if nutrition_ranges and not base_recipes and corpus_version is not None:
+                nutrition_mask = self.nutrition_table.range_mask(corpus_version, nutrition_ranges)
+                if nutrition_mask is not None:
+                    within_mask = nutrition_mask if within_mask is None else within_mask & nutrition_mask
+            check_ranges = nutrition_ranges if nutrition_mask is None else None
+            if nutrition_ranges:
+                trace.annotate(nutrition_table=nutrition_mask is not None)
             
             # If no search terms, return all recipes (or base recipes if chained search)
             if not query.strip() and not ingredient.strip():
-                logger.info(f"🔍 DEBUG: No search terms detected - query.strip(): '{query.strip()}', ingredient.strip(): '{ingredient.strip()}'")
-                if base_recipes:
-                    logger.debug("Chained search with no new terms - returning base recipes")
-                else:
-                    logger.debug("No search terms - applying filters if provided")
+                if not base_recipes:
                     # Apply filters to all recipes when no search terms
                     if filters:
-                        logger.info(f"🔍 DEBUG: About to check filters: {filters}")
-                        logger.info(f"🔍 DEBUG: filters type: {type(filters)}")
-                        logger.info(f"🔍 DEBUG: filters truthy: {bool(filters)}")
-                        logger.info(f"🔍 Applying filters to all recipes: {filters}")
-                        logger.info(f"🔍 Total recipes to filter: {len(all_recipes)}")
-                        logger.info(f"🔍 Dietary restrictions filter: {filters.get('dietary_restrictions', 'None')}")
                         filtered_recipes = []
+                        cuisine_match = filters.get("cuisine_match") or CUISINE_MATCH_PARTIAL
                         
-                        for recipe in all_recipes:
+                        # Cuisine and dietary filters as bitmap operations when the facet
+                        # index matches this snapshot; the per-recipe checks below are the fallback
+                        facet_mask = self._facet_filter_mask(corpus_version, filters, validate_diets=True)
+                        pool_mask = facet_mask
+                        if within_mask is not None:
+                            pool_mask = within_mask if pool_mask is None else pool_mask & within_mask
+                        filter_pool = all_recipes if pool_mask is None else select_positions(pool_mask, all_recipes)
+                        
+                        for recipe in filter_pool:
                             should_include = True
                             
                             # Cuisine filter
-                            if filters.get("cuisine"):
+                            if facet_mask is None and filters.get("cuisine"):
                                 cuisine_filter = filters["cuisine"]
                                 recipe_cuisines = []
                                 
@@ -430,30 +710,20 @@ class RecipeCacheService:
                                 
                                 # CUISINE EXPANSION: Automatically include related/subset cuisines
                                 expanded_cuisine_filter = self._expand_cuisine_filter(cuisine_filter)
-                                if expanded_cuisine_filter != cuisine_filter:
-                                    logger.info(f"🔍 CUISINE EXPANSION: {cuisine_filter} -> {expanded_cuisine_filter}")
-                                
-                                logger.info(f"🔍 DEBUG: Recipe '{recipe.get('title', 'Unknown')}' has cuisines: {recipe_cuisines}")
-                                logger.info(f"🔍 DEBUG: Filtering for cuisine: {cuisine_filter}")
-                                logger.info(f"🔍 DEBUG: Expanded cuisine filter: {expanded_cuisine_filter}")
-                                logger.info(f"🔍 DEBUG: cuisine_filter type: {type(cuisine_filter)}")
                                 
                                 # Handle both single string and list of strings for cuisine filter
                                 if isinstance(expanded_cuisine_filter, str):
                                     # Single cuisine filter - check for exact match or contains
                                     if not any(expanded_cuisine_filter.lower() == cuisine.lower() or cuisine.lower() in expanded_cuisine_filter.lower() for cuisine in recipe_cuisines):
                                         should_include = False
-                                        logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by cuisine filter: {expanded_cuisine_filter}")
                                 elif isinstance(expanded_cuisine_filter, list):
                                     # Multiple cuisine filters - check if ANY of the requested cuisines match ANY of the recipe's cuisines
                                     # This is the key fix: we want to include recipes that match ANY of the requested cuisines
-                                    logger.info(f"🔍 DEBUG: Processing expanded list cuisine filter: {expanded_cuisine_filter}")
                                     cuisine_matched = False
                                     for filter_cuisine in expanded_cuisine_filter:
                                         if not filter_cuisine:
                                             continue
                                         filter_cuisine_lower = filter_cuisine.lower().strip()
-                                        logger.info(f"🔍 DEBUG: Checking filter cuisine: '{filter_cuisine}' -> '{filter_cuisine_lower}'")
                                         
                                         for recipe_cuisine in recipe_cuisines:
                                             if not recipe_cuisine:
@@ -462,11 +732,8 @@ class RecipeCacheService:
 
                                             
                                             # Check for exact match or partial match
-                                            if (filter_cuisine_lower == recipe_cuisine_lower or 
-                                                filter_cuisine_lower in recipe_cuisine_lower or 
-                                                recipe_cuisine_lower in filter_cuisine_lower):
+                                            if cuisine_value_matches(filter_cuisine_lower, recipe_cuisine_lower, cuisine_match):
                                                 cuisine_matched = True
-                                                logger.info(f"🔍 DEBUG: ✅ Cuisine match found: '{filter_cuisine_lower}' matches '{recipe_cuisine_lower}'")
                                                 break
                                         
                                         if cuisine_matched:
@@ -474,16 +741,13 @@ class RecipeCacheService:
                                     
                                     if not cuisine_matched:
                                         should_include = False
-                                        logger.info(f"🔍 DEBUG: ❌ Recipe '{recipe.get('title', 'Unknown')}' excluded by cuisine filter: {expanded_cuisine_filter} - no matches found")
-                                        logger.info(f"🔍 DEBUG: Recipe cuisines: {recipe_cuisines}")
-                                        logger.info(f"🔍 DEBUG: Expanded filter cuisines: {expanded_cuisine_filter}")
                                 else:
                                     # Invalid filter type
                                     should_include = False
                                     logger.warning(f"Invalid cuisine filter type: {type(expanded_cuisine_filter)}")
                             
                             # Dietary restrictions filter
-                            if should_include and filters.get("dietary_restrictions"):
+                            if should_include and facet_mask is None and filters.get("dietary_restrictions"):
                                 dietary_filter = [d.lower() for d in filters["dietary_restrictions"]]
                                 recipe_dietary = []
                                 
@@ -507,11 +771,9 @@ class RecipeCacheService:
                                         # Add vegetarian tag if not already present
                                         if not any('vegetarian' in diet.lower() for diet in recipe_dietary):
                                             recipe_dietary.append('vegetarian')
-                                            logger.debug(f"🔍 Detected vegetarian recipe by ingredients: {recipe.get('title', 'Unknown')}")
                                     else:
                                         # Recipe has meat - remove any incorrect vegetarian tags
                                         recipe_dietary = [d for d in recipe_dietary if 'vegetarian' not in d.lower()]
-                                        logger.debug(f"❌ Removed incorrect vegetarian tag from meat recipe: {recipe.get('title', 'Unknown')}")
                                 
                                 if 'vegan' in dietary_filter:
                                     # Check if recipe is actually vegan by analyzing ingredients
@@ -519,11 +781,9 @@ class RecipeCacheService:
                                         # Add vegan tag if not already present
                                         if not any('vegan' in diet.lower() for diet in recipe_dietary):
                                             recipe_dietary.append('vegan')
-                                            logger.debug(f"🔍 Detected vegan recipe by ingredients: {recipe.get('title', 'Unknown')}")
                                     else:
                                         # Recipe has animal products - remove any incorrect vegan tags
                                         recipe_dietary = [d for d in recipe_dietary if 'vegan' not in d.lower()]
-                                        logger.debug(f"❌ Removed incorrect vegan tag from non-vegan recipe: {recipe.get('title', 'Unknown')}")
                                 
                                 # IMPROVED: Check if any recipe dietary info matches the filter
                                 # Use more flexible matching to catch variations
@@ -535,15 +795,17 @@ class RecipeCacheService:
                                             diet_filter in recipe_diet or 
                                             recipe_diet in diet_filter):
                                             dietary_matched = True
-                                            logger.debug(f"✅ Dietary match found: '{diet_filter}' matches '{recipe_diet}'")
                                             break
                                     if dietary_matched:
                                         break
                                 
                                 if not dietary_matched:
                                     should_include = False
-                                    logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by dietary filter: {dietary_filter}")
-                                    logger.debug(f"Recipe dietary info: {recipe_dietary}")
+                            
+                            # Strict dietary filter: recipe must satisfy ALL restrictions
+                            if should_include and facet_mask is None and self._requires_all_diets(filters):
+                                if not matches_required_diets(required_diet_values(recipe), filters["dietary_restrictions"]):
+                                    should_include = False
                             
                             # Max cooking time filter
                             if should_include and filters.get("max_cooking_time"):
@@ -552,7 +814,6 @@ class RecipeCacheService:
                                     recipe_time = recipe.get('cooking_time') or recipe.get('readyInMinutes')
                                     if recipe_time and int(recipe_time) > max_time:
                                         should_include = False
-                                        logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by cooking time filter: {recipe_time} > {max_time}")
                                 except (ValueError, TypeError):
                                     logger.warning(f"Invalid max_cooking_time value: {filters['max_cooking_time']}")
                             
@@ -563,10 +824,13 @@ class RecipeCacheService:
                                     recipe_calories = recipe.get('calories') or recipe.get('calorieCount')
                                     if recipe_calories and int(recipe_calories) > max_cal:
                                         should_include = False
-                                        logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by calories filter: {recipe_calories} > {max_cal}")
                                 except (ValueError, TypeError):
                                     logger.warning(f"Invalid max_calories value: {filters['max_calories']}")
                             
+                            # Nutrition range filter (when not already applied as a bitmap)
+                            if should_include and check_ranges and not recipe_in_ranges(recipe, check_ranges):
+                                should_include = False
+                            
                             # Min rating filter
                             if should_include and filters.get("min_rating"):
                                 try:
@@ -574,24 +838,18 @@ class RecipeCacheService:
                                     recipe_rating = recipe.get('avg_rating') or recipe.get('rating')
                                     if recipe_rating and float(recipe_rating) < min_rating:
                                         should_include = False
-                                        logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by rating filter: {recipe_rating} < {min_rating}")
                                 except (ValueError, TypeError):
                                     logger.warning(f"Invalid min_rating value: {filters['min_rating']}")
                             
                             if should_include:
                                 filtered_recipes.append(recipe)
                         
-                        logger.info(f"🔍 Filtering results: {len(all_recipes)} -> {len(filtered_recipes)} recipes")
-                        logger.info(f"🔍 Final filtered count: {len(filtered_recipes)}")
                         all_recipes = filtered_recipes
-                    
-                    # If no search terms and no filters, return all recipes
-                    if not filters:
-                        logger.info(f"🔍 No search terms and no filters - returning all {len(all_recipes)} recipes")
-                        return all_recipes
-                    else:
-                        logger.info(f"🔍 No search terms but filters applied - returning {len(all_recipes)} filtered recipes")
-                        return all_recipes
+                        trace.mark("filter", len(all_recipes))
+                
+                # No search terms: all recipes, filtered if filters were given. The
+                # recipes are shared with the snapshot; only the list is the caller's
+                return list(all_recipes)
             
             # STRICT VALIDATION: Require meaningful search terms
             query_trimmed = query.strip()
@@ -610,116 +868,40 @@ class RecipeCacheService:
             is_name_search = bool(query_trimmed)
             is_combined_search = is_ingredient_search and is_name_search
             
-            logger.info(f"🔍 SEARCH TYPE DETERMINATION:")
-            logger.info(f"  - ingredient.strip() result: '{ingredient_trimmed}'")
-            logger.info(f"  - query.strip() result: '{query_trimmed}'")
-            logger.info(f"  - bool(ingredient.strip()): {is_ingredient_search}")
-            logger.info(f"  - bool(query.strip()): {is_name_search}")
-            logger.info(f"  - is_combined_search: {is_combined_search}")
-            logger.info(f"  - Final: ingredient_search={is_ingredient_search}, name_search={is_name_search}")
-            
-            if is_combined_search:
-                logger.info(f"🔍 COMBINED SEARCH MODE: Both name and ingredient search provided")
-                logger.info(f"  - Name search: '{query_trimmed}' in title/description")
-                logger.info(f"  - Ingredient search: '{ingredient_trimmed}' in ingredients field")
-                logger.info(f"  - Will return recipes that match EITHER criteria")
-            elif is_ingredient_search:
-                logger.info(f"🔍 INGREDIENT SEARCH MODE: Looking ONLY in ingredients field for '{ingredient_trimmed}'")
-                logger.info(f"  - WILL NOT look at title, description, or any other fields")
-                logger.info(f"  - ONLY checking recipe.ingredients array for word matches")
-            elif is_name_search:
-                logger.info(f"🔍 NAME SEARCH MODE: Looking ONLY in title/description fields for '{query_trimmed}'")
-                logger.info(f"  - WILL NOT look at ingredients field at all")
-                logger.info(f"  - ONLY checking recipe.title and recipe.description for word matches")
-            else:
-                logger.warning("⚠️ No search parameters provided - applying filters only")
-                # This path is now handled above in the no search terms section
-            
             matching_recipes = []
             
-            # DEBUG: Log the first few recipes to see their structure
-            logger.info(f"🔍 DEBUG: First 3 recipes structure:")
-            for i, recipe in enumerate(all_recipes[:3]):
-                logger.info(f"  Recipe {i+1}: '{recipe.get('title', 'No title')}'")
-                logger.info(f"    - Keys: {list(recipe.keys())}")
-                logger.info(f"    - Title: '{recipe.get('title', 'No title')}'")
-                logger.info(f"    - Description: '{recipe.get('description', 'No description')}'")
-                logger.info(f"    - Ingredients: {recipe.get('ingredients', 'No ingredients')}")
-                logger.info(f"    - Type: {type(recipe)}")
-                # Add specific debugging for the search term
-                if query_trimmed:
-                    title_lower = str(recipe.get('title', '')).lower()
-                    desc_lower = str(recipe.get('description', '')).lower()
-                    logger.info(f"    - 🔍 SEARCH DEBUG for '{query_trimmed}':")
-                    logger.info(f"      * Title contains '{query_trimmed}': {query_trimmed in title_lower}")
-                    logger.info(f"      * Description contains '{query_trimmed}': {query_trimmed in desc_lower}")
-                    logger.info(f"      * Title text: '{title_lower}'")
-                    logger.info(f"      * Description text: '{desc_lower}'")
-                
-                # CRITICAL: Check if this recipe contains the search terms in unexpected places
-                if query_trimmed:
-                    logger.info(f"    - 🔍 SEARCH TERM '{query_trimmed}' ANALYSIS:")
-                    title_contains = query_trimmed.lower() in str(recipe.get('title', '')).lower()
-                    desc_contains = query_trimmed.lower() in str(recipe.get('description', '')).lower()
-                    ingredients_contains = query_trimmed.lower() in str(recipe.get('ingredients', '')).lower()
-                    logger.info(f"      * Title contains '{query_trimmed}': {title_contains}")
-                    logger.info(f"      * Description contains '{query_trimmed}': {desc_contains}")
-                    logger.info(f"      * Ingredients contains '{query_trimmed}': {ingredients_contains}")
-                    
-                    # If ingredients contain the search term but we're doing name search, this is the problem!
-                    if ingredients_contains and is_name_search:
-                        logger.warning(f"      🚨 PROBLEM: Recipe has '{query_trimmed}' in ingredients but we're doing NAME search!")
-                        logger.warning(f"      This should NOT happen - name search should ignore ingredients!")
-                
-                if ingredient_trimmed:
-                    logger.info(f"    - 🔍 INGREDIENT TERM '{ingredient_trimmed}' ANALYSIS:")
-                    title_contains = ingredient_trimmed.lower() in str(recipe.get('title', '')).lower()
-                    desc_contains = ingredient_trimmed.lower() in str(recipe.get('description', '')).lower()
-                    ingredients_contains = ingredient_trimmed.lower() in str(recipe.get('ingredients', '')).lower()
-                    logger.info(f"      * Title contains '{ingredient_trimmed}': {title_contains}")
-                    logger.info(f"      * Description contains '{ingredient_trimmed}': {desc_contains}")
-                    logger.info(f"      * Ingredients contains '{ingredient_trimmed}': {ingredients_contains}")
-                    
-                    # If title/description contain the ingredient term but we're doing ingredient search, this is also a problem!
-                    if (title_contains or desc_contains) and is_ingredient_search:
-                        logger.warning(f"      🚨 PROBLEM: Recipe has '{ingredient_trimmed}' in title/description but we're doing INGREDIENT search!")
-                        logger.warning(f"      This should NOT happen - ingredient search should ignore title/description!")
-            
-            # CRITICAL: Verify search isolation
-            logger.info(f"🔍 SEARCH ISOLATION VERIFICATION:")
-            if is_name_search:
-                logger.info(f"  - NAME SEARCH: Will ONLY look at title and description fields")
-                logger.info(f"  - Will IGNORE: ingredients, summary, instructions, tags, cuisine, etc.")
-            elif is_ingredient_search:
-                logger.info(f"  - INGREDIENT SEARCH: Will ONLY look at ingredients field")
-                logger.info(f"  - Will IGNORE: title, description, summary, instructions, tags, cuisine, etc.")
-            elif is_combined_search:
-                logger.info(f"  - COMBINED SEARCH: Will look at title/description AND ingredients separately")
-                logger.info(f"  - Will IGNORE: summary, instructions, tags, cuisine, etc.")
-            
-            logger.info(f"🔍 DEBUG: Processing {len(all_recipes)} recipes for search")
-            logger.info(f"🔍 DEBUG: Search type: name_search={is_name_search}, ingredient_search={is_ingredient_search}")
-            
-            for recipe in all_recipes:
+            # Narrow the scan to trigram-index candidates; the loop below still
+            # verifies and scores each one, in corpus order, so results are unchanged
+            search_pool = all_recipes
+            if not base_recipes:
+                candidate_positions = self._find_text_candidates(
+                    corpus_version,
+                    query_trimmed.lower(),
+                    ingredient_trimmed.lower()
+                )
+                if within_mask is not None:
+                    if candidate_positions is None:
+                        search_pool = select_positions(within_mask, all_recipes)
+                    else:
+                        within_bits = format(within_mask, 'b')[::-1]
+                        candidate_positions = [i for i in candidate_positions if i < len(within_bits) and within_bits[i] == '1']
+                if candidate_positions is not None:
+                    search_pool = [all_recipes[i] for i in candidate_positions if i < len(all_recipes)]
+            trace.mark("candidates", len(search_pool))
+            
+            for recipe in search_pool:
                 # Calculate relevance score based on search type
                 score = 0
                 matched_terms = 0
                 ingredient_matches = 0
                 title_matches = 0
                 
-                # Debug: Show what recipe we're processing
-                if is_name_search:
-                    logger.info(f"🔍 Processing recipe: '{recipe.get('title', 'No title')}' for name search '{query_trimmed}'")
-                
                 # For COMBINED SEARCH: Check both name and ingredient criteria
                 if is_combined_search:
                     # ENHANCED: Support substring matching for flexible searches
                     # Instead of splitting into words, use the entire search term as a substring
                     query_lower = query_trimmed.lower()
                     ingredient_lower = ingredient_trimmed.lower()
-                    logger.debug(f"🔍 COMBINED SEARCH: Processing recipe '{recipe.get('title', 'No title')}'")
-                    logger.debug(f"  - Looking for name substring: '{query_lower}' in title/description")
-                    logger.debug(f"  - Looking for ingredient substring: '{ingredient_lower}' in ingredients")
                     
                     # SUBSTRING MATCHING: Check if the search terms appear anywhere in the content
                     # This allows for partial matches like "chi" matching "chicken"
@@ -732,7 +914,6 @@ class RecipeCacheService:
                         if query_lower in title_lower:
                             score += 100
                             title_matches = 1
-                            logger.debug(f"  - ✅ Name substring '{query_lower}' found in title!")
                     
                     # Check description field for name search (substring match)
                     if 'description' in recipe and recipe['description']:
@@ -741,7 +922,6 @@ class RecipeCacheService:
                         # Check if the entire query appears as a substring in the description
                         if query_lower in desc_lower:
                             score += 50
-                            logger.debug(f"  - ✅ Name substring '{query_lower}' found in description!")
                     
                     # Check ingredients field for ingredient search (substring match)
                     if 'ingredients' in recipe and isinstance(recipe['ingredients'], list):
@@ -761,48 +941,31 @@ class RecipeCacheService:
                             if ingredient_lower in ing_name:
                                 ingredient_found = True
                                 ingredient_matches = 1
-                                logger.debug(f"  - ✅ Ingredient substring '{ingredient_lower}' found in ingredient '{ing_name}'!")
                                 break
                         
                         # Score based on whether we found the ingredient substring
                         if ingredient_found:
                             score += 100
-                            logger.debug(f"  - ✅ Ingredient substring '{ingredient_lower}' found in ingredients!")
                     
                     # Include recipe if it matches EITHER name OR ingredient criteria (substring matches)
                     if title_matches > 0 or ingredient_matches > 0:
+                        # Score a copy; the snapshot recipe is shared
+                        recipe = dict(recipe)
                         recipe['search_score'] = score
                         recipe['matched_terms'] = title_matches + ingredient_matches
                         recipe['ingredient_matches'] = ingredient_matches
                         recipe['title_matches'] = title_matches
                         matching_recipes.append(recipe)
-                        logger.debug(f"✅ Recipe '{recipe.get('title', 'No title')}' matches combined search criteria")
-                    else:
-                        logger.debug(f"❌ Recipe '{recipe.get('title', 'No title')}' does NOT match combined search criteria")
                 
                 # For INGREDIENT SEARCH: ONLY look at ingredients field, ignore everything else
                 elif is_ingredient_search:
                     ingredient_lower = ingredient_trimmed.lower()
-                    search_context = "CHAINED SEARCH" if base_recipes else "FULL DATABASE"
-                    logger.debug(f"🔍 INGREDIENT SEARCH ({search_context}): Processing recipe '{recipe.get('title', 'No title')}'")
-                    logger.debug(f"  - Looking for ingredient: '{ingredient_lower}'")
-                    logger.debug(f"  - Recipe ingredients field: {recipe.get('ingredients', 'No ingredients')}")
-                    
-                    # DEBUG: Log the actual recipe data structure to see what we're working with
-                    logger.debug(f"  - Recipe keys: {list(recipe.keys())}")
-                    logger.debug(f"  - Recipe type: {type(recipe)}")
-                    
-                    # CRITICAL: Verify we're ONLY looking at ingredients for ingredient search
-                    logger.debug(f"  - ⚠️ For ingredient search, we ONLY check the ingredients field")
-                    logger.debug(f"  - We IGNORE title, description, and all other fields")
                     
                     # SUBSTRING MATCHING: Check if the ingredient search term appears anywhere in ingredients
                     # This allows for partial matches like "chick" matching "chicken"
-                    logger.debug(f"  - Looking for ingredient substring: '{ingredient_lower}'")
                     
                     # ONLY check recipe ingredients field - require SUBSTRING match
                     if 'ingredients' in recipe and isinstance(recipe['ingredients'], list):
-                        logger.debug(f"  - Found ingredients list with {len(recipe['ingredients'])} items")
                         
                         # Track if any ingredient contains the search substring
                         ingredient_found = False
@@ -811,59 +974,35 @@ class RecipeCacheService:
                             ing_name = ""
                             if isinstance(ing, dict) and 'name' in ing:
                                 ing_name = ing['name'].lower()
-                                logger.debug(f"  - Checking ingredient dict: '{ing_name}'")
                             elif isinstance(ing, str):
                                 ing_name = ing.lower()
-                                logger.debug(f"  - Checking ingredient string: '{ing_name}'")
                             else:
-                                logger.debug(f"  - Skipping ingredient with unexpected type: {type(ing)}")
                                 continue
                             
-                            logger.debug(f"  - Checking ingredient: '{ing_name}' for substring '{ingredient_lower}'")
-                            
                             # Check if the ingredient name contains the search substring
                             if ingredient_lower in ing_name:
                                 ingredient_found = True
                                 ingredient_matches = 1
-                                logger.debug(f"  - ✅ Ingredient substring '{ingredient_lower}' found in ingredient '{ing_name}'!")
                                 break
                         
                         # Score based on whether we found the ingredient substring
                         if ingredient_found:
                             score += 100  # 100 points for ingredient match
-                            logger.debug(f"  - ✅ Ingredient substring '{ingredient_lower}' found in ingredients!")
-                        else:
-                            logger.debug(f"  - ❌ Ingredient substring '{ingredient_lower}' NOT found in any ingredients")
-                    else:
-                        logger.debug(f"  - No ingredients list found or ingredients is not a list")
-                        logger.debug(f"  - Ingredients field type: {type(recipe.get('ingredients'))}")
                     
                     # ONLY include recipes that have ANY ingredient words in the ingredients field
                     if ingredient_matches > 0:
+                        recipe = dict(recipe)
                         recipe['search_score'] = score
                         recipe['matched_terms'] = ingredient_matches
                         recipe['ingredient_matches'] = ingredient_matches
                         recipe['title_matches'] = 0
                         matching_recipes.append(recipe)
-                        logger.debug(f"✅ Recipe '{recipe.get('title', 'No title')}' has {ingredient_matches} ingredient words in ingredients field")
-                    else:
-                        logger.debug(f"❌ Recipe '{recipe.get('title', 'No title')}' does NOT have any ingredient words in ingredients field")
                 
                 # For NAME SEARCH: ONLY look at title/description fields, ignore ingredients completely
                 elif is_name_search:
                     query_lower = query_trimmed.lower()
-                    logger.debug(f"🔍 NAME SEARCH: Processing recipe '{recipe.get('title', 'No title')}'")
-                    logger.debug(f"  - Looking for query substring: '{query_lower}'")
-                    logger.debug(f"  - Recipe title: '{recipe.get('title', 'No title')}'")
-                    logger.debug(f"  - Recipe description: '{recipe.get('description', 'No description')}'")
-                    logger.debug(f"  - IGNORING ingredients field completely for name search")
                     
-                    # DEBUG: Log the actual recipe data structure to see what we're working with
-                    logger.debug(f"  - Recipe keys: {list(recipe.keys())}")
-                    logger.debug(f"  - Recipe type: {type(recipe)}")
-                    
-                    # CRITICAL: Double-check that we're NOT looking at ingredients for name search
-                    # This is the key fix - ensure name search only looks at title/description
+                    # Name search only looks at title/description, never ingredients
                     title_text = ""
                     description_text = ""
                     
@@ -873,56 +1012,28 @@ class RecipeCacheService:
                     # Check title field for substring match
                     if 'title' in recipe and recipe['title']:
                         title_text = str(recipe['title']).lower()
-                        logger.debug(f"  - Title to search: '{title_text}'")
                         
                         # Check if the search query appears as a substring in the title
                         if query_lower in title_text:
                             score += 100  # 100 points for title match
                             title_matches = 1
-                            logger.info(f"  - ✅ Query substring '{query_lower}' found in title '{title_text}'!")
-                        else:
-                            logger.info(f"  - ❌ Query substring '{query_lower}' NOT found in title '{title_text}'")
-                            logger.info(f"  - DEBUG: '{query_lower}' is NOT a substring of '{title_text}'")
                     
                     # Check description field for substring match (secondary scoring)
                     if 'description' in recipe and recipe['description']:
                         description_text = str(recipe['description']).lower()
-                        logger.debug(f"  - Description to search: '{description_text}'")
                         
                         # Check if the search query appears as a substring in the description
                         if query_lower in description_text:
                             score += 50  # 50 points for description match
-                            logger.debug(f"  - ✅ Query substring '{query_lower}' found in description!")
-                        else:
-                            logger.debug(f"  - ❌ Query substring '{query_lower}' NOT found in description")
-                    
-                    # CRITICAL: Verify we're NOT looking at ingredients for name search
-                    if 'ingredients' in recipe:
-                        # Double-check that ingredients don't contain the search term
-                        ingredients_text = str(recipe.get('ingredients', '')).lower()
-                        if query_lower in ingredients_text:
-                            logger.debug(f"  - ⚠️ Query '{query_lower}' found in ingredients, but this is name search - ignoring")
-                    
-                    # CRITICAL: Verify we're NOT looking at any other fields that might contain the search term
-                    other_fields_to_check = ['summary', 'instructions', 'tags', 'cuisine', 'cuisines', 'category']
-                    for field in other_fields_to_check:
-                        if field in recipe:
-                            field_text = str(recipe.get(field, '')).lower()
-                            if query_lower in field_text:
-                                logger.debug(f"  - ⚠️ Query '{query_lower}' found in {field}, but this is name search - ignoring")
-
-
                     
                     # Include recipe if it has ANY matching words in title or description
                     if title_matches > 0 or score > 0:
+                        recipe = dict(recipe)
                         recipe['search_score'] = score
                         recipe['matched_terms'] = title_matches
                         recipe['ingredient_matches'] = 0
                         recipe['title_matches'] = title_matches
                         matching_recipes.append(recipe)
-                        logger.info(f"✅ Recipe '{recipe.get('title', 'No title')}' MATCHED name search for '{query_trimmed}' (score: {score})")
-                    else:
-                        logger.info(f"❌ Recipe '{recipe.get('title', 'No title')}' did NOT match name search for '{query_trimmed}' (score: {score}, title_matches: {title_matches})")
                 
                 # For COMBINED SEARCH: both query and ingredient are provided
                 else:
@@ -931,9 +1042,7 @@ class RecipeCacheService:
                     logger.warning("This should not happen with the current search logic")
                     # Don't add any recipes for unexpected combined searches
                     continue
-            
-            logger.info(f"🔍 DEBUG: Initial search found {len(matching_recipes)} recipes")
-            logger.info(f"🔍 DEBUG: Now applying relevance filtering...")
+            trace.mark("score", len(matching_recipes))
             
             # STRICT FILTERING: Only return recipes with meaningful matches
             # Filter out recipes with very low relevance scores
@@ -947,87 +1056,46 @@ class RecipeCacheService:
                 if is_ingredient_search:
                     if ingredient_matches > 0:
                         meaningful_recipes.append(recipe)
-                        logger.debug(f"✅ Recipe '{recipe.get('title', 'No title')}' passed ingredient relevance filter")
-                    else:
-                        logger.debug(f"❌ Recipe '{recipe.get('title', 'No title')}' failed ingredient relevance filter (score: {score})")
                 
                 # For name search: require at least 1 title match OR high description score
                 elif is_name_search:
                     if title_matches > 0 or score >= 50:
                         meaningful_recipes.append(recipe)
-                        logger.info(f"✅ Recipe '{recipe.get('title', 'No title')}' passed name relevance filter (score: {score}, title_matches: {title_matches})")
-                    else:
-                        logger.info(f"❌ Recipe '{recipe.get('title', 'No title')}' failed name relevance filter (score: {score}, title_matches: {title_matches})")
                 
                 # For combined search: require at least 1 title match OR 1 ingredient match
                 elif is_combined_search:
                     if title_matches > 0 or ingredient_matches > 0:
                         meaningful_recipes.append(recipe)
-                        logger.debug(f"✅ Recipe '{recipe.get('title', 'No title')}' passed combined relevance filter")
-                    else:
-                        logger.debug(f"❌ Recipe '{recipe.get('title', 'No title')}' failed combined relevance filter (score: {score}, title_matches: {title_matches}, ingredient_matches: {ingredient_matches})")
                 
                 # For unexpected cases: don't include
                 else:
                     logger.warning(f"⚠️ Recipe '{recipe.get('title', 'No title')}' excluded due to unexpected search type")
             
-            # Sort by relevance score (highest first)
-            if is_ingredient_search:
-                # For ingredient searches, prioritize recipes with more ingredient matches
-                meaningful_recipes.sort(key=lambda x: (x.get('search_score', 0), x.get('ingredient_matches', 0), x.get('title_matches', 0)), reverse=True)
-            elif is_name_search:
-                # For name searches, prioritize recipes with more title matches
-                meaningful_recipes.sort(key=lambda x: (x.get('search_score', 0), x.get('title_matches', 0), x.get('ingredient_matches', 0)), reverse=True)
-            elif is_combined_search:
-                # For combined searches, prioritize recipes with more total matches (title + ingredient)
-                meaningful_recipes.sort(key=lambda x: (x.get('search_score', 0), x.get('matched_terms', 0), x.get('title_matches', 0), x.get('ingredient_matches', 0)), reverse=True)
-            else:
-                # For unexpected cases, sort by overall score
-                meaningful_recipes.sort(key=lambda x: (x.get('search_score', 0), x.get('matched_terms', 0)), reverse=True)
-            
-            logger.info(f"Text search found {len(meaningful_recipes)} recipes with meaningful matches out of {len(matching_recipes)} total matches")
-            if is_ingredient_search:
-                logger.info(f"🔍 INGREDIENT SEARCH RESULTS: Found {len(meaningful_recipes)} recipes with '{ingredient_trimmed}' in ingredients field")
-                logger.info(f"  - ✅ SEARCH WAS COMPLETELY SEPARATE: Only looked at ingredients, ignored title/description")
-                if meaningful_recipes:
-                    sample_titles = [r.get('title', 'No title')[:50] for r in meaningful_recipes[:3]]
-                    logger.info(f"Sample ingredient search results: {sample_titles}")
-            elif is_name_search:
-                logger.info(f"🔍 NAME SEARCH RESULTS: Found {len(meaningful_recipes)} recipes with '{query_trimmed}' in title/description")
-                logger.info(f"  - ✅ SEARCH WAS COMPLETELY SEPARATE: Only looked at title/description, ignored ingredients")
-                if meaningful_recipes:
-                    sample_titles = [r.get('title', 'No title')[:50] for r in meaningful_recipes[:3]]
-                    logger.info(f"Sample name search results: {sample_titles}")
-            elif is_combined_search:
-                logger.info(f"🔍 COMBINED SEARCH RESULTS: Found {len(meaningful_recipes)} recipes matching combined criteria")
-                logger.info(f"  - ✅ COMBINED SEARCH: Returned recipes that match EITHER name OR ingredient criteria")
-                logger.info(f"  - Name search: '{query_trimmed}' in title/description")
-                logger.info(f"  - Ingredient search: '{ingredient_trimmed}' in ingredients field")
-                if meaningful_recipes:
-                    sample_titles = [r.get('title', 'No title')[:50] for r in meaningful_recipes[:3]]
-                    logger.info(f"Sample combined search results: {sample_titles}")
-            
-            # Debug: Show what recipes we're returning
-            logger.info(f"🔍 SEARCH COMPLETE: Returning {len(meaningful_recipes)} recipes from {len(all_recipes)} total recipes")
-            if meaningful_recipes:
-                logger.info(f"🔍 DEBUG: Recipes being returned:")
-                for i, recipe in enumerate(meaningful_recipes[:5]):  # Show first 5
-                    logger.info(f"  {i+1}. '{recipe.get('title', 'No title')}' (score: {recipe.get('search_score', 0)})")
-            else:
-                logger.warning(f"🔍 DEBUG: No recipes matched search criteria!")
-                logger.warning(f"🔍 This explains why you're getting 0 results")
             
             # Apply filters if provided
             if filters:
-                logger.info(f"🔍 Applying filters: {filters}")
                 filtered_recipes = []
+                cuisine_match = filters.get("cuisine_match") or CUISINE_MATCH_PARTIAL
+                
+                # Results are copies of corpus recipes, so facet bits can be checked by id
+                facet_bits = None
+                if not base_recipes:
+                    facet_mask = self._facet_filter_mask(corpus_version, filters, validate_diets=False)
+                    if facet_mask is not None:
+                        facet_bits = format(facet_mask, 'b')[::-1]
                 
                 for recipe in meaningful_recipes:
                     should_include = True
                     
+                    if facet_bits is not None:
+                        position = self.facet_index.position_of(recipe.get('id'))
+                        if position is None or position >= len(facet_bits) or facet_bits[position] != '1':
+                            should_include = False
+                    
                     # Cuisine filter
-                    if filters.get("cuisine"):
-                        cuisine_filter = filters["cuisine"].lower()
+                    if facet_bits is None and filters.get("cuisine"):
+                        # A single cuisine or a list; a recipe matches ANY of them
+                        cuisine_filters = cuisine_filter_values(filters["cuisine"])
                         recipe_cuisines = []
                         
                         # Check both cuisine and cuisines fields
@@ -1037,12 +1105,12 @@ class RecipeCacheService:
                             recipe_cuisines.extend([c.lower() for c in recipe['cuisines'] if c])
                         
                         # Check if any recipe cuisine matches the filter
-                        if not any(cuisine_filter in cuisine or cuisine in cuisine_filter for cuisine in recipe_cuisines):
+                        if not any(cuisine_value_matches(cuisine_filter, cuisine, cuisine_match)
+                                   for cuisine_filter in cuisine_filters for cuisine in recipe_cuisines):
                             should_include = False
-                            logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by cuisine filter: {cuisine_filter}")
                     
                     # Dietary restrictions filter
-                    if should_include and filters.get("dietary_restrictions"):
+                    if should_include and facet_bits is None and filters.get("dietary_restrictions"):
                         dietary_filter = [d.lower() for d in filters["dietary_restrictions"]]
                         recipe_dietary = []
                         
@@ -1068,15 +1136,17 @@ class RecipeCacheService:
                                     diet_filter in recipe_diet or 
                                     recipe_diet in diet_filter):
                                     dietary_matched = True
-                                    logger.debug(f"✅ Dietary match found: '{diet_filter}' matches '{recipe_diet}'")
                                     break
                             if dietary_matched:
                                 break
                         
                         if not dietary_matched:
                             should_include = False
-                            logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by dietary filter: {dietary_filter}")
-                            logger.debug(f"Recipe dietary info: {recipe_dietary}")
+                    
+                    # Strict dietary filter: recipe must satisfy ALL restrictions
+                    if should_include and facet_bits is None and self._requires_all_diets(filters):
+                        if not matches_required_diets(required_diet_values(recipe), filters["dietary_restrictions"]):
+                            should_include = False
                     
                     # Max cooking time filter
                     if should_include and filters.get("max_cooking_time"):
@@ -1085,7 +1155,6 @@ class RecipeCacheService:
                             recipe_time = recipe.get('cooking_time') or recipe.get('readyInMinutes')
                             if recipe_time and int(recipe_time) > max_time:
                                 should_include = False
-                                logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by cooking time filter: {recipe_time} > {max_time}")
                         except (ValueError, TypeError):
                             logger.warning(f"Invalid max_cooking_time value: {filters['max_cooking_time']}")
                     
@@ -1096,10 +1165,13 @@ class RecipeCacheService:
                             recipe_calories = recipe.get('calories') or recipe.get('calorieCount')
                             if recipe_calories and int(recipe_calories) > max_cal:
                                 should_include = False
-                                logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by calories filter: {recipe_calories} > {max_cal}")
                         except (ValueError, TypeError):
                             logger.warning(f"Invalid max_calories value: {filters['max_calories']}")
                     
+                    # Nutrition range filter (when not already applied as a bitmap)
+                    if should_include and check_ranges and not recipe_in_ranges(recipe, check_ranges):
+                        should_include = False
+                    
                     # Min rating filter
                     if should_include and filters.get("min_rating"):
                         try:
@@ -1107,16 +1179,18 @@ class RecipeCacheService:
                             recipe_rating = recipe.get('avg_rating') or recipe.get('rating')
                             if recipe_rating and float(recipe_rating) < min_rating:
                                 should_include = False
-                                logger.debug(f"Recipe '{recipe.get('title', 'Unknown')}' excluded by rating filter: {recipe_rating} < {min_rating}")
                         except (ValueError, TypeError):
                             logger.warning(f"Invalid min_rating value: {filters['min_rating']}")
                     
                     if should_include:
                         filtered_recipes.append(recipe)
                 
-                logger.info(f"🔍 Filtering results: {len(meaningful_recipes)} -> {len(filtered_recipes)} recipes")
                 meaningful_recipes = filtered_recipes
+                trace.mark("filter", len(meaningful_recipes))
             
+            # Rank only the filtered matches, and only as deep as the caller needs
+            meaningful_recipes = rank_results(meaningful_recipes, ranking_key(query, ingredient), rank_limit)
+            trace.mark("rank", len(meaningful_recipes))
             return meaningful_recipes
             
             # Original search logic (commented out since search collection doesn't have full recipes):
@@ -1321,15 +1395,20 @@ class RecipeCacheService:
         # Normalize score
         return min(max(score, 0.0), 1.0)
 
-    def cache_recipes(self, recipes: List[Dict[Any, Any]], query: str = "", ingredient: str = "", filters: Optional[Dict[str, Any]] = None) -> bool:
+    def cache_recipes(self, recipes: List[Dict[Any, Any]], query: str = "", ingredient: str = "", filters: Optional[Dict[str, Any]] = None,
+                      skip_existing: bool = False, mirror_to_search: bool = False) -> bool:
         """
-        Cache recipes in ChromaDB with TTL support
+        Cache recipes in ChromaDB with TTL support.
+        Recipes go through the bulk ingest pipeline: duplicate ids are collapsed
+        and each batch is written with one upsert per collection.
         
         Args:
             recipes: List of recipe dictionaries to cache
             query: Search query that resulted in these recipes (for search context)
             ingredient: Ingredient filter that was used (for search context)
             filters: Dictionary of filters that were applied
+            skip_existing: Leave recipes that are already cached untouched
+            mirror_to_search: Also write each recipe to the search collection
             
         Returns:
             bool: True if caching was successful, False otherwise
@@ -1348,51 +1427,58 @@ class RecipeCacheService:
                 except (ValueError, TypeError) as e:
                     logger.warning(f"Invalid min_rating value: {filters.get('min_rating')}")
             
-            # Process each recipe
-            for recipe in recipes:
-                try:
-                    recipe_id = str(recipe.get('id'))
-                    if not recipe_id:
-                        logger.warning("Skipping recipe with missing ID")
-                        continue
-                        
-                    # Extract metadata and search terms
-                    metadata = self._extract_recipe_metadata(recipe)
-                    search_terms = self._extract_search_terms(recipe)
-                    
-                    # Store the full recipe
-                    self.recipe_collection.upsert(
-                        ids=[recipe_id],
-                        documents=[json.dumps(recipe)],
-                        metadatas=[metadata]
+            search_context = f"{query} {ingredient}".strip()
+            
+            def write_batch(records: List[IngestRecord]) -> None:
+                existing = None
+                if skip_existing:
+                    stored = set(self.recipe_collection.get(ids=[r.id for r in records], include=[]).get('ids') or [])
+                    records = [r for r in records if r.id not in stored]
+                    if not records:
+                        return
+                    # The lookup already showed every remaining record is new
+                    existing = ()
+                self._upsert_recipe_records(records, mirror_to_search=mirror_to_search, existing=existing)
+                
+                # If we have a search query, index the search terms
+                if search_context:
+                    indexed_at = datetime.now().isoformat()
+                    search_ids = [f"{r.id}_{hash(search_context) % 10**8}" for r in records]
+                    self._track_new_rows("searches", search_ids)
+                    self.search_collection.upsert(
+                        ids=search_ids,
+                        documents=[r.search_terms for r in records],
+                        metadatas=[{
+                            "recipe_id": r.id,
+                            "search_context": search_context,
+                            "indexed_at": indexed_at
+                        } for r in records]
                     )
-                    
-                    # If we have a search query, index the search terms
-                    search_context = f"{query} {ingredient}".strip()
-                    if search_context:
-                        self.search_collection.upsert(
-                            ids=[f"{recipe_id}_{hash(search_context) % 10**8}"],
-                            documents=[search_terms],
-                            metadatas=[{
-                                "recipe_id": recipe_id,
-                                "search_context": search_context,
-                                "indexed_at": datetime.now().isoformat()
-                            }]
-                        )
-                        
-                    logger.debug(f"Cached recipe: {recipe.get('title', 'Untitled')} (ID: {recipe_id})")
-                    
-                except Exception as recipe_error:
-                    logger.error(f"Error caching recipe {recipe.get('id')}: {recipe_error}")
-                    continue
+                self._publish_to_corpus([r.document for r in records], "cache_recipes", [r.metadata for r in records])
             
-            logger.info(f"Successfully cached {len(recipes)} recipes")
+            stats = RecipeIngestPipeline(write_batch, prepare=self._prepare_cache_record).run(recipes)
+            if stats["invalid"]:
+                logger.warning(f"Skipped {stats['invalid']} recipes with missing IDs or unusable data")
+            logger.log(logging.INFO if len(recipes) > 1 else logging.DEBUG,
+                       f"Successfully cached {stats['written']} recipes in {stats['batches']} batches")
             return True
             
         except Exception as e:
             logger.error(f"Error in cache_recipes: {e}")
             return False
 
+    @staticmethod
+    def _prepare_cache_record(recipe: Any) -> Optional[IngestRecord]:
+        """Document, metadata and search terms for a recipe passed to cache_recipes"""
+        if not isinstance(recipe, dict) or not recipe.get('id'):
+            return None
+        return IngestRecord(
+            id=str(recipe['id']),
+            document=encode_document(recipe),
+            metadata=RecipeCacheService._extract_recipe_metadata(recipe),
+            search_terms=RecipeCacheService._extract_search_terms(recipe),
+        )
+
     def get_recipes_by_ids(self, recipe_ids: List[str]) -> List[Dict[str, Any]]:
         """
         Get multiple recipes by their IDs from the cache
@@ -1406,6 +1492,12 @@ class RecipeCacheService:
         if not self.recipe_collection or not recipe_ids:
             logger.debug("No recipe collection or empty IDs list provided")
             return [None] * len(recipe_ids) if recipe_ids else []
+        
+        # Served from the parsed corpus when every id is already loaded
+        if CORPUS_ENABLED and self.client:
+            corpus_recipes = [self.corpus.get_recipe(str(rid)) for rid in recipe_ids]
+            if all(recipe is not None for recipe in corpus_recipes):
+                return [dict(recipe) for recipe in corpus_recipes]
             
         try:
             # Get all requested recipes in one batch
@@ -1441,6 +1533,10 @@ class RecipeCacheService:
                         recipe = json.loads(doc)
                         if not isinstance(recipe, dict):
                             raise ValueError("Recipe is not a dictionary")
+                        recipe = self._decode_stored_recipe(recipe, meta)
+                        if recipe is None:
+                            id_to_recipe[recipe_id] = None
+                            continue
                             
                         # Check if cache is still valid
                         if not self._is_cache_valid(meta.get('cached_at')):
@@ -1477,40 +1573,51 @@ class RecipeCacheService:
                     None,
                     lambda: self.recipe_collection.delete(ids=[recipe_id])
                 )
+                self.cache_statistics.record_rows("recipes", -1)
                 logger.debug(f"Cleaned up invalid/expired recipe: {recipe_id}")
         except Exception as e:
             logger.error(f"Error cleaning up recipe {recipe_id}: {str(e)}")
             
     def cache_recipe(self, recipe: Dict[Any, Any]) -> bool:
-        """Cache a single recipe in ChromaDB with TTL support"""
-        if not self.recipe_collection or not recipe:
+        """Cache a single recipe in ChromaDB unless it is already cached"""
+        if not self.recipe_collection or not isinstance(recipe, dict) or not recipe.get('id'):
             return False
+        return self.cache_recipes([recipe], skip_existing=True)
+
+    def get_recipe_json_by_id(self, recipe_id: str) -> Optional[str]:
+        """
+        Get a recipe's detail response as a JSON string without parsing or
+        re-serializing the document.
         
-        try:
-            recipe_id = str(recipe['id'])
-            
-            # Check if recipe already exists in cache
-            existing = self.recipe_collection.get(ids=[recipe_id])
-            if existing and existing.get('documents'):
-                logger.debug(f"Recipe {recipe_id} already in cache, skipping")
-                return True
-                
-            metadata = self._extract_recipe_metadata(recipe)
-            search_terms = self._extract_search_terms(recipe)
-            
-            self.recipe_collection.upsert(
-                ids=[recipe_id],
-                documents=[json.dumps(recipe)],
-                metadatas=[metadata],
-                embeddings=[search_terms]
-            )
-            
-            logger.debug(f"Cached recipe: {recipe.get('title', 'Untitled')} (ID: {recipe_id})")
-            return True
+        The stored corpus JSON is reused and metadata fields the recipe lacks
+        are spliced on, matching get_recipe_by_id. Only the metadata is read
+        from the store.
+        
+        Args:
+            recipe_id: The ID of the recipe to retrieve
             
+        Returns:
+            JSON string, or None when the caller should use get_recipe_by_id
+        """
+        if not CORPUS_ENABLED or not self.client or not self.recipe_collection:
+            return None
+        recipe = self.corpus.get_recipe(str(recipe_id))
+        # RecipeService normalizes missing or string instructions; leave those to it
+        if recipe is None or not isinstance(recipe.get('instructions'), list) or not recipe['instructions']:
+            return None
+        try:
+            results = self.recipe_collection.get(ids=[str(recipe_id)], include=["metadatas"])
         except Exception as e:
-            logger.error(f"Error caching recipe: {e}")
-            return False
+            logger.error(f"Error reading metadata for recipe {recipe_id}: {e}")
+            return None
+        if not results or not results.get('ids'):
+            return None
+        metadata = strip_filter_metadata((results.get('metadatas') or [{}])[0] or {})
+        extras = {k: v for k, v in metadata.items() if k not in recipe or recipe[k] is None or recipe[k] == ''}
+        if any(k in recipe for k in extras):
+            # Metadata replaces an empty field; splicing would duplicate the key
+            return None
+        return splice_object(self.json_index.recipe_json(recipe), extras)
 
     def get_recipe_by_id(self, recipe_id: str) -> Optional[Dict[Any, Any]]:
         """
@@ -1528,33 +1635,9 @@ class RecipeCacheService:
                 entry = self.recipe_collection.get_recipe_by_id(recipe_id)
                 if not entry:
                     return None
-                doc = entry.get('document')
-                meta = entry.get('metadata', {})
-                # If document is JSON, parse it; otherwise construct from metadata/title
-                recipe: Optional[Dict[str, Any]] = None
-                if isinstance(doc, str) and doc.strip().startswith('{'):
-                    try:
-                        recipe = json.loads(doc)
-                    except Exception:
-                        recipe = None
-                if recipe is None:
-                    title = meta.get('title') or meta.get('name') or meta.get('strMeal') or str(doc) or 'Recipe'
-                    image = meta.get('image') or meta.get('imageUrl') or meta.get('strMealThumb') or ''
-                    ingredients = meta.get('ingredients') or []
-                    instructions = meta.get('instructions') or []
-                    if isinstance(instructions, str):
-                        instructions = [instructions]
-                    cuisines = meta.get('cuisines') or ([] if not meta.get('strArea') else [str(meta.get('strArea')).lower()])
-                    recipe = {
-                        'id': str(recipe_id),
-                        'title': title,
-                        'image': image,
-                        'ingredients': ingredients if isinstance(ingredients, list) else [],
-                        'instructions': instructions if isinstance(instructions, list) else [],
-                        'cuisines': cuisines if isinstance(cuisines, list) else ([cuisines] if cuisines else []),
-                        'diets': meta.get('diets') or meta.get('dietary_restrictions') or []
-                    }
-                return recipe
+                # Rows seeded before schema v2 hold a title, with the recipe in the metadata
+                return decode_documents([entry.get('document')], [entry.get('metadata', {})], [recipe_id],
+                                        from_metadata=True)[0]
             except Exception as e:
                 logger.error(f"Fallback get_recipe_by_id error: {e}")
                 return None
@@ -1583,6 +1666,7 @@ class RecipeCacheService:
             if not document or not isinstance(document, str):
                 logger.warning(f"Empty or invalid document for recipe ID: {recipe_id}")
                 self.recipe_collection.delete(ids=[recipe_id])
+                self.cache_statistics.record_rows("recipes", -1)
                 return None
                 
             # Try to parse the document as JSON
@@ -1594,6 +1678,11 @@ class RecipeCacheService:
                 logger.error(f"Invalid JSON in cache for recipe {recipe_id}: {str(e)}")
                 # Remove the invalid entry
                 self.recipe_collection.delete(ids=[recipe_id])
+                self.cache_statistics.record_rows("recipes", -1)
+                return None
+            recipe = self._decode_stored_recipe(recipe, metadata)
+            if recipe is None:
+                logger.debug(f"Skipping pre-v2 document for recipe ID: {recipe_id}")
                 return None
                 
             # Check if cache is still valid
@@ -1605,7 +1694,8 @@ class RecipeCacheService:
             
             # Merge metadata into recipe data for frontend compatibility
             # This ensures tags and other metadata are available in the main recipe object
-            for key, value in metadata.items():
+            # (the canonical filter fields are for store queries only)
+            for key, value in strip_filter_metadata(metadata or {}).items():
                 if key not in recipe or recipe[key] is None or recipe[key] == '':
                     recipe[key] = value
                     
@@ -1617,6 +1707,7 @@ class RecipeCacheService:
             try:
                 # Attempt to clean up the problematic entry
                 self.recipe_collection.delete(ids=[recipe_id])
+                self.cache_statistics.mark_stale("recipes")
             except Exception as cleanup_error:
                 logger.error(f"Failed to clean up invalid cache entry {recipe_id}: {str(cleanup_error)}")
             return None
@@ -1663,68 +1754,34 @@ class RecipeCacheService:
             "total_searches": 0,
             "valid_searches": 0,
             "cache_size_mb": 0,
-            "last_cleanup": None
+            "last_cleanup": None,
+            "corpus": self.corpus.get_stats(),
+            "text_index": self.text_index.get_stats(),
+            "facet_index": self.facet_index.get_stats(),
+            "diet_flags": get_diet_flag_store().get_stats(),
+            "result_sets": get_result_set_store().get_stats(),
+            "summary_index": self.summary_index.get_stats(),
+            "json_index": self.json_index.get_stats(),
+            "query_cache": self.query_cache.get_stats(),
+            "nutrition_table": self.nutrition_table.get_stats(),
+            "filter_pushdown": get_pushdown_stats(),
+            "documents": get_document_stats(),
+            "embedding_cache": get_embedding_cache().get_stats()
         }
         
         try:
             if not self.client:
                 return stats
-                
-            # Get recipe collection stats
-            try:
-                recipe_count = self.recipe_collection.count()
-                stats["total_recipes"] = recipe_count
-                
-                # Count valid recipes (not expired)
-                if recipe_count > 0:
-                    # TTL is disabled - all recipes are valid
-                    stats["valid_recipes"] = recipe_count
-                    
-                    # Original TTL logic (commented out):
-                    # all_recipes = self.recipe_collection.get(include=['metadatas'])
-                    # valid_count = sum(
-                    #     1 for meta in all_recipes['metadatas']
-                    #     if meta and self._is_cache_valid(meta.get('cached_at', ''))
-                    # )
-                    # stats["valid_recipes"] = valid_count
-            except Exception as e:
-                logger.warning(f"Could not get recipe collection stats: {e}")
-                
-            # Get search collection stats
-            try:
-                search_count = self.search_collection.count()
-                stats["total_searches"] = search_count
-                
-                # Count valid searches (not expired)
-                if search_count > 0:
-                    # TTL is disabled - all searches are valid
-                    stats["valid_searches"] = search_count
-                    
-                    # Original TTL logic (commented out):
-                    # all_searches = self.search_collection.get(include=['metadatas'])
-                    # valid_count = sum(
-                    #     1 for meta in all_searches['metadatas']
-                    #     if meta and self._is_cache_valid(meta.get('cached_at', ''))
-                    # )
-                    # stats["valid_searches"] = valid_count
-            except Exception as e:
-                logger.warning(f"Could not get search collection stats: {e}")
-                
-            # Calculate cache size
-            try:
-                import os
-                cache_path = "./chroma_db"
-                if os.path.exists(cache_path):
-                    total_size = 0
-                    for dirpath, dirnames, filenames in os.walk(cache_path):
-                        for filename in filenames:
-                            filepath = os.path.join(dirpath, filename)
-                            if os.path.exists(filepath):
-                                total_size += os.path.getsize(filepath)
-                    stats["cache_size_mb"] = round(total_size / (1024 * 1024), 2)
-            except Exception as e:
-                logger.warning(f"Could not calculate cache size: {e}")
-                
+            
+            # Counts are maintained on write and the store size is sampled in the
+            # background (see cache_stats), so this never scans rows or walks the disk.
+            # TTL is disabled - every cached recipe and search is valid
+            stats["total_recipes"] = stats["valid_recipes"] = self.cache_statistics.count("recipes")
+            stats["total_searches"] = stats["valid_searches"] = self.cache_statistics.count("searches")
+            disk_bytes = self.cache_statistics.disk_size_bytes()
+            if disk_bytes is not None:
+                stats["cache_size_mb"] = round(disk_bytes / (1024 * 1024), 2)
+            
             # Calculate total valid entries
             stats["total_valid_entries"] = (
                 stats["valid_recipes"] + 
@@ -1736,11 +1793,7 @@ class RecipeCacheService:
                 (stats["total_recipes"] - stats["valid_recipes"]) +
                 (stats["total_searches"] - stats["valid_searches"])
             )
-            
-            # Get last cleanup time if available
-            cleanup_meta = self.client.get_collection("recipe_search_cache").get()
-            if cleanup_meta and cleanup_meta.get("last_cleanup"):
-                stats["last_cleanup"] = cleanup_meta["last_cleanup"]
+            stats["cache_statistics"] = self.cache_statistics.get_stats()
             
             return stats
             
@@ -1749,87 +1802,223 @@ class RecipeCacheService:
             return stats
 
     def get_recipe_count(self) -> Dict[str, Any]:
-        """Get the count of recipes in the cache"""
+        """Get the count of recipes in the cache (maintained on write, no row scan)"""
         try:
             if not self.client or not self.recipe_collection:
                 return {"total": 0, "valid": 0, "expired": 0}
-                
-            total_count = self.recipe_collection.count()
-            
-            # Count valid recipes (not expired)
-            valid_count = 0
-            if total_count > 0:
-                all_recipes = self.recipe_collection.get(include=['metadatas'])
-                valid_count = sum(
-                    1 for meta in all_recipes['metadatas']
-                    if meta and self._is_cache_valid(meta.get('cached_at', ''))
-                )
-            
-            expired_count = total_count - valid_count
             
+            # TTL is disabled - every cached recipe is valid
+            total_count = self.cache_statistics.count("recipes")
             return {
                 "total": total_count,
-                "valid": valid_count,
-                "expired": expired_count
+                "valid": total_count,
+                "expired": 0
             }
             
         except Exception as e:
             logger.error(f"Error getting recipe count: {e}")
             return {"total": 0, "valid": 0, "expired": 0}
 
+    def invalidate_corpus(self, reason: str = "") -> int:
+        """
+        Signal that recipe_details_cache changed so the in-process corpus is rebuilt.
+        Call this after writing to recipe_collection directly (imports, seeding, cleanup).
+        
+        Args:
+            reason: Short description of the write, for debug logging
+            
+        Returns:
+            int: The new corpus version
+        """
+        self.cache_statistics.mark_stale()
+        # A direct write may have skipped the filter fields; re-check before pushing down
+        self._filter_schema_state = (False, None, None)
+        return self.corpus.bump_version(reason)
+
+    def _publish_to_corpus(self, documents: List[str], reason: str = "", metadatas: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Apply freshly written recipe documents to the in-process corpus without a
+        full reload. Documents are parsed back so the snapshot holds exactly what a
+        reload from the store would produce.
+        
+        Args:
+            documents: JSON documents just upserted into recipe_collection
+            reason: Short description of the write, for debug logging
+            metadatas: Metadata written with each document, used for stored dietary flags
+            
+        Returns:
+            int: The new corpus version
+        """
+        if not documents:
+            return self.corpus.version
+        flag_store = get_diet_flag_store()
+        recipes = []
+        for i, recipe in enumerate(decode_documents(documents, metadatas)):
+            if recipe is not None:
+                flags = flags_from_metadata(metadatas[i] if metadatas and i < len(metadatas) else None)
+                if flags is not None:
+                    flag_store.set(recipe['id'], flags)
+                recipes.append(recipe)
+        if not recipes:
+            return self.corpus.bump_version(reason)
+        return self.corpus.apply_upserts(recipes, reason)
+
     def _get_all_recipes_from_cache(self, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Get all recipes from cache with optional filtering.
+        Unfiltered reads are served from the process-resident corpus snapshot; each
+        recipe is shallow-copied so search scoring can't leak into the snapshot.
+        """
+        if where is None:
+            return [dict(recipe) for recipe in self._get_corpus_snapshot()[1]]
+        return self._load_all_recipes_from_store(where)
+
+    def _get_corpus_snapshot(self, filters: Optional[Dict[str, Any]] = None):
+        """
+        Get all recipes along with the corpus snapshot version they came from.
+        
+        Args:
+            filters: Search filters; when the recipes come from the store, the
+                ones that can be pushed down limit which rows are read
+        
+        Returns:
+            Tuple of (version, recipes); version is None when the corpus is
+            disabled or unavailable and the recipes were loaded from the store
+            (then possibly only those the filters can match). Corpus recipes are
+            the shared snapshot itself: copy a recipe before modifying it
+        """
+        if CORPUS_ENABLED and self.client and self.recipe_collection:
+            return self.corpus.get_snapshot()
+        return None, self._load_all_recipes_from_store(self._store_where(filters))
+
+    def _store_where(self, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Where clause for a filtered store read, or None to read every row.
+        
+        Pushdown waits until every stored row carries the current filter schema
+        (scripts/migrate_filter_metadata.py); rows without it would be skipped.
+        The check is repeated after any write to the store (by this process,
+        another worker or a script) and every FILTER_SCHEMA_RECHECK_SECONDS,
+        so rows added without the filter fields turn pushdown back off.
+        """
+        if not FILTER_PUSHDOWN_ENABLED or not filters or not self.client or self.recipe_collection is None:
+            return None
+        generation = self.store_generation.read() if self.store_generation is not None else None
+        ready, checked_at, checked_generation = self._filter_schema_state
+        if (checked_at is None or generation != checked_generation
+                or time.time() - checked_at > FILTER_SCHEMA_RECHECK_SECONDS):
+            try:
+                ready = collection_migrated(self.recipe_collection)
+            except Exception as e:
+                logger.warning(f"Could not check the filter metadata schema: {e}")
+                ready = False
+            if not ready:
+                logger.info(f"Recipe store is not migrated to filter schema {FILTER_SCHEMA_VERSION}; "
+                            f"run scripts/migrate_filter_metadata.py to enable filter pushdown")
+            self._filter_schema_state = (ready, time.time(), generation)
+        if not ready:
+            return None
+        return compile_where(filters)
+
+    def _facet_filter_mask(self, corpus_version: Optional[int], filters: Dict[str, Any], validate_diets: bool) -> Optional[int]:
+        """
+        Evaluate the cuisine and dietary filters against the facet index.
+        
+        Args:
+            corpus_version: Snapshot version the recipe list came from
+            filters: Request filters (cuisine, cuisine_match, dietary_restrictions, dietary_match)
+            validate_diets: Re-check vegetarian/vegan tags against ingredients
+            
+        Returns:
+            Bitmap of snapshot positions passing the filters, or None when the
+            index can't be used and the per-recipe checks should run instead
+        """
+        if corpus_version is None or not FACET_INDEX_ENABLED:
+            return None
+        if not filters.get("cuisine") and not filters.get("dietary_restrictions"):
+            return None
+        return self.facet_index.filter_mask(
+            corpus_version,
+            cuisines=filters.get("cuisine"),
+            cuisine_match=filters.get("cuisine_match") or CUISINE_MATCH_PARTIAL,
+            any_diets=filters.get("dietary_restrictions"),
+            validate_diets=validate_diets,
+            all_diets=filters.get("dietary_restrictions") if self._requires_all_diets(filters) else None
+        )
+
+    @staticmethod
+    def _requires_all_diets(filters: Dict[str, Any]) -> bool:
+        """True when the caller asked for recipes matching every dietary restriction"""
+        return bool(filters.get("dietary_restrictions")) and filters.get("dietary_match") == "all"
+
+    def _within_mask(self, corpus_version: Optional[int], all_recipes: List[Dict[str, Any]], recipe_ids: List[str]) -> int:
+        """
+        Bitmap of the positions in `all_recipes` whose ids are in `recipe_ids`.
+        
+        Args:
+            corpus_version: Snapshot version the recipe list came from
+            all_recipes: The recipe list being searched
+            recipe_ids: Ids from a stored result set
+            
+        Returns:
+            int: Bitmap with one bit per matching position
+        """
+        positions = None
+        if corpus_version is not None:
+            positions = self.corpus.get_positions(corpus_version, recipe_ids)
+        if positions is None:
+            # Snapshot moved on (or no corpus): map ids over the list we hold
+            wanted = set(recipe_ids)
+            positions = [i for i, recipe in enumerate(all_recipes) if str(recipe.get('id')) in wanted]
+        bits = bytearray(b'0' * len(all_recipes))
+        for position in positions:
+            if position < len(bits):
+                bits[position] = ord('1')
+        return int(bits[::-1].decode() or '0', 2)
+
+    def _find_text_candidates(self, corpus_version: Optional[int], query_lower: str, ingredient_lower: str) -> Optional[List[int]]:
+        """
+        Use the trigram index to narrow a substring search to candidate positions.
+        
+        Args:
+            corpus_version: Snapshot version the recipe list came from
+            query_lower: Lowercased name search term (title/description)
+            ingredient_lower: Lowercased ingredient search term
+            
+        Returns:
+            Sorted positions into the snapshot list, or None to scan every recipe
+        """
+        if corpus_version is None or not TEXT_INDEX_ENABLED:
+            return None
+        
+        if query_lower and ingredient_lower:
+            # Combined search only includes recipes matching title or ingredients;
+            # description hits still add score during verification
+            lookups = [(query_lower, ('title',)), (ingredient_lower, ('ingredients',))]
+        elif ingredient_lower:
+            lookups = [(ingredient_lower, ('ingredients',))]
+        else:
+            lookups = [(query_lower, ('title', 'description'))]
+        
+        positions = set()
+        for term, fields in lookups:
+            found = self.text_index.candidates(corpus_version, term, fields)
+            if found is None:
+                return None
+            positions.update(found)
+        return sorted(positions)
+
+    def _load_all_recipes_from_store(self, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Read and parse every recipe from the store with optional filtering.
         Works with both ChromaDB and the in-memory fallback collection.
         """
         try:
             # Fallback in-memory path (no Chroma client)
             if not self.client and hasattr(self, 'recipe_collection') and self.recipe_collection is not None and hasattr(self.recipe_collection, 'recipes'):
-                all_recipes = []
-                for entry in self.recipe_collection.recipes.values():
-                    try:
-                        meta = entry.get('metadata', {}) if isinstance(entry, dict) else {}
-                        doc = entry.get('document', '') if isinstance(entry, dict) else ''
-                        recipe = None
-                        # If document is a JSON string, try to parse it
-                        if isinstance(doc, str) and doc.strip().startswith('{'):
-                            try:
-                                recipe = json.loads(doc)
-                                # Extract actual recipe data from nested structure
-                                if 'data' in recipe and isinstance(recipe['data'], dict):
-                                    recipe = recipe['data']
-                                    # Merge in any additional fields from the top level
-                                    if 'id' in recipe and 'id' not in recipe:
-                                        recipe['id'] = recipe.get('id')
-                                    if 'source' in recipe and 'source' not in recipe:
-                                        recipe['source'] = recipe.get('source')
-                            except Exception:
-                                recipe = None
-                        # Otherwise, construct a minimal recipe from metadata/title
-                        if recipe is None:
-                            title = meta.get('title') or meta.get('name') or meta.get('strMeal') or str(doc) or 'Recipe'
-                            rid = meta.get('id') or meta.get('_id') or meta.get('idMeal') or entry.get('id')
-                            if rid is None:
-                                rid = str(hash(title))
-                            cuisines = meta.get('cuisines') or []
-                            if not cuisines and meta.get('cuisine'):
-                                cuisines = [meta.get('cuisine')]
-                            if not cuisines and meta.get('strArea'):
-                                cuisines = [str(meta.get('strArea')).lower()]
-                            ingredients = meta.get('ingredients') or []
-                            instructions = meta.get('instructions') or []
-                            recipe = {
-                                'id': str(rid),
-                                'title': title,
-                                'ingredients': ingredients if isinstance(ingredients, list) else [],
-                                'instructions': instructions if isinstance(instructions, list) else ([instructions] if isinstance(instructions, str) else []),
-                                'cuisines': cuisines if isinstance(cuisines, list) else ([cuisines] if cuisines else []),
-                                'diets': meta.get('diets') or meta.get('dietary_restrictions') or []
-                            }
-                        all_recipes.append(recipe)
-                    except Exception as e:
-                        logger.debug(f"Skipping invalid fallback entry: {e}")
-                        continue
-                return all_recipes
+                entries = [e for e in self.recipe_collection.recipes.values() if isinstance(e, dict)]
+                recipes = decode_documents([e.get('document', '') for e in entries],
+                                           [e.get('metadata', {}) for e in entries],
+                                           [e.get('id') for e in entries], from_metadata=True)
+                return [recipe for recipe in recipes if recipe is not None]
 
             if not self.client or not self.recipe_collection:
                 logger.warning("ChromaDB collections not initialized")
@@ -1909,48 +2098,23 @@ class RecipeCacheService:
                     limit=1000
                 )
             
+            record_store_read(where, len(recipe_results.get('documents') or []))
             if not recipe_results.get('documents'):
                 return []
             
             # Process results
             all_recipes = []
             seen_ids = set()
+            stored_diet_flags = {}
             
-            for i, doc in enumerate(recipe_results['documents']):
+            metadatas = recipe_results.get('metadatas') or []
+            # One json.loads per schema v2 row; older shapes go through the legacy decoder
+            decoded = decode_documents(recipe_results['documents'], metadatas)
+            for i, recipe_data in enumerate(decoded):
                 try:
-                    # Skip empty or invalid documents
-                    if not doc or not isinstance(doc, (str, dict)):
+                    if recipe_data is None:
                         continue
-                        
-                    # Parse JSON if needed
-                    if isinstance(doc, str):
-                        try:
-                            doc = doc.strip()
-                            if not doc:  # Skip empty strings
-                                continue
-                            recipe = json.loads(doc)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Error decoding recipe JSON at index {i}: {e}")
-                            continue
-                    else:
-                        recipe = doc
-                        
-                    # Validate recipe structure
-                    if not isinstance(recipe, dict) or not recipe.get('id'):
-                        continue
-                        
-                    metadata = recipe_results['metadatas'][i] if i < len(recipe_results['metadatas']) else {}
-                    
-                    # Extract actual recipe data from nested structure
-                    recipe_data = recipe
-                    if 'data' in recipe and isinstance(recipe['data'], dict):
-                        # The actual recipe data is in the 'data' field
-                        recipe_data = recipe['data']
-                        # Merge in any additional fields from the top level
-                        if 'id' in recipe and 'id' not in recipe_data:
-                            recipe_data['id'] = recipe['id']
-                        if 'source' in recipe and 'source' not in recipe_data:
-                            recipe_data['source'] = recipe['source']
+                    metadata = metadatas[i] if i < len(metadatas) else {}
                     
                     recipe_id = recipe_data.get('id')
                     if not recipe_id or recipe_id in seen_ids:
@@ -1958,18 +2122,46 @@ class RecipeCacheService:
                     
                     all_recipes.append(recipe_data)
                     seen_ids.add(recipe_id)
+                    flags = flags_from_metadata(metadata)
+                    if flags is not None:
+                        stored_diet_flags[str(recipe_id)] = flags
                     
                 except Exception as e:
                     logger.error(f"Unexpected error processing recipe at index {i}: {e}", exc_info=True)
                     continue
             
+            if where is None:
+                get_diet_flag_store().replace_all(stored_diet_flags)
+            
             logger.info(f"Retrieved {len(all_recipes)} recipes from cache")
             return all_recipes
                 
         except Exception as e:
-            logger.error(f"Error in _get_all_recipes_from_cache: {e}")
+            logger.error(f"Error in _load_all_recipes_from_store: {e}")
             return [] 
 
+    @staticmethod
+    def _unwrap_recipe_document(recipe: Any) -> Optional[Dict[str, Any]]:
+        """
+        Return the recipe data from a parsed document, unwrapping the nested
+        {"data": {...}} shape. Returns None for documents without a top-level id.
+        """
+        if not isinstance(recipe, dict):
+            return None
+        return decode_legacy_document(recipe)
+
+    @staticmethod
+    def _decode_stored_recipe(recipe: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Flat recipe for a parsed document: schema v2 rows as stored, older rows
+        unwrapped while RECIPE_LEGACY_DOCUMENTS is on (None once it's off).
+        """
+        if is_current(metadata):
+            return recipe
+        if not LEGACY_DOCUMENTS_ENABLED:
+            return None
+        return decode_legacy_document(recipe) or recipe
+
     def _expand_cuisine_filter(self, cuisine_filter):
         """
         FIXED: Return exact cuisine matches only, no auto-expansion.
@@ -1991,136 +2183,14 @@ class RecipeCacheService:
 
     def _is_recipe_vegetarian_by_ingredients(self, recipe):
         """
-        FIXED: Robust vegetarian detection that properly catches meat in ingredients and names
+        Whether a recipe is vegetarian, from its stored dietary flags or the
+        shared dietary classifier (word-boundary match, so "chickpea" is not meat)
         """
-        # Comprehensive meat indicators that would make a recipe non-vegetarian
-        meat_indicators = [
-            'chicken', 'beef', 'pork', 'lamb', 'fish', 'salmon', 'tuna', 'shrimp', 'prawn', 
-            'meat', 'bacon', 'ham', 'sausage', 'turkey', 'duck', 'goose', 'venison', 
-            'rabbit', 'quail', 'pheasant', 'veal', 'mackerel', 'haddock', 'clam', 'oyster',
-            'mussel', 'scallop', 'crab', 'lobster', 'anchovy', 'sardine', 'trout', 'cod',
-            'halibut', 'sea bass', 'tilapia', 'catfish', 'swordfish', 'mahi mahi',
-            'steak', 'burger', 'hot dog', 'hotdog', 'pepperoni', 'salami', 'prosciutto',
-            'chorizo', 'pastrami', 'corned beef', 'roast beef', 'ground beef', 'mince',
-            'liver', 'kidney', 'heart', 'tongue', 'tripe', 'oxtail', 'short ribs',
-            'ribeye', 'sirloin', 'tenderloin', 'brisket', 'flank', 'skirt steak',
-            'lamb chops', 'lamb shank', 'pork chops', 'pork belly', 'pork shoulder',
-            'chicken breast', 'chicken thigh', 'chicken wing', 'chicken leg', 'chicken drumstick',
-            'fish fillet', 'fish steak', 'fish cake', 'fish ball', 'fish sauce',
-            'anchovy paste', 'fish stock', 'chicken stock', 'beef stock', 'meat stock',
-            'bone broth', 'chicken broth', 'beef broth', 'meat broth'
-        ]
-        
-        # Get recipe name/title for checking
-        recipe_name = ''
-        if recipe.get('title'):
-            recipe_name = str(recipe['title']).lower()
-        elif recipe.get('name'):
-            recipe_name = str(recipe['name']).lower()
-        
-        # Get ingredients from various possible fields
-        ingredients = []
-        
-        # Check ingredients array
-        if recipe.get('ingredients') and isinstance(recipe['ingredients'], list):
-            for ing in recipe['ingredients']:
-                if isinstance(ing, dict) and 'name' in ing:
-                    ingredients.append(str(ing['name']).lower())
-                elif isinstance(ing, str):
-                    ingredients.append(ing.lower())
-        
-        # Check extendedIngredients array (Spoonacular format)
-        if recipe.get('extendedIngredients') and isinstance(recipe['extendedIngredients'], list):
-            for ing in recipe['extendedIngredients']:
-                if isinstance(ing, dict) and 'name' in ing:
-                    ingredients.append(str(ing['name']).lower())
-        
-        # Check instructions for any meat mentions
-        instructions = recipe.get('instructions', '')
-        if isinstance(instructions, list):
-            instructions = ' '.join(str(step) for step in instructions)
-        instructions = str(instructions).lower()
-        
-        # Combine all text for checking - prioritize recipe name and ingredients
-        all_text = recipe_name + ' ' + ' '.join(ingredients) + ' ' + instructions
-        
-        # IMPROVED: Use word boundary checking to avoid false positives
-        # This prevents "chicken" from matching "chickpea" or "chickenpox"
-        import re
-        
-        # Check for meat indicators with word boundaries
-        for meat in meat_indicators:
-            # Use word boundary regex to match whole words only
-            pattern = r'\b' + re.escape(meat) + r'\b'
-            if re.search(pattern, all_text):
-                logger.debug(f"❌ Meat detected in recipe '{recipe_name}': {meat}")
-                return False
-        
-        # ADDITIONAL SAFETY CHECK: Look for common meat-containing recipe patterns
-        meat_patterns = [
-            r'\bchicken\s+\w+',  # chicken parmesan, chicken marsala, etc.
-            r'\bbeef\s+\w+',      # beef stew, beef stroganoff, etc.
-            r'\bpork\s+\w+',      # pork chops, pork belly, etc.
-            r'\bfish\s+\w+',      # fish tacos, fish curry, etc.
-            r'\bsteak\s+\w+',     # steak fajitas, steak salad, etc.
-            r'\bmeat\s+\w+',      # meat sauce, meat pie, etc.
-        ]
-        
-        for pattern in meat_patterns:
-            if re.search(pattern, all_text):
-                logger.debug(f"❌ Meat pattern detected in recipe '{recipe_name}': {pattern}")
-                return False
-        
-        logger.debug(f"✅ Recipe '{recipe_name}' passed vegetarian check")
-        return True
+        return get_diet_flags(recipe)[0]
 
     def _is_recipe_vegan_by_ingredients(self, recipe):
         """
-        Check if a recipe is vegan by analyzing its ingredients
+        Whether a recipe is vegan, from its stored dietary flags or the shared
+        dietary classifier
         """
-        # Animal product indicators that would make a recipe non-vegan
-        animal_indicators = [
-            'milk', 'cheese', 'butter', 'cream', 'egg', 'yogurt', 'honey', 'gelatin', 
-            'lard', 'tallow', 'whey', 'casein', 'parmesan', 'pecorino', 'mascarpone', 
-            'creme fraiche', 'sour cream', 'condensed milk', 'evaporated milk', 'half and half',
-            'heavy cream', 'light cream', 'whipping cream', 'buttermilk', 'kefir', 'cottage cheese',
-            'ricotta', 'mozzarella', 'cheddar', 'gouda', 'brie', 'camembert', 'feta', 'blue cheese',
-            'goat cheese', 'cream cheese', 'american cheese', 'provolone', 'swiss cheese'
-        ]
-        
-        # First check if it's vegetarian
-        if not self._is_recipe_vegetarian_by_ingredients(recipe):
-            return False
-        
-        # Get ingredients from various possible fields
-        ingredients = []
-        
-        # Check ingredients array
-        if recipe.get('ingredients') and isinstance(recipe['ingredients'], list):
-            for ing in recipe['ingredients']:
-                if isinstance(ing, dict) and 'name' in ing:
-                    ingredients.append(str(ing['name']).lower())
-                elif isinstance(ing, str):
-                    ingredients.append(ing.lower())
-        
-        # Check extendedIngredients array (Spoonacular format)
-        if recipe.get('extendedIngredients') and isinstance(recipe['extendedIngredients'], list):
-            for ing in recipe['extendedIngredients']:
-                if isinstance(ing, dict) and 'name' in ing:
-                    ingredients.append(str(ing['name']).lower())
-        
-        # Check instructions for any animal product mentions
-        instructions = recipe.get('instructions', '')
-        if isinstance(instructions, list):
-            instructions = ' '.join(str(step) for step in instructions)
-        instructions = str(instructions).lower()
-        
-        # Combine all text for checking
-        all_text = ' '.join(ingredients) + ' ' + instructions
-        
-        # Check for animal product indicators
-        for animal in animal_indicators:
-            if animal in all_text:
-                return False
-        
-        return True
+        return get_diet_flags(recipe)[1]
@@ -0,0 +1,179 @@
+"""
+Compact in-memory recipe records for the corpus snapshot.
+
+Each stored document is parsed on its own, so every corpus recipe carries its
+own copies of the dict keys ("id", "title", "ingredients", ...), of cuisine
+and diet names, of units and of common ingredient names. With one snapshot per
+worker that duplication is paid once per worker.
+
+RecipeCompactor rebuilds each recipe with the same shape and values, but
+every key and every short string or number comes from a shared vocabulary, so
+identical values are stored once per process. Records stay plain dicts, which
+the corpus indexes (text, facets, JSON passthrough, query cache) and every
+caller of the read path rely on, so nothing has to convert them back.
+
+Only immutable values are shared. Lists and dicts are still rebuilt per
+recipe, so code that edits a copied recipe can't leak into other recipes.
+"""
+
+import os
+import sys
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPACT_RECIPES_ENABLED = os.environ.get('RECIPE_CORPUS_COMPACT', 'true').lower() == 'true'
+# Longer strings (instructions, descriptions, URLs) are rarely repeated
+COMPACT_MAX_STRING_LENGTH = int(os.environ.get('RECIPE_CORPUS_COMPACT_MAX_LENGTH', '64'))
+
+# Vocabularies reported separately in the stats; everything else goes in "values"
+VOCABULARY_FIELDS = {
+    'cuisines': 'cuisines',
+    'cuisine': 'cuisines',
+    'diets': 'diets',
+    'dietary_restrictions': 'diets',
+    'dietaryRestrictions': 'diets',
+    'tags': 'tags',
+    'dish_types': 'dish_types',
+    'dishTypes': 'dish_types',
+}
+INGREDIENT_VOCABULARIES = {
+    'name': 'ingredients',
+    'unit': 'units',
+}
+
+
+class RecipeCompactor:
+    """Shared vocabularies for the recipes of one corpus snapshot"""
+
+    def __init__(self, max_string_length: int = COMPACT_MAX_STRING_LENGTH):
+        self._lock = threading.Lock()
+        self.max_string_length = max_string_length
+        self._values: Dict[Any, Any] = {}
+        self._vocabularies: Dict[str, set] = {
+            'keys': set(), 'cuisines': set(), 'diets': set(), 'tags': set(),
+            'dish_types': set(), 'ingredients': set(), 'units': set(),
+        }
+        self._stats = {"recipes": 0, "shared_values": 0}
+
+    def compact(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rebuild a recipe so its keys and short values come from the shared vocabularies.
+
+        Args:
+            recipe: Parsed recipe dict
+
+        Returns:
+            Dict equal to `recipe` (same keys, order and values)
+        """
+        with self._lock:
+            self._stats["recipes"] += 1
+            return self._compact_dict(recipe, None)
+
+    def compact_all(self, recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Compact a list of recipes, leaving anything that isn't a dict as it is"""
+        with self._lock:
+            compacted = []
+            for recipe in recipes:
+                if isinstance(recipe, dict):
+                    self._stats["recipes"] += 1
+                    recipe = self._compact_dict(recipe, None)
+                compacted.append(recipe)
+            return compacted
+
+    def _compact_dict(self, value: Dict[Any, Any], vocabulary: Optional[str]) -> Dict[Any, Any]:
+        compacted = {}
+        ingredient_list = vocabulary == 'ingredient_entries'
+        for key, item in value.items():
+            if isinstance(key, str):
+                key = self._share(key, 'keys')
+            if ingredient_list:
+                item_vocabulary = INGREDIENT_VOCABULARIES.get(key)
+            else:
+                item_vocabulary = VOCABULARY_FIELDS.get(key)
+                if key == 'ingredients' or key == 'extendedIngredients':
+                    item_vocabulary = 'ingredient_entries'
+            compacted[key] = self._compact_value(item, item_vocabulary)
+        return compacted
+
+    def _compact_value(self, value: Any, vocabulary: Optional[str]) -> Any:
+        if isinstance(value, str):
+            if len(value) > self.max_string_length:
+                return value
+            return self._share(value, vocabulary)
+        if isinstance(value, dict):
+            return self._compact_dict(value, vocabulary)
+        if isinstance(value, list):
+            # Ingredient lists may also hold plain names
+            item_vocabulary = 'ingredients' if vocabulary == 'ingredient_entries' else vocabulary
+            return [
+                self._compact_dict(item, vocabulary) if isinstance(item, dict)
+                else self._compact_value(item, item_vocabulary)
+                for item in value
+            ]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Keyed by type so 1 and 1.0 stay distinct
+            return self._share_number(value)
+        return value
+
+    def _share(self, value: str, vocabulary: Optional[str]) -> str:
+        shared = self._values.get(value)
+        if shared is None:
+            self._values[value] = shared = value
+        else:
+            self._stats["shared_values"] += 1
+        if vocabulary in self._vocabularies:
+            self._vocabularies[vocabulary].add(shared)
+        return shared
+
+    def _share_number(self, value: Any) -> Any:
+        key = (type(value), value)
+        shared = self._values.get(key)
+        if shared is None:
+            self._values[key] = shared = value
+        else:
+            self._stats["shared_values"] += 1
+        return shared
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return vocabulary sizes and how many values were shared"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["enabled"] = COMPACT_RECIPES_ENABLED
+            stats["vocabulary_sizes"] = {name: len(values) for name, values in self._vocabularies.items()}
+            stats["distinct_values"] = len(self._values)
+        return stats
+
+
+def deep_sizeof(value: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate memory held by a value and everything it references.
+
+    Objects reachable more than once (shared strings, numbers) are counted once,
+    so the result reflects what sharing actually saves.
+    """
+    if seen is None:
+        seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+def bytes_per_recipe(recipes: List[Dict[str, Any]]) -> float:
+    """Average deep size of a recipe list"""
+    if not recipes:
+        return 0.0
+    return deep_sizeof(recipes) / len(recipes)
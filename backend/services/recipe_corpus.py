@@ -0,0 +1,685 @@
+"""
+Process-resident recipe corpus.
+
+Keeps one parsed copy of the recipe_details_cache collection in memory so that
+searches don't page through ChromaDB and json.loads every document per request.
+Writers bump a version counter; the snapshot is then rebuilt in a background
+thread while readers keep being served the previous snapshot. Writers that
+already hold the parsed recipe can apply it directly with apply_upserts().
+
+Derived indexes (text search, facets, ...) register with register_index() and
+are kept in step with the snapshot. An index must provide:
+    build(version, recipes)     - full rebuild from the snapshot list
+    apply_upserts(version, changes) - changes is a list of (position, recipe)
+Positions are indexes into the snapshot list, which only ever grows or has
+entries replaced in place, so they stay valid across incremental updates.
+Index callbacks run outside the corpus lock, one writer at a time; an index
+only answers for the snapshot version it was last given, so readers never
+mix an index with a snapshot it doesn't match.
+
+Upserts that arrive while a rebuild is loading the store are recorded and
+replayed on the rebuilt snapshot (and its indexes) before it is published.
+
+Recipes are compacted on the way in (see recipe_compact): keys and short
+values are shared across the snapshot instead of stored once per recipe.
+
+With a snapshot file set (see corpus_snapshot), the first load in a process
+comes from that file instead of the store. Indexes that also provide
+    export_state(version)                  - picklable copy of their state, or None
+    restore_state(version, recipes, state) - True if the state was taken over
+are restored from it instead of rebuilt. The file is rewritten after each change.
+
+Other processes (gunicorn workers, scripts) write to the same store. With a
+store generation set (see store_generation), every write made here bumps the
+shared counter, and reads notice within STORE_GENERATION_CHECK_SECONDS when
+another process moved it; the corpus then rebuilds as if bump_version had been
+called, and change listeners reset their own per-process state.
+"""
+
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .recipe_compact import RecipeCompactor, COMPACT_RECIPES_ENABLED
+    from .corpus_snapshot import CorpusSnapshotFile, SNAPSHOT_WRITE_DELAY_SECONDS, SNAPSHOT_BOOT_BUDGET_MS
+    from .store_generation import StoreGeneration, STORE_GENERATION_CHECK_SECONDS
+except ImportError:
+    from recipe_compact import RecipeCompactor, COMPACT_RECIPES_ENABLED
+    from corpus_snapshot import CorpusSnapshotFile, SNAPSHOT_WRITE_DELAY_SECONDS, SNAPSHOT_BOOT_BUDGET_MS
+    from store_generation import StoreGeneration, STORE_GENERATION_CHECK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Debounce window so bulk writers (restores, imports) trigger one rebuild, not hundreds
+REBUILD_DELAY_SECONDS = float(os.environ.get('RECIPE_CORPUS_REBUILD_DELAY', '0.5'))
+CORPUS_ENABLED = os.environ.get('RECIPE_CORPUS_ENABLED', 'true').lower() == 'true'
+
+
+class RecipeCorpus:
+    """Versioned, read-only snapshot of every cached recipe.
+
+    The snapshot list and id map are never mutated after they are published;
+    a rebuild builds new ones and swaps the references. Callers that need to
+    modify recipes must copy them first (see RecipeCacheService._get_all_recipes_from_cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializes incremental updates and rebuild publishing (index callbacks run under it)
+        self._write_lock = threading.Lock()
+        # Upserts recorded while a rebuild loads the store, replayed before it publishes
+        self._rebuild_upserts: Optional[List[List[Dict[str, Any]]]] = None
+        # Last version bumped without the changed recipes (bump_version)
+        self._bumped_version = 0
+        self._loader: Optional[Callable[[], List[Dict[str, Any]]]] = None
+        self._version = 0
+        self._snapshot_version = -1
+        self._recipes: Optional[List[Dict[str, Any]]] = None
+        self._positions: Dict[str, int] = {}
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._indexes: List[Any] = []
+        self._compactor: Optional[RecipeCompactor] = None
+        self._snapshot_file: Optional[CorpusSnapshotFile] = None
+        self._store_count: Optional[Callable[[], Optional[int]]] = None
+        self._snapshot_states: List[Any] = []
+        self._snapshot_write_thread: Optional[threading.Thread] = None
+        self._store_generation: Optional[StoreGeneration] = None
+        # Store generation the published (or loading) snapshot includes
+        self._seen_generation: Optional[int] = None
+        self._generation_checked_at = 0.0
+        self._change_listeners: List[Callable[[], Any]] = []
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "rebuilds": 0,
+            "rebuild_failures": 0,
+            "incremental_updates": 0,
+            "last_rebuild_ms": 0.0,
+            "total_rebuild_ms": 0.0,
+            "last_rebuild_at": None,
+            "snapshot_file_loads": 0,
+            "last_snapshot_file_load_ms": 0.0,
+            "external_changes": 0,
+        }
+
+    def set_loader(self, loader: Callable[[], List[Dict[str, Any]]]) -> None:
+        """Register the function that reads and parses the full collection.
+
+        Every RecipeCacheService shares the same ChromaDB singleton, so the first
+        registered loader is kept.
+        """
+        with self._lock:
+            if self._loader is None:
+                self._loader = loader
+
+    def set_snapshot_file(self, snapshot_file: CorpusSnapshotFile,
+                          store_count: Optional[Callable[[], Optional[int]]] = None) -> None:
+        """Boot from and keep writing a snapshot file; the first one set is kept.
+
+        Args:
+            snapshot_file: File to load at boot and rewrite after changes
+            store_count: Returns the number of recipes in the store, used to
+                reject a file that no longer matches it
+        """
+        with self._lock:
+            if self._snapshot_file is None:
+                self._snapshot_file = snapshot_file
+                self._store_count = store_count
+
+    def set_store_generation(self, generation: StoreGeneration) -> None:
+        """Share store writes with other processes through `generation`; the first one set is kept"""
+        with self._lock:
+            if self._store_generation is None:
+                self._store_generation = generation
+
+    def register_change_listener(self, listener: Callable[[], Any]) -> None:
+        """Call `listener` (no arguments) when another process is found to have written to the store"""
+        with self._lock:
+            if listener not in self._change_listeners:
+                self._change_listeners.append(listener)
+
+    def register_snapshot_state(self, holder: Any) -> None:
+        """Save and restore a non-index component (export_state/restore_state) with the snapshot file"""
+        with self._lock:
+            if holder not in self._snapshot_states:
+                self._snapshot_states.append(holder)
+
+    def register_index(self, index: Any) -> None:
+        """Register a derived index; it is built now if a snapshot already exists"""
+        with self._lock:
+            if index in self._indexes:
+                return
+            self._indexes.append(index)
+            recipes = self._recipes
+            version = self._snapshot_version
+        if recipes is not None:
+            self._build_index(index, version, recipes)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def snapshot_version(self) -> int:
+        return self._snapshot_version
+
+    def bump_version(self, reason: str = "") -> int:
+        """Mark the corpus as changed and schedule a background rebuild.
+
+        Args:
+            reason: Short description of the write, used for debug logging
+
+        Returns:
+            The new corpus version
+        """
+        with self._lock:
+            self._version += 1
+            version = self._version
+            self._bumped_version = version
+            has_snapshot = self._recipes is not None
+            snapshot_file = self._snapshot_file
+        if snapshot_file is not None:
+            # The store changed under the file; never boot from it again
+            snapshot_file.invalidate()
+        # Rebuilding anyway, so a write by another process needs no extra handling
+        self._record_store_write()
+        logger.debug(f"Recipe corpus version bumped to {version} ({reason or 'unspecified'})")
+        # Nothing to refresh until somebody has asked for the corpus
+        if has_snapshot:
+            self._schedule_rebuild()
+        return version
+
+    def get_recipes(self) -> List[Dict[str, Any]]:
+        """Return the current snapshot, loading it synchronously on first use"""
+        return self.get_snapshot()[1]
+
+    def get_snapshot(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (snapshot_version, recipes), loading synchronously on first use.
+
+        The version identifies the exact list returned, so callers can check that
+        a derived index was built from the same snapshot before using it.
+        """
+        self._check_store_generation()
+        with self._lock:
+            recipes = self._recipes
+            version = self._snapshot_version
+            if recipes is None:
+                self._stats["misses"] += 1
+            elif version == self._version:
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale_hits"] += 1
+        if recipes is None:
+            self.rebuild()
+            with self._lock:
+                return self._snapshot_version, self._recipes or []
+        if version != self._version:
+            # Serve the previous snapshot while the new one is built
+            self._schedule_rebuild()
+        return version, recipes
+
+    def get_recipe(self, recipe_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a single recipe in the snapshot (None if not loaded or missing)"""
+        self._check_store_generation()
+        with self._lock:
+            recipes = self._recipes
+            position = self._positions.get(str(recipe_id))
+        if recipes is None or position is None:
+            return None
+        return recipes[position]
+
+    def get_positions(self, version: int, recipe_ids: List[str]) -> Optional[List[int]]:
+        """Snapshot positions of the given ids, skipping unknown ones.
+
+        Returns None if `version` is no longer the published snapshot, since
+        positions are only meaningful for the list the caller is holding.
+        """
+        with self._lock:
+            if version != self._snapshot_version or self._recipes is None:
+                return None
+            positions = self._positions
+        return [positions[rid] for rid in recipe_ids if rid in positions]
+
+    def apply_upserts(self, recipes: List[Dict[str, Any]], reason: str = "") -> int:
+        """Publish already-parsed recipes without reloading the whole store.
+
+        Existing ids are replaced in place and new ids are appended, matching the
+        order a full reload would produce. The snapshot list is copied rather than
+        mutated so readers holding the previous list are unaffected.
+
+        Args:
+            recipes: Parsed recipe dicts exactly as they were written to the store
+            reason: Short description of the write, used for debug logging
+
+        Returns:
+            The new corpus version
+        """
+        with self._write_lock:
+            with self._lock:
+                self._version += 1
+                version = self._version
+                snapshot_file = self._snapshot_file
+                if self._rebuild_upserts is not None:
+                    # A rebuild is loading the store; it replays these on its snapshot
+                    self._rebuild_upserts.append(list(recipes))
+                current = self._recipes
+                base_positions = self._positions
+                # Only advance the snapshot if it was current; otherwise a full
+                # rebuild is already owed and will include these recipes
+                was_current = self._snapshot_version == version - 1
+                published_version = version if was_current else self._snapshot_version
+                compactor = self._compactor
+                indexes = list(self._indexes)
+            if snapshot_file is not None:
+                snapshot_file.invalidate()
+            if current is None:
+                # Not loaded yet; the first read will pick the write up
+                self._record_store_write()
+                return version
+
+            updated, positions, changes = self._merge_upserts(current, base_positions, recipes, compactor)
+            self._update_indexes(indexes, published_version, changes)
+            with self._lock:
+                self._recipes = updated
+                self._positions = positions
+                if was_current:
+                    self._snapshot_version = version
+                self._stats["incremental_updates"] += 1
+
+        logger.debug(f"Recipe corpus v{version}: applied {len(changes)} upserts ({reason or 'unspecified'})")
+        if self._record_store_write():
+            # Another process wrote since our snapshot; the upserts alone don't cover it
+            self._store_changed_elsewhere()
+        elif not was_current:
+            self._schedule_rebuild()
+        else:
+            self._schedule_snapshot_write()
+        return version
+
+    def _record_store_write(self) -> bool:
+        """
+        Bump the shared store generation for a write made by this process.
+
+        Returns:
+            bool: True if another process wrote since the generation this
+            process last saw (its write isn't in our snapshot)
+        """
+        generation = self._store_generation
+        if generation is None:
+            return False
+        previous, new = generation.bump()
+        with self._lock:
+            external = self._seen_generation is not None and previous != self._seen_generation
+            if self._seen_generation is not None:
+                self._seen_generation = new
+        return external
+
+    def _check_store_generation(self) -> None:
+        """Reload if another process wrote to the store (checked at most every STORE_GENERATION_CHECK_SECONDS)"""
+        generation = self._store_generation
+        if generation is None or self._seen_generation is None:
+            return
+        now = time.monotonic()
+        if now - self._generation_checked_at < STORE_GENERATION_CHECK_SECONDS:
+            return
+        self._generation_checked_at = now
+        current = generation.read()
+        with self._lock:
+            if self._seen_generation is None or current == self._seen_generation:
+                return
+            self._seen_generation = current
+        self._store_changed_elsewhere()
+
+    def _store_changed_elsewhere(self) -> None:
+        """Rebuild from the store and notify the change listeners after another process wrote to it"""
+        with self._lock:
+            self._version += 1
+            version = self._version
+            self._bumped_version = version
+            self._stats["external_changes"] += 1
+            has_snapshot = self._recipes is not None
+            listeners = list(self._change_listeners)
+        logger.info(f"Recipe store changed by another process; corpus v{version} will be reloaded")
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Recipe corpus change listener failed: {e}")
+        if has_snapshot:
+            self._schedule_rebuild()
+
+    @staticmethod
+    def _merge_upserts(current: List[Dict[str, Any]], current_positions: Dict[str, int],
+                       recipes: List[Dict[str, Any]], compactor: Optional[RecipeCompactor]):
+        """Copy of (recipes, positions) with `recipes` replaced or appended, plus the (position, recipe) changes"""
+        updated = list(current)
+        positions = dict(current_positions)
+        changes = []
+        for recipe in recipes:
+            if not isinstance(recipe, dict) or not recipe.get('id'):
+                continue
+            if compactor is not None:
+                recipe = compactor.compact(recipe)
+            recipe_id = str(recipe['id'])
+            position = positions.get(recipe_id)
+            if position is None:
+                position = len(updated)
+                positions[recipe_id] = position
+                updated.append(recipe)
+            else:
+                updated[position] = recipe
+            changes.append((position, recipe))
+        return updated, positions, changes
+
+    @staticmethod
+    def _update_indexes(indexes: List[Any], version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Run every index's apply_upserts, logging instead of raising"""
+        if not changes:
+            return
+        for index in indexes:
+            try:
+                index.apply_upserts(version, changes)
+            except Exception as e:
+                logger.warning(f"Recipe corpus index update failed: {e}")
+
+    def rebuild(self) -> bool:
+        """Reload the corpus from the store and publish a new snapshot.
+
+        Returns:
+            bool: True if a snapshot was published, False otherwise
+        """
+        loader = self._loader
+        if loader is None:
+            logger.warning("Recipe corpus has no loader registered")
+            return False
+
+        # Capture the version first so writes during the load trigger another pass
+        target_version = self._version
+        if self._recipes is None and self._load_snapshot_file(target_version):
+            return True
+        # Read before loading: writes by other processes from here on are checked again
+        store_generation = self._store_generation.read() if self._store_generation is not None else None
+        with self._lock:
+            target_version = self._version
+            recorded: List[List[Dict[str, Any]]] = []
+            self._rebuild_upserts = recorded
+            if store_generation is not None:
+                self._seen_generation = store_generation
+        try:
+            return self._rebuild(loader, target_version, recorded)
+        finally:
+            with self._lock:
+                if self._rebuild_upserts is recorded:
+                    self._rebuild_upserts = None
+
+    def _rebuild(self, loader: Callable[[], List[Dict[str, Any]]], target_version: int,
+                 recorded: List[List[Dict[str, Any]]]) -> bool:
+        """Load, index and publish one rebuild; upserts appended to `recorded` meanwhile are replayed"""
+        started = time.perf_counter()
+        try:
+            recipes = loader()
+        except Exception as e:
+            with self._lock:
+                self._stats["rebuild_failures"] += 1
+            logger.error(f"Recipe corpus rebuild failed: {e}")
+            return False
+
+        compactor = None
+        if COMPACT_RECIPES_ENABLED:
+            # A fresh vocabulary per rebuild, so values of deleted recipes aren't kept alive
+            compactor = RecipeCompactor()
+            recipes = compactor.compact_all(recipes)
+
+        positions = {}
+        for position, recipe in enumerate(recipes):
+            if isinstance(recipe, dict) and recipe.get('id'):
+                positions.setdefault(str(recipe['id']), position)
+
+        with self._lock:
+            indexes = list(self._indexes)
+        # Build derived indexes before publishing so they are ready with the snapshot
+        for index in indexes:
+            self._build_index(index, target_version, recipes)
+
+        with self._write_lock:
+            with self._lock:
+                replay = [recipe for batch in recorded for recipe in batch]
+                self._rebuild_upserts = None
+                # Every write since the load started was an upsert we now replay,
+                # unless one was only a version bump
+                publish_version = self._version if self._bumped_version <= target_version else target_version
+            if replay:
+                # Written to the store during the load; the loaded rows may predate them
+                recipes, positions, changes = self._merge_upserts(recipes, positions, replay, compactor)
+                self._update_indexes(indexes, publish_version, changes)
+            elif publish_version != target_version:
+                for index in indexes:
+                    self._build_index(index, publish_version, recipes)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            with self._lock:
+                self._recipes = recipes
+                self._positions = positions
+                self._compactor = compactor
+                self._snapshot_version = publish_version
+                self._stats["rebuilds"] += 1
+                self._stats["last_rebuild_ms"] = round(elapsed_ms, 2)
+                self._stats["total_rebuild_ms"] = round(self._stats["total_rebuild_ms"] + elapsed_ms, 2)
+                self._stats["last_rebuild_at"] = datetime.now().isoformat()
+
+        logger.info(f"Recipe corpus v{publish_version} rebuilt: {len(recipes)} recipes in {elapsed_ms:.1f}ms"
+                    + (f" ({len(replay)} upserts replayed)" if replay else ""))
+        self._schedule_snapshot_write()
+        return True
+
+    def _load_snapshot_file(self, target_version: int) -> bool:
+        """Publish the first snapshot from the snapshot file instead of the store.
+
+        Returns:
+            bool: True if a snapshot was published from the file
+        """
+        snapshot_file = self._snapshot_file
+        if snapshot_file is None:
+            return False
+        started = time.perf_counter()
+        store_generation = self._store_generation.read() if self._store_generation is not None else None
+        try:
+            store_count = self._store_count() if self._store_count is not None else None
+        except Exception as e:
+            logger.warning(f"Could not count stored recipes, not using the snapshot file: {e}")
+            return False
+        if store_count is None and self._store_count is not None:
+            return False
+        loaded = snapshot_file.load(store_count, store_generation)
+        if loaded is None:
+            return False
+        recipes, states = loaded
+
+        positions = {}
+        for position, recipe in enumerate(recipes):
+            if isinstance(recipe, dict) and recipe.get('id'):
+                positions.setdefault(str(recipe['id']), position)
+
+        with self._lock:
+            holders = list(self._snapshot_states)
+            indexes = list(self._indexes)
+        for component in holders + indexes:
+            state = states.get(type(component).__name__)
+            restored = False
+            if state is not None and hasattr(component, 'restore_state'):
+                try:
+                    restored = component.restore_state(target_version, recipes, state)
+                except Exception as e:
+                    logger.warning(f"Could not restore {type(component).__name__} from the snapshot file: {e}")
+            if not restored and component in indexes:
+                self._build_index(component, target_version, recipes)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._lock:
+            if self._recipes is not None:
+                # Someone else published first; their snapshot wins
+                return True
+            self._recipes = recipes
+            self._positions = positions
+            # Recipes in the file are already compacted; later upserts share a new vocabulary
+            self._compactor = RecipeCompactor() if COMPACT_RECIPES_ENABLED else None
+            self._snapshot_version = target_version
+            if store_generation is not None:
+                self._seen_generation = store_generation
+            self._stats["snapshot_file_loads"] += 1
+            self._stats["last_snapshot_file_load_ms"] = round(elapsed_ms, 2)
+            self._stats["last_rebuild_at"] = datetime.now().isoformat()
+
+        if elapsed_ms > SNAPSHOT_BOOT_BUDGET_MS:
+            logger.warning(f"Recipe corpus snapshot file load took {elapsed_ms:.1f}ms (budget {SNAPSHOT_BOOT_BUDGET_MS:.0f}ms)")
+        logger.info(f"Recipe corpus v{target_version} loaded from snapshot file: {len(recipes)} recipes in {elapsed_ms:.1f}ms")
+        return True
+
+    def _schedule_snapshot_write(self) -> None:
+        """Start a background snapshot file write unless one is already pending"""
+        with self._lock:
+            if self._snapshot_file is None:
+                return
+            if self._snapshot_write_thread is not None and self._snapshot_write_thread.is_alive():
+                return
+            self._snapshot_write_thread = threading.Thread(
+                target=self._snapshot_write_worker,
+                name="recipe-corpus-snapshot",
+                daemon=True
+            )
+            self._snapshot_write_thread.start()
+
+    def _snapshot_write_worker(self) -> None:
+        """Write the snapshot file once the corpus has been quiet for the debounce window"""
+        if SNAPSHOT_WRITE_DELAY_SECONDS > 0:
+            time.sleep(SNAPSHOT_WRITE_DELAY_SECONDS)
+        self.write_snapshot_file()
+
+    def write_snapshot_file(self) -> bool:
+        """Write the current snapshot and index states to the snapshot file.
+
+        Returns:
+            bool: True if a file matching the published snapshot was written
+        """
+        snapshot_file = self._snapshot_file
+        if snapshot_file is None:
+            return False
+        with self._lock:
+            recipes = self._recipes
+            version = self._snapshot_version
+            current = version == self._version
+            components = list(self._snapshot_states) + list(self._indexes)
+            store_generation = self._seen_generation
+        if recipes is None or not current:
+            # A rebuild is owed; it schedules another write when it publishes
+            return False
+        if self._store_generation is not None and self._store_generation.read() != store_generation:
+            # Another process wrote to the store; our reload writes the file afterwards
+            return False
+        try:
+            store_count = self._store_count() if self._store_count is not None else len(recipes)
+        except Exception as e:
+            logger.warning(f"Could not count stored recipes, not writing the snapshot file: {e}")
+            return False
+        if store_count is None:
+            return False
+
+        states = {}
+        for component in components:
+            if hasattr(component, 'export_state'):
+                try:
+                    state = component.export_state(version)
+                except Exception as e:
+                    logger.warning(f"Could not export {type(component).__name__} for the snapshot file: {e}")
+                    state = None
+                if state is not None:
+                    states[type(component).__name__] = state
+
+        if self._version != version:
+            return False
+        written = snapshot_file.save(recipes, states, store_count, store_generation)
+        if written and self._version != version:
+            # Changed while writing; the next write replaces it
+            snapshot_file.invalidate()
+            return False
+        return written
+
+    def _build_index(self, index: Any, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Run a full build of one derived index, logging instead of raising"""
+        try:
+            index.build(version, recipes)
+        except Exception as e:
+            logger.warning(f"Recipe corpus index build failed for {type(index).__name__}: {e}")
+
+    def _schedule_rebuild(self) -> None:
+        """Start a background rebuild unless one is already running"""
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild_worker,
+                name="recipe-corpus-rebuild",
+                daemon=True
+            )
+            self._rebuild_thread.start()
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> bool:
+        """Block until a running background rebuild finishes.
+
+        Used before forking workers, so the published snapshot is complete and
+        no thread holds the lock at fork time.
+
+        Returns:
+            bool: True if no rebuild is running anymore
+        """
+        with self._lock:
+            thread = self._rebuild_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _rebuild_worker(self) -> None:
+        """Rebuild until the snapshot catches up with the latest version"""
+        while True:
+            if REBUILD_DELAY_SECONDS > 0:
+                time.sleep(REBUILD_DELAY_SECONDS)
+            if not self.rebuild():
+                return
+            with self._lock:
+                if self._snapshot_version == self._version:
+                    return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss and rebuild counters for the snapshot"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+            stats.update({
+                "enabled": CORPUS_ENABLED,
+                "version": self._version,
+                "snapshot_version": self._snapshot_version,
+                "recipe_count": len(self._recipes) if self._recipes is not None else 0,
+                "hit_rate": round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0,
+                "rebuild_in_progress": bool(self._rebuild_thread and self._rebuild_thread.is_alive()),
+                "store_generation": self._seen_generation,
+            })
+            compactor = self._compactor
+            snapshot_file = self._snapshot_file
+        stats["compact"] = compactor.get_stats() if compactor is not None else {"enabled": False}
+        stats["snapshot_file"] = snapshot_file.get_stats() if snapshot_file is not None else {"enabled": False}
+        return stats
+
+
+# Global corpus instance shared by every RecipeCacheService in this process
+_recipe_corpus = RecipeCorpus()
+
+
+def get_recipe_corpus() -> RecipeCorpus:
+    """Get the process-wide recipe corpus"""
+    return _recipe_corpus
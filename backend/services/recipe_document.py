@@ -0,0 +1,169 @@
+"""
+Stored recipe document format (schema v2).
+
+Schema v2 documents are the flat recipe JSON itself, with a string 'id' at
+the top level. The row's metadata carries document_schema_version = 2, so
+readers decode them with one json.loads and no reshaping.
+
+Older rows may instead hold:
+  - a wrapper {"data": {...recipe...}, "id": ..., "source": ...}, whose
+    id/source fill in fields missing from 'data';
+  - (in-memory fallback cache) a plain title, with the recipe in the metadata.
+Those are decoded by the legacy branches below, which only run while
+RECIPE_LEGACY_DOCUMENTS is true. scripts/migrate_document_schema.py rewrites
+a store to v2; after that the flag can be turned off and unmigrated rows are
+skipped instead of reshaped.
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_SCHEMA_VERSION = 2
+DOCUMENT_SCHEMA_FIELD = 'document_schema_version'
+LEGACY_DOCUMENTS_ENABLED = os.environ.get('RECIPE_LEGACY_DOCUMENTS', 'true').lower() == 'true'
+
+_stats_lock = threading.Lock()
+_stats = {"v2": 0, "legacy": 0, "skipped_legacy": 0, "invalid": 0}
+
+
+def _unwrap(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Recipe inside a {"data": {...}} wrapper, with the wrapper's id/source filling in missing fields"""
+    if not isinstance(recipe.get('data'), dict):
+        return recipe
+    flat = dict(recipe['data'])
+    for key in ('id', 'source'):
+        if key in recipe and key not in flat:
+            flat[key] = recipe[key]
+    return flat
+
+
+def canonical_recipe(recipe: Any) -> Any:
+    """Flat schema v2 form of a recipe (unwrapped, string id); non-dicts are returned unchanged"""
+    if not isinstance(recipe, dict):
+        return recipe
+    recipe = _unwrap(recipe)
+    if recipe.get('id') is not None and not isinstance(recipe['id'], str):
+        recipe = dict(recipe, id=str(recipe['id']))
+    return recipe
+
+
+def encode_document(recipe: Dict[str, Any]) -> str:
+    """Schema v2 document for a recipe"""
+    return json.dumps(canonical_recipe(recipe))
+
+
+def schema_metadata() -> Dict[str, Any]:
+    """Metadata field marking a row's document as schema v2"""
+    return {DOCUMENT_SCHEMA_FIELD: DOCUMENT_SCHEMA_VERSION}
+
+
+def is_current(metadata: Optional[Dict[str, Any]]) -> bool:
+    """True when the row's document is already schema v2"""
+    return bool(metadata) and metadata.get(DOCUMENT_SCHEMA_FIELD) == DOCUMENT_SCHEMA_VERSION
+
+
+def _recipe_from_metadata(document: Any, metadata: Dict[str, Any], row_id: Any) -> Dict[str, Any]:
+    """Minimal recipe for a fallback-cache row whose document is only a title"""
+    title = metadata.get('title') or metadata.get('name') or metadata.get('strMeal') or str(document) or 'Recipe'
+    rid = metadata.get('id') or metadata.get('_id') or metadata.get('idMeal') or row_id
+    if rid is None:
+        rid = str(hash(title))
+    cuisines = metadata.get('cuisines') or []
+    if not cuisines and metadata.get('cuisine'):
+        cuisines = [metadata.get('cuisine')]
+    if not cuisines and metadata.get('strArea'):
+        cuisines = [str(metadata.get('strArea')).lower()]
+    ingredients = metadata.get('ingredients') or []
+    instructions = metadata.get('instructions') or []
+    return {
+        'id': str(rid),
+        'title': title,
+        'ingredients': ingredients if isinstance(ingredients, list) else [],
+        'instructions': instructions if isinstance(instructions, list) else ([instructions] if isinstance(instructions, str) else []),
+        'cuisines': cuisines if isinstance(cuisines, list) else ([cuisines] if cuisines else []),
+        'diets': metadata.get('diets') or metadata.get('dietary_restrictions') or []
+    }
+
+
+def decode_legacy_document(document: Any, metadata: Optional[Dict[str, Any]] = None,
+                           row_id: Any = None, from_metadata: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Decode a pre-v2 document.
+
+    Args:
+        document: Stored document (JSON string, parsed dict or plain title)
+        metadata: The row's metadata
+        row_id: The row's id
+        from_metadata: Rebuild a minimal recipe from the metadata when the
+            document isn't JSON (in-memory fallback cache rows)
+
+    Returns:
+        Flat recipe dict, or None when the document holds no recipe
+    """
+    recipe = None
+    if isinstance(document, str) and document.strip().startswith('{'):
+        try:
+            recipe = json.loads(document)
+        except ValueError:
+            recipe = None
+    elif isinstance(document, dict):
+        recipe = document
+    if isinstance(recipe, dict) and (recipe.get('id') or from_metadata):
+        return _unwrap(recipe)
+    if from_metadata and recipe is None:
+        return _recipe_from_metadata(document, metadata or {}, row_id)
+    return None
+
+
+def decode_documents(documents: List[Any], metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+                     ids: Optional[List[Any]] = None, from_metadata: bool = False) -> List[Optional[Dict[str, Any]]]:
+    """
+    Decode stored documents into recipe dicts.
+
+    Args:
+        documents: Stored documents, one per row
+        metadatas: The rows' metadata (decides between v2 and legacy decoding)
+        ids: The rows' ids (only used to rebuild legacy fallback rows)
+        from_metadata: See decode_legacy_document
+
+    Returns:
+        One recipe dict per document, None where a document holds no recipe
+        (or is legacy while RECIPE_LEGACY_DOCUMENTS is off)
+    """
+    counts = {"v2": 0, "legacy": 0, "skipped_legacy": 0, "invalid": 0}
+    recipes: List[Optional[Dict[str, Any]]] = []
+    for i, document in enumerate(documents):
+        metadata = metadatas[i] if metadatas and i < len(metadatas) else None
+        recipe = None
+        if is_current(metadata):
+            try:
+                recipe = json.loads(document)
+            except (TypeError, ValueError):
+                recipe = None
+            if not isinstance(recipe, dict) or not recipe.get('id'):
+                recipe = None
+            counts["v2" if recipe is not None else "invalid"] += 1
+        elif not LEGACY_DOCUMENTS_ENABLED:
+            counts["skipped_legacy"] += 1
+        else:
+            recipe = decode_legacy_document(document, metadata, ids[i] if ids and i < len(ids) else None, from_metadata)
+            counts["legacy" if recipe is not None else "invalid"] += 1
+        recipes.append(recipe)
+
+    with _stats_lock:
+        for key, value in counts.items():
+            _stats[key] += value
+    return recipes
+
+
+def get_document_stats() -> Dict[str, Any]:
+    """Return how many documents were decoded by each route in this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update({"schema_version": DOCUMENT_SCHEMA_VERSION, "legacy_enabled": LEGACY_DOCUMENTS_ENABLED})
+    return stats
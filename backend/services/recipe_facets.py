@@ -0,0 +1,334 @@
+"""
+Facet bitmaps for cuisine and dietary filters.
+
+Each normalized cuisine/diet value maps to a bitmap (a Python int) whose set
+bits are positions in the recipe corpus snapshot. Multi-cuisine OR and
+multi-diet AND filters become bitwise operations over a small vocabulary
+instead of nested loops over every recipe.
+
+The per-recipe value extraction mirrors the filters it replaces:
+  - cuisine_values / diet_tag_values: the lenient any-match filters in
+    RecipeCacheService.get_cached_recipes
+  - required_diet_values: RecipeService._matches_dietary_restrictions
+"""
+
+import os
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from .dietary_classifier import get_diet_flags
+except ImportError:
+    from dietary_classifier import get_diet_flags
+
+logger = logging.getLogger(__name__)
+
+FACET_INDEX_ENABLED = os.environ.get('RECIPE_FACET_INDEX_ENABLED', 'true').lower() == 'true'
+
+# Cuisine matching modes: 'partial' is the historical behaviour where
+# "american" also matches "south american"; 'exact' requires equality
+CUISINE_MATCH_PARTIAL = 'partial'
+CUISINE_MATCH_EXACT = 'exact'
+
+
+def cuisine_values(recipe: Dict[str, Any]) -> Set[str]:
+    """Normalized cuisines from the recipe's 'cuisine' and 'cuisines' fields"""
+    values = set()
+    if recipe.get('cuisine'):
+        values.add(str(recipe['cuisine']).lower().strip())
+    if recipe.get('cuisines') and isinstance(recipe['cuisines'], list):
+        values.update(str(c).lower().strip() for c in recipe['cuisines'] if c)
+    return values
+
+
+def diet_tag_values(recipe: Dict[str, Any]) -> Set[str]:
+    """Diet tags as seen by the any-match dietary filter in get_cached_recipes"""
+    values = set()
+    if recipe.get('dietaryRestrictions'):
+        values.update(str(d).lower() for d in recipe['dietaryRestrictions'] if d)
+    if recipe.get('diets'):
+        values.update(str(d).lower() for d in recipe['diets'] if d)
+    if recipe.get('vegetarian') is True:
+        values.add('vegetarian')
+    if recipe.get('vegan') is True:
+        values.add('vegan')
+    return values
+
+
+def analyze_dietary_restrictions(recipe: Dict[str, Any]) -> Set[str]:
+    """Infer vegetarian/vegan from the dietary classifier when a recipe has no diet tags"""
+    is_vegetarian, is_vegan = get_diet_flags(recipe)
+    restrictions = set()
+    if is_vegetarian:
+        restrictions.add('vegetarian')
+    if is_vegan:
+        restrictions.add('vegan')
+    return restrictions
+
+
+def required_diet_values(recipe: Dict[str, Any]) -> Set[str]:
+    """Diet tags as seen by the all-match check in RecipeService"""
+    values = set()
+    if 'diets' in recipe and isinstance(recipe['diets'], list):
+        values.update(d.lower() for d in recipe['diets'] if isinstance(d, str) and d.strip())
+    if 'dietary_restrictions' in recipe and isinstance(recipe['dietary_restrictions'], list):
+        values.update(d.lower() for d in recipe['dietary_restrictions'] if isinstance(d, str) and d.strip())
+    if recipe.get('vegetarian', False):
+        values.add('vegetarian')
+    if recipe.get('vegan', False):
+        values.add('vegan')
+    if not values:
+        values = analyze_dietary_restrictions(recipe)
+    return values
+
+
+def matches_required_diets(values: Set[str], restrictions: List[str]) -> bool:
+    """
+    Check that a recipe's diet values satisfy every requested restriction.
+    A vegan recipe also satisfies 'vegetarian'.
+    """
+    required = {r.lower().strip() for r in restrictions if r and r.strip()}
+    if not required:
+        return True
+    if 'vegetarian' in required and 'vegan' in values:
+        required.discard('vegetarian')
+        required.add('vegan')
+    return required.issubset(values)
+
+
+def cuisine_filter_values(cuisines: Any) -> List[str]:
+    """Requested cuisine filter (a string or a list of strings) as lowercased values"""
+    if isinstance(cuisines, str):
+        requested = [cuisines]
+    elif isinstance(cuisines, list):
+        requested = [c for c in cuisines if c]
+    else:
+        return []
+    return [str(c).lower().strip() for c in requested]
+
+
+def cuisine_value_matches(filter_value: str, value: str, mode: str = CUISINE_MATCH_PARTIAL) -> bool:
+    """Compare one requested cuisine with one recipe cuisine"""
+    if mode == CUISINE_MATCH_EXACT:
+        return filter_value == value
+    return filter_value == value or filter_value in value or value in filter_value
+
+
+def select_positions(mask: int, recipes: List[Any]) -> List[Any]:
+    """Return the recipes whose snapshot position is set in `mask`, in order"""
+    bits = format(mask, 'b')[::-1]
+    return [recipe for recipe, bit in zip(recipes, bits) if bit == '1']
+
+
+class RecipeFacetIndex:
+    """Cuisine and diet bitmaps keyed by corpus snapshot position"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = -1
+        self._reset()
+        self._stats = {"builds": 0, "incremental_updates": 0, "lookups": 0, "fallbacks": 0}
+
+    def _reset(self) -> None:
+        self._all = 0
+        self._cuisines: Dict[str, int] = {}
+        self._diet_tags: Dict[str, int] = {}
+        self._required_diets: Dict[str, int] = {}
+        self._vegetarian = 0
+        self._vegan = 0
+        self._doc_values: Dict[int, Tuple[Set[str], Set[str], Set[str], bool, bool]] = {}
+        self._positions: Dict[str, int] = {}
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Rebuild every bitmap from a corpus snapshot"""
+        with self._lock:
+            self._reset()
+            for position, recipe in enumerate(recipes):
+                self._add(position, recipe)
+            self.version = version
+            self._stats["builds"] += 1
+        logger.debug(f"Recipe facet index v{version} built: {len(self._cuisines)} cuisines, {len(self._diet_tags)} diet tags")
+
+    def export_state(self, version: int) -> Optional[Dict[str, Any]]:
+        """Copy of the bitmaps for the snapshot file, or None if not built for `version`"""
+        with self._lock:
+            if version != self.version:
+                return None
+            return {
+                "all": self._all,
+                "cuisines": dict(self._cuisines),
+                "diet_tags": dict(self._diet_tags),
+                "required_diets": dict(self._required_diets),
+                "vegetarian": self._vegetarian,
+                "vegan": self._vegan,
+                "doc_values": dict(self._doc_values),
+                "positions": dict(self._positions),
+            }
+
+    def restore_state(self, version: int, recipes: List[Dict[str, Any]], state: Dict[str, Any]) -> bool:
+        """Take over bitmaps saved in the snapshot file for `recipes`"""
+        if state.get("all", 0).bit_length() > len(recipes):
+            return False
+        with self._lock:
+            self._all = state["all"]
+            self._cuisines = state["cuisines"]
+            self._diet_tags = state["diet_tags"]
+            self._required_diets = state["required_diets"]
+            self._vegetarian = state["vegetarian"]
+            self._vegan = state["vegan"]
+            self._doc_values = state["doc_values"]
+            self._positions = state["positions"]
+            self.version = version
+            self._stats["builds"] += 1
+        return True
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Replace the facet values for the given snapshot positions"""
+        with self._lock:
+            for position, recipe in changes:
+                self._remove(position)
+                self._add(position, recipe)
+            self.version = version
+            self._stats["incremental_updates"] += 1
+
+    def _add(self, position: int, recipe: Dict[str, Any]) -> None:
+        if not isinstance(recipe, dict):
+            return
+        bit = 1 << position
+        cuisines = cuisine_values(recipe)
+        tags = diet_tag_values(recipe)
+        required = required_diet_values(recipe)
+        is_vegetarian, is_vegan = get_diet_flags(recipe)
+
+        self._all |= bit
+        for value in cuisines:
+            self._cuisines[value] = self._cuisines.get(value, 0) | bit
+        for value in tags:
+            self._diet_tags[value] = self._diet_tags.get(value, 0) | bit
+        for value in required:
+            self._required_diets[value] = self._required_diets.get(value, 0) | bit
+        if is_vegetarian:
+            self._vegetarian |= bit
+        if is_vegan:
+            self._vegan |= bit
+        self._doc_values[position] = (cuisines, tags, required, is_vegetarian, is_vegan)
+        if recipe.get('id'):
+            self._positions.setdefault(str(recipe['id']), position)
+
+    def _remove(self, position: int) -> None:
+        values = self._doc_values.pop(position, None)
+        if values is None:
+            return
+        clear = ~(1 << position)
+        cuisines, tags, required, _, _ = values
+        self._all &= clear
+        for bitmaps, keys in ((self._cuisines, cuisines), (self._diet_tags, tags), (self._required_diets, required)):
+            for key in keys:
+                remaining = bitmaps.get(key, 0) & clear
+                if remaining:
+                    bitmaps[key] = remaining
+                else:
+                    bitmaps.pop(key, None)
+        self._vegetarian &= clear
+        self._vegan &= clear
+
+    def filter_mask(self, version: int,
+                    cuisines: Any = None,
+                    cuisine_match: str = CUISINE_MATCH_PARTIAL,
+                    any_diets: Optional[List[str]] = None,
+                    validate_diets: bool = False,
+                    all_diets: Optional[List[str]] = None) -> Optional[int]:
+        """
+        Combine the requested facet filters into a single bitmap.
+
+        Args:
+            version: Snapshot version the caller is filtering
+            cuisines: Cuisine or list of cuisines; a recipe matches ANY of them
+            cuisine_match: 'partial' (substring either way) or 'exact'
+            any_diets: Diets for the lenient filter; a recipe matches ANY of them
+            validate_diets: Re-check vegetarian/vegan tags against ingredients
+            all_diets: Diets the recipe must ALL satisfy
+
+        Returns:
+            Bitmap of matching positions, or None if the index is stale
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            if version != self.version:
+                self._stats["fallbacks"] += 1
+                return None
+            mask = self._all
+            if cuisines:
+                mask &= self._cuisine_mask(cuisines, cuisine_match)
+            if any_diets:
+                mask &= self._any_diet_mask(any_diets, validate_diets)
+            if all_diets:
+                mask &= self._all_diets_mask(all_diets)
+            return mask
+
+    def position_of(self, recipe_id: Any) -> Optional[int]:
+        """Snapshot position of a recipe id, if indexed"""
+        with self._lock:
+            return self._positions.get(str(recipe_id))
+
+    def _cuisine_mask(self, cuisines: Any, mode: str) -> int:
+        requested = cuisine_filter_values(cuisines)
+        mask = 0
+        for value, bitmap in self._cuisines.items():
+            if any(cuisine_value_matches(f, value, mode) for f in requested):
+                mask |= bitmap
+        return mask
+
+    def _any_diet_mask(self, diets: List[str], validate: bool) -> int:
+        requested = [d.lower() for d in diets]
+        mask = 0
+        # Ingredient validation overrides tags: validated recipes always match,
+        # and for the rest any tag naming the validated diet is ignored
+        overridden = []
+        if validate and 'vegetarian' in requested:
+            mask |= self._vegetarian
+            overridden.append('vegetarian')
+        if validate and 'vegan' in requested:
+            mask |= self._vegan
+            overridden.append('vegan')
+        for value, bitmap in self._diet_tags.items():
+            if any(word in value for word in overridden):
+                continue
+            if any(f == value or f in value or value in f for f in requested):
+                mask |= bitmap
+        return mask
+
+    def _all_diets_mask(self, diets: List[str]) -> int:
+        required = {r.lower().strip() for r in diets if r and r.strip()}
+        mask = self._all
+        for restriction in required:
+            if restriction == 'vegetarian':
+                # A vegan recipe also satisfies 'vegetarian'
+                mask &= self._required_diets.get('vegetarian', 0) | self._required_diets.get('vegan', 0)
+            else:
+                mask &= self._required_diets.get(restriction, 0)
+        return mask
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return vocabulary sizes and lookup counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "enabled": FACET_INDEX_ENABLED,
+                "version": self.version,
+                "indexed_recipes": bin(self._all).count('1'),
+                "cuisine_values": len(self._cuisines),
+                "diet_values": len(self._diet_tags),
+                "required_diet_values": len(self._required_diets),
+            })
+        return stats
+
+
+# Global index registered with the process-wide recipe corpus
+_recipe_facet_index = RecipeFacetIndex()
+
+
+def get_recipe_facet_index() -> RecipeFacetIndex:
+    """Get the process-wide recipe facet index"""
+    return _recipe_facet_index
@@ -0,0 +1,193 @@
+"""
+Filterable metadata schema and where-clause compiler for recipe_details_cache.
+
+Every recipe written to the store gets a fixed set of canonical metadata
+fields (all prefixed with filter_ so they can't clash with the flattened seed
+fields):
+  filter_cuisine_<value>   True for each normalized cuisine (exact matching)
+  filter_like_<cuisine>    True for each CANONICAL_CUISINES entry that
+                           partially matches one of its cuisines
+  filter_diet_<value>      True for each diet value of the all-match check
+  filter_calories, filter_protein, filter_carbs, filter_fat,
+  filter_ready_in_minutes  numbers, only when known
+  filter_schema_version    FILTER_SCHEMA_VERSION
+
+compile_where() turns search filters into a ChromaDB where clause over those
+fields, so a store read only fetches and parses rows that can match. The
+clause never excludes a recipe the filters would keep; the existing filters
+still run on the fetched rows, so results don't change. Filters it can't
+express (partial matches on a cuisine outside CANONICAL_CUISINES, any-match
+diets) are left out of the clause.
+
+Collections written before this schema need scripts/migrate_filter_metadata.py;
+until every row carries the current version, reads don't push filters down.
+"""
+
+import os
+import re
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from .dietary_classifier import DIET_CLASSIFIER_VERSION
+    from .recipe_facets import CUISINE_MATCH_EXACT, cuisine_value_matches, cuisine_values, required_diet_values
+    from .recipe_nutrition import COLUMNS as NUTRITION_COLUMNS, nutrition_values
+except ImportError:
+    from dietary_classifier import DIET_CLASSIFIER_VERSION
+    from recipe_facets import CUISINE_MATCH_EXACT, cuisine_value_matches, cuisine_values, required_diet_values
+    from recipe_nutrition import COLUMNS as NUTRITION_COLUMNS, nutrition_values
+
+logger = logging.getLogger(__name__)
+
+FILTER_PUSHDOWN_ENABLED = os.environ.get('RECIPE_FILTER_PUSHDOWN', 'true').lower() == 'true'
+# How often a process re-checks that every stored row carries the filter schema
+FILTER_SCHEMA_RECHECK_SECONDS = float(os.environ.get('RECIPE_FILTER_SCHEMA_RECHECK_SECONDS', '300'))
+
+# Diet flags come from the dietary classifier, so its version is part of the schema
+FILTER_SCHEMA_VERSION = f"1.{DIET_CLASSIFIER_VERSION}"
+FILTER_FIELD_PREFIX = 'filter_'
+SCHEMA_VERSION_FIELD = 'filter_schema_version'
+
+# Cuisines offered by the app's filters and preferences (src/components/RecipeFilters.tsx).
+# Changing this list changes the stored flags: bump FILTER_SCHEMA_VERSION and migrate.
+CANONICAL_CUISINES = (
+    'american', 'british', 'chinese', 'french', 'greek', 'indian', 'irish', 'italian',
+    'japanese', 'mexican', 'moroccan', 'spanish', 'thai', 'vietnamese', 'mediterranean',
+    'korean', 'caribbean', 'cajun',
+)
+
+_SLUG = re.compile(r'[^a-z0-9]+')
+
+
+def _slug(value: str) -> str:
+    """Metadata-key form of a value; values that collide only widen the fetch"""
+    return _SLUG.sub('_', str(value).lower().strip()).strip('_')
+
+
+def filterable_metadata(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical filter fields to store alongside a recipe"""
+    metadata: Dict[str, Any] = {SCHEMA_VERSION_FIELD: FILTER_SCHEMA_VERSION}
+    cuisines = cuisine_values(recipe)
+    for value in cuisines:
+        if _slug(value):
+            metadata[f"filter_cuisine_{_slug(value)}"] = True
+    for canonical in CANONICAL_CUISINES:
+        if any(cuisine_value_matches(canonical, value) for value in cuisines if value):
+            metadata[f"filter_like_{canonical}"] = True
+    for value in required_diet_values(recipe):
+        if _slug(value):
+            metadata[f"filter_diet_{_slug(value)}"] = True
+    for column, value in zip(NUTRITION_COLUMNS, nutrition_values(recipe)):
+        if value is not None:
+            metadata[f"filter_{column}"] = value
+    return metadata
+
+
+def strip_filter_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata without any canonical filter fields (e.g. before rewriting them)"""
+    return {k: v for k, v in metadata.items() if not k.startswith(FILTER_FIELD_PREFIX)}
+
+
+def _any_of(clauses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _cuisine_clause(cuisine_filter: Any, cuisine_match: Optional[str]) -> Optional[Dict[str, Any]]:
+    values = cuisine_filter if isinstance(cuisine_filter, list) else [cuisine_filter]
+    values = [str(v).lower().strip() for v in values if v and str(v).strip()]
+    if not values:
+        return None
+    clauses = []
+    for value in values:
+        if cuisine_match == CUISINE_MATCH_EXACT:
+            clauses.append({f"filter_cuisine_{_slug(value)}": True})
+        elif value in CANONICAL_CUISINES:
+            clauses.append({f"filter_like_{value}": True})
+        else:
+            # Partial match on an unknown cuisine: can't be expressed, fetch every cuisine
+            return None
+    return _any_of(clauses)
+
+
+def _diet_clauses(restrictions: List[str]) -> List[Dict[str, Any]]:
+    clauses = []
+    for restriction in {str(r).lower().strip() for r in restrictions if r and str(r).strip()}:
+        if restriction == 'vegetarian':
+            # A vegan recipe satisfies 'vegetarian' (matches_required_diets)
+            clauses.append(_any_of([{"filter_diet_vegetarian": True}, {"filter_diet_vegan": True}]))
+        elif _slug(restriction):
+            clauses.append({f"filter_diet_{_slug(restriction)}": True})
+    return clauses
+
+
+def _range_clauses(ranges: Dict[str, List[Optional[float]]]) -> List[Dict[str, Any]]:
+    clauses = []
+    for column, (low, high) in ranges.items():
+        if column not in NUTRITION_COLUMNS:
+            continue
+        if low is not None:
+            clauses.append({f"filter_{column}": {"$gte": low}})
+        if high is not None:
+            clauses.append({f"filter_{column}": {"$lte": high}})
+    return clauses
+
+
+def compile_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Compile search filters into a ChromaDB where clause.
+
+    Args:
+        filters: Filters as passed to RecipeCacheService.get_cached_recipes
+            (cuisine, cuisine_match, dietary_restrictions, dietary_match,
+            nutrition_ranges); other keys are ignored
+
+    Returns:
+        Where clause matching a superset of the recipes the filters keep, or
+        None when no filter can be pushed down
+    """
+    if not filters:
+        return None
+    clauses = []
+    if filters.get("cuisine"):
+        cuisine_clause = _cuisine_clause(filters["cuisine"], filters.get("cuisine_match"))
+        if cuisine_clause is not None:
+            clauses.append(cuisine_clause)
+    if filters.get("dietary_restrictions") and filters.get("dietary_match") == "all":
+        clauses.extend(_diet_clauses(filters["dietary_restrictions"]))
+    if filters.get("nutrition_ranges"):
+        clauses.extend(_range_clauses(filters["nutrition_ranges"]))
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def collection_migrated(collection: Any) -> bool:
+    """True when every row of `collection` carries the current filter schema"""
+    total = collection.count()
+    if not total:
+        return True
+    current = collection.get(where={SCHEMA_VERSION_FIELD: FILTER_SCHEMA_VERSION}, include=[])
+    return len(current.get('ids') or []) >= total
+
+
+_stats_lock = threading.Lock()
+_stats = {"store_reads": 0, "pushdown_reads": 0, "rows_read": 0, "pushdown_rows_read": 0}
+
+
+def record_store_read(where: Optional[Dict[str, Any]], rows: int) -> None:
+    """Count one read of the recipe store and the rows it transferred"""
+    with _stats_lock:
+        _stats["store_reads"] += 1
+        _stats["rows_read"] += rows
+        if where:
+            _stats["pushdown_reads"] += 1
+            _stats["pushdown_rows_read"] += rows
+
+
+def get_pushdown_stats() -> Dict[str, Any]:
+    """Return store read counters for this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update({"enabled": FILTER_PUSHDOWN_ENABLED, "schema_version": FILTER_SCHEMA_VERSION})
+    return stats
@@ -0,0 +1,393 @@
+"""
+Bulk ingest pipeline for seeding and caching recipes.
+
+Stages:
+    1. stream-parse the source (a JSON list, or an object with a 'recipes' list)
+       one recipe at a time, so the whole file is never held in memory
+    2. prepare each recipe (id, JSON document, metadata, embedding) in chunks,
+       optionally in a process pool
+    3. dedupe ids in memory; a later record for the same id replaces the earlier
+       one, which is what sequential upserts would have stored
+    4. write large batches with a single upsert per collection
+
+Progress and throughput are logged after every batch. When a checkpoint path
+is given, the number of source records already written is saved after each
+batch, and a later run over the same unchanged file continues from there.
+Replaying a partially written batch is safe because every write is an upsert.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    from .dietary_classifier import diet_metadata
+    from .recipe_filter_schema import filterable_metadata
+    from .recipe_document import encode_document, schema_metadata
+except ImportError:
+    from dietary_classifier import diet_metadata
+    from recipe_filter_schema import filterable_metadata
+    from recipe_document import encode_document, schema_metadata
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.environ.get('RECIPE_INGEST_BATCH_SIZE', '500'))
+# 0 prepares recipes in-process; the process pool is meant for offline ingest scripts
+INGEST_WORKERS = int(os.environ.get('RECIPE_INGEST_WORKERS', '0'))
+PREPARE_CHUNK_SIZE = 100
+READ_CHUNK_SIZE = 1 << 16
+
+
+class IngestRecord(NamedTuple):
+    """One prepared recipe, ready to upsert"""
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    embedding: Optional[List[float]] = None
+    search_terms: Optional[str] = None
+
+
+class _JsonStream:
+    """Incremental reader for the values of a top-level JSON array"""
+
+    def __init__(self, fp, chunk_size: int = READ_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of input"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'end of input'}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self._buf) or self._eof or not self._fill():
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def array_items(self) -> Iterator[Any]:
+        """Yield the values of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def iter_recipes_from_file(path: str, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Stream recipes from a seed file without loading it whole.
+
+    Args:
+        path: JSON file holding a list of recipes or {"recipes": [...]}
+        skip: Number of leading records to skip (used when resuming)
+
+    Yields:
+        Recipe dicts in file order (non-dict entries are yielded too and
+        rejected by the prepare step, so record counts stay aligned)
+
+    Raises:
+        ValueError: If the file is neither a list nor an object with a 'recipes' list
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        first = stream.peek()
+        if first == '{':
+            stream.expect('{')
+            while stream.peek() != '}':
+                key = stream.value()
+                stream.expect(':')
+                if key == 'recipes' and stream.peek() == '[':
+                    break
+                stream.value()
+                if stream.peek() == ',':
+                    stream.expect(',')
+            else:
+                raise ValueError("Seed file format not recognized; expected list or {'recipes': [...]}")
+        elif first != '[':
+            raise ValueError("Seed file format not recognized; expected list or {'recipes': [...]}")
+
+        for position, item in enumerate(stream.array_items()):
+            if position >= skip:
+                yield item
+
+
+def seed_recipe_id(item: Dict[str, Any]) -> str:
+    """Stable id for a seed record, derived from its title when it has no id"""
+    rid = item.get('id') or item.get('_id') or item.get('idMeal')
+    if rid:
+        return str(rid)
+    title = item.get('title') or item.get('name') or item.get('strMeal') or ''
+    return hashlib.md5(title.encode('utf-8')).hexdigest()
+
+
+def flatten_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
+    """ChromaDB-compatible metadata for a seed record (complex values as JSON strings)"""
+    meta = {}
+    for key, value in item.items():
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            meta[key] = value
+        elif isinstance(value, (dict, list)):
+            meta[key] = json.dumps(value)
+        else:
+            meta[key] = str(value)
+    # Dietary verdicts are computed once here and looked up on reads
+    meta.update(diet_metadata(item))
+    # Canonical fields that store reads filter on
+    meta.update(filterable_metadata(item))
+    meta.update(schema_metadata())
+    return meta
+
+
+def prepare_seed_recipe(item: Any) -> Optional[IngestRecord]:
+    """Prepare one seed file record, or None if it isn't a recipe object"""
+    if not isinstance(item, dict):
+        return None
+    return IngestRecord(seed_recipe_id(item), encode_document(item), flatten_metadata(item))
+
+
+def _prepare_chunk(prepare: Callable[[Any], Optional[IngestRecord]],
+                   embed: Optional[Callable[[List[str]], List[List[float]]]],
+                   items: List[Any]) -> List[Optional[IngestRecord]]:
+    """Prepare a chunk of records and embed their documents in one call"""
+    records = []
+    for item in items:
+        try:
+            records.append(prepare(item))
+        except Exception as e:
+            logger.warning(f"Skipping recipe that could not be prepared: {e}")
+            records.append(None)
+    if embed is not None:
+        prepared = [r for r in records if r is not None]
+        if prepared:
+            embeddings = iter(embed([r.document for r in prepared]))
+            records = [r._replace(embedding=list(next(embeddings))) if r is not None else None for r in records]
+    return records
+
+
+def _source_fingerprint(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(checkpoint_path: Optional[str], source_path: str) -> int:
+    """Number of records of `source_path` already written, or 0 if there is no usable checkpoint"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    try:
+        with open(checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") != _source_fingerprint(source_path):
+            logger.info(f"Ignoring ingest checkpoint {checkpoint_path}: source file changed")
+            return 0
+        return int(checkpoint.get("consumed", 0))
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable ingest checkpoint {checkpoint_path}: {e}")
+        return 0
+
+
+class RecipeIngestPipeline:
+    """Prepare, dedupe and batch-write a stream of recipes"""
+
+    def __init__(self, write_batch: Callable[[List[IngestRecord]], None],
+                 prepare: Callable[[Any], Optional[IngestRecord]] = prepare_seed_recipe,
+                 embed: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 batch_size: Optional[int] = None, workers: Optional[int] = None):
+        """
+        Args:
+            write_batch: Upserts one batch of prepared records
+            prepare: Turns a source record into an IngestRecord (must be picklable
+                when workers > 1, i.e. a module-level function or staticmethod)
+            embed: Embedding function applied to documents during preparation, so
+                several collections can share one embedding pass
+            batch_size: Records per write (default RECIPE_INGEST_BATCH_SIZE)
+            workers: Prepare processes; 0 or 1 prepares in-process (default RECIPE_INGEST_WORKERS)
+        """
+        self.write_batch = write_batch
+        self.prepare = prepare
+        self.embed = embed
+        self.batch_size = max(1, batch_size or INGEST_BATCH_SIZE)
+        self.workers = INGEST_WORKERS if workers is None else workers
+
+    def _prepared_chunks(self, records: Iterable[Any]) -> Iterator[List[Optional[IngestRecord]]]:
+        """Prepared chunks in source order, keeping a bounded number in flight"""
+        work = partial(_prepare_chunk, self.prepare, self.embed)
+        chunks = _chunked(records, PREPARE_CHUNK_SIZE)
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield work(chunk)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(work, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, records: Iterable[Any], limit: int = 0, checkpoint_path: Optional[str] = None,
+            source_path: Optional[str] = None, start_at: int = 0) -> Dict[str, Any]:
+        """
+        Ingest a stream of source records.
+
+        Args:
+            records: Source records, already advanced past `start_at`
+            limit: Stop after this many source records in total (0 = no limit)
+            checkpoint_path: Where to record progress after each batch
+            source_path: Seed file the records come from (checkpoint fingerprint)
+            start_at: Records consumed by an earlier, interrupted run
+
+        Returns:
+            Dict with records read, recipes written, duplicates, invalid records and timing
+        """
+        stats = {"resumed_at": start_at, "read": 0, "written": 0, "duplicates": 0,
+                 "invalid": 0, "batches": 0, "seconds": 0.0, "recipes_per_second": 0.0}
+        started = time.perf_counter()
+        seen = set()
+        batch: Dict[str, IngestRecord] = {}
+        consumed = start_at
+
+        def flush():
+            if not batch:
+                return
+            self.write_batch(list(batch.values()))
+            stats["written"] += len(batch)
+            stats["batches"] += 1
+            batch.clear()
+            if checkpoint_path and source_path:
+                _save_checkpoint(checkpoint_path, source_path, consumed, stats)
+            elapsed = time.perf_counter() - started
+            logger.info(f"Ingested {stats['written']} recipes from {stats['read']} records "
+                        f"({stats['written'] / elapsed if elapsed else 0:.0f} recipes/s, "
+                        f"{stats['duplicates']} duplicate ids, {stats['invalid']} invalid)")
+
+        if limit > 0:
+            records = _take(records, max(0, limit - start_at))
+        for chunk in self._prepared_chunks(records):
+            for record in chunk:
+                stats["read"] += 1
+                consumed += 1
+                if record is None:
+                    stats["invalid"] += 1
+                    continue
+                if record.id in seen:
+                    stats["duplicates"] += 1
+                seen.add(record.id)
+                # Later records win; an id still in the pending batch keeps its place
+                batch[record.id] = record
+                if len(batch) >= self.batch_size:
+                    flush()
+        flush()
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        stats["recipes_per_second"] = round(stats["written"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+        return stats
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _take(items: Iterable[Any], count: int) -> Iterator[Any]:
+    for position, item in enumerate(items):
+        if position >= count:
+            return
+        yield item
+
+
+def _save_checkpoint(checkpoint_path: str, source_path: str, consumed: int, stats: Dict[str, Any]) -> None:
+    """Atomically record how many source records have been written"""
+    checkpoint = {
+        "source": _source_fingerprint(source_path),
+        "consumed": consumed,
+        "written": stats["written"],
+        "updated_at": time.time(),
+    }
+    tmp_path = checkpoint_path + '.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, checkpoint_path)
+    except OSError as e:
+        logger.warning(f"Could not write ingest checkpoint {checkpoint_path}: {e}")
+
+
+def ingest_file(path: str, write_batch: Callable[[List[IngestRecord]], None], limit: int = 0,
+                checkpoint_path: Optional[str] = None, resume: bool = True,
+                **pipeline_options) -> Dict[str, Any]:
+    """
+    Stream a seed file through the ingest pipeline.
+
+    Args:
+        path: Seed JSON file
+        write_batch: Upserts one batch of prepared records
+        limit: Maximum number of source records to ingest (0 = all)
+        checkpoint_path: Progress file; enables resuming an interrupted run
+        resume: Continue from the checkpoint if it matches the file
+        **pipeline_options: Passed to RecipeIngestPipeline (prepare, embed, batch_size, workers)
+
+    Returns:
+        Dict of ingest statistics (see RecipeIngestPipeline.run)
+    """
+    start_at = load_checkpoint(checkpoint_path, path) if resume else 0
+    if start_at:
+        logger.info(f"Resuming ingest of {path} after {start_at} records")
+    pipeline = RecipeIngestPipeline(write_batch, **pipeline_options)
+    return pipeline.run(iter_recipes_from_file(path, skip=start_at), limit=limit,
+                        checkpoint_path=checkpoint_path, source_path=path, start_at=start_at)
@@ -0,0 +1,156 @@
+"""
+Serialized JSON passthrough for recipe documents.
+
+The corpus already holds every recipe parsed once. This index keeps each
+corpus recipe serialized once as well, so detail and list responses are built
+by splicing the stored JSON strings together instead of running json.dumps
+over every recipe on every request.
+
+Search results are shallow copies of corpus recipes with a few per-request
+keys added (search_score, ...). Those keys are spliced onto the stored JSON.
+Anything else, such as a changed or removed stored key, falls back to
+json.dumps, so the output always matches serializing the dict.
+"""
+
+import json
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def splice_object(object_json: str, extras: Dict[str, Any]) -> str:
+    """Append keys to a serialized JSON object (keys must not already be present)"""
+    if not extras:
+        return object_json
+    extra_json = json.dumps(extras)
+    object_json = object_json.rstrip()
+    if object_json == '{}':
+        return extra_json
+    return object_json[:-1] + ', ' + extra_json[1:]
+
+
+class RecipeJsonIndex:
+    """recipe id -> (corpus recipe, its JSON serialization)
+
+    Readers look entries up without the lock: build() swaps in a new dict and
+    apply_upserts() only replaces single entries. The counters are best-effort.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = -1
+        self._entries: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        self._stats = {"builds": 0, "incremental_updates": 0, "passthrough": 0, "spliced": 0, "serialized": 0}
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Serialize every recipe in a corpus snapshot once"""
+        entries = {}
+        for recipe in recipes:
+            if isinstance(recipe, dict) and recipe.get('id'):
+                try:
+                    entries.setdefault(str(recipe['id']), (recipe, json.dumps(recipe)))
+                except (TypeError, ValueError) as e:
+                    logger.debug(f"Recipe {recipe.get('id')} is not JSON serializable: {e}")
+        with self._lock:
+            self._entries = entries
+            self.version = version
+            self._stats["builds"] += 1
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Re-serialize recipes written since the last build"""
+        with self._lock:
+            for _, recipe in changes:
+                if isinstance(recipe, dict) and recipe.get('id'):
+                    try:
+                        self._entries[str(recipe['id'])] = (recipe, json.dumps(recipe))
+                    except (TypeError, ValueError):
+                        self._entries.pop(str(recipe['id']), None)
+            self.version = version
+            self._stats["incremental_updates"] += 1
+
+    def export_state(self, version: int) -> Optional[Dict[str, str]]:
+        """recipe id -> stored JSON for the snapshot file, or None if not built for `version`"""
+        with self._lock:
+            if version != self.version:
+                return None
+            return {recipe_id: recipe_json for recipe_id, (_, recipe_json) in self._entries.items()}
+
+    def restore_state(self, version: int, recipes: List[Dict[str, Any]], state: Dict[str, str]) -> bool:
+        """Pair JSON saved in the snapshot file with the loaded recipes"""
+        entries = {}
+        for recipe in recipes:
+            if isinstance(recipe, dict) and recipe.get('id'):
+                recipe_id = str(recipe['id'])
+                recipe_json = state.get(recipe_id)
+                if recipe_json is not None:
+                    entries.setdefault(recipe_id, (recipe, recipe_json))
+        with self._lock:
+            self._entries = entries
+            self.version = version
+            self._stats["builds"] += 1
+        return True
+
+    def recipe_json(self, recipe: Dict[str, Any]) -> str:
+        """
+        JSON for a corpus recipe or a shallow copy of one.
+
+        Args:
+            recipe: A corpus recipe, or a copy with extra per-request keys
+
+        Returns:
+            str: Same JSON value json.dumps(recipe) would produce
+        """
+        return ''.join(self._json_parts(recipe))
+
+    def dumps_list(self, recipes: List[Dict[str, Any]]) -> str:
+        """Serialize a list of recipes as a JSON array"""
+        parts = ['[']
+        for i, recipe in enumerate(recipes):
+            if i:
+                parts.append(', ')
+            parts.extend(self._json_parts(recipe))
+        parts.append(']')
+        return ''.join(parts)
+
+    def dumps_result(self, result: Dict[str, Any], list_key: str = 'results') -> str:
+        """Serialize a response dict whose `list_key` holds recipes"""
+        rest = {k: v for k, v in result.items() if k != list_key}
+        return splice_object('{"' + list_key + '": ' + self.dumps_list(result.get(list_key) or []) + '}', rest)
+
+    def _json_parts(self, recipe: Dict[str, Any]) -> Tuple[str, ...]:
+        """String pieces that concatenate to the recipe's JSON, avoiding copies of the stored string"""
+        entry = self._entries.get(str(recipe.get('id')))
+        if entry is not None:
+            stored, stored_json = entry
+            if stored is recipe:
+                self._stats["passthrough"] += 1
+                return (stored_json,)
+            # Shallow copy: every stored key must still hold the very same value
+            if all(k in recipe and recipe[k] is v for k, v in stored.items()):
+                extras = {k: v for k, v in recipe.items() if k not in stored}
+                self._stats["spliced"] += 1
+                if not extras:
+                    return (stored_json,)
+                if not stored:
+                    return (json.dumps(extras, default=str),)
+                return (stored_json[:-1], ', ', json.dumps(extras, default=str)[1:])
+        self._stats["serialized"] += 1
+        return (json.dumps(recipe, default=str),)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and passthrough counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"version": self.version, "recipes": len(self._entries)})
+        return stats
+
+
+# Global index registered with the process-wide recipe corpus
+_recipe_json_index = RecipeJsonIndex()
+
+
+def get_recipe_json_index() -> RecipeJsonIndex:
+    """Get the process-wide recipe JSON index"""
+    return _recipe_json_index
@@ -0,0 +1,305 @@
+"""
+Columnar nutrition table for macro and time range filters.
+
+Holds one row per corpus snapshot position with the recipe's calories,
+protein, carbs, fat and total time as float64 (NaN when unknown). Range
+filters such as calories <= 500, protein >= 30 or time <= 30 become a few
+vectorized comparisons instead of a scan over recipe dicts. A recipe whose
+value is unknown never matches a filter on that column.
+
+The table is written to a .npy file next to the store and memory-mapped
+copy-on-write. Workers mapping the same file share its pages, and
+incremental updates stay private to the process that made them. It is
+kept in step with the corpus like the other indexes. Without NumPy the
+table is disabled and callers fall back to recipe_in_ranges().
+"""
+
+import os
+import re
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+NUTRITION_TABLE_ENABLED = os.environ.get('RECIPE_NUTRITION_TABLE_ENABLED', 'true').lower() == 'true'
+
+COLUMNS = ('calories', 'protein', 'carbs', 'fat', 'ready_in_minutes')
+# Request parameter name -> column; each accepts a min_ and a max_ prefix
+RANGE_PARAMETERS = {
+    'calories': 'calories',
+    'protein': 'protein',
+    'carbs': 'carbs',
+    'fat': 'fat',
+    'time': 'ready_in_minutes',
+}
+
+# Where each column's value may live in a recipe, in order of preference
+_NUTRIENT_KEYS = {
+    'calories': ('calories', 'calorieCount'),
+    'protein': ('protein',),
+    'carbs': ('carbs', 'carbohydrates'),
+    'fat': ('fat',),
+}
+_TIME_KEYS = ('ready_in_minutes', 'readyInMinutes', 'totalTime', 'cooking_time', 'cookingTime')
+_LEADING_NUMBER = re.compile(r'^\s*(\d+(?:\.\d+)?)')
+
+Ranges = Dict[str, List[Optional[float]]]
+
+
+def _number(value: Any) -> Optional[float]:
+    """Numeric value of 420, 420.0, "420" or "12g"; None otherwise"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+    if isinstance(value, str):
+        match = _LEADING_NUMBER.match(value)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def nutrition_values(recipe: Dict[str, Any]) -> Tuple[Optional[float], ...]:
+    """The recipe's value for each of COLUMNS (None when unknown)"""
+    nutrition = recipe.get('nutrition')
+    nutrition = nutrition if isinstance(nutrition, dict) else {}
+    values = []
+    for column in COLUMNS:
+        keys = _TIME_KEYS if column == 'ready_in_minutes' else _NUTRIENT_KEYS[column]
+        value = None
+        for source in ((recipe,) if column == 'ready_in_minutes' else (nutrition, recipe)):
+            for key in keys:
+                value = _number(source.get(key))
+                if value is not None:
+                    break
+            if value is not None:
+                break
+        values.append(value)
+    return tuple(values)
+
+
+def parse_range_filters(args: Mapping[str, Any]) -> Ranges:
+    """
+    Read min_/max_ range parameters (max_calories, min_protein, max_time, ...).
+
+    Returns:
+        {column: [low, high]} with None for an open end; empty when none were given
+
+    Raises:
+        ValueError: If a value is not a number or a range is empty
+    """
+    ranges: Ranges = {}
+    for name, column in RANGE_PARAMETERS.items():
+        bounds = []
+        for prefix in ('min_', 'max_'):
+            raw = args.get(prefix + name)
+            if raw is None or str(raw).strip() == '':
+                bounds.append(None)
+                continue
+            try:
+                bound = float(raw)
+            except (TypeError, ValueError):
+                raise ValueError(f"{prefix}{name} must be a number")
+            if bound != bound:
+                raise ValueError(f"{prefix}{name} must be a number")
+            bounds.append(bound)
+        if bounds[0] is None and bounds[1] is None:
+            continue
+        if bounds[0] is not None and bounds[1] is not None and bounds[0] > bounds[1]:
+            raise ValueError(f"min_{name} is greater than max_{name}")
+        ranges[column] = bounds
+    return ranges
+
+
+def recipe_in_ranges(recipe: Dict[str, Any], ranges: Ranges) -> bool:
+    """Dict-scan equivalent of NutritionTable.range_mask for a single recipe"""
+    values = dict(zip(COLUMNS, nutrition_values(recipe)))
+    for column, (low, high) in ranges.items():
+        value = values.get(column)
+        if value is None:
+            return False
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+    return True
+
+
+class NutritionTable:
+    """(positions x COLUMNS) float64 table keyed by corpus snapshot position"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self.path = path
+        self.version = -1
+        self._table = None
+        self._size = 0
+        self._positions: Dict[str, int] = {}
+        self._mapped = False
+        self._stats = {"builds": 0, "incremental_updates": 0, "lookups": 0, "fallbacks": 0}
+
+    def set_path(self, path: str) -> None:
+        """Back the table with a memory-mapped file from the next build on"""
+        self.path = path
+
+    @property
+    def available(self) -> bool:
+        return NUMPY_AVAILABLE and NUTRITION_TABLE_ENABLED
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Rebuild the table from a corpus snapshot"""
+        if not self.available:
+            return
+        table = np.full((len(recipes), len(COLUMNS)), np.nan, dtype=np.float64)
+        positions = {}
+        for position, recipe in enumerate(recipes):
+            if not isinstance(recipe, dict):
+                continue
+            table[position] = [np.nan if v is None else v for v in nutrition_values(recipe)]
+            if recipe.get('id'):
+                positions.setdefault(str(recipe['id']), position)
+        table, mapped = self._map_to_file(table)
+
+        with self._lock:
+            self._table = table
+            self._size = len(recipes)
+            self._positions = positions
+            self._mapped = mapped
+            self.version = version
+            self._stats["builds"] += 1
+        logger.debug(f"Nutrition table v{version} built over {len(recipes)} recipes (mapped: {mapped})")
+
+    def _map_to_file(self, table):
+        """Write the table to self.path and map it copy-on-write; returns (table, mapped)"""
+        if not self.path or not len(table):
+            return table, False
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npy"
+        try:
+            np.save(tmp_path, table)
+            os.replace(tmp_path, self.path)
+            return np.load(self.path, mmap_mode='c'), True
+        except Exception as e:
+            logger.warning(f"Could not memory-map nutrition table at {self.path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return table, False
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Rewrite the rows of the given snapshot positions"""
+        if not self.available:
+            return
+        with self._lock:
+            if self._table is None:
+                return
+            needed = max([position + 1 for position, _ in changes] + [self._size])
+            if needed > len(self._table):
+                # Appended recipes: grow in memory; the next build maps a file again
+                grown = np.full((max(needed, int(len(self._table) * 1.25) + 1), len(COLUMNS)), np.nan, dtype=np.float64)
+                grown[:len(self._table)] = self._table
+                self._table = grown
+                self._mapped = False
+            for position, recipe in changes:
+                self._table[position] = [np.nan if v is None else v for v in nutrition_values(recipe)]
+                if isinstance(recipe, dict) and recipe.get('id'):
+                    self._positions.setdefault(str(recipe['id']), position)
+            self._size = needed
+            self.version = version
+            self._stats["incremental_updates"] += 1
+
+    def _mask_array(self, ranges: Ranges):
+        """Boolean array over positions 0..size-1; caller holds the lock"""
+        mask = np.ones(self._size, dtype=bool)
+        for column, (low, high) in ranges.items():
+            values = self._table[:self._size, COLUMNS.index(column)]
+            # NaN compares False, so unknown values never match
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+            if low is None and high is None:
+                mask &= ~np.isnan(values)
+        return mask
+
+    def range_mask(self, version: int, ranges: Ranges) -> Optional[int]:
+        """
+        Bitmap of snapshot positions whose values fall in every range.
+
+        Args:
+            version: Snapshot version the caller is filtering
+            ranges: {column: [low, high]} from parse_range_filters
+
+        Returns:
+            Bitmap with one bit per matching position, or None when the table
+            can't be used (no NumPy, or built from another snapshot)
+        """
+        with self._lock:
+            if not self.available or self._table is None or version != self.version:
+                self._stats["fallbacks"] += 1
+                return None
+            self._stats["lookups"] += 1
+            mask = self._mask_array(ranges)
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+    def matcher(self, ranges: Ranges) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Predicate for recipes that fall in every range.
+
+        The ranges are evaluated once over the whole table; recipes found in it
+        are then a position lookup. Recipes the table doesn't know (not in the
+        corpus, e.g. from another collection) are checked field by field.
+        """
+        mask = None
+        positions: Dict[str, int] = {}
+        with self._lock:
+            if self.available and self._table is not None:
+                self._stats["lookups"] += 1
+                mask = self._mask_array(ranges)
+                positions = self._positions
+
+        def matches(recipe: Dict[str, Any]) -> bool:
+            position = positions.get(str(recipe.get('id'))) if mask is not None else None
+            if position is not None and position < len(mask):
+                return bool(mask[position])
+            return recipe_in_ranges(recipe, ranges)
+
+        return matches
+
+    def filter_recipes(self, recipes: Sequence[Dict[str, Any]], ranges: Ranges) -> List[Dict[str, Any]]:
+        """Keep the recipes that fall in every range, in order"""
+        if not ranges:
+            return list(recipes)
+        matches = self.matcher(ranges)
+        return [recipe for recipe in recipes if matches(recipe)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return table size and lookup counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "enabled": NUTRITION_TABLE_ENABLED,
+                "numpy": NUMPY_AVAILABLE,
+                "version": self.version,
+                "rows": self._size,
+                "memory_mapped": self._mapped,
+                "path": self.path,
+            })
+        return stats
+
+
+# Global table registered with the process-wide recipe corpus
+_nutrition_table = NutritionTable()
+
+
+def get_nutrition_table() -> NutritionTable:
+    """Get the process-wide nutrition table"""
+    return _nutrition_table
@@ -1,6 +1,6 @@
 # ChromaDB handled via singleton to prevent multiple instances
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 logger = logging.getLogger(__name__)
 # Optional numpy import for numeric ops; fall back if unavailable
@@ -30,7 +30,25 @@ except ImportError:
 from datetime import datetime
 import logging
 import random
+import os
+import threading
+import time
 from services.recipe_cache_service import RecipeCacheService
+from services.recipe_nutrition import get_nutrition_table
+from services.sparse_retrieval import (
+    NUMPY_AVAILABLE as SEARCH_INDEX_AVAILABLE, SEARCH_BACKEND, SEARCH_BACKEND_CHROMA, SEARCH_BACKEND_DENSE,
+    SEARCH_BACKEND_SPARSE, SparseRecipeIndex
+)
+from services.dense_retrieval import DenseRecipeIndex
+from services.embedding_cache import EMBEDDING_CACHE_FILE, get_embedding_cache
+
+# How often an in-process search index compares its size with the collection's row count
+SEARCH_INDEX_CHECK_SECONDS = 60
+# Rows read per collection.get() while building a search index
+SEARCH_INDEX_LOAD_BATCH = 1000
+
+# SentenceTransformer model used for document embeddings when installed
+ENCODER_MODEL = 'all-MiniLM-L6-v2'
 
 # Optional import for enhanced embeddings
 try:
@@ -53,7 +71,7 @@ class RecipeSearchService:
         self.cache_service = None
         
         # Import ChromaDB singleton to prevent multiple instances
-        from utils.chromadb_singleton import get_chromadb_client
+        from utils.chromadb_singleton import get_chromadb_client, get_chromadb_path
         from utils.lightweight_embeddings import get_lightweight_embedding_function
         
         # Use the singleton ChromaDB client
@@ -112,6 +130,24 @@ class RecipeSearchService:
             )
 
         self.recipe_collection = selected
+
+        # In-process indexes over the selected collection, built on first use by the
+        # backend they serve (see services/sparse_retrieval.py, services/dense_retrieval.py)
+        self.search_backend = SEARCH_BACKEND
+        if self.search_backend != SEARCH_BACKEND_CHROMA and not SEARCH_INDEX_AVAILABLE:
+            logger.warning(f"The {self.search_backend} search backend needs numpy - using ChromaDB queries")
+            self.search_backend = SEARCH_BACKEND_CHROMA
+        self.sparse_index = SparseRecipeIndex()
+        self.dense_index = DenseRecipeIndex(
+            path=os.path.join(get_chromadb_path(), f"dense_vectors_{getattr(selected, 'name', 'recipes')}.npy")
+        )
+        self._search_index_lock = threading.Lock()
+        self._search_index_checked_at = {}
+
+        # Document and query embeddings are looked up by (model id, text hash) before encoding
+        self.embedding_cache = get_embedding_cache()
+        self.embedding_cache.set_path(os.path.join(get_chromadb_path(), EMBEDDING_CACHE_FILE))
+
         # Initialize cache service for hydration of full recipe data
         try:
             self.cache_service = RecipeCacheService()
@@ -122,7 +158,7 @@ class RecipeSearchService:
         # Initialize sentence transformer for better embeddings (if available)
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
-                self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+                self.encoder = SentenceTransformer(ENCODER_MODEL)
                 logger.info("Using SentenceTransformer for enhanced embeddings")
             except Exception as e:
                 logger.warning(f"Failed to load SentenceTransformer, falling back to ChromaDB default: {e}")
@@ -181,7 +217,7 @@ class RecipeSearchService:
         if self.encoder:
             try:
                 # Use searchable text for better semantic search while keeping full recipe in documents
-                embedding = self.encoder.encode(searchable_text).tolist()
+                embedding = self._encode_documents([searchable_text])[0]
             except Exception as e:
                 logger.error(f"Failed to generate embedding: {e}")
         
@@ -196,51 +232,254 @@ class RecipeSearchService:
                 ids=[f"recipe_{recipe_id}"],
                 embeddings=[embedding] if embedding else None
             )
+            self._update_search_indexes([f"recipe_{recipe_id}"])
             logger.info(f"Successfully indexed recipe: {metadata['name']}")
         except Exception as e:
             logger.error(f"Failed to index recipe: {e}")
 
+    def _query_collection(self, query_texts: List[str], n_results: int,
+                          where: Optional[Dict[str, Any]] = None) -> Dict[str, List[List[Any]]]:
+        """
+        Nearest rows for each query text from the configured search backend.
+
+        Returns:
+            collection.query()-shaped results ('documents', 'metadatas', 'distances'), one list per query
+        """
+        if self.search_backend == SEARCH_BACKEND_SPARSE:
+            self._ensure_search_index(SEARCH_BACKEND_SPARSE)
+            return self.sparse_index.search(query_texts, n_results=n_results, where=where)
+        if self.search_backend == SEARCH_BACKEND_DENSE:
+            self._ensure_search_index(SEARCH_BACKEND_DENSE)
+            return self.dense_index.search(self._embed_queries(query_texts), n_results=n_results, where=where)
+        return self.recipe_collection.query(
+            query_texts=query_texts,
+            n_results=n_results,
+            where=where if where else None,
+            include=['documents', 'metadatas', 'distances']
+        )
+
+    def _encode_documents(self, texts: List[str]) -> List[List[float]]:
+        """SentenceTransformer embeddings of searchable texts, encoding only the uncached ones"""
+        return self.embedding_cache.embed(f"sentence-transformers/{ENCODER_MODEL}", texts, self.encoder.encode)
+
+    def _embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """Query embeddings from the lightweight embedding function, through the cache"""
+        function = self.embedding_function
+        model_id = f"{getattr(function, 'model_id', type(function).__name__)}/{getattr(function, 'dimensions', '')}"
+        return self.embedding_cache.embed(model_id, query_texts, function)
+
+    def _ensure_search_index(self, backend: str) -> None:
+        """
+        Build a backend's index on first use and after it was invalidated. Writes
+        made elsewhere are picked up when the collection's row count changes,
+        checked at most every SEARCH_INDEX_CHECK_SECONDS.
+        """
+        index = self.dense_index if backend == SEARCH_BACKEND_DENSE else self.sparse_index
+        if index.built and not index.stale:
+            now = time.time()
+            if now - self._search_index_checked_at.get(backend, 0.0) < SEARCH_INDEX_CHECK_SECONDS:
+                return
+            self._search_index_checked_at[backend] = now
+            try:
+                if self.recipe_collection.count() == index.size:
+                    return
+            except Exception as e:
+                logger.warning(f"Could not count recipe collection: {e}")
+                return
+            index.invalidate()
+        with self._search_index_lock:
+            if index.built and not index.stale:
+                # Rebuilt by another thread while this one waited
+                return
+            # Cleared before reading, so a write landing during the load marks it stale again
+            index.stale = False
+            if backend == SEARCH_BACKEND_DENSE:
+                ids, embeddings, documents, metadatas = self._read_collection(['embeddings', 'documents', 'metadatas'])
+                space = (getattr(self.recipe_collection, 'metadata', None) or {}).get('hnsw:space', 'l2')
+                index.build(ids, embeddings, documents, metadatas, space=space)
+            else:
+                ids, documents, metadatas = self._read_collection(['documents', 'metadatas'])
+                texts = [self._row_searchable_text(document, metadata) for document, metadata in zip(documents, metadatas)]
+                index.build(ids, texts, documents, metadatas)
+            self._search_index_checked_at[backend] = time.time()
+
+    def _read_collection(self, include: List[str]):
+        """Every row of the collection, read in batches: (ids, *one list per `include` field)"""
+        columns = {field: [] for field in include}
+        ids = []
+        offset = 0
+        while True:
+            batch = self.recipe_collection.get(include=include, limit=SEARCH_INDEX_LOAD_BATCH, offset=offset)
+            batch_ids = batch.get('ids') or []
+            ids.extend(batch_ids)
+            for field in include:
+                values = batch.get(field)
+                columns[field].extend(values if values is not None else [None] * len(batch_ids))
+            if len(batch_ids) < SEARCH_INDEX_LOAD_BATCH:
+                break
+            offset += len(batch_ids)
+        return (ids, *(columns[field] for field in include))
+
+    def _update_search_indexes(self, ids: List[str]) -> None:
+        """Bring the in-process indexes up to date after this service upserted `ids`"""
+        # BM25 weights depend on every row's length, so the sparse index rebuilds
+        self.sparse_index.invalidate()
+        if not self.dense_index.built or self.dense_index.stale:
+            return
+        try:
+            rows = self.recipe_collection.get(ids=ids, include=['embeddings', 'documents', 'metadatas'])
+            self.dense_index.upsert(rows['ids'], rows['embeddings'], rows['documents'], rows['metadatas'])
+        except Exception as e:
+            logger.warning(f"Could not update the dense index in place, rebuilding it: {e}")
+            self.dense_index.invalidate()
+
+    def _row_searchable_text(self, document: Any, metadata: Optional[Dict[str, Any]]) -> str:
+        """_create_searchable_text for a stored row, whatever shape its recipe document has"""
+        metadata = metadata or {}
+        try:
+            recipe = json.loads(document) if isinstance(document, str) else document
+        except (TypeError, ValueError):
+            recipe = None
+        if not isinstance(recipe, dict):
+            recipe = {}
+
+        # Stored recipes use title/cuisines and ingredient/step dicts; the text builder expects strings
+        def _strings(values):
+            if isinstance(values, str):
+                return [values]
+            if not isinstance(values, list):
+                return []
+            return [str(v.get('name') or v.get('step') or '') if isinstance(v, dict) else str(v) for v in values]
+
+        cuisines = recipe.get('cuisines')
+        view = dict(recipe)
+        view.update({
+            "name": recipe.get('name') or recipe.get('title') or metadata.get('name') or metadata.get('title') or '',
+            "cuisine": recipe.get('cuisine') or (cuisines[0] if isinstance(cuisines, list) and cuisines else '')
+                       or metadata.get('cuisine') or '',
+            "mealType": recipe.get('mealType') or metadata.get('meal_type') or '',
+            "dietaryRestrictions": _strings(recipe.get('dietaryRestrictions') or recipe.get('diets')),
+            "ingredients": _strings(recipe.get('ingredients')),
+            "instructions": _strings(recipe.get('instructions')),
+            "nutrition": recipe.get('nutrition') if isinstance(recipe.get('nutrition'), dict) else {},
+        })
+        try:
+            return self._create_searchable_text(view)
+        except Exception as e:
+            logger.debug(f"Falling back to the recipe name for searchable text: {e}")
+            return str(view["name"])
+
     def semantic_search(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Perform enhanced semantic search on recipes with improved filtering and ranking
         """
-        # Expand the query for better semantic matching
-        expanded_query = self._expand_query(query)
-        
-        where_clause = self._build_where_clause(filters)
-        
-        try:
-            # Perform semantic search with expanded query
-            results = self.recipe_collection.query(
-                query_texts=[expanded_query],
-                n_results=min(limit * 3, 10000),  # Fetch more for post-ranking
-                where=where_clause if where_clause else None,
-                include=['documents', 'metadatas', 'distances']
-            )
+        return self.semantic_search_many([query], filters=filters, limit=limit)[0]
+
+    def semantic_search_many(self, queries: List[str], filters: Optional[Dict[str, Any]] = None,
+                             limit: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Run several semantic searches sharing the same filters as one backend query.
+
+        Returns:
+            One result list per query, as semantic_search returns it
+        """
+        return self.semantic_search_batch([(query, filters, limit) for query in queries])
+
+    def semantic_search_batch(self, searches: List[Tuple[str, Optional[Dict[str, Any]], int]],
+                              parsed: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Run several semantic searches, each with its own filters and limit, in as few
+        backend queries as possible: searches whose filters build the same where clause
+        are answered by one _query_collection call.
+
+        Args:
+            searches: (query, filters, limit) per search
+            parsed: Stored documents already parsed, by row id; shared across calls so a
+                recipe returned by several searches is parsed once
+
+        Returns:
+            One result list per search, as semantic_search returns it
+        """
+        parsed = {} if parsed is None else parsed
+        groups: Dict[str, List[int]] = {}
+        for position, (_, filters, _) in enumerate(searches):
+            key = json.dumps([self._build_where_clause(filters), (filters or {}).get("nutrition_ranges")],
+                             sort_keys=True, default=str)
+            groups.setdefault(key, []).append(position)
+        
+        output: List[List[Dict[str, Any]]] = [[] for _ in searches]
+        for positions in groups.values():
+            filters = searches[positions[0]][1]
+            where_clause = self._build_where_clause(filters)
+            
+            # Calorie/macro/time ranges aren't in the collection metadata; they are checked
+            # against the nutrition table after the query, so fetch a wider pool
+            nutrition_ranges = (filters or {}).get("nutrition_ranges")
+            in_ranges = get_nutrition_table().matcher(nutrition_ranges) if nutrition_ranges else None
+            fetch_factor = 10 if in_ranges else 3
+            # Fetch more for post-ranking; each search only ranks its own share of the rows
+            fetch = [min(searches[position][2] * fetch_factor, 10000) for position in positions]
+            
+            try:
+                # Perform semantic search with expanded queries
+                results = self._query_collection(
+                    [self._expand_query(searches[position][0]) for position in positions],
+                    n_results=max(fetch),
+                    where=where_clause
+                )
+            except Exception as e:
+                logger.error(f"Error during semantic search: {e}")
+                continue
             
-            if not results or not results['documents']:
+            for row, position in enumerate(positions):
+                query, _, limit = searches[position]
+                output[position] = self._process_search_results(results, row, query, in_ranges, limit,
+                                                                 rows=fetch[row], parsed=parsed)
+        return output
+
+    def _process_search_results(self, results: Dict[str, List[List[Any]]], row: int, query: str,
+                                in_ranges, limit: int, rows: Optional[int] = None,
+                                parsed: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Turn one query's rows of _query_collection results into ranked recipe objects.
+        Only the first `rows` are considered; documents are parsed through `parsed` (by row id).
+        """
+        try:
+            if not results or not results['documents'] or row >= len(results['documents']):
                 return []
+            row_ids = (results.get('ids') or [])[row] if row < len(results.get('ids') or []) else []
             
             # Process and rank results
             processed_results = []
-            for i, doc in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][i]
-                base_score = 1 - results['distances'][0][i]  # Convert distance to similarity
+            for i, doc in enumerate(results['documents'][row][:rows]):
+                metadata = results['metadatas'][row][i]
+                base_score = 1 - results['distances'][row][i]  # Convert distance to similarity
                 
-                # Parse the full recipe document
-                try:
-                    if isinstance(doc, str):
-                        recipe_data = json.loads(doc)
-                    else:
-                        recipe_data = doc
-                except (json.JSONDecodeError, TypeError):
-                    logger.warning(f"Failed to parse recipe document at index {i}")
+                # Parse the full recipe document (once per row id when sharing `parsed`)
+                doc_id = row_ids[i] if parsed is not None and i < len(row_ids) else None
+                recipe_data = parsed.get(doc_id) if doc_id is not None else None
+                if recipe_data is None:
+                    try:
+                        if isinstance(doc, str):
+                            recipe_data = json.loads(doc)
+                        else:
+                            recipe_data = doc
+                    except (json.JSONDecodeError, TypeError):
+                        logger.warning(f"Failed to parse recipe document at index {i}")
+                        continue
+                    if doc_id is not None:
+                        parsed[doc_id] = recipe_data
+                
+                if in_ranges is not None and not in_ranges(recipe_data):
                     continue
                 
-                # Debug: Log the raw recipe data from ChromaDB
-                logger.debug(f"Recipe {i} raw data from ChromaDB: {recipe_data}")
-                logger.debug(f"Recipe {i} metadata from ChromaDB: {metadata}")
-                logger.debug(f"Recipe {i} document type: {type(doc)}, document content: {doc}")
+                # Debug: Log the raw recipe data from ChromaDB (guarded: formatting
+                # whole documents is expensive even when the message is dropped)
+                debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                if debug_enabled:
+                    logger.debug(f"Recipe {i} raw data from ChromaDB: {recipe_data}")
+                    logger.debug(f"Recipe {i} metadata from ChromaDB: {metadata}")
+                    logger.debug(f"Recipe {i} document type: {type(doc)}, document content: {doc}")
                 
                 # Safely access recipe fields with defaults
                 recipe_id = recipe_data.get("id") or recipe_data.get("_id") or metadata.get("recipe_id", f"unknown_{i}")
@@ -276,7 +515,8 @@ class RecipeSearchService:
                 logger.debug(f"Recipe {i} cuisine extraction - cuisines: {recipe_data.get('cuisines')}, cuisine: {recipe_data.get('cuisine')}, metadata cuisine: {metadata.get('cuisine')}, final: {cuisine}")
                 
                 # Debug: Log the full recipe data structure to see what fields are available
-                logger.debug(f"Recipe {i} full data structure: {json.dumps(recipe_data, indent=2)}")
+                if debug_enabled:
+                    logger.debug(f"Recipe {i} full data structure: {json.dumps(recipe_data, indent=2)}")
                 
                 # Normalize the cuisine if we have one
                 if cuisine:
@@ -476,7 +716,7 @@ class RecipeSearchService:
         # Get the recipe document
         recipe_doc = self.recipe_collection.get(
             ids=[f"recipe_{recipe_id}"],
-            include=['documents']
+            include=['documents', 'metadatas']
         )
         
         if not recipe_doc or not recipe_doc['documents']:
@@ -484,11 +724,13 @@ class RecipeSearchService:
         
         # Use the recipe's document as query
         query_text = recipe_doc['documents'][0]
+        if self.search_backend == SEARCH_BACKEND_SPARSE:
+            # Match on the same text the recipe was indexed under, not its raw JSON
+            query_text = self._row_searchable_text(query_text, (recipe_doc.get('metadatas') or [None])[0])
         
-        results = self.recipe_collection.query(
-            query_texts=[query_text],
-            n_results=limit + 1,  # +1 to exclude the original recipe
-            include=['documents', 'metadatas', 'distances']
+        results = self._query_collection(
+            [query_text],
+            n_results=limit + 1  # +1 to exclude the original recipe
         )
         
         # Filter out the original recipe and process results
@@ -522,13 +764,17 @@ class RecipeSearchService:
             or hash(json.dumps(recipe, sort_keys=True)[:128])
         )
 
-    def get_recipe_recommendations(self, user_preferences: Dict[str, Any], limit: int = 16) -> List[Dict[str, Any]]:
+    def get_recipe_recommendations(self, user_preferences: Dict[str, Any], limit: int = 16,
+                                   nutrition_ranges: Optional[Dict[str, List[Optional[float]]]] = None) -> List[Dict[str, Any]]:
         """
         Get personalized recipe recommendations with FAIR cuisine split and favorite foods:
         1. Reserve 2-3 slots for favorite foods (any cuisine)
         2. Distribute remaining slots equally among preferred cuisines
         3. Ensure each cuisine gets exactly the same number of recipes
         4. Add randomization for variety on each refresh
+        
+        nutrition_ranges ({column: [low, high]}, see parse_range_filters) restricts
+        every candidate search to recipes within those calorie/macro/time ranges.
         """
         import random
         import time
@@ -576,6 +822,8 @@ class RecipeSearchService:
             filters["is_vegan"] = True
         if "gluten-free" in dr:
             filters["is_gluten_free"] = True
+        if nutrition_ranges:
+            filters["nutrition_ranges"] = nutrition_ranges
 
         # If no cuisines selected, prioritize favorite foods then variety
         if not favorite_cuisines:
@@ -583,11 +831,14 @@ class RecipeSearchService:
             all_recipes = []
             used_ids = set()
             
+            # Favorite food and popular searches share the filters, so they go out as one query
+            searches = [(f"delicious {food} recipes", filters, 2) for food in favorite_foods[:3]]
+            searches.append(("popular delicious recipes", filters, limit * 2))
+            *food_results, popular_pool = self.semantic_search_batch(searches)
+            
             # Include favorite foods first (up to 3)
             if favorite_foods:
-                for food in favorite_foods[:3]:
-                    query = f"delicious {food} recipes"
-                    results = self.semantic_search(query=query, filters=filters, limit=2)
+                for results in food_results:
                     # Shuffle results for variety
                     random.shuffle(results)
                     for recipe in results:
@@ -601,8 +852,7 @@ class RecipeSearchService:
             # Fill remaining slots with popular recipes
             remaining = limit - len(all_recipes)
             if remaining > 0:
-                popular_query = "popular delicious recipes"
-                popular_results = self.semantic_search(query=popular_query, filters=filters, limit=remaining * 2)
+                popular_results = popular_pool[:remaining * 2]
                 # Shuffle results for variety
                 random.shuffle(popular_results)
                 for recipe in popular_results:
@@ -632,6 +882,17 @@ class RecipeSearchService:
         final_recommendations = []
         used_ids = set()
         
+        # Every sub-query is gathered up front and sent as one batch (one backend query
+        # per distinct filter); each recipe document is parsed once across all of them.
+        # The cuisine pool is sized for the most slots Phase 2 can have and cut down below.
+        combined_cuisine_filter = {"cuisine": favorite_cuisines}
+        if nutrition_ranges:
+            combined_cuisine_filter["nutrition_ranges"] = nutrition_ranges
+        parsed_documents: Dict[str, Any] = {}
+        searches = [(f"delicious {food} recipes", filters, 5) for food in favorite_foods]
+        searches.append(("delicious recipes", combined_cuisine_filter, limit * 3))
+        *food_results, cuisine_pool = self.semantic_search_batch(searches, parsed=parsed_documents)
+        
         # PHASE 1: Add favorite foods (any cuisine, but prefer preferred cuisines)
         if favorite_foods and favorite_food_slots > 0:
             logger.info(f"Phase 1: Adding {favorite_food_slots} favorite food recipes")
@@ -640,12 +901,10 @@ class RecipeSearchService:
             favorite_foods_in_preferred = []
             favorite_foods_other = []
             
-            for food in favorite_foods:
+            # The loop stops once the slots are full
+            for results in food_results:
                 if len(favorite_foods_in_preferred) + len(favorite_foods_other) >= favorite_food_slots:
                     break
-                    
-                query = f"delicious {food} recipes"
-                results = self.semantic_search(query=query, filters=filters, limit=5)
                 
                 # Shuffle results for variety
                 random.shuffle(results)
@@ -717,19 +976,11 @@ class RecipeSearchService:
             # This ensures we're using the full 339 recipes instead of searching each cuisine separately
             logger.info("🔍 Getting recipes from combined cuisine pool...")
             
-            # Create a filter for all selected cuisines
-            combined_cuisine_filter = {"cuisine": favorite_cuisines}
-            
-            logger.info(f"🔍 DEBUG: Sending cuisine filter to semantic search: {combined_cuisine_filter}")
-            logger.info(f"🔍 DEBUG: This will search ChromaDB for recipes with cuisine in: {favorite_cuisines}")
+            logger.info(f"🔍 DEBUG: Cuisine filter sent to semantic search: {combined_cuisine_filter}")
             
-            # Get a larger pool of recipes from all selected cuisines
+            # A larger pool of recipes from all selected cuisines
             pool_size = remaining_slots * 3  # Get 3x more than needed for better distribution
-            combined_results = self.semantic_search(
-                query="delicious recipes", 
-                filters=combined_cuisine_filter, 
-                limit=pool_size
-            )
+            combined_results = cuisine_pool[:pool_size]
             
             # Debug: Show what cuisines we're actually getting back from the search
             if combined_results:
@@ -832,11 +1083,14 @@ class RecipeSearchService:
             else:
                 logger.warning("⚠️ No recipes found from combined cuisine pool, falling back to individual searches")
                 # Fall back to the old individual search approach
-                self._fill_with_individual_cuisine_searches(final_recommendations, used_ids, favorite_cuisines, remaining_slots, filters, user_preferences)
+                self._fill_with_individual_cuisine_searches(final_recommendations, used_ids, favorite_cuisines, remaining_slots, filters, user_preferences,
+                                                            parsed=parsed_documents)
             
             # DEBUG: If we still don't have enough recipes, try a search without cuisine filters to see what's available
             if len(final_recommendations) < remaining_slots:
-                logger.warning(f"⚠️ Only got {len(final_recommendations)} recipes, trying search without cuisine filters")
+                logger.warning(f"⚠️ Only got {len(final_recommendations)} recipes")
+            if len(final_recommendations) < remaining_slots and logger.isEnabledFor(logging.DEBUG):
+                # Diagnostic only: costs another query, so it runs with debug logging on
                 try:
                     no_filter_results = self.semantic_search(
                         query="delicious recipes", 
@@ -882,8 +1136,9 @@ class RecipeSearchService:
         
         return final_recommendations
 
-    def _fill_with_individual_cuisine_searches(self, final_recommendations, used_ids, favorite_cuisines, remaining_slots, filters, user_preferences):
-        """Fallback method to fill remaining slots with individual cuisine searches"""
+    def _fill_with_individual_cuisine_searches(self, final_recommendations, used_ids, favorite_cuisines, remaining_slots, filters, user_preferences,
+                                               parsed=None):
+        """Fallback method to fill remaining slots with per-cuisine searches, batched per attempt"""
         logger.info("🔄 Using fallback individual cuisine search approach")
         
         # Calculate target for each cuisine - ensure equal distribution
@@ -910,67 +1165,64 @@ class RecipeSearchService:
             cuisine_added_counts[cuisine] = current_count
             logger.info(f"   - {cuisine}: {current_count} recipes already added")
         
-        # Fill each cuisine to its target
+        # Slots each cuisine still needs to reach its target
+        needed_counts = {}
         for i, cuisine in enumerate(favorite_cuisines):
-            if len(final_recommendations) >= len(final_recommendations) + remaining_slots:
-                break
-                
-            logger.info(f"🔍 PROCESSING CUISINE {i+1}/{len(favorite_cuisines)}: {cuisine}")
-            
             # This cuisine gets target_per_cuisine + 1 if it's in the extra slots
             target_count = target_per_cuisine + (1 if i < extra_slots else 0)
             current_count = cuisine_added_counts[cuisine]
-            needed_count = target_count - current_count
-            
-            logger.info(f"   - Target count: {target_count}")
-            logger.info(f"   - Current count: {current_count}")
-            logger.info(f"   - Needed count: {needed_count}")
-            
-            if needed_count <= 0:
+            logger.info(f"🔍 {cuisine}: target {target_count}, current {current_count}")
+            if target_count - current_count > 0:
+                needed_counts[cuisine] = target_count - current_count
+            else:
                 logger.info(f"✓ {cuisine} already has {current_count} recipes (target: {target_count})")
-                continue
-            
-            logger.info(f"🔍 Getting {needed_count} additional recipes for {cuisine} cuisine")
+        found_counts = {cuisine: 0 for cuisine in needed_counts}
+        
+        # Search for recipes from each specific cuisine
+        search_templates = [
+            "{} recipes",
+            "{} traditional dishes",
+            "{} food",
+            "{} cuisine",
+            "{} dishes"
+        ]
+        
+        max_search_attempts = 3  # Limit search attempts per cuisine
+        
+        for attempt in range(max_search_attempts):
+            short_cuisines = [c for c in needed_counts if found_counts[c] < needed_counts[c]]
+            if not short_cuisines:
+                break
             
-            # Search for recipes from this specific cuisine
-            search_queries = [
-                f"{cuisine} recipes",
-                f"{cuisine} traditional dishes",
-                f"{cuisine} food",
-                f"{cuisine} cuisine",
-                f"{cuisine} dishes"
+            # One batched search per attempt: every short cuisine's query runs over the pool of
+            # all of them, and each keeps the recipes of its own cuisine. Use different search
+            # strategies per attempt, with a higher limit to get more options
+            template = search_templates[attempt % len(search_templates)]
+            cuisine_filters = filters.copy() if filters else {}
+            cuisine_filters["cuisine"] = short_cuisines if len(short_cuisines) > 1 else short_cuisines[0]
+            searches = [
+                (template.format(cuisine), cuisine_filters,
+                 (needed_counts[cuisine] - found_counts[cuisine]) * 4 * len(short_cuisines))
+                for cuisine in short_cuisines
             ]
+            logger.info(f"Search attempt {attempt + 1} for {short_cuisines}: '{template}'")
+            batch_results = self.semantic_search_batch(searches, parsed=parsed)
             
-            cuisine_recipes_found = 0
-            max_search_attempts = 3  # Limit search attempts per cuisine
+            if not any(batch_results) and not cuisine_filters.get("nutrition_ranges"):
+                # No row passes the filter, so other query wordings can't find any either
+                logger.warning(f"No results found for {short_cuisines}")
+                break
             
-            for attempt in range(max_search_attempts):
-                if cuisine_recipes_found >= needed_count:
-                    break
-                    
-                # Use different search strategies
-                query = search_queries[attempt % len(search_queries)]
-                logger.info(f"Search attempt {attempt + 1} for {cuisine}: '{query}'")
-                
-                # Search with higher limit to get more options
-                search_limit = (needed_count - cuisine_recipes_found) * 4
-                
-                # Create cuisine-specific filters to ensure we get recipes from this cuisine
-                cuisine_filters = filters.copy() if filters else {}
-                cuisine_filters["cuisine"] = cuisine  # Restrict to this specific cuisine
-                
-                results = self.semantic_search(query=query, filters=cuisine_filters, limit=search_limit)
-                
-                if not results:
-                    logger.warning(f"No results found for {cuisine} with query: {query}")
-                    continue
-                
-                logger.info(f"Found {len(results)} potential recipes for {cuisine}")
+            for cuisine, results in zip(short_cuisines, batch_results):
+                needed_count = needed_counts[cuisine]
                 
                 # Process results for this cuisine
                 for recipe in results:
-                    if cuisine_recipes_found >= needed_count:
+                    if found_counts[cuisine] >= needed_count:
                         break
+                    
+                    if (recipe.get('metadata') or {}).get('cuisine') != cuisine:
+                        continue
                         
                     k = self._get_recipe_key(recipe)
                     if k in used_ids:
@@ -988,15 +1240,13 @@ class RecipeSearchService:
                     recipe['cuisines'] = [cuisine]
                     final_recommendations.append(recipe)
                     used_ids.add(k)
-                    cuisine_recipes_found += 1
+                    found_counts[cuisine] += 1
                     cuisine_added_counts[cuisine] += 1
                     
-                    logger.info(f"✓ Added {cuisine} recipe {cuisine_recipes_found}/{needed_count}: {recipe.get('title', recipe.get('name', 'Unknown'))}")
-                
-                if cuisine_recipes_found >= needed_count:
-                    break
-            
-            logger.info(f"✓ {cuisine}: Added {cuisine_recipes_found}/{needed_count} recipes")
+                    logger.info(f"✓ Added {cuisine} recipe {found_counts[cuisine]}/{needed_count}: {recipe.get('title', recipe.get('name', 'Unknown'))}")
+        
+        for cuisine, needed_count in needed_counts.items():
+            logger.info(f"✓ {cuisine}: Added {found_counts[cuisine]}/{needed_count} recipes")
     
     def _should_exclude_recipe(self, recipe: Dict[str, Any], user_preferences: Dict[str, Any] = None) -> bool:
         """
@@ -1414,13 +1664,23 @@ class RecipeSearchService:
             }
             metadatas.append(metadata)
             ids.append(f"recipe_{recipe.get('id')}")
-            
-            # Generate embedding if we have the encoder
-            if self.encoder:
-                # Use searchable text for better semantic search while keeping full recipe in documents
-                searchable_text = self._create_searchable_text(recipe)
-                embedding = self.encoder.encode([searchable_text])[0].tolist()
-                embeddings.append(embedding)
+        
+        # Rows already stored with the same document and metadata need no write (or encoding)
+        unchanged = self._unchanged_row_ids(ids, documents, metadatas)
+        if unchanged:
+            keep = [i for i, row_id in enumerate(ids) if row_id not in unchanged]
+            recipes = [recipes[i] for i in keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            ids = [ids[i] for i in keep]
+            logger.info(f"Skipping {len(unchanged)} unchanged recipes")
+        if not ids:
+            return
+        
+        # Generate embeddings if we have the encoder
+        if self.encoder:
+            # Use searchable text for better semantic search while keeping full recipe in documents
+            embeddings = self._encode_documents([self._create_searchable_text(recipe) for recipe in recipes])
         
         # Bulk upsert
         self.recipe_collection.upsert(
@@ -1428,7 +1688,29 @@ class RecipeSearchService:
             metadatas=metadatas,
             ids=ids,
             embeddings=embeddings if embeddings else None
-        ) 
+        )
+        self._update_search_indexes(ids)
+
+    def _unchanged_row_ids(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> set:
+        """Ids whose stored document and metadata (apart from indexed_at) already match"""
+        try:
+            stored = self.recipe_collection.get(ids=ids, include=['documents', 'metadatas'])
+        except Exception as e:
+            logger.warning(f"Could not read stored recipes, reindexing all: {e}")
+            return set()
+        stored_rows = {
+            row_id: (document, metadata or {})
+            for row_id, document, metadata in zip(stored.get('ids') or [], stored.get('documents') or [],
+                                                  stored.get('metadatas') or [])
+        }
+        unchanged = set()
+        for row_id, document, metadata in zip(ids, documents, metadatas):
+            row = stored_rows.get(row_id)
+            if row is None or row[0] != document:
+                continue
+            if {k: v for k, v in row[1].items() if k != 'indexed_at'} == {k: v for k, v in metadata.items() if k != 'indexed_at'}:
+                unchanged.add(row_id)
+        return unchanged
 
     def _expand_query(self, query: str) -> str:
         """
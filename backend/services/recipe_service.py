@@ -2,6 +2,17 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+try:
+    from .recipe_facets import analyze_dietary_restrictions, matches_required_diets, required_diet_values
+    from .result_set_store import get_result_set_store
+    from .seeded_pagination import decode_cursor, encode_cursor, new_seed, seeded_page
+    from .search_trace import current_trace
+except ImportError:
+    from recipe_facets import analyze_dietary_restrictions, matches_required_diets, required_diet_values
+    from result_set_store import get_result_set_store
+    from seeded_pagination import decode_cursor, encode_cursor, new_seed, seeded_page
+    from search_trace import current_trace
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,6 +26,7 @@ class RecipeService:
             recipe_cache: The recipe cache instance to use for storing/retrieving recipes
         """
         self.recipe_cache = recipe_cache
+        self.result_sets = get_result_set_store()
         logger.info("Recipe Service initialized in local-only mode - no API calls will be made")
     
     async def get_recipe_by_id(self, recipe_id: str) -> Optional[Dict[str, Any]]:
@@ -733,114 +745,14 @@ class RecipeService:
         if not restrictions:
             return True
             
-        # Get dietary restrictions from various possible fields
-        recipe_restrictions = set()
-        
-        # Check diets field (common in Spoonacular data)
-        if 'diets' in recipe and isinstance(recipe['diets'], list):
-            recipe_restrictions.update(d.lower() for d in recipe['diets'] if isinstance(d, str) and d.strip())
-            
-        # Check dietary_restrictions field (our normalized field)
-        if 'dietary_restrictions' in recipe and isinstance(recipe['dietary_restrictions'], list):
-            recipe_restrictions.update(d.lower() for d in recipe['dietary_restrictions'] 
-                                     if isinstance(d, str) and d.strip())
-        
-        # Check for vegetarian/vegan flags directly in the recipe
-        if recipe.get('vegetarian', False):
-            recipe_restrictions.add('vegetarian')
-        if recipe.get('vegan', False):
-            recipe_restrictions.add('vegan')
-        
-        # If no explicit restrictions found, analyze ingredients
-        if not recipe_restrictions:
-            recipe_restrictions = self._analyze_recipe_dietary_restrictions(recipe)
-            
-        # Debug logging
+        recipe_restrictions = required_diet_values(recipe)
         logger.debug(f"Recipe '{recipe.get('title', 'unknown')}' has restrictions: {recipe_restrictions}")
-        
-        # Check if all required restrictions are met
-        required_restrictions = {r.lower().strip() for r in restrictions if r and r.strip()}
-        
-        # If no valid restrictions to check, return True
-        if not required_restrictions:
-            return True
-            
-        # Special case: if 'vegetarian' is required but recipe is marked as 'vegan', that's also acceptable
-        if 'vegetarian' in required_restrictions and 'vegan' in recipe_restrictions:
-            required_restrictions.discard('vegetarian')
-            required_restrictions.add('vegan')
-        
-        # Check if all required restrictions are present in the recipe
-        return required_restrictions.issubset(recipe_restrictions)
+        return matches_required_diets(recipe_restrictions, restrictions)
     
     def _analyze_recipe_dietary_restrictions(self, recipe: Dict[str, Any]) -> set:
         """Analyze recipe ingredients to determine dietary restrictions."""
-        restrictions = set()
-        
-        # Get all text from recipe for analysis
-        recipe_text = ""
-        
-        # Add title and description
-        recipe_text += f" {recipe.get('title', '')} {recipe.get('description', '')}"
-        
-        # Add ingredients
-        if 'ingredients' in recipe and isinstance(recipe['ingredients'], list):
-            for ing in recipe['ingredients']:
-                if isinstance(ing, dict) and 'name' in ing:
-                    recipe_text += f" {ing['name']}"
-                elif isinstance(ing, str):
-                    recipe_text += f" {ing}"
-        
-        # Add instructions
-        if 'instructions' in recipe:
-            if isinstance(recipe['instructions'], list):
-                recipe_text += f" {' '.join(str(step) for step in recipe['instructions'])}"
-            elif isinstance(recipe['instructions'], str):
-                recipe_text += f" {recipe['instructions']}"
-        
-        recipe_text = recipe_text.lower()
-        
-        # Meat indicators that would make a recipe non-vegetarian
-        meat_indicators = [
-            'chicken', 'beef', 'pork', 'lamb', 'fish', 'salmon', 'tuna', 'shrimp', 'prawn', 
-            'meat', 'bacon', 'ham', 'sausage', 'turkey', 'duck', 'goose', 'venison', 
-            'rabbit', 'quail', 'pheasant', 'veal', 'mackerel', 'haddock', 'clam', 'oyster',
-            'mussel', 'scallop', 'crab', 'lobster', 'anchovy', 'sardine', 'trout', 'cod',
-            'halibut', 'sea bass', 'tilapia', 'catfish', 'swordfish', 'mahi mahi',
-            'steak', 'burger', 'hot dog', 'hotdog', 'pepperoni', 'salami', 'prosciutto',
-            'chorizo', 'pastrami', 'corned beef', 'roast beef', 'ground beef', 'mince',
-            'liver', 'kidney', 'heart', 'tongue', 'tripe', 'oxtail', 'short ribs',
-            'ribeye', 'sirloin', 'tenderloin', 'brisket', 'flank', 'skirt steak',
-            'lamb chops', 'lamb shank', 'pork chops', 'pork belly', 'pork shoulder',
-            'chicken breast', 'chicken thigh', 'chicken wing', 'chicken leg', 'chicken drumstick',
-            'fish fillet', 'fish steak', 'fish cake', 'fish ball', 'fish sauce',
-            'anchovy paste', 'fish stock', 'chicken stock', 'beef stock', 'meat stock',
-            'bone broth', 'chicken broth', 'beef broth', 'meat broth'
-        ]
-        
-        # Check for meat indicators
-        has_meat = any(meat in recipe_text for meat in meat_indicators)
-        
-        if not has_meat:
-            restrictions.add('vegetarian')
-            
-            # Check for animal products that would make it non-vegan
-            animal_indicators = [
-                'milk', 'cheese', 'butter', 'cream', 'egg', 'yogurt', 'honey', 'gelatin', 
-                'lard', 'tallow', 'whey', 'casein', 'parmesan', 'pecorino', 'mascarpone', 
-                'creme fraiche', 'sour cream', 'condensed milk', 'evaporated milk', 'half and half',
-                'heavy cream', 'light cream', 'whipping cream', 'buttermilk', 'kefir', 'cottage cheese',
-                'ricotta', 'mozzarella', 'cheddar', 'gouda', 'brie', 'camembert', 'feta', 'blue cheese',
-                'goat cheese', 'cream cheese', 'american cheese', 'provolone', 'swiss cheese'
-            ]
-            
-            has_animal_products = any(animal in recipe_text for animal in animal_indicators)
-            
-            if not has_animal_products:
-                restrictions.add('vegan')
-        
-        return restrictions
-        
+        return analyze_dietary_restrictions(recipe)
+
     def _matches_query(self, recipe: Dict[str, Any], query: str) -> bool:
         """
         Check if a recipe's title matches the search query.
@@ -907,7 +819,14 @@ class RecipeService:
                        cuisines: List[str] = None, 
                        dietary_restrictions: List[str] = None,
                        foods_to_avoid: List[str] = None,
-                       favorite_foods: List[str] = None) -> List[Dict[str, Any]]:
+                       favorite_foods: List[str] = None,
+                       cuisine_match: str = None,
+                       within: str = None,
+                       keep_result_set: bool = False,
+                       seed: int = None,
+                       cursor: str = None,
+                       shuffle: str = None,
+                       nutrition_ranges: Dict[str, List[Optional[float]]] = None) -> List[Dict[str, Any]]:
         """
         Search recipes from local cache with simplified filtering and balancing.
         
@@ -920,44 +839,68 @@ class RecipeService:
             dietary_restrictions: List of dietary restrictions to filter by
             foods_to_avoid: List of foods to exclude from results
             favorite_foods: List of favorite foods to prioritize
+            cuisine_match: 'partial' (default, "american" also matches "south american") or 'exact'
+            within: Result-set handle from a previous search; only its recipes are searched
+            keep_result_set: Store the ids of the full result and return a handle for `within`
+            seed: Seed for a stable shuffled order; pages with the same seed never overlap
+            cursor: Cursor from a previous seeded page; implies its seed and replaces offset
+            shuffle: 'seeded' to start a seeded listing with a server-chosen seed
+            nutrition_ranges: {column: [low, high]} calorie/macro/time ranges from parse_range_filters
             
         Returns:
-            List of filtered recipe dictionaries from local cache
+            Dict with the page of 'results', the 'total' match count and a 'result_set'
+            handle for searching within these results (None unless `keep_result_set`,
+            or when the result is too large to keep). 'result_set_expired' is set
+            when `within` is unknown or has expired. Seeded listings also return the
+            'seed' and a 'next_cursor' (None on the last page).
+            
+        Raises:
+            ValueError: If `cursor` is malformed
         """
+        # Seeded mode is opted into by passing a seed or cursor, or shuffle='seeded'
+        after = None
+        if cursor:
+            seed, after = decode_cursor(cursor)
+            offset = 0
+        elif seed is None and shuffle == 'seeded':
+            seed = new_seed()
+        
         # Normalize inputs
         cuisines = [c.lower().strip() for c in cuisines] if cuisines else []
         dietary_restrictions = [dr.lower().strip() for dr in dietary_restrictions] if dietary_restrictions else []
         foods_to_avoid = [fa.lower().strip() for fa in foods_to_avoid] if foods_to_avoid else []
         favorite_foods = [ff.lower().strip() for ff in favorite_foods] if favorite_foods else []
         
-        # Log once per request
-        logger.info(f"Searching recipes: query='{query}', ingredient='{ingredient}', "
-                   f"cuisines={len(cuisines)}, diets={len(dietary_restrictions)}, "
-                   f"offset={offset}, limit={limit}")
+        # Timings and counts go to the request's trace, logged once when it finishes
+        trace = current_trace()
         
         # Get recipes from cache with initial filtering
         # Build filters dictionary for the cache service
         filters = {}
         if cuisines:
             filters["cuisine"] = cuisines[0] if len(cuisines) == 1 else cuisines  # Pass single cuisine or list
+        if cuisine_match:
+            filters["cuisine_match"] = cuisine_match
         if dietary_restrictions:
             filters["dietary_restrictions"] = dietary_restrictions
-        
-        logger.info(f"🔍 RECIPE SERVICE DEBUG: About to call cache service with filters: {filters}")
-        logger.info(f"🔍 RECIPE SERVICE DEBUG: cuisines parameter: {cuisines}")
-        logger.info(f"🔍 RECIPE SERVICE DEBUG: dietary_restrictions parameter: {dietary_restrictions}")
-        
-        all_recipes = self.recipe_cache.get_cached_recipes(query, ingredient, filters)
+            # Recipes must satisfy every restriction; the cache service applies this
+            # with its facet index instead of a second pass over the results here
+            filters["dietary_match"] = "all"
+        if within:
+            within_ids = self.result_sets.get(within)
+            if within_ids is None:
+                logger.warning(f"Result set '{within}' is unknown or expired")
+                return {"results": [], "total": 0, "result_set_expired": True}
+            filters["within_ids"] = within_ids
+        if nutrition_ranges:
+            filters["nutrition_ranges"] = nutrition_ranges
+        
+        # Pages are shuffled or cut from a seeded permutation, never taken in relevance
+        # order, so the cache service can skip ranking altogether
+        all_recipes = self.recipe_cache.get_cached_recipes(query, ingredient, filters, rank_limit=0)
         if not all_recipes:
-            logger.warning("No recipes found in cache")
+            trace.annotate(total=0)
             return {"results": [], "total": 0}
-            
-        logger.info(f"Processing {len(all_recipes)} recipes from cache after search filtering")
-        
-        # Debug: Log some recipe titles to see what we got
-        if all_recipes:
-            sample_titles = [recipe.get('title', 'No title')[:50] for recipe in all_recipes[:5]]
-            logger.info(f"Sample recipe titles from cache: {sample_titles}")
         
         # Apply additional filters in sequence (cuisines, dietary restrictions, etc.)
         # These filters are applied on top of the search results, not replacing them
@@ -992,22 +935,12 @@ class RecipeService:
                     avoid_filtered.append(recipe)
             
             filtered_recipes = avoid_filtered
-            logger.info(f"After foods-to-avoid filtering: {len(filtered_recipes)} recipes")
+            trace.mark("avoid_filter", len(filtered_recipes))
         
         # Cuisine filtering is now handled by the cache service
-        logger.info(f"🔍 Cuisine filtering handled by cache service - cuisines requested: {cuisines}")
         
-        # Apply dietary restrictions filtering directly here to ensure it works
-        if dietary_restrictions:
-            logger.info(f"🔍 Applying dietary restrictions filter: {dietary_restrictions}")
-            diet_filtered = []
-            for recipe in filtered_recipes:
-                if self._matches_dietary_restrictions(recipe, dietary_restrictions):
-                    diet_filtered.append(recipe)
-                else:
-                    logger.debug(f"❌ Recipe excluded by dietary filter: {recipe.get('title', 'Unknown')}")
-            filtered_recipes = diet_filtered
-            logger.info(f"After dietary restrictions filtering: {len(filtered_recipes)} recipes")
+        # Dietary restrictions (all must match) are applied by the cache service
+        # via filters["dietary_match"] = "all"
         
         # The cache service has already scored and sorted the recipes by search relevance
         # We don't need to re-score them here. Just preserve the existing search scores.
@@ -1015,6 +948,7 @@ class RecipeService:
         
         # Add bonus scores for user preferences (optional enhancement)
         if favorite_foods and filtered_recipes:
+            boosted_recipes = []
             for recipe in filtered_recipes:
                 bonus_score = 0
                 recipe_text = f"{recipe.get('title', '')} {recipe.get('description', '')}".lower()
@@ -1023,49 +957,65 @@ class RecipeService:
                         bonus_score += 20
                         break
                 
-                # Add bonus to existing search score
+                # Add bonus to existing search score (on a copy: results may be
+                # shared with the cache service's corpus snapshot)
                 if 'search_score' in recipe:
-                    recipe['search_score'] += bonus_score
-                    recipe['preference_bonus'] = bonus_score
+                    recipe = dict(recipe, search_score=recipe['search_score'] + bonus_score,
+                                  preference_bonus=bonus_score)
+                boosted_recipes.append(recipe)
+            filtered_recipes = boosted_recipes
+            trace.mark("preference_bonus", len(filtered_recipes))
         
         # Store the total count BEFORE applying pagination
         total_matching_recipes = len(filtered_recipes)
         
+        # Keep the ids of the full result so a follow-up search can run within it;
+        # only on request, since storing them costs a write to the shared table
+        result_set = None
+        if keep_result_set:
+            result_set = self.result_sets.put(
+                [recipe.get('id') for recipe in filtered_recipes],
+                getattr(getattr(self.recipe_cache, 'corpus', None), 'version', None)
+            )
+        
+        if seed is not None:
+            # Only the requested page is ordered (bounded heap over seeded keys),
+            # so the filtered list is neither copied nor shuffled
+            paginated_recipes, next_after = seeded_page(filtered_recipes, seed, offset, limit, after)
+            trace.mark("paginate", len(paginated_recipes))
+            trace.annotate(total=total_matching_recipes, seed=seed)
+            return {
+                "results": paginated_recipes,
+                "total": total_matching_recipes,
+                "result_set": result_set,
+                "seed": seed,
+                "next_cursor": encode_cursor(seed, next_after) if next_after is not None else None
+            }
+        
         # ENHANCED: Add randomization to ensure different recipes on each request
         # This prevents the same recipes from being returned every time
         import random
         random.seed()  # Use system time as seed for true randomness
-        
-        # Shuffle the filtered recipes to get different order each time
-        shuffled_recipes = filtered_recipes.copy()
-        random.shuffle(shuffled_recipes)
-        
-        logger.info(f"🔍 RANDOMIZATION: Shuffled {len(shuffled_recipes)} recipes for variety")
-        
-        # Debug pagination parameters
-        logger.info(f"🔍 PAGINATION DEBUG:")
-        logger.info(f"   - Requested offset: {offset}")
-        logger.info(f"   - Requested limit: {limit}")
-        logger.info(f"   - Total filtered recipes: {total_matching_recipes}")
-        logger.info(f"   - Will return recipes from index {offset} to {min(offset + limit, total_matching_recipes)}")
+        trace.annotate(total=total_matching_recipes)
         
         # Check if the requested offset is valid
         if offset >= total_matching_recipes:
-            logger.warning(f"Requested offset {offset} is beyond available recipes ({total_matching_recipes})")
+            trace.mark("paginate", 0)
             return {
                 "results": [],
-                "total": total_matching_recipes
+                "total": total_matching_recipes,
+                "result_set": result_set
             }
         
-        # Apply pagination to shuffled recipes
-        paginated_recipes = shuffled_recipes[offset:offset + limit]
-        
-        logger.info(f"Final result: {len(paginated_recipes)} recipes (offset: {offset}, limit: {limit})")
-        logger.info(f"Total matching recipes: {total_matching_recipes}")
+        # A page of a fresh shuffle is a uniform sample of the page's size, so only
+        # the page is drawn instead of copying and shuffling every match
+        paginated_recipes = random.sample(filtered_recipes, max(0, min(limit, total_matching_recipes - offset)))
+        trace.mark("paginate", len(paginated_recipes))
         
         return {
             "results": paginated_recipes,
-            "total": total_matching_recipes  # Total count of ALL matching recipes, not just current page
+            "total": total_matching_recipes,  # Total count of ALL matching recipes, not just current page
+            "result_set": result_set
         }
     
     def get_all_cuisines(self) -> List[str]:
@@ -0,0 +1,207 @@
+"""
+Compact summary records and field projection for recipe list endpoints.
+
+List views only show a title, image, cuisine and a few macros, but the
+endpoints return full recipe documents. The summary index keeps one small,
+precomputed record per corpus recipe (kept in step with the corpus like the
+text and facet indexes), so a `view=summary` listing never touches or
+serializes ingredients and instructions. `fields=a,b,c` projects any other
+subset.
+"""
+
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = (
+    'id', 'title', 'image', 'cuisine', 'cuisines', 'diets', 'tags', 'dish_types',
+    'ready_in_minutes', 'servings', 'calories', 'protein', 'carbs', 'fat',
+    'avg_rating', 'source'
+)
+
+VIEWS = {
+    'summary': SUMMARY_FIELDS,
+}
+
+# Per-request values that are not part of the stored recipe
+REQUEST_FIELDS = ('search_score', 'preference_bonus')
+
+MACRO_FIELDS = ('calories', 'protein', 'carbs', 'fat')
+
+# Every recipe key build_summary reads
+SUMMARY_SOURCE_FIELDS = (
+    'id', 'title', 'name', 'image', 'cuisine', 'cuisines', 'nutrition', 'diets', 'dietary_restrictions',
+    'tags', 'dish_types', 'dishTypes', 'ready_in_minutes', 'readyInMinutes', 'cooking_time', 'servings',
+    'avg_rating', 'source'
+) + MACRO_FIELDS
+
+
+def build_summary(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact list-view record for one recipe"""
+    cuisines = recipe.get('cuisines')
+    if isinstance(cuisines, str):
+        cuisines = [c.strip() for c in cuisines.split(',') if c.strip()]
+    elif not isinstance(cuisines, list):
+        cuisines = []
+    cuisine = recipe.get('cuisine') or (cuisines[0] if cuisines else '')
+
+    nutrition = recipe.get('nutrition') if isinstance(recipe.get('nutrition'), dict) else {}
+    summary = {
+        'id': recipe.get('id'),
+        'title': recipe.get('title') or recipe.get('name') or '',
+        'image': recipe.get('image') or '',
+        'cuisine': cuisine,
+        'cuisines': cuisines or ([cuisine] if cuisine else []),
+        'diets': recipe.get('diets') or recipe.get('dietary_restrictions') or [],
+        'tags': recipe.get('tags') or [],
+        'dish_types': recipe.get('dish_types') or recipe.get('dishTypes') or [],
+        'ready_in_minutes': recipe.get('ready_in_minutes') or recipe.get('readyInMinutes') or recipe.get('cooking_time'),
+        'servings': recipe.get('servings'),
+        'avg_rating': recipe.get('avg_rating'),
+        'source': recipe.get('source') or '',
+    }
+    for macro in MACRO_FIELDS:
+        value = recipe.get(macro)
+        summary[macro] = value if value is not None else nutrition.get(macro)
+    return summary
+
+
+def parse_projection(fields_param: Optional[str], view_param: Optional[str]) -> Tuple[Optional[str], Optional[List[str]]]:
+    """
+    Parse the `fields` and `view` request parameters.
+
+    Args:
+        fields_param: Comma-separated field names, e.g. "id,title,image"
+        view_param: Named view, e.g. "summary"
+
+    Returns:
+        Tuple of (view name or None, list of extra fields or None)
+
+    Raises:
+        ValueError: If the view name is unknown
+    """
+    view = (view_param or '').strip().lower() or None
+    if view and view not in VIEWS:
+        raise ValueError(f"Unknown view '{view}', expected one of {sorted(VIEWS)}")
+    fields = [f.strip() for f in (fields_param or '').split(',') if f.strip()]
+    # fields=summary is accepted as a shorthand for view=summary
+    if len(fields) == 1 and fields[0].lower() in VIEWS and not view:
+        return fields[0].lower(), None
+    return view, fields or None
+
+
+def project(recipe: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Copy only the requested fields (plus id) from a recipe"""
+    projected = {'id': recipe.get('id')}
+    for field in fields:
+        if field in recipe:
+            projected[field] = recipe[field]
+    return projected
+
+
+class RecipeSummaryIndex:
+    """recipe id -> (corpus recipe, its summary record)
+
+    A stored summary is only returned for the corpus recipe it was built from,
+    or a shallow copy of it. Other recipes that share the id (API results,
+    edited copies) get a summary built from their own fields. When an id
+    appears more than once in a build or an upsert batch, the last one wins,
+    like the corpus's own upserts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = -1
+        self._summaries: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._stats = {"builds": 0, "incremental_updates": 0, "lookups": 0, "misses": 0, "mismatches": 0}
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Rebuild every summary from a corpus snapshot"""
+        summaries = {}
+        for recipe in recipes:
+            if isinstance(recipe, dict) and recipe.get('id'):
+                summaries[str(recipe['id'])] = (recipe, build_summary(recipe))
+        with self._lock:
+            self._summaries = summaries
+            self.version = version
+            self._stats["builds"] += 1
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Refresh the summaries for recipes written since the last build"""
+        with self._lock:
+            for _, recipe in changes:
+                if isinstance(recipe, dict) and recipe.get('id'):
+                    self._summaries[str(recipe['id'])] = (recipe, build_summary(recipe))
+            self.version = version
+            self._stats["incremental_updates"] += 1
+
+    def get(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Summary for a recipe, built on the fly unless its corpus copy is indexed.
+
+        Args:
+            recipe: A corpus recipe, a shallow copy of one, or any other recipe dict
+
+        Returns:
+            Dict: Same record build_summary(recipe) would produce
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            entry = self._summaries.get(str(recipe.get('id')))
+            if entry is None:
+                self._stats["misses"] += 1
+            else:
+                stored, summary = entry
+                # Shallow copy: every field the summary reads must still hold the very same value
+                if stored is recipe or all(recipe.get(k) is stored.get(k) for k in SUMMARY_SOURCE_FIELDS):
+                    return summary
+                self._stats["mismatches"] += 1
+        return build_summary(recipe)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and lookup counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"version": self.version, "summaries": len(self._summaries)})
+        return stats
+
+
+# Global index registered with the process-wide recipe corpus
+_recipe_summary_index = RecipeSummaryIndex()
+
+
+def get_recipe_summary_index() -> RecipeSummaryIndex:
+    """Get the process-wide recipe summary index"""
+    return _recipe_summary_index
+
+
+def shape_recipes(recipes: List[Dict[str, Any]], view: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Apply a named view and/or field projection to a list of recipes.
+
+    Args:
+        recipes: Full recipe dicts
+        view: Named view from VIEWS, or None
+        fields: Extra fields to include, or None
+
+    Returns:
+        The recipes unchanged when neither is given, otherwise new compact dicts
+    """
+    if not view and not fields:
+        return recipes
+    shaped = []
+    for recipe in recipes:
+        if view:
+            record = dict(_recipe_summary_index.get(recipe))
+            for field in REQUEST_FIELDS:
+                if field in recipe:
+                    record[field] = recipe[field]
+            if fields:
+                record.update((f, recipe[f]) for f in fields if f in recipe and f not in record)
+        else:
+            record = project(recipe, fields)
+        shaped.append(record)
+    return shaped
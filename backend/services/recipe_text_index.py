@@ -0,0 +1,194 @@
+"""
+Trigram inverted index over recipe title, description and ingredient names.
+
+Used by RecipeCacheService.get_cached_recipes to narrow substring searches
+(e.g. "chi" matching "chicken") to a candidate set before the existing scorer
+runs. Candidates are a superset of the true matches; the scorer still verifies
+each one, so results are identical to a full scan.
+"""
+
+import os
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEXT_INDEX_ENABLED = os.environ.get('RECIPE_TEXT_INDEX_ENABLED', 'true').lower() == 'true'
+
+NGRAM_SIZE = 3
+INDEXED_FIELDS = ('title', 'description', 'ingredients')
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Return the set of character trigrams in already-lowercased text"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _field_texts(recipe: Dict[str, Any], field: str) -> Iterable[str]:
+    """Yield the lowercased strings the scorer compares against for a field"""
+    if field == 'ingredients':
+        ingredients = recipe.get('ingredients')
+        if not isinstance(ingredients, list):
+            return
+        for ing in ingredients:
+            if isinstance(ing, dict) and 'name' in ing:
+                yield str(ing['name']).lower()
+            elif isinstance(ing, str):
+                yield ing.lower()
+        return
+    value = recipe.get(field)
+    if value:
+        yield str(value).lower()
+
+
+class RecipeTextIndex:
+    """Per-field trigram postings keyed by corpus snapshot position"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = -1
+        self._postings: Dict[str, Dict[str, Set[int]]] = {f: {} for f in INDEXED_FIELDS}
+        self._doc_grams: Dict[str, Dict[int, Set[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self._size = 0
+        self._stats = {
+            "builds": 0,
+            "incremental_updates": 0,
+            "lookups": 0,
+            "fallbacks": 0,
+        }
+
+    def build(self, version: int, recipes: List[Dict[str, Any]]) -> None:
+        """Rebuild the whole index from a corpus snapshot"""
+        postings: Dict[str, Dict[str, Set[int]]] = {f: {} for f in INDEXED_FIELDS}
+        doc_grams: Dict[str, Dict[int, Set[str]]] = {f: {} for f in INDEXED_FIELDS}
+        for position, recipe in enumerate(recipes):
+            if not isinstance(recipe, dict):
+                continue
+            for field in INDEXED_FIELDS:
+                grams = self._recipe_grams(recipe, field)
+                if not grams:
+                    continue
+                doc_grams[field][position] = grams
+                field_postings = postings[field]
+                for gram in grams:
+                    field_postings.setdefault(gram, set()).add(position)
+
+        with self._lock:
+            self._postings = postings
+            self._doc_grams = doc_grams
+            self._size = len(recipes)
+            self.version = version
+            self._stats["builds"] += 1
+        logger.debug(f"Recipe text index v{version} built over {len(recipes)} recipes")
+
+    def export_state(self, version: int) -> Optional[Dict[str, Any]]:
+        """Copy of the postings for the snapshot file, or None if not built for `version`"""
+        with self._lock:
+            if version != self.version:
+                return None
+            return {
+                "size": self._size,
+                # Posting sets are updated in place, per-recipe gram sets are replaced
+                "postings": {f: {gram: set(bucket) for gram, bucket in grams.items()} for f, grams in self._postings.items()},
+                "doc_grams": {f: dict(grams) for f, grams in self._doc_grams.items()},
+            }
+
+    def restore_state(self, version: int, recipes: List[Dict[str, Any]], state: Dict[str, Any]) -> bool:
+        """Take over postings saved in the snapshot file for `recipes`"""
+        if state.get("size") != len(recipes) or set(state.get("postings", ())) != set(INDEXED_FIELDS):
+            return False
+        with self._lock:
+            self._postings = state["postings"]
+            self._doc_grams = state["doc_grams"]
+            self._size = state["size"]
+            self.version = version
+            self._stats["builds"] += 1
+        return True
+
+    def apply_upserts(self, version: int, changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Re-index the given snapshot positions in place"""
+        with self._lock:
+            for position, recipe in changes:
+                for field in INDEXED_FIELDS:
+                    field_postings = self._postings[field]
+                    for gram in self._doc_grams[field].pop(position, ()):
+                        bucket = field_postings.get(gram)
+                        if bucket is not None:
+                            bucket.discard(position)
+                            if not bucket:
+                                del field_postings[gram]
+                    grams = self._recipe_grams(recipe, field)
+                    if grams:
+                        self._doc_grams[field][position] = grams
+                        for gram in grams:
+                            field_postings.setdefault(gram, set()).add(position)
+                self._size = max(self._size, position + 1)
+            self.version = version
+            self._stats["incremental_updates"] += 1
+
+    def candidates(self, version: int, term: str, fields: Iterable[str]) -> Optional[List[int]]:
+        """
+        Return snapshot positions that may contain `term` in any of `fields`.
+
+        Args:
+            version: Snapshot version the caller is searching
+            term: Lowercased search substring
+            fields: Fields to search, any of INDEXED_FIELDS
+
+        Returns:
+            Sorted positions, or None when the index can't answer (stale index or a
+            term shorter than one trigram) and the caller should scan everything
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            if version != self.version or len(term) < NGRAM_SIZE:
+                self._stats["fallbacks"] += 1
+                return None
+
+            # Intersect the rarest postings first so the working set shrinks fastest
+            grams = sorted(_ngrams(term), key=lambda g: min(
+                len(self._postings[f].get(g, ())) for f in fields
+            ))
+            matches: Set[int] = set()
+            for field in fields:
+                field_postings = self._postings[field]
+                found: Optional[Set[int]] = None
+                for gram in grams:
+                    bucket = field_postings.get(gram)
+                    if not bucket:
+                        found = set()
+                        break
+                    found = set(bucket) if found is None else found & bucket
+                    if not found:
+                        break
+                if found:
+                    matches |= found
+        return sorted(matches)
+
+    def _recipe_grams(self, recipe: Dict[str, Any], field: str) -> Set[str]:
+        grams: Set[str] = set()
+        for text in _field_texts(recipe, field):
+            grams |= _ngrams(text)
+        return grams
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and lookup counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "enabled": TEXT_INDEX_ENABLED,
+                "version": self.version,
+                "indexed_recipes": self._size,
+                "distinct_trigrams": {f: len(self._postings[f]) for f in INDEXED_FIELDS},
+            })
+        return stats
+
+
+# Global index registered with the process-wide recipe corpus
+_recipe_text_index = RecipeTextIndex()
+
+
+def get_recipe_text_index() -> RecipeTextIndex:
+    """Get the process-wide recipe text index"""
+    return _recipe_text_index
@@ -0,0 +1,262 @@
+"""
+Short-lived result-set handles for chained search.
+
+A search the client asks to keep (result_set=true) stores the ids of its full
+(unpaginated) result list under an opaque handle and returns the handle to
+the client. A follow-up search passes
+`within=<handle>` and is intersected with that id list server-side, instead of
+the client posting the previous results back in filters['baseRecipes'].
+
+Entries are kept in an LRU bounded by entry count and by the total number of
+stored ids, and expire once unused for the TTL. Since every access moves an
+entry to the end, LRU order is also expiry order.
+
+Once a path is set, every entry is also written to an SQLite table next to
+the ChromaDB store, so a handle created by one gunicorn worker resolves in the
+others; a miss in this process's LRU falls through to the table. Each thread
+opens its own connection and the table is read and written outside the LRU
+lock, so concurrent searches never wait on each other's disk I/O. Expired and
+overflowing rows are trimmed at most every RESULT_SET_PURGE_SECONDS.
+"""
+
+import os
+import json
+import secrets
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESULT_SET_TTL_SECONDS = float(os.environ.get('RESULT_SET_TTL_SECONDS', '900'))
+RESULT_SET_MAX_ENTRIES = int(os.environ.get('RESULT_SET_MAX_ENTRIES', '1000'))
+# Caps memory: about 60 bytes per stored id, so the default is roughly 30MB
+RESULT_SET_MAX_IDS = int(os.environ.get('RESULT_SET_MAX_IDS', '500000'))
+# Share handles between worker processes through the on-disk table
+RESULT_SET_SHARED = os.environ.get('RESULT_SET_SHARED', 'true').lower() == 'true'
+RESULT_SET_FILE = 'result_sets.sqlite3'
+# How often put() trims expired and overflowing rows from the shared table
+RESULT_SET_PURGE_SECONDS = float(os.environ.get('RESULT_SET_PURGE_SECONDS', '60'))
+
+
+class ResultSetStore:
+    """Bounded LRU of handle -> (last_used, corpus_version, recipe ids), over an optional shared table"""
+
+    def __init__(self, ttl_seconds: float = RESULT_SET_TTL_SECONDS,
+                 max_entries: int = RESULT_SET_MAX_ENTRIES,
+                 max_ids: int = RESULT_SET_MAX_IDS,
+                 path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Optional[int], Tuple[str, ...]]]" = OrderedDict()
+        self._stored_ids = 0
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self.path = path
+        # Per-thread (connection, pid, path) for the shared table
+        self._local = threading.local()
+        self._disk_failed = False
+        self._purged_at = 0.0
+        self._stats = {
+            "created": 0,
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "rejected": 0,
+            "disk_errors": 0,
+        }
+
+    def set_path(self, path: str) -> None:
+        """Share entries through the table at `path` (opened on first use)"""
+        with self._lock:
+            if path != self.path:
+                self.path = path
+                self._disk_failed = False
+
+    def _count(self, stat: str) -> None:
+        """Increment one counter"""
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection to the shared table, or None when not shared"""
+        path = self.path
+        if not RESULT_SET_SHARED or not path or self._disk_failed:
+            return None
+        local = self._local
+        if getattr(local, 'connection', None) is None or local.pid != os.getpid() or local.path != path:
+            try:
+                connection = sqlite3.connect(path, timeout=10)
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('PRAGMA synchronous=NORMAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS result_sets ('
+                    'handle TEXT PRIMARY KEY, last_used REAL NOT NULL, '
+                    'corpus_version INTEGER, ids TEXT NOT NULL)'
+                )
+                connection.execute('CREATE INDEX IF NOT EXISTS result_sets_last_used ON result_sets (last_used)')
+                connection.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Result-set table unavailable at {path}: {e}")
+                self._disk_failed = True
+                return None
+            local.connection, local.pid, local.path = connection, os.getpid(), path
+        return local.connection
+
+    def put(self, recipe_ids: Iterable[Any], corpus_version: Optional[int] = None) -> Optional[str]:
+        """
+        Store a result set and return its handle.
+
+        Args:
+            recipe_ids: Ids of every recipe in the result, in result order
+            corpus_version: Corpus version the result was computed from
+
+        Returns:
+            str: Opaque handle, or None if the result is too large to keep
+        """
+        ids = tuple(str(rid) for rid in recipe_ids if rid is not None and rid != '')
+        if len(ids) > self.max_ids:
+            self._count("rejected")
+            return None
+
+        handle = secrets.token_urlsafe(12)
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            self._remember(handle, now, corpus_version, ids)
+            self._stats["created"] += 1
+            purge = now - self._purged_at >= RESULT_SET_PURGE_SECONDS
+            if purge:
+                self._purged_at = now
+
+        db = self._db()
+        if db is not None:
+            try:
+                db.execute('INSERT OR REPLACE INTO result_sets (handle, last_used, corpus_version, ids) '
+                           'VALUES (?, ?, ?, ?)', (handle, now, corpus_version, json.dumps(ids)))
+                if purge:
+                    db.execute('DELETE FROM result_sets WHERE last_used < ?', (now - self.ttl_seconds,))
+                    # Same entry bound as the LRU, least recently used first
+                    db.execute('DELETE FROM result_sets WHERE handle IN (SELECT handle FROM result_sets '
+                               'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+                db.commit()
+            except sqlite3.Error as e:
+                self._count("disk_errors")
+                logger.warning(f"Result-set table write failed: {e}")
+        return handle
+
+    def get(self, handle: str) -> Optional[List[str]]:
+        """Return the ids stored under a handle, or None if unknown or expired"""
+        if not handle:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                self._forget(handle)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._remember(handle, now, entry[1], entry[2])
+                self._stats["hits"] += 1
+
+        db = self._db()
+        if entry is None:
+            entry = self._load(db, handle, now) if db is not None else None
+            with self._lock:
+                if entry is None:
+                    self._stats["misses"] += 1
+                    return None
+                self._remember(handle, now, entry[1], entry[2])
+                self._stats["hits"] += 1
+        if db is not None:
+            try:
+                # Keep the shared entry alive for the other workers too
+                db.execute('UPDATE result_sets SET last_used = ? WHERE handle = ?', (now, handle))
+                db.commit()
+            except sqlite3.Error as e:
+                self._count("disk_errors")
+                logger.warning(f"Result-set table update failed: {e}")
+        return list(entry[2])
+
+    def _load(self, db: sqlite3.Connection, handle: str,
+              now: float) -> Optional[Tuple[float, Optional[int], Tuple[str, ...]]]:
+        """Entry for `handle` from the shared table, or None if absent, expired or unreadable"""
+        try:
+            row = db.execute('SELECT last_used, corpus_version, ids FROM result_sets WHERE handle = ?',
+                             (handle,)).fetchone()
+        except sqlite3.Error as e:
+            self._count("disk_errors")
+            logger.warning(f"Result-set table lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        last_used, corpus_version, ids = row
+        try:
+            ids = json.loads(ids)
+            if not isinstance(ids, list):
+                raise ValueError("ids are not a list")
+            expired = now - float(last_used) > self.ttl_seconds
+        except (TypeError, ValueError) as e:
+            # A corrupt row is treated as expired
+            logger.warning(f"Result-set '{handle}' is unreadable: {e}")
+            expired = True
+        if expired:
+            self._count("expired")
+            return None
+        self._count("disk_hits")
+        return last_used, corpus_version, tuple(str(rid) for rid in ids)
+
+    def _remember(self, handle: str, now: float, corpus_version: Optional[int], ids: Tuple[str, ...]) -> None:
+        """Add or refresh an LRU entry and evict past the bounds; caller holds the lock"""
+        self._forget(handle)
+        self._entries[handle] = (now, corpus_version, ids)
+        self._stored_ids += len(ids)
+        while self._entries and (len(self._entries) > self.max_entries or self._stored_ids > self.max_ids):
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._stored_ids -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def _forget(self, handle: str) -> None:
+        """Drop an LRU entry if present; caller holds the lock"""
+        entry = self._entries.pop(handle, None)
+        if entry is not None:
+            self._stored_ids -= len(entry[2])
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired entries from the LRU end; caller holds the lock"""
+        while self._entries:
+            handle, (last_used, _, ids) = next(iter(self._entries.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            del self._entries[handle]
+            self._stored_ids -= len(ids)
+            self._stats["expired"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return occupancy and hit/eviction counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._entries),
+                "stored_ids": self._stored_ids,
+                "max_entries": self.max_entries,
+                "max_ids": self.max_ids,
+                "ttl_seconds": self.ttl_seconds,
+                "shared": RESULT_SET_SHARED and bool(self.path) and not self._disk_failed,
+            })
+        return stats
+
+
+# Global store shared by every RecipeService in this process
+_result_set_store = ResultSetStore()
+
+
+def get_result_set_store() -> ResultSetStore:
+    """Get the process-wide result-set store"""
+    return _result_set_store
@@ -0,0 +1,79 @@
+"""
+Relevance ranking for RecipeCacheService search results.
+
+Matches are ordered by the score fields the scorer sets on each result
+(search_score, title/ingredient matches, matched_terms), highest first, with
+ties kept in corpus order. rank_results() only has to order the first
+`limit` results: heapq.nlargest picks them in O(n log k) and the remaining
+matches follow in their original order, so cutting one page no longer sorts
+every match.
+
+nlargest is stable like sorted() (equal keys keep their input order), so a
+list ranked to any depth ranks to exactly the order the unranked list would.
+The query-result cache can therefore keep results ranked to whatever depth
+the first caller asked for, and each caller re-ranks on the way out.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, List, Optional
+
+RankingKey = Callable[[Dict[str, Any]], tuple]
+
+# Up to this many ranked results, the rest are copied by deleting the picked ones
+SMALL_PAGE = 64
+# A full sort is cheaper unless the results outnumber the ranked depth by this much
+HEAP_MIN_RATIO = 32
+
+_INGREDIENT_KEY: RankingKey = lambda r: (r.get('search_score', 0), r.get('ingredient_matches', 0), r.get('title_matches', 0))
+_NAME_KEY: RankingKey = lambda r: (r.get('search_score', 0), r.get('title_matches', 0), r.get('ingredient_matches', 0))
+
+
+def ranking_key(query: str = "", ingredient: str = "") -> Optional[RankingKey]:
+    """
+    Sort key for a search's results (used with reverse=True).
+
+    Returns:
+        Key function, or None for listings without search terms (kept in corpus order)
+    """
+    if (ingredient or '').strip():
+        # Ingredient searches prioritize recipes with more ingredient matches
+        return _INGREDIENT_KEY
+    if (query or '').strip():
+        # Name searches prioritize recipes with more title matches
+        return _NAME_KEY
+    return None
+
+
+def rank_results(results: List[Dict[str, Any]], key: Optional[RankingKey],
+                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Order search results by relevance, as far as the caller needs.
+
+    Args:
+        results: Scored matches (corpus order, or ranked to any depth)
+        key: Key from ranking_key(); None leaves the order unchanged
+        limit: Only the first `limit` results need to be ranked; None ranks them all
+
+    Returns:
+        New list with every result, the first min(limit, len) of them in rank order
+    """
+    if key is None or limit is not None and limit <= 0:
+        return list(results)
+    if limit is None or limit * HEAP_MIN_RATIO >= len(results):
+        return sorted(results, key=key, reverse=True)
+    # search_score leads every key, so only results scoring at least the k-th best
+    # score can make the top k; the full key is computed for those alone
+    scores = [recipe.get('search_score', 0) for recipe in results]
+    cutoff = heapq.nlargest(limit, scores)[-1]
+    candidates = [i for i, score in enumerate(scores) if score >= cutoff]
+    top = heapq.nlargest(limit, candidates, key=lambda i: key(results[i]))
+    ranked = [results[i] for i in top]
+    if limit <= SMALL_PAGE:
+        rest = list(results)
+        for i in sorted(top, reverse=True):
+            del rest[i]
+    else:
+        picked = set(top)
+        rest = [recipe for i, recipe in enumerate(results) if i not in picked]
+    ranked.extend(rest)
+    return ranked
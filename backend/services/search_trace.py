@@ -0,0 +1,135 @@
+"""
+Per-request search trace.
+
+A route starts a trace, and the services it calls mark the end of each stage
+(fetch, candidates, score, filter, rank, paginate, ...) with an optional item
+count. Each stage's time is the time since the previous mark. When the request
+finishes, the trace is written as a single log line, and optionally as a
+Server-Timing response header. This replaces the per-recipe logging that used
+to run on every search.
+
+Services find the active trace through a context variable. Without an active
+trace, current_trace() returns a no-op trace, so marking costs next to nothing
+outside traced requests.
+"""
+
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TRACE_LOG = os.environ.get('SEARCH_TRACE_LOG', 'true').lower() == 'true'
+# Always send the Server-Timing header, not only when the request asks with trace=1
+SEARCH_TRACE_HEADERS = os.environ.get('SEARCH_TRACE_HEADERS', 'false').lower() == 'true'
+# Requests slower than this are logged at WARNING instead of INFO
+SEARCH_TRACE_SLOW_MS = float(os.environ.get('SEARCH_TRACE_SLOW_MS', '1000'))
+
+
+class SearchTrace:
+    """Stage timings and counts for one request"""
+
+    def __init__(self, name: str, **fields: Any):
+        self.name = name
+        self.fields: Dict[str, Any] = dict(fields)
+        self.stages: List[Tuple[str, float, Optional[int]]] = []
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def mark(self, stage: str, count: Optional[int] = None) -> None:
+        """End a stage: record the time since the previous mark and an optional item count"""
+        now = time.perf_counter()
+        self.stages.append((stage, (now - self._last) * 1000, count))
+        self._last = now
+
+    def annotate(self, **fields: Any) -> None:
+        """Attach request-level values (query, cache hit, ...) to the trace"""
+        self.fields.update(fields)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "total_ms": round(self.elapsed_ms, 2),
+            "stages": [
+                {"stage": stage, "ms": round(ms, 2), **({"count": count} if count is not None else {})}
+                for stage, ms, count in self.stages
+            ],
+            **self.fields,
+        }
+
+    def log_line(self) -> str:
+        """One-line summary, e.g. 'get_recipes 12.4ms fetch=0.8ms/1089 score=9.1ms/148 ... query=chicken'"""
+        parts = [f"{self.name} {self.elapsed_ms:.1f}ms"]
+        for stage, ms, count in self.stages:
+            parts.append(f"{stage}={ms:.1f}ms" + (f"/{count}" if count is not None else ""))
+        parts.extend(f"{key}={value!r}" for key, value in self.fields.items() if value not in (None, '', [], {}))
+        return ' '.join(parts)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value"""
+        entries = []
+        for stage, ms, count in self.stages:
+            entry = f"{stage};dur={ms:.2f}"
+            if count is not None:
+                entry += f';desc="{count}"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed_ms:.2f}")
+        return ', '.join(entries)
+
+    def finish(self, response: Any = None, header: bool = False) -> Any:
+        """
+        Log the trace once, stop it being the active trace, and optionally add
+        the Server-Timing header.
+
+        Args:
+            response: Flask response (or (response, status) tuple) to decorate
+            header: Add the Server-Timing header even if SEARCH_TRACE_HEADERS is off
+
+        Returns:
+            The response that was passed in
+        """
+        if _current_trace.get() is self:
+            _current_trace.set(None)
+        if SEARCH_TRACE_LOG:
+            level = logging.WARNING if self.elapsed_ms >= SEARCH_TRACE_SLOW_MS else logging.INFO
+            logger.log(level, f"search trace: {self.log_line()}")
+        if response is not None and (header or SEARCH_TRACE_HEADERS):
+            target = response[0] if isinstance(response, tuple) else response
+            headers = getattr(target, 'headers', None)
+            if headers is not None:
+                headers['Server-Timing'] = self.server_timing()
+                exposed = headers.get('Access-Control-Expose-Headers')
+                headers['Access-Control-Expose-Headers'] = f"{exposed}, Server-Timing" if exposed else "Server-Timing"
+        return response
+
+
+class _NullTrace:
+    """Stand-in used when no request is being traced"""
+
+    def mark(self, stage: str, count: Optional[int] = None) -> None:
+        pass
+
+    def annotate(self, **fields: Any) -> None:
+        pass
+
+
+_NULL_TRACE = _NullTrace()
+_current_trace: ContextVar[Optional[SearchTrace]] = ContextVar('search_trace', default=None)
+
+
+def start_trace(name: str, **fields: Any) -> SearchTrace:
+    """Start a trace and make it the active trace for this request"""
+    trace = SearchTrace(name, **fields)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    """The active trace, or a no-op trace outside traced requests"""
+    return _current_trace.get() or _NULL_TRACE
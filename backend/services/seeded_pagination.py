@@ -0,0 +1,98 @@
+"""
+Seeded shuffles and keyset cursors for paginated recipe listings.
+
+Each recipe gets a sort key derived from (seed, recipe id), so a seed defines
+one fixed permutation of any result list. Pages are cut from that permutation
+with a bounded heap (top offset+limit keys), so the full list is never copied
+or shuffled. The cursor records the key of the last recipe served, and the
+next page starts strictly after it. Pages therefore never overlap or skip
+recipes, and the same (seed, cursor) always yields the same page.
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+import secrets
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CURSOR_VERSION = 1
+
+SortKey = Tuple[int, str]
+
+
+def new_seed() -> int:
+    """Random seed for a new listing session"""
+    return secrets.randbelow(2 ** 31)
+
+
+def shuffle_key(seed: int, recipe: Dict[str, Any]) -> SortKey:
+    """Position of a recipe in the permutation for `seed`; ids break hash ties"""
+    recipe_id = str(recipe.get('id', ''))
+    digest = hashlib.blake2b(f"{seed}:{recipe_id}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big'), recipe_id
+
+
+def encode_cursor(seed: int, after: SortKey) -> str:
+    """Opaque cursor for the page following the recipe with key `after`"""
+    payload = json.dumps({"v": CURSOR_VERSION, "seed": seed, "after": list(after)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, SortKey]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        Tuple of (seed, key of the last recipe already served)
+
+    Raises:
+        ValueError: If the cursor is malformed or from another cursor version
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor payload is not an object")
+        if payload.get("v") != CURSOR_VERSION:
+            raise ValueError("unsupported cursor version")
+        after = payload["after"]
+        if not isinstance(after, list) or len(after) != 2:
+            raise ValueError("cursor position is not a [key, id] pair")
+        return int(payload["seed"]), (int(after[0]), str(after[1]))
+    except (KeyError, IndexError, TypeError, ValueError, OverflowError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def seeded_page(recipes: Iterable[Dict[str, Any]], seed: int, offset: int = 0, limit: int = 20,
+                after: Optional[SortKey] = None) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+    """
+    Cut one page from the seeded permutation of `recipes`.
+
+    Args:
+        recipes: Matching recipes, in any order
+        seed: Permutation seed
+        offset: Recipes to skip after `after` (offset-style paging)
+        limit: Page size
+        after: Key of the last recipe already served (cursor-style paging)
+
+    Returns:
+        Tuple of (page of recipes, key to continue after or None on the last page)
+    """
+    offset = max(0, offset)
+    limit = max(0, limit)
+    remaining = 0
+
+    def keyed():
+        nonlocal remaining
+        for recipe in recipes:
+            key = shuffle_key(seed, recipe)
+            if after is None or key > after:
+                remaining += 1
+                yield key, recipe
+
+    top = heapq.nsmallest(offset + limit, keyed(), key=lambda item: item[0])
+    page = top[offset:]
+    has_more = remaining > offset + limit
+    next_after = page[-1][0] if page and has_more else None
+    return [recipe for _, recipe in page], next_after
@@ -0,0 +1,318 @@
+"""
+In-process BM25 retrieval over recipe searchable text.
+
+RecipeSearchService can answer semantic_search, find_similar_recipes and the
+recommendation searches from this index instead of ChromaDB's nearest
+neighbours (RECIPE_SEARCH_BACKEND=sparse). The lightweight embeddings those
+distances come from carry little lexical meaning; BM25 over the text that
+_create_searchable_text builds ranks recipes by the words they share with the
+query.
+
+The index is a term-major CSR matrix held in NumPy arrays: for each term, the
+rows that contain it and their BM25 weights. A batch of queries is scored in
+one np.bincount over the postings of all their terms, and `where` filters (the
+ChromaDB syntax _build_where_clause produces) become boolean masks over the
+rows, built once per distinct filter.
+
+Results come back in the shape collection.query() returns, with distances of
+1 - score / best score, so callers keep computing similarity as 1 - distance.
+When fewer rows share a word with the query than were asked for, the rest are
+filled with the remaining rows that pass the filter, in collection order, as
+nearest-neighbour search would also return them.
+"""
+
+import os
+import re
+import json
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKEND_CHROMA = 'chroma'
+SEARCH_BACKEND_SPARSE = 'sparse'
+# Exact k-NN over the stored embeddings, see services/dense_retrieval.py
+SEARCH_BACKEND_DENSE = 'dense'
+SEARCH_BACKEND = os.environ.get('RECIPE_SEARCH_BACKEND', SEARCH_BACKEND_CHROMA).lower()
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Distinct `where` filters whose row masks are kept per build
+MASK_CACHE_SIZE = 64
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric words of `text`"""
+    return _TOKEN.findall(str(text or '').lower())
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    try:
+        if operator == '$eq':
+            return value == operand
+        if operator == '$ne':
+            return value != operand
+        if operator == '$in':
+            return value in operand
+        if operator == '$nin':
+            return value not in operand
+        if operator == '$gt':
+            return value > operand
+        if operator == '$gte':
+            return value >= operand
+        if operator == '$lt':
+            return value < operand
+        if operator == '$lte':
+            return value <= operand
+    except TypeError:
+        # Mismatched types (e.g. a string cooking_time against a number) never match
+        return False
+    raise ValueError(f"Unsupported where operator: {operator}")
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a ChromaDB `where` filter against one row's metadata.
+
+    Supports field equality, the $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte operators and
+    $and/$or; several fields in one dict must all match. A missing field never matches.
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key not in metadata:
+            return False
+        elif isinstance(condition, dict):
+            if not all(_compare(metadata[key], op, operand) for op, operand in condition.items()):
+                return False
+        elif metadata[key] != condition:
+            return False
+    return True
+
+
+class WhereMasks:
+    """Row masks of `where` filters over one set of row metadata, cached per distinct filter"""
+
+    def __init__(self, metadatas: List[Dict[str, Any]]):
+        self.metadatas = metadatas
+        self._lock = threading.Lock()
+        self._masks: Dict[str, Any] = {}
+        self.builds = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def get(self, where: Optional[Dict[str, Any]]):
+        """Boolean mask of the rows passing `where` (None when there is no filter)"""
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True, default=str)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self.hits += 1
+                return mask
+        metadatas = self.metadatas
+        mask = np.fromiter((matches_where(metadata, where) for metadata in metadatas),
+                           dtype=bool, count=len(metadatas))
+        with self._lock:
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.pop(next(iter(self._masks)))
+            self._masks[key] = mask
+            self.builds += 1
+        return mask
+
+    def clear(self) -> None:
+        """Drop every mask (rows were added or their metadata changed)"""
+        with self._lock:
+            self._masks.clear()
+
+
+class _IndexState:
+    """One build of the index; replaced whole, so a search never mixes two builds"""
+
+    def __init__(self, ids, documents, metadatas, vocabulary, indptr, rows, weights):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.rows = rows
+        self.weights = weights
+        self.masks = WhereMasks(metadatas)
+
+
+class SparseRecipeIndex:
+    """BM25 postings over one collection's rows, with batched query scoring"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._state: Optional[_IndexState] = None
+        self.stale = False
+        self._stats = {"builds": 0, "queries": 0, "batches": 0}
+
+    @property
+    def built(self) -> bool:
+        return self._state is not None
+
+    @property
+    def size(self) -> int:
+        state = self._state
+        return len(state.ids) if state else 0
+
+    def invalidate(self) -> None:
+        """Rebuild before the next search (the collection was written); build() doesn't clear this"""
+        self.stale = True
+
+    def build(self, ids: List[str], texts: List[str], documents: List[Any], metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Replace the index with the given rows.
+
+        Args:
+            ids: Row ids
+            texts: Searchable text of each row (what is tokenized and weighted)
+            documents: Stored documents, returned with the results
+            metadatas: Row metadata, returned with the results and matched by `where`
+        """
+        vocabulary: Dict[str, int] = {}
+        rows, columns, frequencies, lengths = [], [], [], []
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                frequencies.append(frequency)
+
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        frequencies = np.array(frequencies, dtype=np.float64)
+        lengths = np.array(lengths, dtype=np.float64)
+        average_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        document_frequency = np.bincount(columns, minlength=len(vocabulary))
+        idf = np.log(1.0 + (len(texts) - document_frequency + 0.5) / (document_frequency + 0.5))
+        saturation = self.k1 * (1.0 - self.b + self.b * lengths[rows] / average_length)
+        weights = idf[columns] * frequencies * (self.k1 + 1.0) / (frequencies + saturation)
+
+        # Term-major: a stable sort keeps each term's rows in collection order
+        order = np.argsort(columns, kind='stable')
+        indptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+
+        state = _IndexState(list(ids), list(documents), [metadata or {} for metadata in metadatas],
+                            vocabulary, indptr, rows[order], weights[order])
+        with self._lock:
+            self._state = state
+            self._stats["builds"] += 1
+        logger.info(f"Sparse recipe index built over {len(ids)} rows, {len(vocabulary)} terms")
+
+    @staticmethod
+    def _score(state: _IndexState, query_texts: List[str]):
+        """BM25 scores of every row for each query, as a (queries x rows) matrix"""
+        size = len(state.ids)
+        row_parts, weight_parts = [], []
+        for query, text in enumerate(query_texts):
+            for term, frequency in Counter(tokenize(text)).items():
+                column = state.vocabulary.get(term)
+                if column is None:
+                    continue
+                start, end = state.indptr[column], state.indptr[column + 1]
+                row_parts.append(state.rows[start:end] + query * size)
+                weight_parts.append(state.weights[start:end] * frequency)
+        if not row_parts:
+            return np.zeros((len(query_texts), size))
+        # One pass accumulates every query's scores into its own block of cells
+        scores = np.bincount(np.concatenate(row_parts), weights=np.concatenate(weight_parts),
+                             minlength=len(query_texts) * size)
+        return scores.reshape(len(query_texts), size)
+
+    def search(self, query_texts: List[str], n_results: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> Dict[str, List[List[Any]]]:
+        """
+        Top rows for each query, in the shape collection.query() returns.
+
+        Args:
+            query_texts: Queries scored together in one batch
+            n_results: Rows returned per query
+            where: ChromaDB-style metadata filter
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas' and 'distances', one list per query
+        """
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        state = self._state
+        if state is None:
+            for key in results:
+                results[key] = [[] for _ in query_texts]
+            return results
+        mask = state.masks.get(where)
+        scores = self._score(state, query_texts)
+        with self._lock:
+            self._stats["queries"] += len(query_texts)
+            self._stats["batches"] += 1
+
+        pool = np.flatnonzero(mask) if mask is not None else np.arange(len(state.ids))
+        for row_scores in scores:
+            picked = self._top_rows(row_scores, pool, n_results)
+            best = row_scores[picked[0]] if len(picked) else 0.0
+            distances = 1.0 - row_scores[picked] / best if best > 0 else np.ones(len(picked))
+            results["ids"].append([state.ids[i] for i in picked])
+            results["documents"].append([state.documents[i] for i in picked])
+            results["metadatas"].append([state.metadatas[i] for i in picked])
+            results["distances"].append(distances.tolist())
+        return results
+
+    @staticmethod
+    def _top_rows(row_scores, pool, k: int):
+        """Rows of `pool` with the k highest scores, best first, ties in collection order"""
+        k = min(k, len(pool))
+        if k <= 0:
+            return pool[:0]
+        candidate_scores = row_scores[pool]
+        if k < len(pool):
+            kth = np.partition(candidate_scores, len(pool) - k)[len(pool) - k]
+            above = np.flatnonzero(candidate_scores > kth)
+            tied = np.flatnonzero(candidate_scores == kth)[:k - len(above)]
+            chosen = np.concatenate((above, tied))
+        else:
+            chosen = np.arange(len(pool))
+        chosen = chosen[np.lexsort((chosen, -candidate_scores[chosen]))]
+        return pool[chosen]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and query counters"""
+        state = self._state
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "built": state is not None,
+            "stale": self.stale,
+            "rows": len(state.ids) if state else 0,
+            "terms": len(state.vocabulary) if state else 0,
+            "postings": int(len(state.rows)) if state else 0,
+            "mask_builds": state.masks.builds if state else 0,
+            "mask_hits": state.masks.hits if state else 0,
+            "cached_masks": len(state.masks) if state else 0,
+        })
+        return stats
@@ -0,0 +1,100 @@
+"""
+Generation counter for the recipe store, shared by every process using it.
+
+Each process keeps its own parsed corpus and the state derived from it. A
+write made by another gunicorn worker, or by a maintenance script, changes the
+store without telling this process. So every write to recipe_details_cache
+bumps a counter kept in a small file next to the ChromaDB store. The corpus
+compares that counter with the one its snapshot was loaded at (at most every
+RECIPE_STORE_GENERATION_CHECK_SECONDS) and rebuilds when another process
+moved it.
+
+Bumps take an exclusive flock on a sidecar lock file and replace the counter
+file atomically, so readers never see a partial value. Where fcntl is
+unavailable (Windows) bumps are not locked, and two writers racing each
+other can miss the other's change.
+"""
+
+import os
+import threading
+import logging
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STORE_GENERATION_FILE = 'recipe_store.generation'
+# How stale another process's write may be before a reader notices it
+STORE_GENERATION_CHECK_SECONDS = float(os.environ.get('RECIPE_STORE_GENERATION_CHECK_SECONDS', '1.0'))
+
+
+class StoreGeneration:
+    """Persisted write counter for one recipe store"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def read(self) -> int:
+        """Current generation (0 if nothing was ever recorded)"""
+        try:
+            with open(self.path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> Tuple[int, int]:
+        """
+        Record a write to the store.
+
+        Returns:
+            Tuple of (previous, new) generation; previous differs from what
+            this process last saw when another process wrote in between
+        """
+        with self._lock:
+            lock_file = None
+            try:
+                if fcntl is not None:
+                    lock_file = open(self.path + '.lock', 'a')
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                previous = self.read()
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.write(str(previous + 1))
+                os.replace(tmp_path, self.path)
+                return previous, previous + 1
+            except OSError as e:
+                logger.warning(f"Could not record recipe store change in {self.path}: {e}")
+                previous = self.read()
+                return previous, previous
+            finally:
+                if lock_file is not None:
+                    lock_file.close()
+
+
+def store_generation_path(chroma_path: str) -> str:
+    """Counter file for the store kept in `chroma_path`"""
+    return os.path.join(chroma_path, STORE_GENERATION_FILE)
+
+
+
+def mark_store_changed(chroma_path: Optional[str] = None) -> int:
+    """
+    Record a write to recipe_details_cache made outside RecipeCacheService
+    (maintenance scripts), so running servers reload their corpus and don't
+    boot from a snapshot file that predates it.
+
+    Args:
+        chroma_path: Data directory of the store (default: the configured one)
+
+    Returns:
+        int: The new generation
+    """
+    if chroma_path is None:
+        from utils.chromadb_singleton import get_chromadb_path
+        chroma_path = get_chromadb_path()
+    return StoreGeneration(store_generation_path(chroma_path)).bump()[1]
@@ -6,7 +6,6 @@ This ensures data is always available on Railway
 
 import os
 import sys
-import json
 import time
 from pathlib import Path
 
@@ -126,35 +125,11 @@ def restore_from_sample_data():
         from services.recipe_cache_service import RecipeCacheService
         recipe_cache = RecipeCacheService()
         
-        restored_count = 0
-        for recipe in sample_recipes:
-            try:
-                recipe_id = recipe['id']
-                document = json.dumps(recipe)
-                metadata = {
-                    'cuisine': recipe.get('cuisine', ''),
-                    'cuisines': json.dumps(recipe.get('cuisines', [])),
-                    'diets': recipe.get('diets', ''),
-                    'ingredients': json.dumps(recipe.get('ingredients', [])),
-                    'instructions': json.dumps(recipe.get('instructions', [])),
-                    'calories': recipe.get('calories', 0),
-                    'protein': recipe.get('protein', 0),
-                    'carbs': recipe.get('carbs', 0),
-                    'fat': recipe.get('fat', 0)
-                }
-                
-                # Store in ChromaDB
-                recipe_cache.recipe_collection.upsert(
-                    ids=[recipe_id],
-                    documents=[document],
-                    metadatas=[metadata]
-                )
-                restored_count += 1
-                
-            except Exception as e:
-                print(f"   ⚠️ Error restoring recipe {recipe.get('id', 'unknown')}: {e}")
-                continue
-        
+        # Schema v2 documents with the filterable metadata, published to the corpus
+        if not recipe_cache.cache_recipes(sample_recipes):
+            print("   ⚠️ Error restoring sample recipes")
+            return False
+        restored_count = len(sample_recipes)
         print(f"✅ Restored {restored_count} sample recipes to ChromaDB")
         return restored_count > 0
         
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test that cached row counts follow the cache service's writes without an
+extra store lookup per upsert
+"""
+
+import os
+import sys
+import tempfile
+
+# Keep the test's ChromaDB client (when chromadb is installed) away from the real store
+os.environ.setdefault('CHROMA_DB_PATH', tempfile.mkdtemp(prefix='cache_statistics_'))
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.cache_stats import CacheStatistics
+from services.recipe_cache_service import RecipeCacheService
+
+
+class CountingCollection:
+    """In-memory collection that counts get() round trips"""
+
+    def __init__(self):
+        self.rows = {}
+        self.gets = 0
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        self.gets += 1
+        keys = [k for k in ids if k in self.rows] if ids is not None else list(self.rows)
+        return {"ids": keys, "documents": [self.rows[k][0] for k in keys], "metadatas": [self.rows[k][1] for k in keys]}
+
+    def upsert(self, ids, documents, metadatas=None, embeddings=None):
+        for i, rid in enumerate(ids):
+            self.rows[rid] = (documents[i], metadatas[i] if metadatas else {})
+
+
+def _make_service():
+    service = RecipeCacheService()
+    service.client = object()
+    service.recipe_collection = CountingCollection()
+    service.search_collection = CountingCollection()
+    service.cache_statistics = CacheStatistics(interval=0)
+    service.cache_statistics.configure(tempfile.mkdtemp(prefix='cache_statistics_'), {
+        "recipes": service._count_stored_recipes,
+        "searches": service._count_stored_searches,
+    })
+    return service
+
+
+def _recipes(*ids):
+    return [{"id": rid, "title": f"Recipe {rid}", "ingredients": [{"name": "rice"}]} for rid in ids]
+
+
+def test_skip_existing_write_reuses_its_lookup():
+    """cache_recipe looks the ids up once and counts the new rows from that lookup"""
+    service = _make_service()
+    assert service.cache_statistics.count("recipes") == 0
+    service.recipe_collection.gets = 0
+    assert service.cache_recipes(_recipes("1", "2"), skip_existing=True)
+    assert service.recipe_collection.gets == 1
+    assert service.cache_statistics.tracking("recipes")
+    assert service.cache_statistics.count("recipes") == 2
+
+    service.recipe_collection.gets = 0
+    assert service.cache_recipe(_recipes("2")[0]) is True
+    assert service.recipe_collection.gets == 1
+    assert service.cache_statistics.count("recipes") == 2
+
+
+def test_plain_upsert_recounts_lazily():
+    """An upsert without a lookup marks the count stale instead of reading the store"""
+    service = _make_service()
+    assert service.cache_statistics.count("recipes") == 0
+    service.recipe_collection.gets = 0
+    assert service.cache_recipes(_recipes("1", "2", "3"))
+    assert service.recipe_collection.gets == 0
+    assert not service.cache_statistics.tracking("recipes")
+    assert service.cache_statistics.count("recipes") == 3
+    assert service.cache_statistics.tracking("recipes")
+
+
+if __name__ == "__main__":
+    test_skip_existing_write_reuses_its_lookup()
+    test_plain_upsert_recounts_lazily()
+    print("✅ Cache statistics tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the dietary classifier on keyword edge cases: compounds and inflections
+of meat and animal-product words, and plant foods that start with one
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.dietary_classifier import classify_recipe, diet_metadata, flags_from_metadata
+
+MEAT = (False, False)
+VEGETARIAN = (True, False)
+VEGAN = (True, True)
+
+CASES = [
+    # Compounds and inflections of meat words
+    ("Frozen meatballs", MEAT),
+    ("Meatloaf mix", MEAT),
+    ("Cheeseburger patties", MEAT),
+    ("Beefsteak tomato", MEAT),
+    ("Hamburger buns", MEAT),
+    ("Minced beef", MEAT),
+    ("Garlic prawns", MEAT),
+    ("Anchovies on toast", MEAT),
+    ("Roast geese", MEAT),
+    # Compounds and inflections of animal products
+    ("Buttery crackers", VEGETARIAN),
+    ("Cheesy garlic bread", VEGETARIAN),
+    ("Creamy tomato soup", VEGETARIAN),
+    ("Eggwhites omelette", VEGETARIAN),
+    ("Scrambled eggs", VEGETARIAN),
+    ("Greek yoghurt bowl", VEGETARIAN),
+    # Plant foods that start with a keyword
+    ("Roasted eggplant", VEGAN),
+    ("Butternut squash soup", VEGAN),
+    ("Butter beans on toast", VEGAN),
+    ("Honeydew salad", VEGAN),
+    ("Chickpea curry", VEGAN),
+    ("Kidney bean chili", VEGAN),
+    ("Hearty lentil stew", VEGAN),
+    ("Artichoke hearts with minced garlic", VEGAN),
+    ("Falafel burgers", VEGAN),
+    ("Gooseberry compote", VEGAN),
+]
+
+
+def test_keyword_edge_cases():
+    """Each title classifies as expected"""
+    failures = [(title, classify_recipe({"title": title}), expected)
+                for title, expected in CASES if classify_recipe({"title": title}) != expected]
+    assert not failures, failures
+
+
+def test_ingredients_and_instructions_are_scanned():
+    """Keywords in ingredient names and instructions count, not just the title"""
+    recipe = {"title": "Weeknight pasta", "ingredients": [{"name": "spaghetti"}, {"name": "parmesan"}],
+              "instructions": ["Boil the pasta briefly", "Toss with the cheese"]}
+    assert classify_recipe(recipe) == VEGETARIAN
+    recipe["ingredients"].append("2 chicken breasts")
+    assert classify_recipe(recipe) == MEAT
+
+
+def test_stored_flags_round_trip():
+    """Flags written by diet_metadata are read back; other versions are treated as missing"""
+    metadata = diet_metadata({"title": "Cheesy garlic bread"})
+    assert flags_from_metadata(metadata) == VEGETARIAN
+    assert flags_from_metadata(dict(metadata, diet_classifier_version=metadata["diet_classifier_version"] - 1)) is None
+
+
+if __name__ == "__main__":
+    test_keyword_edge_cases()
+    test_ingredients_and_instructions_are_scanned()
+    test_stored_flags_round_trip()
+    print("✅ Dietary classifier tests passed")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test that filters pushed down to the recipe store return the same recipes as
+the in-memory filter path, and that pushdown turns off when rows without the
+filter fields are written
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Keep the test's ChromaDB client (when chromadb is installed) away from the real store
+os.environ.setdefault('CHROMA_DB_PATH', tempfile.mkdtemp(prefix='filter_pushdown_'))
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.recipe_cache_service as recipe_cache_module
+from services.recipe_cache_service import RecipeCacheService
+from services.recipe_filter_schema import collection_migrated, strip_filter_metadata
+from services.store_generation import StoreGeneration, store_generation_path
+
+RECIPES = [
+    {"id": "1", "title": "Chicken Tikka Masala", "cuisines": ["Indian"], "ingredients": ["chicken", "yogurt", "tomato"],
+     "nutrition": {"calories": 620, "protein": 42}, "readyInMinutes": 50},
+    {"id": "2", "title": "Chana Masala", "cuisines": ["Indian"], "diets": ["vegan"], "ingredients": ["chickpeas", "onion", "rice"],
+     "nutrition": {"calories": 410, "protein": 14}, "readyInMinutes": 30},
+    {"id": "3", "title": "Margherita Pizza", "cuisine": "Italian", "diets": ["vegetarian"], "ingredients": ["flour", "mozzarella", "basil"],
+     "nutrition": {"calories": 780, "protein": 30}, "readyInMinutes": 25},
+    {"id": "4", "title": "Mushroom Risotto", "cuisines": ["Italian"], "ingredients": ["rice", "mushrooms", "parmesan"],
+     "calories": 520, "readyInMinutes": 40},
+    {"id": "5", "title": "Beef Tacos", "cuisines": ["Mexican"], "ingredients": ["beef", "tortillas", "salsa"],
+     "nutrition": {"calories": 560, "protein": 35}, "readyInMinutes": 20},
+    {"id": "6", "title": "Black Bean Burrito Bowl", "cuisines": ["Mexican"], "diets": ["vegan", "gluten free"],
+     "ingredients": ["black beans", "rice", "corn"], "nutrition": {"calories": 480, "protein": 18}},
+    {"id": "7", "title": "Southern Fried Chicken", "cuisines": ["Southern", "American"], "ingredients": ["chicken", "buttermilk", "flour"],
+     "nutrition": {"calories": 900, "protein": 55}, "readyInMinutes": 60},
+    {"id": "8", "title": "Greek Salad", "cuisines": ["Greek", "Mediterranean"], "diets": ["vegetarian", "gluten free"],
+     "ingredients": ["cucumber", "feta", "olives"], "nutrition": {"calories": 300, "protein": 9}, "readyInMinutes": 10},
+    {"id": "9", "title": "Pad Thai", "cuisines": ["Thai"], "ingredients": ["rice noodles", "shrimp", "peanuts"]},
+]
+
+FILTERS = [
+    {"cuisine": "italian"},
+    {"cuisine": ["indian", "mexican"]},
+    {"cuisine": "american", "cuisine_match": "exact"},
+    {"cuisine": "south"},
+    {"dietary_restrictions": ["vegetarian"], "dietary_match": "all"},
+    {"dietary_restrictions": ["vegan", "gluten free"], "dietary_match": "all"},
+    {"dietary_restrictions": ["vegan"], "dietary_match": "any"},
+    {"nutrition_ranges": {"calories": [None, 500.0]}},
+    {"nutrition_ranges": {"protein": [20.0, None], "ready_in_minutes": [None, 45.0]}},
+    {"cuisine": ["indian", "mexican"], "dietary_restrictions": ["vegetarian"], "dietary_match": "all",
+     "nutrition_ranges": {"calories": [None, 500.0]}},
+]
+
+
+def _matches(where, metadata):
+    """Evaluate a ChromaDB where clause against one row's metadata"""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_matches(clause, metadata) for clause in where["$and"])
+    if "$or" in where:
+        return any(_matches(clause, metadata) for clause in where["$or"])
+    (key, condition), = where.items()
+    if key not in metadata:
+        return False
+    if isinstance(condition, dict):
+        (op, value), = condition.items()
+        return {"$eq": metadata[key] == value, "$gte": metadata[key] >= value, "$lte": metadata[key] <= value}[op]
+    return metadata[key] == condition
+
+
+class InMemoryCollection:
+    """Stand-in for recipe_details_cache that evaluates where clauses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.where_reads = 0
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        if ids is not None:
+            keys = [k for k in ids if k in self.rows]
+        else:
+            keys = [k for k, (_, metadata) in self.rows.items() if _matches(where, metadata)]
+            keys = keys[offset:offset + limit] if limit else keys[offset:]
+        if where:
+            self.where_reads += 1
+        return {"ids": keys, "documents": [self.rows[k][0] for k in keys], "metadatas": [self.rows[k][1] for k in keys]}
+
+    def upsert(self, ids, documents, metadatas=None, embeddings=None):
+        for i, rid in enumerate(ids):
+            self.rows[rid] = (documents[i], metadatas[i] if metadatas else {})
+
+
+def _make_service():
+    """Cache service reading from an in-memory store, with the corpus off so filters reach the store"""
+    service = RecipeCacheService()
+    service.client = object()
+    service.recipe_collection = InMemoryCollection()
+    service.store_generation = None
+    service._filter_schema_state = (False, None, None)
+    for recipe in RECIPES:
+        recipe = dict(recipe, ingredients=[{"name": name} for name in recipe["ingredients"]])
+        record = RecipeCacheService._prepare_cache_record(recipe)
+        service.recipe_collection.upsert([record.id], [record.document], [record.metadata])
+    return service
+
+
+def _search(service, filters, pushdown):
+    recipe_cache_module.FILTER_PUSHDOWN_ENABLED = pushdown
+    return sorted(r["id"] for r in service._search_cached_recipes("", "", json.loads(json.dumps(filters))))
+
+
+def test_pushdown_matches_in_memory_filters():
+    """Every filter combination returns the same recipes with and without pushdown"""
+    service = _make_service()
+    corpus_enabled = recipe_cache_module.CORPUS_ENABLED
+    recipe_cache_module.CORPUS_ENABLED = False
+    try:
+        assert collection_migrated(service.recipe_collection)
+        for filters in FILTERS:
+            expected = _search(service, filters, pushdown=False)
+            assert _search(service, filters, pushdown=True) == expected, filters
+        assert service.recipe_collection.where_reads > 0
+    finally:
+        recipe_cache_module.CORPUS_ENABLED = corpus_enabled
+        recipe_cache_module.FILTER_PUSHDOWN_ENABLED = True
+
+
+def test_unmigrated_write_disables_pushdown():
+    """A row written without the filter fields turns pushdown off after invalidate_corpus"""
+    service = _make_service()
+    filters = {"cuisine": "italian"}
+    assert service._store_where(filters) is not None
+
+    document, metadata = service.recipe_collection.rows["3"]
+    service.recipe_collection.rows["3"] = (document, strip_filter_metadata(metadata))
+    service.invalidate_corpus("test_legacy_write")
+    assert service._store_where(filters) is None
+
+
+def test_other_process_write_disables_pushdown():
+    """A store generation bump (another worker or a script) makes the next read re-check the schema"""
+    service = _make_service()
+    service.store_generation = StoreGeneration(store_generation_path(tempfile.mkdtemp(prefix='filter_pushdown_')))
+    filters = {"cuisine": "italian"}
+    assert service._store_where(filters) is not None
+
+    document, metadata = service.recipe_collection.rows["4"]
+    service.recipe_collection.rows["4"] = (document, strip_filter_metadata(metadata))
+    assert service._store_where(filters) is not None
+    service.store_generation.bump()
+    assert service._store_where(filters) is None
+
+
+if __name__ == "__main__":
+    test_pushdown_matches_in_memory_filters()
+    test_unmigrated_write_disables_pushdown()
+    test_other_process_write_disables_pushdown()
+    print("✅ Filter pushdown tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test summary projection: view=summary and fields=..., and that indexed
+summaries are only used for the corpus recipe they were built from
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import services.recipe_summaries as recipe_summaries
+from services.recipe_summaries import (
+    RecipeSummaryIndex, SUMMARY_FIELDS, SUMMARY_SOURCE_FIELDS, build_summary, parse_projection, shape_recipes
+)
+
+RECIPES = [
+    {"id": "1", "title": "Chicken Tikka Masala", "cuisines": ["Indian"], "image": "tikka.jpg",
+     "nutrition": {"calories": 620, "protein": 42}, "readyInMinutes": 50,
+     "ingredients": [{"name": "chicken"}], "instructions": ["Cook"]},
+    {"id": "2", "title": "Chana Masala", "cuisine": "Indian", "diets": ["vegan"], "calories": 410,
+     "ingredients": [{"name": "chickpeas"}], "instructions": ["Simmer"]},
+]
+
+
+def _index(recipes=RECIPES):
+    index = RecipeSummaryIndex()
+    index.build(1, recipes)
+    return index
+
+
+class _RecordingDict(dict):
+    """Dict that remembers which keys were read"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read = set()
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return super().get(key, default)
+
+
+def test_source_fields_cover_build_summary():
+    """The copy check compares every key build_summary reads"""
+    recipe = _RecordingDict(RECIPES[0])
+    build_summary(recipe)
+    assert recipe.read <= set(SUMMARY_SOURCE_FIELDS), recipe.read - set(SUMMARY_SOURCE_FIELDS)
+
+
+def test_parse_projection():
+    assert parse_projection(None, "summary") == ("summary", None)
+    assert parse_projection("summary", None) == ("summary", None)
+    assert parse_projection("id, title,", None) == (None, ["id", "title"])
+    try:
+        parse_projection(None, "full")
+        assert False, "unknown view accepted"
+    except ValueError:
+        pass
+
+
+def test_summary_view_and_fields():
+    """view=summary returns the summary fields plus request fields and extra fields, never the heavy ones"""
+    original = recipe_summaries._recipe_summary_index
+    recipe_summaries._recipe_summary_index = _index()
+    try:
+        scored = dict(RECIPES[0], search_score=0.9)
+        shaped, = shape_recipes([scored], "summary", ["instructions"])
+        assert set(shaped) == set(SUMMARY_FIELDS) | {"search_score", "instructions"}
+        assert shaped["calories"] == 620 and shaped["cuisine"] == "Indian" and shaped["ready_in_minutes"] == 50
+        assert "ingredients" not in shaped
+
+        projected, = shape_recipes([RECIPES[1]], None, ["title", "missing"])
+        assert projected == {"id": "2", "title": "Chana Masala"}
+        assert shape_recipes(RECIPES, None, None) is RECIPES
+    finally:
+        recipe_summaries._recipe_summary_index = original
+
+
+def test_copies_use_index_and_other_recipes_do_not():
+    """A scored copy of a corpus recipe uses the stored summary; a different recipe with the same id does not"""
+    index = _index()
+    assert index.get(dict(RECIPES[0], search_score=1.0)) is index.get(RECIPES[0])
+    assert index.get_stats()["mismatches"] == 0
+
+    api_recipe = {"id": "1", "title": "Butter Chicken", "cuisines": ["Indian"], "calories": 700}
+    summary = index.get(api_recipe)
+    assert summary == build_summary(api_recipe)
+    assert summary["title"] == "Butter Chicken" and summary["calories"] == 700
+
+    edited = dict(RECIPES[0], title="Tikka Masala (edited)")
+    assert index.get(edited)["title"] == "Tikka Masala (edited)"
+    assert index.get_stats()["mismatches"] == 2
+
+    assert index.get({"id": "404", "title": "Unknown"})["title"] == "Unknown"
+    assert index.get_stats()["misses"] == 1
+
+
+def test_duplicates_resolve_the_same_way_in_build_and_upserts():
+    """The last recipe for an id wins whether it arrives in a build or an upsert batch"""
+    first = {"id": "7", "title": "First"}
+    second = {"id": "7", "title": "Second"}
+
+    built = _index([first, second])
+    upserted = _index([])
+    upserted.apply_upserts(2, [(0, first), (0, second)])
+    for index in (built, upserted):
+        assert index.get(second) is index.get(dict(second))
+        assert index.get(first)["title"] == "First"
+        assert index.get_stats()["summaries"] == 1
+
+    third = {"id": "7", "title": "Third"}
+    built.apply_upserts(2, [(0, third)])
+    assert built.get(second)["title"] == "Second"
+    assert built.get(dict(third))["title"] == "Third"
+
+
+if __name__ == "__main__":
+    test_source_fields_cover_build_summary()
+    test_parse_projection()
+    test_summary_view_and_fields()
+    test_copies_use_index_and_other_recipes_do_not()
+    test_duplicates_resolve_the_same_way_in_build_and_upserts()
+    print("✅ Recipe summary tests passed")
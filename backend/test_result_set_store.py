@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test result-set handles: expiry, sharing through the on-disk table, corrupt
+rows, and that searches only keep a result set when asked to
+"""
+
+import os
+import sys
+import time
+import asyncio
+import sqlite3
+import tempfile
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.result_set_store import ResultSetStore, RESULT_SET_FILE
+from services.recipe_service import RecipeService
+
+
+def _table_path():
+    return os.path.join(tempfile.mkdtemp(prefix='result_sets_'), RESULT_SET_FILE)
+
+
+def test_handle_round_trip_and_expiry():
+    """A handle returns its ids until unused for the TTL"""
+    store = ResultSetStore(ttl_seconds=0.2)
+    handle = store.put(["1", 2, None, "", "3"])
+    assert store.get(handle) == ["1", "2", "3"]
+    time.sleep(0.3)
+    assert store.get(handle) is None
+    assert store.get_stats()["expired"] == 1
+    assert store.get("unknown") is None
+
+
+def test_handle_shared_between_processes():
+    """A handle made by one worker resolves in another through the table, and expires there too"""
+    path = _table_path()
+    writer = ResultSetStore(ttl_seconds=0.5, path=path)
+    reader = ResultSetStore(ttl_seconds=0.5, path=path)
+    handle = writer.put(["a", "b"], corpus_version=7)
+    assert reader.get(handle) == ["a", "b"]
+    assert reader.get_stats()["disk_hits"] == 1
+
+    stale = writer.put(["c"])
+    time.sleep(0.6)
+    assert ResultSetStore(ttl_seconds=0.5, path=path).get(stale) is None
+
+
+def test_corrupt_row_is_treated_as_expired():
+    """An unreadable row is a miss, not an exception"""
+    path = _table_path()
+    handle = ResultSetStore(path=path).put(["a"])
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE result_sets SET ids = ? WHERE handle = ?", ("{not json", handle))
+        connection.execute("INSERT INTO result_sets (handle, last_used, corpus_version, ids) VALUES (?, ?, ?, ?)",
+                           ("dict_row", time.time(), None, '{"a": 1}'))
+    reader = ResultSetStore(path=path)
+    assert reader.get(handle) is None
+    assert reader.get("dict_row") is None
+    assert reader.get_stats()["expired"] == 2
+
+
+class _StubCache:
+    def __init__(self, recipes):
+        self.recipes = recipes
+
+    def get_cached_recipes(self, query, ingredient, filters, rank_limit=None):
+        within = filters.get("within_ids")
+        return [r for r in self.recipes if within is None or r["id"] in within]
+
+
+def test_search_keeps_result_set_only_when_asked():
+    """Plain searches store nothing; keep_result_set returns a handle usable with `within`"""
+    service = RecipeService(_StubCache([{"id": str(i), "title": f"Recipe {i}"} for i in range(5)]))
+    service.result_sets = ResultSetStore()
+
+    plain = asyncio.run(service.search_recipes(limit=2))
+    assert plain["result_set"] is None
+    assert service.result_sets.get_stats()["created"] == 0
+
+    kept = asyncio.run(service.search_recipes(limit=2, keep_result_set=True))
+    assert kept["result_set"]
+    within = asyncio.run(service.search_recipes(within=kept["result_set"]))
+    assert within["total"] == 5
+
+    expired = asyncio.run(service.search_recipes(within="gone"))
+    assert expired["result_set_expired"] is True
+
+
+if __name__ == "__main__":
+    test_handle_round_trip_and_expiry()
+    test_handle_shared_between_processes()
+    test_corrupt_row_is_treated_as_expired()
+    test_search_keeps_result_set_only_when_asked()
+    print("✅ Result-set store tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test seeded pagination cursors: round trips, pages that never overlap, and
+malformed cursors rejected with ValueError (a 400 from /api/get_recipes)
+"""
+
+import os
+import sys
+import json
+import base64
+
+# Add the current directory to the path so we can import services
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.seeded_pagination import decode_cursor, encode_cursor, seeded_page
+
+
+def _cursor(payload):
+    """Cursor-encode any JSON value, the way a client could forge one"""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_cursor_round_trip():
+    """A cursor decodes to the seed and key it was made from"""
+    assert decode_cursor(encode_cursor(42, (123456789, "recipe_7"))) == (42, (123456789, "recipe_7"))
+
+
+def test_cursor_pages_cover_every_recipe_once():
+    """Following cursors visits every recipe exactly once"""
+    recipes = [{"id": str(i)} for i in range(23)]
+    seen, after = [], None
+    while True:
+        page, after = seeded_page(recipes, 5, limit=5, after=after)
+        seen.extend(r["id"] for r in page)
+        if after is None:
+            break
+        seed, after = decode_cursor(encode_cursor(5, after))
+        assert seed == 5
+    assert sorted(seen, key=int) == [r["id"] for r in recipes]
+
+
+def test_malformed_cursors_raise_value_error():
+    """Anything that isn't a current cursor object raises ValueError, never another exception"""
+    malformed = [
+        "",
+        "not base64!",
+        "é",
+        base64.urlsafe_b64encode(b"not json").decode('ascii'),
+        _cursor([1, 2, 3]),
+        _cursor("a string"),
+        _cursor(7),
+        _cursor(None),
+        _cursor({"v": 2, "seed": 1, "after": [1, "a"]}),
+        _cursor({"v": 1, "seed": 1}),
+        _cursor({"v": 1, "seed": "x", "after": [1, "a"]}),
+        _cursor({"v": 1, "seed": 1, "after": "12"}),
+        _cursor({"v": 1, "seed": 1, "after": {"0": 1}}),
+        _cursor({"v": 1, "seed": 1, "after": [1]}),
+        _cursor({"v": 1, "seed": 1, "after": ["x", "a"]}),
+        _cursor({"v": 1, "seed": 1e999, "after": [1, "a"]}),
+    ]
+    for cursor in malformed:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"cursor {cursor!r} was accepted")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_cursor_pages_cover_every_recipe_once()
+    test_malformed_cursors_raise_value_error()
+    print("✅ Seeded pagination tests passed")
@@ -1,43 +1,90 @@
 """
 Lightweight embedding functions for ChromaDB to avoid model downloads
+
+With NumPy available, each call embeds the whole batch of texts into one
+matrix instead of building every vector one float at a time in Python.
+
+LIGHTWEIGHT_EMBEDDING_MODE selects the vectors:
+  compat  (default) the vectors existing collections were built with,
+          reproduced exactly (bit for bit) by the vectorized code
+  hashed  a hashing-trick bag of words: each token is hashed to a signed
+          column, so the same word always lands in the same place, and
+          vectors are L2-normalized. Collections embedded in compat mode must
+          be re-embedded before switching, or stored and query vectors won't
+          be comparable.
 """
 
+import os
+import re
+import zlib
 import hashlib
+import logging
 from typing import List
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODE_COMPAT = 'compat'
+EMBEDDING_MODE_HASHED = 'hashed'
+EMBEDDING_MODE = os.environ.get('LIGHTWEIGHT_EMBEDDING_MODE', EMBEDDING_MODE_COMPAT).lower()
+
+# Code points str.split() treats as separators (none lie above U+3000)
+_WHITESPACE = [c for c in range(0x3001) if chr(c).isspace()]
+_TOKEN = re.compile(r'\w+')
+# Batches shorter than this (in characters) embed faster in the per-text loop
+VECTORIZE_MIN_CHARS = int(os.environ.get('LIGHTWEIGHT_EMBEDDING_VECTORIZE_MIN_CHARS', '2000'))
+# Token -> (column, sign) lookups kept per hashed embedder; cleared when full
+HASHED_TOKEN_CACHE_SIZE = 100000
+
+
+def _vectorize(texts: List[str]) -> bool:
+    """True when a batch is worth embedding as one matrix"""
+    return NUMPY_AVAILABLE and sum(len(text) for text in texts) >= VECTORIZE_MIN_CHARS
+
 
 class LightweightEmbeddingFunction:
     """
     Simple hash-based embedding function that doesn't require model downloads.
     Creates deterministic embeddings from text using SHA-256 hash.
     """
-    
+
+    model_id = 'sha256-v1'
+
     def __init__(self, dimensions: int = 384):
         """
         Initialize the embedding function.
-        
+
         Args:
             dimensions: Number of dimensions for the embedding (default: 384, same as all-MiniLM-L6-v2)
         """
         self.dimensions = dimensions
-    
+
     def __call__(self, input: List[str]) -> List[List[float]]:
         """
         Generate embeddings for input texts.
-        
+
         Args:
             input: List of text strings to embed
-            
+
         Returns:
             List of embedding vectors (one per input text)
         """
+        if _vectorize(input):
+            return self._matrix(input).tolist()
+
         embeddings = []
-        
+
         for text in input:
             # Create a simple embedding from text hash
             hash_obj = hashlib.sha256(text.encode('utf-8'))
             hash_bytes = hash_obj.digest()
-            
+
             # Convert to specified number of float dimensions
             embedding = []
             for i in range(self.dimensions):
@@ -46,83 +93,214 @@ class LightweightEmbeddingFunction:
                 # Normalize to [-1, 1] range
                 normalized_val = (byte_val / 128.0) - 1.0
                 embedding.append(normalized_val)
-            
+
             embeddings.append(embedding)
-        
+
         return embeddings
 
+    def _matrix(self, texts: List[str]):
+        """float64 embeddings of a batch, identical to the per-text loop"""
+        if not texts:
+            return np.zeros((0, self.dimensions))
+        digests = b''.join(hashlib.sha256(text.encode('utf-8')).digest() for text in texts)
+        hash_bytes = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), -1)
+        columns = np.arange(self.dimensions) % hash_bytes.shape[1]
+        return hash_bytes[:, columns] / 128.0 - 1.0
+
+    def embed_matrix(self, texts: List[str]):
+        """Embeddings of a batch as one float32 matrix (one row per text); needs NumPy"""
+        return self._matrix(texts).astype(np.float32)
+
 
 class TokenBasedEmbeddingFunction:
     """
     Simple token-based embedding function for better semantic similarity.
     Still lightweight but more meaningful than pure hash-based.
     """
-    
+
+    model_id = 'token-position-v1'
+
     def __init__(self, dimensions: int = 384):
         """
         Initialize the embedding function.
-        
+
         Args:
             dimensions: Number of dimensions for the embedding
         """
         self.dimensions = dimensions
-    
+
     def __call__(self, input: List[str]) -> List[List[float]]:
         """
         Generate embeddings for input texts using simple token analysis.
-        
+
         Args:
             input: List of text strings to embed
-            
+
         Returns:
             List of embedding vectors (one per input text)
         """
+        if _vectorize(input):
+            return self._matrix(input).tolist()
+
         embeddings = []
-        
+
         for text in input:
             # Simple tokenization and feature extraction
             text_lower = text.lower()
             words = text_lower.split()
-            
+
             # Create embedding based on word characteristics
             embedding = [0.0] * self.dimensions
-            
+
             # Use various text features to populate embedding
             for i, word in enumerate(words[:self.dimensions]):
                 # Position-based features
                 pos_weight = 1.0 - (i / max(len(words), 1))
-                
+
                 # Word length feature
                 length_feature = min(len(word) / 10.0, 1.0)
-                
+
                 # Character-based features
                 char_sum = sum(ord(c) for c in word) % 1000
                 char_feature = (char_sum / 1000.0) * 2.0 - 1.0
-                
+
                 # Combine features
                 idx = i % self.dimensions
                 embedding[idx] = pos_weight * length_feature * char_feature
-            
+
             # Normalize to reasonable range
             max_val = max(abs(v) for v in embedding) or 1.0
             embedding = [v / max_val for v in embedding]
-            
+
             embeddings.append(embedding)
-        
+
         return embeddings
 
+    def _matrix(self, texts: List[str]):
+        """
+        float64 embeddings of a batch, identical to the per-text loop.
 
-def get_lightweight_embedding_function(use_token_based: bool = False, dimensions: int = 384):
+        All texts are lowered and laid out as one array of code points; words are
+        the runs between whitespace (as str.split() finds them), and their lengths
+        and code point sums come from one cumulative sum. The features are then
+        computed with the same float64 operations, in the same order, as the loop.
+        """
+        matrix = np.zeros((len(texts), self.dimensions))
+        if not texts:
+            return matrix
+        lowered = [text.lower() for text in texts]
+        # A separator between texts keeps words from running across them
+        codes = np.frombuffer(' '.join(lowered).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        is_word = ~np.isin(codes, _WHITESPACE)
+        edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if not len(starts):
+            return matrix
+
+        # Text each word belongs to, its position in that text, and the text's word count
+        text_starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+        rows = np.searchsorted(text_starts, starts, side='right') - 1
+        words_per_text = np.bincount(rows, minlength=len(texts))
+        first_word = np.concatenate(([0], np.cumsum(words_per_text)[:-1]))
+        positions = np.arange(len(starts)) - first_word[rows]
+
+        keep = positions < self.dimensions
+        rows, positions, starts, ends = rows[keep], positions[keep], starts[keep], ends[keep]
+        code_sums = np.concatenate(([0], np.cumsum(codes)))
+        char_sums = (code_sums[ends] - code_sums[starts]) % 1000
+
+        pos_weight = 1.0 - (positions / np.maximum(words_per_text[rows], 1))
+        length_feature = np.minimum((ends - starts) / 10.0, 1.0)
+        char_feature = (char_sums / 1000.0) * 2.0 - 1.0
+        matrix[rows, positions] = pos_weight * length_feature * char_feature
+
+        max_val = np.abs(matrix).max(axis=1)
+        max_val[max_val == 0] = 1.0
+        return matrix / max_val[:, None]
+
+    def embed_matrix(self, texts: List[str]):
+        """Embeddings of a batch as one float32 matrix (one row per text); needs NumPy"""
+        return self._matrix(texts).astype(np.float32)
+
+
+class HashedTokenEmbeddingFunction:
+    """
+    Hashing-trick bag of words: every token adds a signed count to the column
+    its CRC-32 selects, and each vector is L2-normalized. Needs NumPy.
+    """
+
+    model_id = 'hashed-tokens-v1'
+
+    def __init__(self, dimensions: int = 384):
+        """
+        Initialize the embedding function.
+
+        Args:
+            dimensions: Number of dimensions for the embedding
+        """
+        self.dimensions = dimensions
+        self._token_columns = {}
+
+    def _columns(self, token: str):
+        column = self._token_columns.get(token)
+        if column is None:
+            if len(self._token_columns) >= HASHED_TOKEN_CACHE_SIZE:
+                self._token_columns.clear()
+            digest = zlib.crc32(token.encode('utf-8'))
+            column = (digest % self.dimensions, -1.0 if digest & 0x80000000 else 1.0)
+            self._token_columns[token] = column
+        return column
+
+    def embed_matrix(self, texts: List[str]):
+        """Embeddings of a batch as one float32 matrix (one row per text)"""
+        lookup = self._token_columns.get
+        cells, signs = [], []
+        for row, text in enumerate(texts):
+            offset = row * self.dimensions
+            for token in _TOKEN.findall(text.lower()):
+                column, sign = lookup(token) or self._columns(token)
+                cells.append(offset + column)
+                signs.append(sign)
+        # Signed token counts per (text, column) cell, accumulated in one pass
+        matrix = np.bincount(np.array(cells, dtype=np.int64), weights=np.array(signs),
+                             minlength=len(texts) * self.dimensions)
+        matrix = matrix.reshape(len(texts), self.dimensions).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        return matrix / norms[:, None]
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for input texts.
+
+        Args:
+            input: List of text strings to embed
+
+        Returns:
+            List of embedding vectors (one per input text)
+        """
+        return self.embed_matrix(input).tolist()
+
+
+def get_lightweight_embedding_function(use_token_based: bool = False, dimensions: int = 384, mode: str = None):
     """
     Get a lightweight embedding function for ChromaDB.
-    
+
     Args:
         use_token_based: If True, use token-based embeddings; if False, use hash-based
         dimensions: Number of dimensions for embeddings
-        
+        mode: 'compat' or 'hashed' (default: LIGHTWEIGHT_EMBEDDING_MODE); 'hashed'
+            replaces the token-based embeddings
+
     Returns:
         Embedding function instance
     """
+    mode = (mode or EMBEDDING_MODE).lower()
+    if use_token_based and mode == EMBEDDING_MODE_HASHED:
+        if NUMPY_AVAILABLE:
+            return HashedTokenEmbeddingFunction(dimensions)
+        logger.warning("Hashed token embeddings need NumPy; using compat token embeddings")
     if use_token_based:
         return TokenBasedEmbeddingFunction(dimensions)
     else:
@@ -35,11 +35,16 @@ export interface FetchRecipesOptions {
   diets?: string[];
   favoriteFoods?: string[];
   baseRecipes?: any[]; // For chained search: filter ingredient search within previous results
+  within?: string; // For chained search: result-set handle returned by a previous search
+  keepResultSet?: boolean; // Ask for a result-set handle so a later search can run within these results
+  seed?: number; // Stable shuffle: pages requested with the same seed never overlap
 }
 
 export interface PaginatedRecipes {
   recipes: ManualRecipe[];
   total: number;
+  resultSet?: string; // Handle for searching within these results
+  resultSetExpired?: boolean; // The `within` handle had expired; results come from a search without it
 }
 
 export const fetchManualRecipes = async (
@@ -89,6 +94,21 @@ export const fetchManualRecipes = async (
       params.append('cuisine', options.cuisines.join(','));
     }
     
+    // Seeded shuffle so page N is the same recipes every time it is requested
+    if (options.seed !== undefined) {
+      params.append('seed', options.seed.toString());
+    }
+    
+    // Restrict the search to a previous result set (chained search)
+    if (options.within) {
+      params.append('within', options.within);
+    }
+    
+    // The server only keeps a result set (and returns its handle) when asked
+    if (options.keepResultSet) {
+      params.append('result_set', 'true');
+    }
+    
     // Handle favorite foods
     if (options.favoriteFoods?.length) {
       params.append('favorite_foods', options.favoriteFoods.join(','));
@@ -145,6 +165,13 @@ export const fetchManualRecipes = async (
         error: errorText
       });
       
+      // The `within` handle expired (410): run the same search without it
+      if (response.status === 410 && options.within) {
+        console.log('Result set expired, searching without it');
+        const retried = await fetchManualRecipes(query, ingredient, { ...options, within: undefined });
+        return { ...retried, resultSetExpired: true };
+      }
+      
       // Don't throw for 404, just return empty result
       if (response.status === 404) {
         console.log('No recipes found for query');
@@ -169,6 +196,7 @@ export const fetchManualRecipes = async (
     // Handle both array response and object with results key
     let recipes: any[] = [];
     let total = 0;
+    const resultSet: string | undefined = data?.result_set || undefined;
     
     if (data && data.results && data.total !== undefined) {
       // New format with results and total
@@ -381,7 +409,8 @@ export const fetchManualRecipes = async (
       
       return {
         recipes: usableRecipes,
-        total: total || usableRecipes.length
+        total: total || usableRecipes.length,
+        resultSet
       };
     } else {
       // If no recipes found, return empty array with 0 total
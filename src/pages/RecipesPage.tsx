@@ -106,6 +106,9 @@ const RecipesPage: React.FC = () => {
   const [showLoading, setShowLoading] = useState(false);
   // Add state to track previous search results for chained search
   const [previousSearchResults, setPreviousSearchResults] = useState<Recipe[]>([]);
+  const [previousResultSet, setPreviousResultSet] = useState<string | undefined>(undefined);
+  // One shuffle seed per visit keeps pages stable (no repeats or gaps between pages)
+  const [shuffleSeed] = useState(() => Math.floor(Math.random() * 2147483647));
   const [isChainedSearch, setIsChainedSearch] = useState(false);
   const [currentPage, setCurrentPage] = useState(() => {
     // Try to restore the current page from localStorage
@@ -175,7 +178,7 @@ const RecipesPage: React.FC = () => {
     data: recipesData = { recipes: [], total: 0 }, 
     isLoading: isLoadingRecipes, 
     isFetching 
-  } = useQuery<{ recipes: Recipe[], total: number }>({
+  } = useQuery<{ recipes: Recipe[], total: number, resultSet?: string }>({
     queryKey: ['recipes', searchQuery, ingredientSearch, selectedCuisines, selectedDiets, currentPage, recipesPerPage, isChainedSearch],
     enabled: true, // Always enable the query to fetch recipes on mount
     queryFn: async () => {
@@ -193,7 +196,7 @@ const RecipesPage: React.FC = () => {
         
         // For chained search: ingredient search filters down from previous name search results
         let result;
-        if (isChainedSearch && ingredientSearch && previousSearchResults.length > 0) {
+        if (isChainedSearch && ingredientSearch && previousResultSet) {
           console.log('🔗 CHAINED SEARCH: Filtering ingredient search within previous name search results');
           // Use a special endpoint or parameter to indicate chained search
           result = await fetchManualRecipes('', ingredientSearch, {
@@ -201,8 +204,13 @@ const RecipesPage: React.FC = () => {
             pageSize: recipesPerPage,
             cuisines: selectedCuisines,
             diets: selectedDiets,
-            baseRecipes: previousSearchResults // Pass previous results for filtering
+            within: previousResultSet, // Server-side handle for the previous results
+            seed: shuffleSeed
           });
+          if (result.resultSetExpired) {
+            // The handle is gone on the server; don't send it again
+            setPreviousResultSet(undefined);
+          }
         } else {
           // Regular search: search from entire database
           console.log('🔍 REGULAR SEARCH: Searching entire database');
@@ -210,7 +218,9 @@ const RecipesPage: React.FC = () => {
             page: currentPage,
             pageSize: recipesPerPage,
             cuisines: selectedCuisines,
-            diets: selectedDiets
+            diets: selectedDiets,
+            seed: shuffleSeed,
+            keepResultSet: Boolean(searchQuery) // Name searches can be narrowed by ingredient later
           });
         }
         
@@ -232,7 +242,8 @@ const RecipesPage: React.FC = () => {
         
         return {
           recipes: result.recipes as unknown as Recipe[],
-          total: totalRecipes
+          total: totalRecipes,
+          resultSet: result.resultSet
         };
       } catch (error) {
         console.error('Error fetching recipes:', error);
@@ -254,6 +265,7 @@ const RecipesPage: React.FC = () => {
       console.log('🔍 Auto-clearing name search: input was cleared');
       setSearchQuery('');
       setPreviousSearchResults([]);
+      setPreviousResultSet(undefined);
       setIsChainedSearch(false);
       updateCurrentPage(1);
     } else {
@@ -274,6 +286,7 @@ const RecipesPage: React.FC = () => {
         // If no name search is active, clear everything
         setSearchQuery('');
         setPreviousSearchResults([]);
+        setPreviousResultSet(undefined);
         setIsChainedSearch(false);
         updateCurrentPage(1);
       }
@@ -319,6 +332,7 @@ const RecipesPage: React.FC = () => {
       setSearchQuery(searchTerm);
       // Keep ingredientSearch as is - don't clear it
       setPreviousSearchResults([]); // Clear previous results
+      setPreviousResultSet(undefined);
       console.log('  - Will do COMBINED SEARCH:');
       console.log('    * Name search for:', searchTerm);
       console.log('    * Ingredient search for:', ingredientSearch);
@@ -330,6 +344,7 @@ const RecipesPage: React.FC = () => {
       setSearchQuery(searchTerm);
       setIngredientSearch(''); // Clear ingredient search for name-only search
       setPreviousSearchResults([]); // Clear previous results
+      setPreviousResultSet(undefined);
       console.log('  - Will do NAME SEARCH for:', searchTerm);
       console.log('  - Backend will ONLY look at recipe titles and descriptions');
     } else if (hasValidIngredientSearch) {
@@ -339,6 +354,7 @@ const RecipesPage: React.FC = () => {
       setSearchQuery(''); // Clear name search for ingredient-only search
       // Keep ingredientSearch as is - this will be sent to backend as ingredient parameter
       setPreviousSearchResults([]); // Clear previous results
+      setPreviousResultSet(undefined);
       console.log('  - Will do INGREDIENT SEARCH for:', ingredientSearch);
       console.log('  - Backend will ONLY look at recipe ingredients field');
       console.log('  - searchQuery will be empty, ingredientSearch will be sent as ingredient parameter');
@@ -351,6 +367,7 @@ const RecipesPage: React.FC = () => {
       setIngredientSearch('');
       setIsChainedSearch(false);
       setPreviousSearchResults([]);
+      setPreviousResultSet(undefined);
     }
     
     updateCurrentPage(1);
@@ -446,6 +463,7 @@ const RecipesPage: React.FC = () => {
     setIngredientSearch("");
     setIsChainedSearch(false);
     setPreviousSearchResults([]);
+    setPreviousResultSet(undefined);
     // Reset to page 1 when clearing all filters
     updateCurrentPage(1);
   }, [updateCurrentPage]);
@@ -594,8 +612,9 @@ const RecipesPage: React.FC = () => {
       console.log('💾 Storing search results for potential chained search');
       console.log('  - Found', recipesData.recipes.length, 'recipes for query:', searchQuery);
       setPreviousSearchResults(recipesData.recipes);
+      setPreviousResultSet(recipesData.resultSet);
     }
-  }, [recipesData.recipes, searchQuery, isChainedSearch]);
+  }, [recipesData.recipes, recipesData.resultSet, searchQuery, isChainedSearch]);
 
   // Auto-clear search when both inputs are empty
   useEffect(() => {
@@ -603,6 +622,7 @@ const RecipesPage: React.FC = () => {
       console.log('🔍 Auto-clearing search: both inputs are empty');
       setSearchQuery('');
       setPreviousSearchResults([]);
+      setPreviousResultSet(undefined);
       setIsChainedSearch(false);
       updateCurrentPage(1);
     }